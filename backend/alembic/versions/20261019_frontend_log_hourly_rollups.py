@@ -0,0 +1,43 @@
+"""Add frontend_log_hourly_rollups and backfill from frontend_logs
+
+Revision ID: 20261019_flroll
+Revises: 68d75a6160a0
+Create Date: 2026-10-19
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+revision: str = "20261019_flroll"
+down_revision: Union[str, Sequence[str], None] = "68d75a6160a0"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "frontend_log_hourly_rollups",
+        sa.Column("hour", sa.DateTime(), nullable=False),
+        sa.Column("level", sa.String(), nullable=False),
+        sa.Column("context", sa.String(), nullable=False),
+        sa.Column("count", sa.Integer(), nullable=False, server_default="0"),
+        sa.PrimaryKeyConstraint("hour", "level", "context"),
+    )
+    op.create_index(
+        op.f("ix_frontend_log_hourly_rollups_hour"), "frontend_log_hourly_rollups", ["hour"], unique=False
+    )
+    op.execute(
+        """
+        INSERT INTO frontend_log_hourly_rollups (hour, level, context, count)
+        SELECT date_trunc('hour', timestamp), level, context, COUNT(*)
+        FROM frontend_logs
+        GROUP BY 1, 2, 3
+        """
+    )
+
+
+def downgrade() -> None:
+    op.drop_index(op.f("ix_frontend_log_hourly_rollups_hour"), table_name="frontend_log_hourly_rollups")
+    op.drop_table("frontend_log_hourly_rollups")
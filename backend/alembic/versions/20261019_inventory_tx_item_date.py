@@ -0,0 +1,28 @@
+"""Add composite index for paged inventory transactions and stock history
+
+Revision ID: 20261019_invtxdate
+Revises: 20261019_sitekey
+Create Date: 2026-10-19
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+revision: str = "20261019_invtxdate"
+down_revision: Union[str, Sequence[str], None] = "20261019_sitekey"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index(
+        "ix_inventory_transactions_item_date",
+        "inventory_transactions",
+        ["item_id", "date", "transaction_id"],
+        unique=False,
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_inventory_transactions_item_date", table_name="inventory_transactions")
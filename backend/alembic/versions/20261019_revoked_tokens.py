@@ -0,0 +1,44 @@
+"""Create revoked_tokens for logout / token revocation
+
+Revision ID: 20261019_revoked
+Revises: 20261019_invtxdate
+Create Date: 2026-10-19
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+revision: str = "20261019_revoked"
+down_revision: Union[str, Sequence[str], None] = "20261019_invtxdate"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # The model predates this migration, so databases built with create_all may already have the table
+    inspector = sa.inspect(op.get_bind())
+    if "revoked_tokens" not in inspector.get_table_names():
+        op.create_table(
+            "revoked_tokens",
+            sa.Column("jti", sa.String(), nullable=False),
+            sa.Column("user_id", sa.String(), nullable=False),
+            sa.Column("token_type", sa.String(), nullable=False),
+            sa.Column("revoked_at", sa.DateTime(), nullable=False),
+            sa.Column("expires_at", sa.DateTime(), nullable=False),
+            sa.Column("reason", sa.String(), nullable=True),
+            sa.ForeignKeyConstraint(["user_id"], ["users.user_id"]),
+            sa.PrimaryKeyConstraint("jti"),
+        )
+        existing = set()
+    else:
+        existing = {ix["name"] for ix in inspector.get_indexes("revoked_tokens")}
+    if "ix_revoked_tokens_expires_at" not in existing:
+        # Purge deletes and filter rebuilds select by expiry
+        op.create_index("ix_revoked_tokens_expires_at", "revoked_tokens", ["expires_at"], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index("ix_revoked_tokens_expires_at", table_name="revoked_tokens")
+    op.drop_table("revoked_tokens")
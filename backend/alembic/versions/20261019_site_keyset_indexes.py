@@ -0,0 +1,25 @@
+"""Add composite indexes for keyset-paged site tickets and shipments
+
+Revision ID: 20261019_sitekey
+Revises: 20261019_sladue
+Create Date: 2026-10-19
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+revision: str = "20261019_sitekey"
+down_revision: Union[str, Sequence[str], None] = "20261019_sladue"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index("ix_tickets_site_created", "tickets", ["site_id", "created_at", "ticket_id"], unique=False)
+    op.create_index("ix_shipments_site_shipment", "shipments", ["site_id", "shipment_id"], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index("ix_shipments_site_shipment", table_name="shipments")
+    op.drop_index("ix_tickets_site_created", table_name="tickets")
@@ -0,0 +1,45 @@
+"""Add tickets.sla_due_at with a partial index for the SLA scanner
+
+Revision ID: 20261019_sladue
+Revises: 20261019_flroll
+Create Date: 2026-10-19
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+revision: str = "20261019_sladue"
+down_revision: Union[str, Sequence[str], None] = "20261019_flroll"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column("tickets", sa.Column("sla_due_at", sa.DateTime(), nullable=True))
+    # Same thresholds as models.compute_sla_due_at: level 0 -> target, level 1 -> breach
+    op.execute(
+        """
+        UPDATE tickets
+        SET sla_due_at = CASE
+            WHEN COALESCE(escalation_level, 0) = 0
+            THEN created_at + make_interval(hours => COALESCE(sla_target_hours, 24))
+            WHEN escalation_level = 1 AND COALESCE(sla_breach_hours, 48) > COALESCE(sla_target_hours, 24)
+            THEN created_at + make_interval(hours => COALESCE(sla_breach_hours, 48))
+        END
+        WHERE status NOT IN ('completed', 'closed', 'approved', 'archived')
+        """
+    )
+    op.create_index(
+        "ix_tickets_sla_due_at_pending",
+        "tickets",
+        ["sla_due_at"],
+        unique=False,
+        postgresql_where=sa.text("sla_due_at IS NOT NULL"),
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_tickets_sla_due_at_pending", table_name="tickets")
+    op.drop_column("tickets", "sla_due_at")
@@ -2,8 +2,14 @@ from sqlalchemy.orm import Session, joinedload, selectinload
 from sqlalchemy import and_, or_, desc, asc, case, update, func, text
 import models, schemas
 import uuid
-from datetime import date, datetime, timezone
-from typing import List, Optional
+from datetime import date, datetime, timedelta, timezone
+from typing import Dict, List, Optional
+from utils.sla_engine import sla_engine, notify_rules_changed
+from utils.site_index import notify_site_saved, notify_site_deleted
+from utils.pagination import encode_cursor, keyset_page, offset_page_with_total
+from utils.inventory_ledger import Adjustment, Decrement, apply_adjustments, apply_decrements
+from utils.barcode_cache import barcode_cache, item_row, notify_inventory_changed
+from utils.metrics import record_cache_lookup
 
 # =============================================================================
 # OPTIMIZED CRUD OPERATIONS WITH PROPER EAGER LOADING
@@ -160,19 +166,77 @@ def create_site(db: Session, site: schemas.SiteCreate):
     db.add(db_site)
     db.commit()
     db.refresh(db_site)
+    notify_site_saved(db_site)
     return db_site
 
 def get_site(db: Session, site_id: str):
-    """Get site with related data eager loaded"""
-    return db.query(models.Site).options(
-        selectinload(models.Site.tickets),
-        selectinload(models.Site.shipments),
-        selectinload(models.Site.equipment),
-        selectinload(models.Site.site_equipment)
-    ).filter(models.Site.site_id == site_id).first()
+    """Get the site row only; related collections are paged via get_site_*_page"""
+    return db.query(models.Site).filter(models.Site.site_id == site_id).first()
 
-def get_sites(db: Session, skip: int = 0, limit: int = 100, region: Optional[str] = None, search: Optional[str] = None):
-    """Get sites with pagination, optional region and search filtering"""
+def get_site_summary(db: Session, site_id: str):
+    """Site row plus ticket/shipment/equipment aggregates computed in SQL (no collections loaded)"""
+    db_site = get_site(db, site_id)
+    if not db_site:
+        return None
+
+    ticket_counts, last_visit_at, last_ticket_at = {}, None, None
+    for status, count, last_check_in, last_created in db.query(
+        models.Ticket.status,
+        func.count(models.Ticket.ticket_id),
+        func.max(models.Ticket.check_in_time),
+        func.max(models.Ticket.created_at),
+    ).filter(models.Ticket.site_id == site_id).group_by(models.Ticket.status).all():
+        ticket_counts[getattr(status, "value", status) or "unknown"] = count
+        if last_check_in and (last_visit_at is None or last_check_in > last_visit_at):
+            last_visit_at = last_check_in
+        if last_created and (last_ticket_at is None or last_created > last_ticket_at):
+            last_ticket_at = last_created
+    closed = sum(n for status, n in ticket_counts.items() if status in models.CLOSED_TICKET_STATUSES)
+
+    shipment_counts = {
+        status or "unknown": count
+        for status, count in db.query(models.Shipment.status, func.count(models.Shipment.shipment_id))
+        .filter(models.Shipment.site_id == site_id).group_by(models.Shipment.status).all()
+    }
+    equipment_count, site_equipment_count = db.query(
+        db.query(func.count(models.Equipment.equipment_id)).filter(models.Equipment.site_id == site_id).scalar_subquery(),
+        db.query(func.count(models.SiteEquipment.equipment_id)).filter(models.SiteEquipment.site_id == site_id).scalar_subquery(),
+    ).one()
+
+    summary = schemas.SiteOut.model_validate(db_site).model_dump()
+    summary.update(
+        ticket_counts=ticket_counts,
+        total_tickets=sum(ticket_counts.values()),
+        open_tickets=sum(ticket_counts.values()) - closed,
+        closed_tickets=closed,
+        shipment_counts=shipment_counts,
+        total_shipments=sum(shipment_counts.values()),
+        equipment_count=equipment_count,
+        site_equipment_count=site_equipment_count,
+        last_visit_at=last_visit_at,
+        last_ticket_at=last_ticket_at,
+    )
+    return summary
+
+def get_site_tickets_page(db: Session, site_id: str, limit: int = 50, after=None):
+    """Newest-first page of a site's tickets; returns (tickets, next_cursor)"""
+    query = db.query(models.Ticket).options(
+        joinedload(models.Ticket.assigned_user),
+        joinedload(models.Ticket.claimed_user),
+        joinedload(models.Ticket.onsite_tech)
+    ).filter(models.Ticket.site_id == site_id)
+    return keyset_page(query, (models.Ticket.created_at, models.Ticket.ticket_id), limit, after)
+
+def get_site_shipments_page(db: Session, site_id: str, limit: int = 50, after=None):
+    """Newest-first page of a site's shipments (IDs are sequential); returns (shipments, next_cursor)"""
+    query = db.query(models.Shipment).options(
+        joinedload(models.Shipment.item),
+        selectinload(models.Shipment.shipment_items)
+    ).filter(models.Shipment.site_id == site_id)
+    return keyset_page(query, (models.Shipment.shipment_id,), limit, after)
+
+def _site_list_query(db: Session, region: Optional[str] = None, search: Optional[str] = None):
+    """Filtered and ordered site list query shared by get_sites/get_sites_with_total."""
     query = db.query(models.Site)
     if region:
         query = query.filter(models.Site.region == region)
@@ -191,27 +255,22 @@ def get_sites(db: Session, skip: int = 0, limit: int = 100, region: Optional[str
         # Prioritize prefix matches on site_id for better Autocomplete behavior
         prefix = f"{search}%"
         order_first = case((models.Site.site_id.ilike(prefix), 0), else_=1)
-        return query.order_by(order_first.asc(), models.Site.site_id.asc()).offset(skip).limit(limit).all()
-    return query.order_by(models.Site.site_id.asc()).offset(skip).limit(limit).all()
+        return query.order_by(order_first.asc(), models.Site.site_id.asc())
+    return query.order_by(models.Site.site_id.asc())
+
+def get_sites(db: Session, skip: int = 0, limit: int = 100, region: Optional[str] = None, search: Optional[str] = None):
+    """Get sites with pagination, optional region and search filtering"""
+    return _site_list_query(db, region=region, search=search).offset(skip).limit(limit).all()
+
+def get_sites_with_total(db: Session, skip: int = 0, limit: int = 100, region: Optional[str] = None,
+                         search: Optional[str] = None):
+    """Like get_sites, plus the total match count from the same query; returns (sites, total, estimated)"""
+    query = _site_list_query(db, region=region, search=search)
+    return offset_page_with_total(query, skip, limit, estimate_table=None if region or search else "sites")
 
 def count_sites(db: Session, region: Optional[str] = None, search: Optional[str] = None) -> int:
     """Count sites with optional filters"""
-    query = db.query(models.Site)
-    if region:
-        query = query.filter(models.Site.region == region)
-    if search:
-        like = f"%{search}%"
-        query = query.filter(
-            or_(
-                models.Site.site_id.ilike(like),
-                models.Site.location.ilike(like),
-                models.Site.city.ilike(like),
-                models.Site.state.ilike(like),
-                models.Site.brand.ilike(like),
-                models.Site.ip_address.ilike(like),
-            )
-        )
-    return query.count()
+    return _site_list_query(db, region=region, search=search).order_by(None).count()
 
 def update_site(db: Session, site_id: str, site: schemas.SiteCreate):
     """Update site with optimized query"""
@@ -230,35 +289,70 @@ def update_site(db: Session, site_id: str, site: schemas.SiteCreate):
     
     db.commit()
     db.refresh(db_site)
+    if db_site.site_id != site_id:
+        notify_site_deleted(site_id)
+    notify_site_saved(db_site)
     return db_site
 
-def delete_site(db: Session, site_id: str):
-    """Delete site (check for dependencies first)"""
+def _delete_ticket_rows(db: Session, ticket_ids):
+    """Delete tickets and their dependent rows, set-based (no commit).
+
+    `ticket_ids` is a list or a SELECT of ticket_id; each child table is cleared
+    with one `WHERE ticket_id IN (...)` statement. Order matters for FKs (the DB
+    may not have ON DELETE CASCADE).
+    """
+    for child in (models.TicketAttachment, models.TicketComment, models.TimeEntry, models.Task,
+                  models.InventoryTransaction, models.TicketAudit):
+        db.query(child).filter(child.ticket_id.in_(ticket_ids)).delete(synchronize_session=False)
+    # Shipments (possibly of another site) only lose the link to the ticket
+    db.query(models.Shipment).filter(models.Shipment.ticket_id.in_(ticket_ids)).update({"ticket_id": None}, synchronize_session=False)
+    db.query(models.Ticket).filter(models.Ticket.ticket_id.in_(ticket_ids)).delete(synchronize_session=False)
+
+def count_site_tickets(db: Session, site_id: str) -> int:
+    return db.query(func.count(models.Ticket.ticket_id)).filter(models.Ticket.site_id == site_id).scalar() or 0
+
+def delete_site(db: Session, site_id: str, chunk_size: Optional[int] = None):
+    """Delete a site and everything that hangs off it with set-based statements.
+
+    By default everything happens in one transaction. With `chunk_size`, tickets are
+    removed `chunk_size` at a time with a commit per chunk (for very large sites,
+    run in the background) so locks are held briefly; the site row goes last.
+    """
     db_site = db.query(models.Site).filter(models.Site.site_id == site_id).first()
     if not db_site:
         return None
-    
-    # Clean up dependencies to avoid FK constraint errors
-    # 1) Delete equipment and site_equipment
-    db.query(models.Equipment).filter(models.Equipment.site_id == site_id).delete(synchronize_session=False)
-    db.query(models.SiteEquipment).filter(models.SiteEquipment.site_id == site_id).delete(synchronize_session=False)
-    # 2) Delete shipments (and inventory transactions linked via shipment_items)
-    shipment_ids = [s.shipment_id for s in db.query(models.Shipment).filter(models.Shipment.site_id == site_id).all()]
-    if shipment_ids:
-        shipment_items = db.query(models.ShipmentItem).filter(models.ShipmentItem.shipment_id.in_(shipment_ids)).all()
-        shipment_item_ids = [si.shipment_item_id for si in shipment_items]
-        if shipment_item_ids:
-            db.query(models.InventoryTransaction).filter(models.InventoryTransaction.shipment_item_id.in_(shipment_item_ids)).delete(synchronize_session=False)
-        db.query(models.ShipmentItem).filter(models.ShipmentItem.shipment_id.in_(shipment_ids)).delete(synchronize_session=False)
-        db.query(models.Shipment).filter(models.Shipment.shipment_id.in_(shipment_ids)).delete(synchronize_session=False)
-    # 3) Delete tickets and their children
-    ticket_ids = [t.ticket_id for t in db.query(models.Ticket).filter(models.Ticket.site_id == site_id).all()]
-    for tid in ticket_ids:
-        # Reuse delete_ticket logic
-        delete_ticket(db, tid)
-    
-    db.delete(db_site)
-    db.commit()
+    # Rows are removed with bulk statements; keep the returned object readable after commit
+    db.expunge(db_site)
+
+    try:
+        # 1) Tickets and their children
+        if chunk_size:
+            while True:
+                ids = [row[0] for row in db.query(models.Ticket.ticket_id)
+                       .filter(models.Ticket.site_id == site_id).limit(chunk_size).all()]
+                if not ids:
+                    break
+                _delete_ticket_rows(db, ids)
+                db.commit()
+        else:
+            site_tickets = db.query(models.Ticket.ticket_id).filter(models.Ticket.site_id == site_id).scalar_subquery()
+            _delete_ticket_rows(db, site_tickets)
+        # 2) Equipment and site_equipment
+        db.query(models.Equipment).filter(models.Equipment.site_id == site_id).delete(synchronize_session=False)
+        db.query(models.SiteEquipment).filter(models.SiteEquipment.site_id == site_id).delete(synchronize_session=False)
+        # 3) Shipments, their items and inventory transactions linked via those items
+        site_shipments = db.query(models.Shipment.shipment_id).filter(models.Shipment.site_id == site_id).scalar_subquery()
+        site_items = db.query(models.ShipmentItem.shipment_item_id).filter(models.ShipmentItem.shipment_id.in_(site_shipments)).scalar_subquery()
+        db.query(models.InventoryTransaction).filter(models.InventoryTransaction.shipment_item_id.in_(site_items)).delete(synchronize_session=False)
+        db.query(models.ShipmentItem).filter(models.ShipmentItem.shipment_id.in_(site_shipments)).delete(synchronize_session=False)
+        db.query(models.Shipment).filter(models.Shipment.site_id == site_id).delete(synchronize_session=False)
+
+        db.query(models.Site).filter(models.Site.site_id == site_id).delete(synchronize_session=False)
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+    notify_site_deleted(site_id)
     return db_site
 
 # Ticket CRUD - Highly Optimized
@@ -444,8 +538,11 @@ def get_ticket_for_response(db: Session, ticket_id: str):
         joinedload(models.Ticket.claimed_user),
     ).filter(models.Ticket.ticket_id == ticket_id).first()
 
-def _apply_ticket_list_filters(query, status, workflow_state, priority, assigned_user_id, site_id, ticket_type, search):
+def _apply_ticket_list_filters(query, status, workflow_state, priority, assigned_user_id, site_id, ticket_type, search,
+                               exclude_archived=False):
     """Apply common ticket list/count filters. Returns the modified query."""
+    if exclude_archived:
+        query = query.filter(models.Ticket.status != models.TicketStatus.archived)
     if status:
         if status == 'active':
             query = query.filter(~models.Ticket.status.in_([
@@ -484,6 +581,23 @@ def _apply_ticket_list_filters(query, status, workflow_state, priority, assigned
     return query
 
 
+def _ticket_list_query(db: Session, status: Optional[str] = None, workflow_state: Optional[str] = None,
+                       priority: Optional[str] = None, assigned_user_id: Optional[str] = None,
+                       site_id: Optional[str] = None, ticket_type: Optional[str] = None,
+                       search: Optional[str] = None, exclude_archived: bool = False,
+                       include_related: bool = True):
+    query = db.query(models.Ticket)
+    if include_related:
+        query = query.options(
+            joinedload(models.Ticket.site),
+            joinedload(models.Ticket.assigned_user),
+            joinedload(models.Ticket.claimed_user),
+            joinedload(models.Ticket.onsite_tech)
+        )
+    query = _apply_ticket_list_filters(query, status, workflow_state, priority, assigned_user_id, site_id, ticket_type, search,
+                                       exclude_archived)
+    return query.order_by(desc(models.Ticket.created_at))
+
 def get_tickets(db: Session, skip: int = 0, limit: int = 100, 
                 status: Optional[str] = None, 
                 workflow_state: Optional[str] = None,
@@ -492,18 +606,28 @@ def get_tickets(db: Session, skip: int = 0, limit: int = 100,
                 site_id: Optional[str] = None,
                 ticket_type: Optional[str] = None,
                 search: Optional[str] = None,
-                include_related: bool = True):
+                include_related: bool = True,
+                exclude_archived: bool = False):
     """Get tickets with comprehensive filtering and eager loading"""
-    query = db.query(models.Ticket)
-    if include_related:
-        query = query.options(
-            joinedload(models.Ticket.site),
-            joinedload(models.Ticket.assigned_user),
-            joinedload(models.Ticket.claimed_user),
-            joinedload(models.Ticket.onsite_tech)
-        )
-    query = _apply_ticket_list_filters(query, status, workflow_state, priority, assigned_user_id, site_id, ticket_type, search)
-    return query.order_by(desc(models.Ticket.created_at)).offset(skip).limit(limit).all()
+    query = _ticket_list_query(db, status, workflow_state, priority, assigned_user_id, site_id, ticket_type, search,
+                               exclude_archived, include_related)
+    return query.offset(skip).limit(limit).all()
+
+def get_tickets_with_total(db: Session, skip: int = 0, limit: int = 100,
+                           status: Optional[str] = None,
+                           workflow_state: Optional[str] = None,
+                           priority: Optional[str] = None,
+                           assigned_user_id: Optional[str] = None,
+                           site_id: Optional[str] = None,
+                           ticket_type: Optional[str] = None,
+                           search: Optional[str] = None,
+                           include_related: bool = True,
+                           exclude_archived: bool = False):
+    """Like get_tickets, plus the total match count from the same query; returns (tickets, total, estimated)"""
+    query = _ticket_list_query(db, status, workflow_state, priority, assigned_user_id, site_id, ticket_type, search,
+                               exclude_archived, include_related)
+    filtered = any([status, workflow_state, priority, assigned_user_id, site_id, ticket_type, search, exclude_archived])
+    return offset_page_with_total(query, skip, limit, estimate_table=None if filtered else "tickets")
 
 def count_tickets(db: Session,
                   status: Optional[str] = None,
@@ -512,9 +636,11 @@ def count_tickets(db: Session,
                   assigned_user_id: Optional[str] = None,
                   site_id: Optional[str] = None,
                   ticket_type: Optional[str] = None,
-                  search: Optional[str] = None) -> int:
+                  search: Optional[str] = None,
+                  exclude_archived: bool = False) -> int:
     query = db.query(models.Ticket)
-    query = _apply_ticket_list_filters(query, status, workflow_state, priority, assigned_user_id, site_id, ticket_type, search)
+    query = _apply_ticket_list_filters(query, status, workflow_state, priority, assigned_user_id, site_id, ticket_type, search,
+                                       exclude_archived)
     return query.count()
 
 
@@ -534,28 +660,13 @@ def update_ticket(db: Session, ticket_id: str, ticket: schemas.TicketUpdate):
     return db_ticket
 
 def delete_ticket(db: Session, ticket_id: str):
-    """Delete ticket with optimized cascade deletion"""
+    """Delete ticket with its dependent rows in one transaction"""
     db_ticket = db.query(models.Ticket).filter(models.Ticket.ticket_id == ticket_id).first()
     if not db_ticket:
         return None
-    
-    # Manually delete dependent rows to satisfy FK constraints (DB may not have ON DELETE CASCADE)
-    # Order matters to avoid FK issues
-    db.query(models.TicketAttachment).filter(models.TicketAttachment.ticket_id == ticket_id).delete(synchronize_session=False)
-    db.query(models.TicketComment).filter(models.TicketComment.ticket_id == ticket_id).delete(synchronize_session=False)
-    db.query(models.TimeEntry).filter(models.TimeEntry.ticket_id == ticket_id).delete(synchronize_session=False)
-    db.query(models.Task).filter(models.Task.ticket_id == ticket_id).delete(synchronize_session=False)
-    db.query(models.InventoryTransaction).filter(models.InventoryTransaction.ticket_id == ticket_id).delete(synchronize_session=False)
-    # Delete audits last referencing this ticket
-    db.query(models.TicketAudit).filter(models.TicketAudit.ticket_id == ticket_id).delete(synchronize_session=False)
-    # Detach shipments linked to this ticket by nullifying the foreign key
-    # Deleting shipments can violate FKs from inventory transactions that reference shipments
-    db.query(models.Shipment).filter(models.Shipment.ticket_id == ticket_id).update({"ticket_id": None}, synchronize_session=False)
-    # (moved above) audits already deleted
-
-    # Finally delete the ticket using a bulk delete to avoid ORM relationship updates
+
     try:
-        db.query(models.Ticket).filter(models.Ticket.ticket_id == ticket_id).delete(synchronize_session=False)
+        _delete_ticket_rows(db, [ticket_id])
         db.commit()
     except Exception:
         db.rollback()
@@ -603,16 +714,8 @@ def get_shipment(db: Session, shipment_id: str):
         selectinload(models.Shipment.shipment_items).joinedload(models.ShipmentItem.item)
     ).filter(models.Shipment.shipment_id == shipment_id).first()
 
-def get_shipments(db: Session, skip: int = 0, limit: int = 100, 
-                  site_id: Optional[str] = None,
-                  ticket_id: Optional[str] = None,
-                  search: Optional[str] = None):
-    """Get shipments with filtering and eager loading"""
-    query = db.query(models.Shipment).options(
-        joinedload(models.Shipment.site),
-        joinedload(models.Shipment.ticket)
-    )
-    
+def _apply_shipment_list_filters(query, site_id, ticket_id, search, include_archived):
+    """Apply common shipment list/count filters. Returns the modified query."""
     if site_id:
         query = query.filter(models.Shipment.site_id == site_id)
     if ticket_id:
@@ -626,38 +729,46 @@ def get_shipments(db: Session, skip: int = 0, limit: int = 100,
             models.Shipment.what_is_being_shipped.ilike(like),
             models.Shipment.site_id.ilike(like)
         ))
-    
-    return query.order_by(desc(models.Shipment.date_created)).offset(skip).limit(limit).all()
+    if not include_archived:
+        query = query.filter(models.Shipment.archived.is_(False))
+    return query
+
+def _shipment_list_query(db: Session, site_id: Optional[str] = None, ticket_id: Optional[str] = None,
+                         search: Optional[str] = None, include_archived: bool = True):
+    query = db.query(models.Shipment).options(
+        joinedload(models.Shipment.site),
+        joinedload(models.Shipment.ticket)
+    )
+    query = _apply_shipment_list_filters(query, site_id, ticket_id, search, include_archived)
+    return query.order_by(desc(models.Shipment.date_created))
+
+def get_shipments(db: Session, skip: int = 0, limit: int = 100, 
+                  site_id: Optional[str] = None,
+                  ticket_id: Optional[str] = None,
+                  search: Optional[str] = None,
+                  include_archived: bool = True):
+    """Get shipments with filtering and eager loading"""
+    query = _shipment_list_query(db, site_id, ticket_id, search, include_archived)
+    return query.offset(skip).limit(limit).all()
+
+def get_shipments_with_total(db: Session, skip: int = 0, limit: int = 100,
+                             site_id: Optional[str] = None,
+                             ticket_id: Optional[str] = None,
+                             search: Optional[str] = None,
+                             include_archived: bool = True):
+    """Like get_shipments, plus the total match count from the same query; returns (shipments, total, estimated)"""
+    query = _shipment_list_query(db, site_id, ticket_id, search, include_archived)
+    filtered = any([site_id, ticket_id, search, not include_archived])
+    return offset_page_with_total(query, skip, limit, estimate_table=None if filtered else "shipments")
 
 def count_shipments(db: Session,
                     site_id: Optional[str] = None,
                     ticket_id: Optional[str] = None,
                     search: Optional[str] = None,
                     include_archived: bool = True) -> int:
-    query = db.query(models.Shipment)
-    if site_id:
-        query = query.filter(models.Shipment.site_id == site_id)
-    if ticket_id:
-        query = query.filter(models.Shipment.ticket_id == ticket_id)
-    if search:
-        like = f"%{search}%"
-        query = query.filter(or_(
-            models.Shipment.shipment_id.ilike(like),
-            models.Shipment.tracking_number.ilike(like),
-            models.Shipment.return_tracking.ilike(like),
-            models.Shipment.what_is_being_shipped.ilike(like),
-            models.Shipment.site_id.ilike(like)
-        ))
-    if not include_archived:
-        query = query.filter(models.Shipment.archived.is_(False))
+    query = _apply_shipment_list_filters(db.query(models.Shipment), site_id, ticket_id, search, include_archived)
     return query.count()
 
-def get_shipments_by_site(db: Session, site_id: str):
-    """Get all shipments for a specific site with eager loading"""
-    return db.query(models.Shipment).options(
-        joinedload(models.Shipment.ticket)
-    ).filter(models.Shipment.site_id == site_id).order_by(desc(models.Shipment.date_created)).all()
-
 def update_shipment(db: Session, shipment_id: str, shipment: schemas.ShipmentCreate):
     """Update shipment with optimized query"""
     db_shipment = db.query(models.Shipment).filter(models.Shipment.shipment_id == shipment_id).first()
@@ -1073,6 +1184,7 @@ def create_inventory_item(db: Session, item: schemas.InventoryItemCreate):
     db.add(db_item)
     db.commit()
     db.refresh(db_item)
+    notify_inventory_changed(barcodes=[db_item.barcode])
     return db_item
 
 def get_inventory_item(db: Session, item_id: str):
@@ -1107,6 +1219,7 @@ def update_inventory_item(db: Session, item_id: str, item: schemas.InventoryItem
     
     db.commit()
     db.refresh(db_item)
+    notify_inventory_changed(item_ids=[item_id], barcodes=[db_item.barcode])
     return db_item
 
 def delete_inventory_item(db: Session, item_id: str):
@@ -1122,20 +1235,139 @@ def delete_inventory_item(db: Session, item_id: str):
     
     db.delete(db_item)
     db.commit()
+    notify_inventory_changed(item_ids=[item_id])
     return db_item
 
-def get_transactions_by_item(db: Session, item_id: str):
-    """Get all transactions for an inventory item"""
-    return db.query(models.InventoryTransaction).options(
-        joinedload(models.InventoryTransaction.user),
-        joinedload(models.InventoryTransaction.shipment),
-        joinedload(models.InventoryTransaction.ticket)
-    ).filter(models.InventoryTransaction.item_id == item_id).order_by(desc(models.InventoryTransaction.date)).all()
+def get_item_transactions_page(db: Session, item_id: str, limit: int = 50, after=None):
+    """Newest-first page of an item's inventory transactions; returns (transactions, next_cursor)
+
+    `date` is nullable and a NULL can't take part in the keyset comparison, so dated
+    rows are walked on (date, transaction_id) first and undated rows after them on
+    transaction_id alone, with cursors of (None, transaction_id or None).
+    """
+    tx = models.InventoryTransaction
+    query = db.query(tx).filter(tx.item_id == item_id)
+    rows = []
+    if after is None or after[0] is not None:
+        rows, cursor = keyset_page(query.filter(tx.date.isnot(None)), (tx.date, tx.transaction_id), limit, after)
+        if cursor is not None:
+            return rows, cursor
+        after = None
+    undated = query.filter(tx.date.is_(None))
+    if after is not None and after[1] is not None:
+        undated = undated.filter(tx.transaction_id < after[1])
+    room = limit - len(rows)
+    more = undated.order_by(tx.transaction_id.desc()).limit(room + 1).all()
+    rows = rows + more[:room]
+    if len(more) <= room:
+        return rows, None
+    # (None, None): the page ended on the last dated row and undated rows follow
+    return rows, encode_cursor([None, more[room - 1].transaction_id if room else None])
+
+def get_item_stock_history(db: Session, item_id: str, start: date, end: date) -> Optional[dict]:
+    """Daily stock level of an item between start and end, from its transaction ledger.
+
+    Balances are anchored on the current quantity_on_hand and walked backwards: the
+    balance at the end of a day is the current quantity minus the net change of every
+    later day, computed by a running SUM() window over the per-day totals. Only days
+    with transactions get a point. Returns None if the item does not exist.
+    """
+    current = db.query(models.InventoryItem.quantity_on_hand).filter(models.InventoryItem.item_id == item_id).first()
+    if current is None:
+        return None
+    on_hand = current[0] or 0
+
+    tx = models.InventoryTransaction
+    # `out` rows store a positive quantity; `in` and (signed) `adjust` rows are added as-is
+    signed = case((tx.type == models.InventoryTransactionType.out, -tx.quantity), else_=tx.quantity)
+    daily = db.query(tx.date.label("day"), func.sum(signed).label("net_change"))\
+        .filter(tx.item_id == item_id, tx.date >= start)\
+        .group_by(tx.date)\
+        .subquery()
+    later_change = func.sum(daily.c.net_change).over(order_by=daily.c.day.desc(), rows=(None, -1))
+    rows = db.query(
+        daily.c.day,
+        daily.c.net_change,
+        (on_hand - func.coalesce(later_change, 0)).label("balance")
+    ).order_by(daily.c.day).all()
+
+    points = [{"date": r.day, "net_change": r.net_change, "balance": r.balance} for r in rows if r.day <= end]
+    after_end = [r for r in rows if r.day > end]
+    if points:
+        closing = points[-1]["balance"]
+    elif after_end:
+        closing = after_end[0].balance - after_end[0].net_change
+    else:
+        closing = on_hand
+    return {
+        "item_id": item_id,
+        "start": start,
+        "end": end,
+        "opening_balance": points[0]["balance"] - points[0]["net_change"] if points else closing,
+        "closing_balance": closing,
+        "points": points,
+    }
 
 def get_inventory_item_by_barcode(db: Session, barcode: str):
     """Get inventory item by barcode"""
     return db.query(models.InventoryItem).filter(models.InventoryItem.barcode == barcode).first()
 
+def get_inventory_items_by_barcodes(db: Session, barcodes: List[str]) -> Dict[str, dict]:
+    """Resolve barcodes to item rows (column dicts): the barcode cache first, then one IN query.
+    Barcodes without an item are left out of the result."""
+    barcodes = list(dict.fromkeys(b for b in barcodes if b))
+    found, missing = barcode_cache.get_many(barcodes)
+    record_cache_lookup("barcode", True, len(found))
+    record_cache_lookup("barcode", False, len(missing))
+    if missing:
+        generation = barcode_cache.generation
+        items = db.query(models.InventoryItem)\
+            .filter(models.InventoryItem.barcode.in_(missing))\
+            .order_by(models.InventoryItem.item_id)\
+            .all()
+        for db_item in items:
+            # Several items may share a barcode; like the single scan, keep one
+            if db_item.barcode not in found:
+                found[db_item.barcode] = item_row(db_item)
+                barcode_cache.put(db_item.barcode, found[db_item.barcode], generation)
+    return found
+
+def scan_inventory_batch(db: Session, scans: List[schemas.BarcodeScanEntry], user_id: Optional[str] = None,
+                         notes: Optional[str] = None) -> dict:
+    """Resolve a batch of scanned barcodes and apply any quantity adjustments in one transaction.
+    Returns the items (after adjustment) in scan order, unknown barcodes and per-item changes."""
+    found = get_inventory_items_by_barcodes(db, [scan.barcode for scan in scans])
+    adjustments = [
+        Adjustment(found[scan.barcode]["item_id"], scan.quantity_delta)
+        for scan in scans
+        if scan.quantity_delta and scan.barcode in found
+    ]
+    changes = []
+    if adjustments:
+        try:
+            changes, _ = apply_adjustments(db, adjustments, user_id=user_id, notes=notes or "Barcode scan adjustment")
+            db.commit()
+        except Exception:
+            db.rollback()
+            raise
+        notify_inventory_changed(item_ids=[c.item_id for c in changes])
+    new_quantity = {c.item_id: c.new_quantity for c in changes}
+
+    items, not_found = [], []
+    for barcode in dict.fromkeys(scan.barcode for scan in scans):
+        row = found.get(barcode)
+        if row is None:
+            not_found.append(barcode)
+        elif row["item_id"] in new_quantity:
+            items.append({**row, "quantity_on_hand": new_quantity[row["item_id"]]})
+        else:
+            items.append(row)
+    return {
+        "items": items,
+        "not_found": not_found,
+        "changes": [c._asdict() for c in changes],
+    }
+
 # Audit CRUD - Optimized
 def create_ticket_audit(db: Session, audit: schemas.TicketAuditCreate):
     """Create audit log entry with optimized query"""
@@ -1198,6 +1430,7 @@ def create_sla_rule(db: Session, rule: schemas.SLARuleCreate):
     db.add(db_rule)
     db.commit()
     db.refresh(db_rule)
+    notify_rules_changed()
     return db_rule
 
 def get_sla_rule(db: Session, rule_id: str):
@@ -1225,6 +1458,7 @@ def update_sla_rule(db: Session, rule_id: str, rule: schemas.SLARuleUpdate):
     db_rule.updated_at = datetime.now(timezone.utc)
     db.commit()
     db.refresh(db_rule)
+    notify_rules_changed()
     return db_rule
 
 def delete_sla_rule(db: Session, rule_id: str):
@@ -1235,34 +1469,12 @@ def delete_sla_rule(db: Session, rule_id: str):
     
     db.delete(db_rule)
     db.commit()
+    notify_rules_changed()
     return db_rule
 
 def get_matching_sla_rule(db: Session, ticket_type, customer_impact, business_priority):
-    """Get the most specific SLA rule that matches the ticket criteria - Optimized"""
-    # Use a single query with proper ordering
-    return db.query(models.SLARule).filter(
-        models.SLARule.is_active == True,
-        or_(
-            and_(
-                models.SLARule.ticket_type == ticket_type,
-                models.SLARule.customer_impact == customer_impact,
-                models.SLARule.business_priority == business_priority
-            ),
-            and_(
-                models.SLARule.ticket_type == ticket_type,
-                models.SLARule.customer_impact == customer_impact,
-                models.SLARule.business_priority.is_(None)
-            ),
-            and_(
-                models.SLARule.ticket_type == ticket_type,
-                models.SLARule.customer_impact.is_(None),
-                models.SLARule.business_priority.is_(None)
-            )
-        )
-    ).order_by(
-        desc(models.SLARule.business_priority.isnot(None)),
-        desc(models.SLARule.customer_impact.isnot(None))
-    ).first()
+    """Get the most specific active SLA rule for the ticket criteria (compiled in-memory lookup)"""
+    return sla_engine.match(db, ticket_type, customer_impact, business_priority)
 
 # Time Entry CRUD - Optimized
 def create_time_entry(db: Session, time_entry_data: dict):
@@ -1722,13 +1934,13 @@ def bulk_update_inventory_for_shipment(
     ticket_id: Optional[str] = None
 ) -> dict:
     """
-    Optimized bulk inventory update for shipment status changes.
-    Uses single queries instead of O(N) individual lookups.
+    Remove a shipment's items from inventory.
+    One set-based UPDATE ... RETURNING decrements every item atomically (see
+    utils.inventory_ledger) and one INSERT records the transactions.
     Returns summary of changes made.
     """
     try:
-        # Get all shipment items that need inventory removal in one query
-        shipment_items = db.query(models.ShipmentItem)\
+        shipment_items = db.query(models.ShipmentItem.shipment_item_id, models.ShipmentItem.item_id, models.ShipmentItem.quantity)\
             .filter(
                 models.ShipmentItem.shipment_id == shipment_id,
                 models.ShipmentItem.remove_from_inventory == True,
@@ -1739,77 +1951,25 @@ def bulk_update_inventory_for_shipment(
         if not shipment_items:
             return {"updated_items": 0, "transactions_created": 0, "errors": []}
         
-        # Get all affected inventory items in one query
-        item_ids = [item.item_id for item in shipment_items]
-        inventory_items = db.query(models.InventoryItem)\
-            .filter(models.InventoryItem.item_id.in_(item_ids))\
-            .all()
-        
-        # Create lookup dict for fast access
-        inventory_lookup = {item.item_id: item for item in inventory_items}
-        
-        # Prepare bulk operations
-        inventory_transactions = []
-        inventory_updates = []
-        errors = []
-        
-        for shipment_item in shipment_items:
-            inventory_item = inventory_lookup.get(shipment_item.item_id)
-            if not inventory_item:
-                errors.append(f"Inventory item {shipment_item.item_id} not found")
-                continue
-            
-            # Calculate new quantity
-            qty = shipment_item.quantity or 1
-            old_qty = inventory_item.quantity_on_hand or 0
-            new_qty = max(0, old_qty - qty)
-            
-            # Create inventory transaction
-            transaction = models.InventoryTransaction(
-                transaction_id=str(uuid.uuid4()),
-                item_id=shipment_item.item_id,
-                user_id=user_id,
-                shipment_item_id=shipment_item.shipment_item_id,
-                ticket_id=ticket_id,
-                date=date.today(),
-                quantity=qty,
-                type=models.InventoryTransactionType.out,
-                notes=f"Shipped for ticket {ticket_id}" if ticket_id else "Shipped"
-            )
-            inventory_transactions.append(transaction)
-            
-            # Prepare inventory update
-            inventory_updates.append({
-                'item_id': inventory_item.item_id,
-                'quantity_on_hand': new_qty,
-                'old_quantity': old_qty
-            })
-        
-        # Bulk insert transactions
-        if inventory_transactions:
-            db.bulk_save_objects(inventory_transactions)
-        
-        # Bulk update inventory quantities
-        for update_data in inventory_updates:
-            db.execute(
-                update(models.InventoryItem)
-                .where(models.InventoryItem.item_id == update_data['item_id'])
-                .values(quantity_on_hand=update_data['quantity_on_hand'])
-            )
-        
+        decrements = [Decrement(si.item_id, si.quantity or 1, si.shipment_item_id) for si in shipment_items]
+        changes, missing = apply_decrements(
+            db, decrements, user_id=user_id, ticket_id=ticket_id,
+            notes=f"Shipped for ticket {ticket_id}" if ticket_id else "Shipped"
+        )
         db.commit()
+        notify_inventory_changed(item_ids=[c.item_id for c in changes])
         
         return {
-            "updated_items": len(inventory_updates),
-            "transactions_created": len(inventory_transactions),
-            "errors": errors,
+            "updated_items": len(changes),
+            "transactions_created": sum(1 for d in decrements if d.item_id not in missing),
+            "errors": [f"Inventory item {item_id} not found" for item_id in missing],
             "changes": [
                 {
-                    "item_id": update_data['item_id'],
-                    "old_quantity": update_data['old_quantity'],
-                    "new_quantity": update_data['quantity_on_hand']
+                    "item_id": change.item_id,
+                    "old_quantity": change.old_quantity,
+                    "new_quantity": change.new_quantity
                 }
-                for update_data in inventory_updates
+                for change in changes
             ]
         }
         
@@ -1848,3 +2008,71 @@ def create_audit_log(
     )
     db.add(audit)
     return audit
+
+
+def _utc_naive(dt: datetime) -> datetime:
+    return dt.astimezone(timezone.utc).replace(tzinfo=None) if dt.tzinfo else dt
+
+
+def _floor_hour(dt: datetime) -> datetime:
+    return dt.replace(minute=0, second=0, microsecond=0)
+
+
+def get_frontend_log_stats(db: Session, start_time: datetime, end_time: datetime) -> dict:
+    """Counts by level, context and hour-of-day for frontend logs in [start_time, end_time).
+
+    Whole hours come from frontend_log_hourly_rollups; only the unaligned edges of
+    the window (at most an hour each) fall back to GROUP BY over raw rows. The
+    hour containing `end_time` is read from the rollup when it is the current hour.
+    """
+    start = _utc_naive(start_time)
+    end = _utc_naive(end_time)
+    now_hour = _floor_hour(datetime.now(timezone.utc).replace(tzinfo=None))
+    first_full = _floor_hour(start) if start == _floor_hour(start) else _floor_hour(start) + timedelta(hours=1)
+    rollup_end = _floor_hour(end)
+    if rollup_end == now_hour:
+        # Current hour: the rollup already holds everything ingested so far
+        rollup_end = now_hour + timedelta(hours=1)
+        raw_ranges = []
+    else:
+        raw_ranges = [(max(rollup_end, start), end)]
+    if first_full >= rollup_end:
+        raw_ranges = [(start, end)]
+        first_full = rollup_end
+    elif start < first_full:
+        raw_ranges.append((start, first_full))
+
+    groups = []
+    if first_full < rollup_end:
+        R = models.FrontendLogHourlyRollup
+        groups.extend(
+            (int(hour.hour), level, context, int(count))
+            for hour, level, context, count in db.query(R.hour, R.level, R.context, R.count)
+            .filter(R.hour >= first_full, R.hour < rollup_end)
+            .all()
+        )
+    L = models.FrontendLog
+    hour_of_day = func.extract("hour", L.timestamp)
+    for lo, hi in raw_ranges:
+        if lo >= hi:
+            continue
+        groups.extend(
+            (int(hour), level, context, int(count))
+            for hour, level, context, count in db.query(hour_of_day, L.level, L.context, func.count())
+            .filter(L.timestamp >= lo, L.timestamp < hi)
+            .group_by(hour_of_day, L.level, L.context)
+            .all()
+        )
+
+    stats = {"total_logs": 0, "by_level": {}, "by_context": {}, "by_hour": {}, "error_rate": 0}
+    error_count = 0
+    for hour, level, context, count in groups:
+        stats["total_logs"] += count
+        stats["by_level"][level] = stats["by_level"].get(level, 0) + count
+        stats["by_context"][context] = stats["by_context"].get(context, 0) + count
+        stats["by_hour"][hour] = stats["by_hour"].get(hour, 0) + count
+        if level in ("ERROR", "WARN"):
+            error_count += count
+    if stats["total_logs"]:
+        stats["error_rate"] = (error_count / stats["total_logs"]) * 100
+    return stats
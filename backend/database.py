@@ -1,10 +1,32 @@
+import time
+
 from sqlalchemy import create_engine
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
 from sqlalchemy.orm import sessionmaker, declarative_base
+from sqlalchemy.pool import QueuePool
 
 from settings import settings
+from utils import metrics
+from utils.query_stats import instrument_engine
+from utils.etag import track_table_changes
 
 DATABASE_URL = settings.DATABASE_URL
 
+
+class InstrumentedQueuePool(QueuePool):
+    """QueuePool that records how long callers wait for a connection."""
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            return super()._do_get()
+        except PoolTimeoutError:
+            metrics.DB_POOL_CHECKOUT_TIMEOUTS.inc()
+            raise
+        finally:
+            metrics.DB_POOL_CHECKOUT_WAIT.observe(time.perf_counter() - start)
+
+
 engine = create_engine(
     DATABASE_URL,
     pool_pre_ping=True,
@@ -12,8 +34,14 @@ engine = create_engine(
     echo=False,
     pool_size=settings.DB_POOL_SIZE,
     max_overflow=settings.DB_MAX_OVERFLOW,
+    poolclass=InstrumentedQueuePool,
 )
+instrument_engine(engine)
+metrics.DB_POOL_CHECKED_OUT.set_function(lambda: engine.pool.checkedout())
+metrics.DB_POOL_SIZE.set_function(lambda: engine.pool.size())
+metrics.DB_POOL_OVERFLOW.set_function(lambda: max(0, engine.pool.overflow()))
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+track_table_changes(SessionLocal)
 Base = declarative_base()
 
 def get_db():
@@ -1,8 +1,10 @@
 import logging
 from fastapi import FastAPI, Depends, HTTPException, status, BackgroundTasks, WebSocket, Query, Request
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, PlainTextResponse, FileResponse, Response
+from fastapi.utils import is_body_allowed_for_status_code
+from starlette.concurrency import run_in_threadpool
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.middleware.gzip import GZipMiddleware
+from starlette.datastructures import Headers, MutableHeaders
 from fastapi.security import OAuth2PasswordBearer, OAuth2PasswordRequestForm
 from sqlalchemy.orm import Session
 from typing import Optional, List, Dict
@@ -23,39 +25,95 @@ from settings import settings
 # Set SECRET_KEY in env before any import that loads auth (auth validates length at import)
 os.environ.setdefault("SECRET_KEY", settings.SECRET_KEY)
 
-from utils.main_utils import verify_password, create_access_token, APILatencyTracker, timer_ms
-
-# Configure logging
+from utils.main_utils import create_access_token, timer_ms
+from utils.password_pool import password_pool
+from utils.latency import RouteLatencyRegistry
+from utils import metrics
+from utils import query_stats
+from utils.profiling import request_profiler
+from utils.log_ingest import log_ingest_queue, log_retention_loop
+from utils.sla_engine import sla_rules_listener
+from utils.sla_scanner import sla_scan_loop
+from utils.site_index import site_index_loop, site_index_listener
+from utils.barcode_cache import barcode_cache_listener
+from utils.response_cache import response_cache, response_cache_listener
+from utils.compression import CompressionMiddleware
+from utils.broadcast import broadcaster
+from utils.broadcast_aggregator import broadcast_aggregator
+from utils.token_revocation import revocation_list, revoke, revoked_from_payload, token_revocation_listener, token_revocation_purge_loop
+
+from utils.logging_config import install_queue_logging, install_log_sampling
+
+# Configure logging: handlers run on a listener thread; hot INFO loggers are sampled
 logging.basicConfig(level=logging.INFO)
+install_queue_logging()
+install_log_sampling(settings.LOG_SAMPLE_RATES)
 logger = logging.getLogger("ticketing")
+broadcast_logger = logging.getLogger("ticketing.broadcast")
 
 # Create database tables only when explicitly enabled (e.g. local dev).
 # In production, schema changes must come from Alembic migrations only.
 if os.environ.get("CREATE_TABLES_ON_STARTUP", "").strip().lower() in ("1", "true", "yes"):
     models.Base.metadata.create_all(bind=engine)
     logger.info("create_all ran (CREATE_TABLES_ON_STARTUP is set)")
-latency_tracker = APILatencyTracker(max_samples_per_key=600)
-
-# Redis connection for WebSocket broadcasting (async client)
-redis_client: Redis | None = None
+latency_registry = RouteLatencyRegistry(max_keys=settings.LATENCY_MAX_ROUTE_KEYS,
+                                        window_seconds=settings.LATENCY_WINDOW_SECONDS)
+
+# Shared Redis manager (sync rate limiter + async WebSocket broadcasting)
+from utils.redis_manager import redis_manager
+
+async def _publish_worker_stats_loop():
+    """Push this worker's latency histograms and metrics to Redis so /ops/latency and /metrics can merge workers."""
+    interval = settings.LATENCY_PUBLISH_INTERVAL_SECONDS
+    while True:
+        await asyncio.sleep(interval)
+        client = await redis_manager.get_async()
+        if not client:
+            continue
+        try:
+            await latency_registry.publish(client, ttl_seconds=int(interval * 3))
+            await metrics.registry.publish(client, ttl_seconds=int(interval * 3))
+        except Exception as e:
+            logger.warning("Worker stats publish failed: %s", e)
+            redis_manager.record_failure(e)
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     """Application lifespan manager"""
-    global redis_client
-    try:
-        redis_url = settings.REDIS_URL
-        redis_client = await Redis.from_url(redis_url, decode_responses=True)
-        await redis_client.ping()
+    if await redis_manager.get_async():
         logger.info("Connected to async Redis for WebSocket broadcasting")
-    except Exception as e:
-        logger.warning(f"Async Redis connection failed: {e}. WebSocket broadcasting will be disabled.")
-        redis_client = None
+    else:
+        logger.warning("Async Redis unavailable; broadcasting via %s until it recovers",
+                       "Postgres" if "postgres" in settings.BROADCAST_BACKENDS else "this worker only")
+    stats_task = asyncio.create_task(_publish_worker_stats_loop())
+    log_ingest_queue.start()
+    retention_task = asyncio.create_task(log_retention_loop())
+    sla_rules_task = asyncio.create_task(sla_rules_listener())
+    sla_scan_task = asyncio.create_task(sla_scan_loop(broadcast_message))
+    site_index_tasks = [asyncio.create_task(site_index_loop()), asyncio.create_task(site_index_listener())]
+    barcode_cache_task = asyncio.create_task(barcode_cache_listener())
+    response_cache_task = asyncio.create_task(response_cache_listener())
+    revocation_tasks = [asyncio.create_task(token_revocation_purge_loop()), asyncio.create_task(token_revocation_listener())]
+    broadcast_tasks = [asyncio.create_task(broadcaster.run(manager.broadcast)),
+                       asyncio.create_task(broadcast_aggregator.run(_publish_broadcast))]
     
     yield
     
-    if redis_client:
-        await redis_client.aclose()
+    stats_task.cancel()
+    retention_task.cancel()
+    sla_rules_task.cancel()
+    sla_scan_task.cancel()
+    for task in site_index_tasks:
+        task.cancel()
+    barcode_cache_task.cancel()
+    response_cache_task.cancel()
+    for task in revocation_tasks:
+        task.cancel()
+    for task in broadcast_tasks:
+        task.cancel()
+    password_pool.shutdown()
+    await log_ingest_queue.stop()
+    await redis_manager.aclose()
 
 app = FastAPI(
     title="Ticketing System API",
@@ -70,9 +128,14 @@ app = FastAPI(
 @app.exception_handler(HTTPException)
 async def http_exception_handler(request: Request, exc: HTTPException):
     """Standardize HTTP error responses."""
+    headers = getattr(exc, "headers", None)
+    if not is_body_allowed_for_status_code(exc.status_code):
+        # e.g. 304 Not Modified from conditional GETs
+        return Response(status_code=exc.status_code, headers=headers)
     return JSONResponse(
         status_code=exc.status_code,
         content={"detail": exc.detail, "status_code": exc.status_code},
+        headers=headers,
     )
 
 
@@ -93,23 +156,20 @@ async def generic_exception_handler(request: Request, exc: Exception):
     )
 
 
-def _latency_bucket(request: Request) -> str:
-    path = request.url.path or "/"
-    query = request.url.query or ""
-    if path.startswith("/tickets"):
-        return "tickets"
-    if path.startswith("/fieldtech-companies"):
-        if "for_map=true" in query:
-            return "fieldtech_map"
-        return "fieldtech_companies"
-    if path.startswith("/sites"):
-        return "sites"
-    if path.startswith("/shipments"):
-        return "shipments"
-    return "other"
+def _route_template(scope) -> str:
+    """Matched route path template (e.g. /tickets/{ticket_id}); bounded label cardinality."""
+    route = scope.get("route")
+    return getattr(route, "path", None) or "unmatched"
 
 # Middlewares
-app.add_middleware(GZipMiddleware, minimum_size=500)
+app.add_middleware(
+    CompressionMiddleware,
+    minimum_size=settings.COMPRESSION_MINIMUM_SIZE,
+    content_types=settings.COMPRESSION_CONTENT_TYPES,
+    gzip_level=settings.COMPRESSION_GZIP_LEVEL,
+    brotli_quality=settings.COMPRESSION_BROTLI_QUALITY,
+    zstd_level=settings.COMPRESSION_ZSTD_LEVEL,
+)
 app.add_middleware(
     CORSMiddleware,
     allow_origins=settings.CORS_ORIGINS,
@@ -119,23 +179,112 @@ app.add_middleware(
 )
 
 
-@app.middleware("http")
-async def latency_middleware(request: Request, call_next):
-    start = timer_ms()
-    response = await call_next(request)
+def _is_admin_token(authorization: str) -> bool:
+    """True when the bearer token belongs to an admin (one user lookup; profiling opt-in only)."""
+    scheme, _, token = authorization.partition(" ")
+    if scheme.lower() != "bearer" or not token:
+        return False
+    try:
+        user_id = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM]).get("sub")
+    except jwt.InvalidTokenError:
+        return False
+    if not user_id:
+        return False
+    db = SessionLocal()
+    try:
+        user = crud.get_user(db, user_id=str(user_id))
+    finally:
+        db.close()
+    role = getattr(user, "role", None) if user else None
+    return getattr(role, "value", role) == models.UserRole.admin.value
+
+
+class LatencyMiddleware:
+    """Per-request timing, DB query stats, latency histograms and opt-in profiling.
+
+    Pure ASGI: headers are added to `http.response.start` as it passes through, so
+    there is no extra task or body re-streaming per request (as with
+    `@app.middleware("http")`), and streaming responses are forwarded untouched.
+    Latency is measured to the response start, like the time-to-headers the
+    previous middleware recorded.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        headers = Headers(scope=scope)
+        profile_forced = bool(headers.get("x-profile")) and await run_in_threadpool(
+            _is_admin_token, headers.get("authorization", "")
+        )
+        sampler = request_profiler.start() if profile_forced or request_profiler.should_sample() else None
+        start = timer_ms()
+        db_stats, db_token = query_stats.start_request()
+
+        response_started = False
+
+        async def send_with_timing(message):
+            nonlocal response_started
+            if message["type"] == "http.response.start":
+                response_started = True
+                await _finish_request(scope, message["status"], MutableHeaders(scope=message),
+                                      start, db_stats, sampler, profile_forced)
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            query_stats.end_request(db_token)
+            try:
+                if not response_started:
+                    # Unhandled exception: ServerErrorMiddleware (outside this one) sends the 500
+                    await _finish_request(scope, 500, None, start, db_stats, sampler, profile_forced)
+            finally:
+                if sampler is not None:
+                    # No-op when already finished; otherwise stop the thread and free its slot
+                    request_profiler.finish(sampler, scope["method"], _route_template(scope), 0.0, False)
+
+
+async def _finish_request(scope, status_code, headers, start, db_stats, sampler, profile_forced):
+    """Record a finished request; `headers` are the response's, or None when there is no response to annotate."""
     elapsed_ms = timer_ms() - start
-    bucket = _latency_bucket(request)
-    latency_tracker.record(bucket, elapsed_ms)
-    response.headers["X-Response-Time-Ms"] = f"{elapsed_ms:.2f}"
+    method = scope["method"]
+    route = _route_template(scope)
+    if headers is None:
+        headers = MutableHeaders()
+    if sampler is not None:
+        keep = profile_forced or elapsed_ms >= request_profiler.slow_threshold_ms
+        profile_id = await run_in_threadpool(request_profiler.finish, sampler, method, route, elapsed_ms, keep)
+        if profile_id:
+            headers["X-Profile-Id"] = profile_id
+    headers["X-DB-Queries"] = str(db_stats.count)
+    headers["X-DB-Time-Ms"] = f"{db_stats.total_ms:.2f}"
+    for fp, repeats in db_stats.repeated(settings.DB_REPEATED_QUERY_WARN_THRESHOLD):
+        logger.warning(
+            "repeated_query method=%s route=%s repeats=%d statement=%s",
+            method,
+            route,
+            repeats,
+            fp[:300],
+        )
+    latency_registry.record(method, route, status_code, elapsed_ms)
+    metrics.HTTP_REQUESTS.inc(labels=(method, route, f"{status_code // 100}xx"))
+    metrics.HTTP_REQUEST_DURATION.observe(elapsed_ms / 1000.0, labels=(method, route))
+    headers["X-Response-Time-Ms"] = f"{elapsed_ms:.2f}"
     if elapsed_ms > 1200:
         logger.warning(
-            "slow_request method=%s path=%s bucket=%s elapsed_ms=%.2f",
-            request.method,
-            request.url.path,
-            bucket,
+            "slow_request method=%s path=%s route=%s elapsed_ms=%.2f",
+            method,
+            scope["path"],
+            route,
             elapsed_ms,
         )
-    return response
+
+
+app.add_middleware(LatencyMiddleware)
 
 # Include routers
 from routers import tickets, users, sites, shipments, fieldtechs, fieldtech_companies, tasks, equipment, inventory, sla, audit, logging, search
@@ -155,13 +304,14 @@ app.include_router(logging.router)
 app.include_router(search.router)
 
 # Import authentication from auth module (SECRET_KEY already set above)
-from utils.auth import get_current_user, require_role, SECRET_KEY, ALGORITHM, ACCESS_TOKEN_EXPIRE_MINUTES, rate_limit, rate_limit_public
+from utils.auth import get_current_user, require_role, SECRET_KEY, ALGORITHM, ACCESS_TOKEN_EXPIRE_MINUTES, rate_limit, rate_limit_public, oauth2_scheme
 
 # Override _enqueue_broadcast with redis_client access
 def _enqueue_broadcast(background_tasks: BackgroundTasks, message: str):
     """Enqueue a WebSocket broadcast message"""
     if background_tasks:
-        background_tasks.add_task(broadcast_message, message)
+        metrics.BROADCAST_QUEUE_DEPTH.inc()
+        background_tasks.add_task(_queued_broadcast, message)
     else:
         # If no background tasks available, broadcast directly (for testing)
         import asyncio
@@ -171,36 +321,41 @@ def _enqueue_broadcast(background_tasks: BackgroundTasks, message: str):
             # No event loop running, skip broadcast
             logger.warning(f"No background tasks available, skipping broadcast: {message}")
 
+async def _queued_broadcast(message: str):
+    try:
+        await broadcast_message(message)
+    finally:
+        metrics.BROADCAST_QUEUE_DEPTH.dec()
+
 async def broadcast_message(message: str):
-    """Broadcast a message to all WebSocket connections"""
-    logger.info(f"Broadcasting message: {message}")
-    if redis_client:
-        try:
-            await redis_client.publish("websocket_updates", message)
-            logger.info("Message published to Redis")
-        except Exception as e:
-            logger.warning(f"Redis publish failed: {e}")
-            # Fallback to direct broadcast
-            await manager.broadcast(message)
-    else:
-        # Direct broadcast when Redis is not available
-        logger.info("Using direct broadcast (no Redis)")
+    """Broadcast a message to all WebSocket connections on every worker (coalesced per topic)"""
+    await run_in_threadpool(response_cache.invalidate_for_message, message)
+    if not broadcast_aggregator.submit(message):
+        await _publish_broadcast(message)
+
+async def _publish_broadcast(message: str):
+    transport = await broadcaster.publish(message)
+    metrics.BROADCASTS.inc(labels=(transport,))
+    broadcast_logger.info("broadcast transport=%s message=%.200s", transport, message)
+    if transport == "local":
+        # No backend reachable: only this worker's sockets get it
         await manager.broadcast(message)
 
 # Dependency injection for Redis client
 async def get_redis() -> Redis | None:
-    return redis_client
+    return await redis_manager.get_async()
 
 # Authentication endpoints
 @app.post("/token")
-def login_form(
+async def login_form(
     form_data: OAuth2PasswordRequestForm = Depends(),
     db: Session = Depends(get_db),
     _rl: None = Depends(rate_limit_public("login", limit=settings.RATE_LIMIT_LOGIN_PER_MINUTE, window_seconds=60))
 ):
     """Login endpoint (OAuth2 form)"""
-    user = crud.get_user_by_email(db, email=form_data.username)
-    if not user or not user.active or not verify_password(form_data.password, user.hashed_password):
+    # Async so the bcrypt check waits on the password pool without holding a threadpool thread
+    user = await run_in_threadpool(crud.get_user_by_email, db, email=form_data.username)
+    if not user or not user.active or not await password_pool.verify_async(form_data.password, user.hashed_password):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect email or password",
@@ -220,14 +375,14 @@ def login_form(
     }
 
 @app.post("/login")
-def login_json(
+async def login_json(
     form_data: OAuth2PasswordRequestForm = Depends(),
     db: Session = Depends(get_db),
     _rl: None = Depends(rate_limit_public("login", limit=settings.RATE_LIMIT_LOGIN_PER_MINUTE, window_seconds=60))
 ):
     """Login endpoint (form-encoded for frontend)"""
-    user = crud.get_user_by_email(db, email=form_data.username)
-    if not user or not user.active or not verify_password(form_data.password, user.hashed_password):
+    user = await run_in_threadpool(crud.get_user_by_email, db, email=form_data.username)
+    if not user or not user.active or not await password_pool.verify_async(form_data.password, user.hashed_password):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect email or password",
@@ -295,6 +450,9 @@ def refresh_token(
         raise HTTPException(status_code=401, detail="Refresh token expired")
     except jwt.PyJWTError:
         raise HTTPException(status_code=401, detail="Invalid refresh token")
+
+    if revocation_list.is_revoked(payload.get("jti"), db):
+        raise HTTPException(status_code=401, detail="Refresh token revoked")
     
     user = crud.get_user(db, user_id=user_id)
     if not user:
@@ -318,6 +476,28 @@ def refresh_token(
         "expires_in": ACCESS_TOKEN_EXPIRE_MINUTES * 60
     }
 
+class LogoutRequest(BaseModel):
+    refresh_token: Optional[str] = None
+
+@app.post("/logout")
+def logout(
+    logout_data: Optional[LogoutRequest] = None,
+    token: str = Depends(oauth2_scheme),
+    current_user: models.User = Depends(get_current_user),
+    db: Session = Depends(get_db),
+):
+    """Revoke the caller's access token and, if given, their refresh token"""
+    revoked = [revoked_from_payload(jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM]))]
+    if logout_data and logout_data.refresh_token:
+        try:
+            payload = jwt.decode(logout_data.refresh_token, SECRET_KEY, algorithms=[ALGORITHM])
+        except jwt.PyJWTError:
+            payload = None  # expired or invalid: nothing left to revoke
+        if payload and payload.get("type") == "refresh" and str(payload.get("sub")) == current_user.user_id:
+            revoked.append(revoked_from_payload(payload, default_type="refresh"))
+    revoke(db, [r for r in revoked if r is not None], reason="logout")
+    return {"success": True}
+
 # WebSocket connection manager
 class ConnectionManager:
     def __init__(self):
@@ -328,14 +508,14 @@ class ConnectionManager:
         await websocket.accept()
         self.active_connections.append(websocket)
         self.user_connections[user_id] = websocket
-        logger.info(f"WebSocket connected for user: {user_id}")
+        broadcast_logger.info("WebSocket connected for user: %s", user_id)
 
     def disconnect(self, websocket: WebSocket, user_id: str = None):
         if websocket in self.active_connections:
             self.active_connections.remove(websocket)
         if user_id and user_id in self.user_connections:
             del self.user_connections[user_id]
-        logger.info(f"WebSocket disconnected for user: {user_id}")
+        broadcast_logger.info("WebSocket disconnected for user: %s", user_id)
 
     async def send_personal_message(self, message: str, user_id: str):
         if user_id in self.user_connections:
@@ -360,6 +540,7 @@ class ConnectionManager:
                 self.active_connections.remove(connection)
 
 manager = ConnectionManager()
+metrics.WEBSOCKET_CONNECTIONS.set_function(lambda: len(manager.active_connections))
 
 # WebSocket endpoint
 @app.websocket("/ws/updates")
@@ -375,7 +556,9 @@ async def websocket_endpoint(websocket: WebSocket):
     try:
         payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
         user_id = payload.get("sub")
-        if not user_id:
+        # A socket only receives broadcasts, so until the filter is loaded it is not checked against the DB
+        revoked = await run_in_threadpool(revocation_list.is_revoked, payload.get("jti"), None, False)
+        if not user_id or revoked:
             await websocket.close(code=4401)
             return
     except Exception:
@@ -386,80 +569,37 @@ async def websocket_endpoint(websocket: WebSocket):
     
     try:
         logger.info(f"WebSocket connection established for user: {user_id}")
-        
-        # If Redis is available, subscribe to updates
-        pubsub = None
-        if redis_client:
-            try:
-                pubsub = redis_client.pubsub()
-                await pubsub.subscribe("websocket_updates")
-                logger.info("Subscribed to Redis websocket_updates channel")
-
-                async def pubsub_listener():
-                    async for message in pubsub.listen():
-                        if message and message.get("type") == "message":
-                            await websocket.send_text(message.get("data"))
-
-                async def ws_receiver():
-                    while True:
-                        try:
-                            data = await websocket.receive_text()
-                            if data:
-                                try:
-                                    parsed_data = json.loads(data)
-                                    if parsed_data.get('type') == 'ping':
-                                        await websocket.send_text(json.dumps({"type": "pong", "data": "connected"}))
-                                except json.JSONDecodeError:
-                                    pass
-                        except Exception:
-                            # Break on disconnect
-                            break
-
-                await asyncio.gather(pubsub_listener(), ws_receiver(), return_exceptions=True)
-            except Exception as e:
-                logger.warning(f"Redis subscription failed: {e}")
-                # Fall back to simple keepalive + receiver
-                async def keepalive():
-                    while True:
-                        await asyncio.sleep(60)
-                        await websocket.send_text(json.dumps({"type": "ping", "timestamp": datetime.now(timezone.utc).isoformat()}))
-
-                async def ws_receiver():
-                    while True:
+        # Broadcasts arrive through manager.broadcast (the worker's broadcaster listener)
+        async def keepalive():
+            while True:
+                await asyncio.sleep(60)
+                await websocket.send_text(json.dumps({"type": "ping", "timestamp": datetime.now(timezone.utc).isoformat()}))
+
+        async def ws_receiver():
+            while True:
+                try:
+                    data = await websocket.receive_text()
+                    if data:
                         try:
-                            data = await websocket.receive_text()
-                            await websocket.send_text(json.dumps({"type": "pong", "data": "connected"}))
-                        except Exception:
-                            break
-
-                await asyncio.gather(keepalive(), ws_receiver(), return_exceptions=True)
-        else:
-            # Fallback without Redis - just keepalive
-            logger.info("No Redis available, using simple keepalive")
-            async def keepalive():
-                while True:
-                    await asyncio.sleep(60)
-                    await websocket.send_text(json.dumps({"type": "ping", "timestamp": datetime.now(timezone.utc).isoformat()}))
-
-            async def ws_receiver():
-                while True:
-                    try:
-                        data = await websocket.receive_text()
-                        await websocket.send_text(json.dumps({"type": "pong", "data": "connected"}))
-                    except Exception:
-                        break
-
-            await asyncio.gather(keepalive(), ws_receiver(), return_exceptions=True)
+                            parsed_data = json.loads(data)
+                            if parsed_data.get('type') == 'ping':
+                                await websocket.send_text(json.dumps({"type": "pong", "data": "connected"}))
+                        except json.JSONDecodeError:
+                            pass
+                except Exception:
+                    # Break on disconnect
+                    break
+
+        receiver = asyncio.create_task(ws_receiver())
+        pinger = asyncio.create_task(keepalive())
+        try:
+            await receiver
+        finally:
+            pinger.cancel()
                     
     except Exception as e:
         logger.info(f"WebSocket disconnected for user {user_id}: {e}")
     finally:
-        try:
-            if redis_client and pubsub:
-                await pubsub.unsubscribe("websocket_updates")
-                await pubsub.close()
-        except Exception:
-            pass
         manager.disconnect(websocket, user_id)
 
 # Health check
@@ -470,15 +610,88 @@ def health_check():
 
 
 @app.get("/ops/latency")
-def get_latency_baseline(
+async def get_latency_baseline(
+    scope: str = Query("worker", pattern="^(worker|cluster)$"),
     current_user: models.User = Depends(require_role([models.UserRole.admin.value, models.UserRole.dispatcher.value]))
 ):
-    """Rolling p50/p95 latency summary for hot endpoint groups."""
+    """p50/p90/p99/p999 latency per route template, method and status class.
+
+    scope=worker reports this process; scope=cluster merges every worker's last
+    published histogram from Redis (falls back to worker scope without Redis).
+    """
+    summary = None
+    workers = 1
+    if scope == "cluster":
+        client = await redis_manager.get_async()
+        if client:
+            try:
+                hists, workers = await RouteLatencyRegistry.collect(client)
+                summary = RouteLatencyRegistry.summarize(hists)
+            except Exception as e:
+                logger.warning("Latency histogram collect failed: %s", e)
+                redis_manager.record_failure(e)
+        if summary is None:
+            scope = "worker"
+    if summary is None:
+        summary = latency_registry.summary()
+    return {
+        "generated_at": datetime.now(timezone.utc).isoformat(),
+        "scope": scope,
+        "workers": workers,
+        "summary": summary,
+    }
+
+@app.get("/ops/redis")
+def get_redis_status(
+    current_user: models.User = Depends(require_role([models.UserRole.admin.value, models.UserRole.dispatcher.value]))
+):
+    """Redis health and circuit breaker state shared by rate limiting and broadcasting."""
+    return {
+        "generated_at": datetime.now(timezone.utc).isoformat(),
+        "redis": redis_manager.status(),
+    }
+
+@app.get("/ops/profiles")
+def list_profiles(
+    current_user: models.User = Depends(require_role([models.UserRole.admin.value]))
+):
+    """Stored request profiles (speedscope JSON), newest first."""
     return {
         "generated_at": datetime.now(timezone.utc).isoformat(),
-        "summary": latency_tracker.summary(),
+        "profiles": request_profiler.store.list(),
     }
 
+@app.get("/ops/profiles/{name}")
+def download_profile(
+    name: str,
+    current_user: models.User = Depends(require_role([models.UserRole.admin.value]))
+):
+    """Download one profile; open it at https://www.speedscope.app."""
+    path = request_profiler.store.path_for(name)
+    if not path:
+        raise HTTPException(status_code=404, detail="Profile not found")
+    return FileResponse(path, media_type="application/json", filename=name)
+
+@app.get("/metrics", include_in_schema=False)
+async def get_metrics(request: Request):
+    """OpenMetrics exposition merged across workers (this worker only when Redis is down).
+
+    Scrapers authenticate with `Authorization: Bearer <METRICS_TOKEN>` when the token is set.
+    """
+    if settings.METRICS_TOKEN:
+        supplied = request.headers.get("authorization", "")
+        if not secrets.compare_digest(supplied, f"Bearer {settings.METRICS_TOKEN}"):
+            raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid metrics token")
+    snapshots = [metrics.registry.snapshot()]
+    client = await redis_manager.get_async()
+    if client:
+        try:
+            snapshots, _ = await metrics.registry.collect(client)
+        except Exception as e:
+            logger.warning("Metrics collect failed: %s", e)
+            redis_manager.record_failure(e)
+    return PlainTextResponse(metrics.render(snapshots), media_type=metrics.CONTENT_TYPE)
+
 # Root endpoint
 @app.get("/")
 def read_root():
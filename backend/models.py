@@ -1,8 +1,11 @@
-from sqlalchemy import Column, String, Integer, Float, Date, DateTime, ForeignKey, Text, Enum, Boolean
-from sqlalchemy.orm import relationship
+from sqlalchemy import Column, String, Integer, Float, Date, DateTime, ForeignKey, Text, Enum, Boolean, Index, event
+from sqlalchemy import and_, case, func, literal, or_
+from sqlalchemy.sql.elements import BindParameter, ClauseElement
+from sqlalchemy.orm import Session, relationship
+from sqlalchemy.orm.attributes import get_history
 from database import Base
 import enum
-from datetime import datetime, timezone
+from datetime import datetime, timedelta, timezone
 
 class UserRole(enum.Enum):
     tech = 'tech'
@@ -211,6 +214,7 @@ class Ticket(Base):
     resolution_time = Column(DateTime)  # When ticket was resolved
     escalation_level = Column(Integer, default=0)  # Current escalation level
     escalation_notified = Column(Boolean, default=False)  # Whether escalation was notified
+    sla_due_at = Column(DateTime)  # Naive UTC time of the next SLA threshold; NULL once none are left
     customer_impact = Column(Enum(ImpactLevel), default=ImpactLevel.medium)
     business_priority = Column(Enum(BusinessPriority), default=BusinessPriority.medium)
     
@@ -261,6 +265,13 @@ class Ticket(Base):
     time_entries = relationship('TimeEntry', back_populates='ticket')
     attachments = relationship('TicketAttachment', back_populates='ticket')
 
+    __table_args__ = (
+        # Partial: only tickets with a pending SLA threshold, which is all the scanner reads
+        Index('ix_tickets_sla_due_at_pending', 'sla_due_at', postgresql_where=sla_due_at.isnot(None)),
+        # Keyset pages of a site's tickets (GET /sites/{id}/tickets)
+        Index('ix_tickets_site_created', 'site_id', 'created_at', 'ticket_id'),
+    )
+
 class TicketAudit(Base):
     __tablename__ = 'ticket_audits'
     audit_id = Column(String, primary_key=True, index=True)
@@ -304,6 +315,11 @@ class Shipment(Base):
     item = relationship('InventoryItem', back_populates='shipments')
     shipment_items = relationship('ShipmentItem', back_populates='shipment', cascade='all, delete-orphan')
 
+    __table_args__ = (
+        # Keyset pages of a site's shipments (GET /sites/{id}/shipments)
+        Index('ix_shipments_site_shipment', 'site_id', 'shipment_id'),
+    )
+
 class ShipmentItem(Base):
     __tablename__ = 'shipment_items'
     shipment_item_id = Column(String, primary_key=True, index=True)
@@ -339,6 +355,10 @@ class InventoryTransactionType(enum.Enum):
 
 class InventoryTransaction(Base):
     __tablename__ = 'inventory_transactions'
+    __table_args__ = (
+        # Keyset pages and stock history of one item (GET /inventory/{id}/transactions, /stock-history)
+        Index('ix_inventory_transactions_item_date', 'item_id', 'date', 'transaction_id'),
+    )
     transaction_id = Column(String, primary_key=True, index=True)
     item_id = Column(String, ForeignKey('inventory_items.item_id'))
     user_id = Column(String, ForeignKey('users.user_id'))
@@ -449,7 +469,7 @@ class RevokedToken(Base):
     user_id = Column(String, ForeignKey('users.user_id'), nullable=False)
     token_type = Column(String, nullable=False)  # 'access' or 'refresh'
     revoked_at = Column(DateTime, default=lambda: datetime.now(timezone.utc), nullable=False)
-    expires_at = Column(DateTime, nullable=False)  # When the token would have expired
+    expires_at = Column(DateTime, nullable=False, index=True)  # When the token would have expired
     reason = Column(String)  # Optional reason for revocation (logout, security, etc.)
     user = relationship('User')
 
@@ -466,6 +486,14 @@ class FrontendLog(Base):
     client_ip = Column(String)
     error_id = Column(String)  # For correlating related errors
 
+class FrontendLogHourlyRollup(Base):
+    """Per-hour log counts maintained on ingest so /api/logs/stats never scans raw rows."""
+    __tablename__ = 'frontend_log_hourly_rollups'
+    hour = Column(DateTime, primary_key=True, index=True)  # UTC hour bucket start
+    level = Column(String, primary_key=True)
+    context = Column(String, primary_key=True)
+    count = Column(Integer, nullable=False, default=0)
+
 class FrontendError(Base):
     __tablename__ = 'frontend_errors'
     id = Column(Integer, primary_key=True, index=True)
@@ -477,4 +505,102 @@ class FrontendError(Base):
     url = Column(String)
     user_agent = Column(Text)
     client_ip = Column(String)
-    additional_data = Column(Text)  # JSON string of additional error data 
\ No newline at end of file
+    additional_data = Column(Text)  # JSON string of additional error data 
+
+
+# Statuses of finished tickets (no further SLA escalation; "closed" in site summaries)
+CLOSED_TICKET_STATUSES = frozenset({'completed', 'closed', 'approved', 'archived'})
+_SLA_INPUT_FIELDS = ('status', 'created_at', 'sla_target_hours', 'sla_breach_hours', 'escalation_level')
+
+
+def compute_sla_due_at(created_at, sla_target_hours, sla_breach_hours, escalation_level, status):
+    """Next SLA threshold for a ticket (naive UTC), or None when nothing is left to cross.
+
+    Level 0 is due at the target time, level 1 at the breach time; the SLA
+    scanner applies the same transitions in SQL when it bumps escalation_level.
+    """
+    if created_at is None or getattr(status, 'value', status) in CLOSED_TICKET_STATUSES:
+        return None
+    if created_at.tzinfo is not None:
+        created_at = created_at.astimezone(timezone.utc).replace(tzinfo=None)
+    target = sla_target_hours if sla_target_hours is not None else 24
+    breach = sla_breach_hours if sla_breach_hours is not None else 48
+    level = escalation_level or 0
+    if level == 0:
+        return created_at + timedelta(hours=target)
+    if level == 1 and breach > target:
+        return created_at + timedelta(hours=breach)
+    return None
+
+
+def _apply_sla_due_at(ticket):
+    ticket.sla_due_at = compute_sla_due_at(
+        ticket.created_at, ticket.sla_target_hours, ticket.sla_breach_hours, ticket.escalation_level, ticket.status
+    )
+
+
+@event.listens_for(Ticket, 'before_insert')
+def _ticket_sla_due_on_insert(mapper, connection, ticket):
+    if ticket.created_at is None:
+        ticket.created_at = datetime.now(timezone.utc)
+    _apply_sla_due_at(ticket)
+
+
+@event.listens_for(Ticket, 'before_update')
+def _ticket_sla_due_on_update(mapper, connection, ticket):
+    # Only when an input changed, so a stale session cannot undo a scanner escalation
+    if any(get_history(ticket, name).has_changes() for name in _SLA_INPUT_FIELDS):
+        _apply_sla_due_at(ticket)
+
+
+def sla_due_at_expression(dialect_name, created_at, sla_target_hours, sla_breach_hours, escalation_level, status):
+    """SQL form of compute_sla_due_at, or None for dialects without hour arithmetic here."""
+    target = func.coalesce(sla_target_hours, 24)
+    breach = func.coalesce(sla_breach_hours, 48)
+    level = func.coalesce(escalation_level, 0)
+    if dialect_name == 'postgresql':
+        def plus_hours(hours):
+            return created_at + func.make_interval(0, 0, 0, 0, hours)
+    elif dialect_name == 'sqlite':
+        def plus_hours(hours):
+            return func.datetime(created_at, func.printf('+%d hours', hours))
+    else:
+        return None
+    closed = [TicketStatus(s) for s in sorted(CLOSED_TICKET_STATUSES)]
+    return case(
+        (or_(created_at.is_(None), status.in_(closed)), None),
+        (level == 0, plus_hours(target)),
+        (and_(level == 1, breach > target), plus_hours(breach)),
+        else_=None,
+    )
+
+
+def _update_value_names(stmt):
+    values = getattr(stmt, '_values', None) or {}
+    return {getattr(k, 'key', k): v for k, v in values.items()}
+
+
+def _as_expression(value, column):
+    """A SET value reusable elsewhere in the statement (a bound parameter may appear only once)."""
+    if isinstance(value, BindParameter):
+        value = value.value
+    if isinstance(value, ClauseElement):
+        return value
+    return literal(value, type_=column.type)
+
+
+@event.listens_for(Session, 'do_orm_execute')
+def _ticket_sla_due_on_bulk_update(state):
+    """Bulk `query(Ticket).update(...)` / `update(Ticket)` skip before_update: set sla_due_at in the same UPDATE."""
+    if not state.is_update or state.bind_mapper is None or state.bind_mapper.class_ is not Ticket:
+        return
+    values = _update_value_names(state.statement)
+    if 'sla_due_at' in values or not values.keys() & set(_SLA_INPUT_FIELDS):
+        return
+    columns = Ticket.__table__.c
+    # SET expressions see the old row, so use the new value wherever the statement sets one
+    inputs = [_as_expression(values[name], columns[name]) if name in values else columns[name] for name in
+              ('created_at', 'sla_target_hours', 'sla_breach_hours', 'escalation_level', 'status')]
+    expression = sla_due_at_expression(state.session.get_bind().dialect.name, *inputs)
+    if expression is not None:
+        state.statement = state.statement.values(sla_due_at=expression)
@@ -1,5 +1,5 @@
 """Field tech companies: one address per company, techs listed under company."""
-from fastapi import APIRouter, Depends, HTTPException, BackgroundTasks, UploadFile, File
+from fastapi import APIRouter, Depends, HTTPException, BackgroundTasks, UploadFile, File, Request, Response
 from sqlalchemy.orm import Session
 from sqlalchemy import func
 from typing import List, Optional
@@ -9,6 +9,11 @@ import io
 import models, schemas, crud
 from database import get_db
 from utils.main_utils import get_current_user, require_role, _enqueue_broadcast
+from utils.etag import etag_guard
+from utils.response_cache import response_cache
+
+# Tables a company response is built from (ETag validators)
+COMPANY_TABLES = ("field_tech_companies", "field_techs")
 
 router = APIRouter(prefix="/fieldtech-companies", tags=["fieldtech-companies"])
 
@@ -49,6 +54,8 @@ def create_company(
 
 @router.get("/", response_model=List[schemas.FieldTechCompanyOut])
 def list_companies(
+    request: Request,
+    response: Response,
     skip: int = 0,
     limit: int = 500,
     region: Optional[str] = None,
@@ -58,7 +65,17 @@ def list_companies(
     for_map: bool = False,
     db: Session = Depends(get_db),
     current_user: models.User = Depends(get_current_user),
+    _etag: None = Depends(etag_guard(*COMPANY_TABLES)),
 ):
+    return response_cache.respond(
+        "companies", request, response, current_user,
+        lambda session: _list_companies(session, skip, limit, region, state, city, include_techs, for_map), db,
+        model=List[schemas.FieldTechCompanyOut],
+    )
+
+
+def _list_companies(db: Session, skip: int, limit: int, region: Optional[str], state: Optional[str],
+                    city: Optional[str], include_techs: bool, for_map: bool):
     from zip_lookup import lookup_zip
     companies = crud.get_field_tech_companies(db, skip=skip, limit=limit, region=region, state=state, city=city, include_techs=include_techs)
     if not include_techs and not for_map:
@@ -84,6 +101,7 @@ def get_company(
     company_id: str,
     db: Session = Depends(get_db),
     current_user: models.User = Depends(get_current_user),
+    _etag: None = Depends(etag_guard(*COMPANY_TABLES)),
 ):
     company = crud.get_field_tech_company(db, company_id=company_id)
     if not company:
@@ -281,6 +299,7 @@ def import_companies_from_csv(
                 created_techs += 1
 
     db.commit()
+    response_cache.invalidate(["field_tech_company"])
     return {
         "created_companies": created_companies,
         "updated_companies": updated_companies,
@@ -1,11 +1,14 @@
-from fastapi import APIRouter, Depends, HTTPException, status, BackgroundTasks
+from fastapi import APIRouter, Depends, HTTPException, status, BackgroundTasks, Query
 from sqlalchemy.orm import Session
-from typing import List
-from datetime import datetime, timezone
+from typing import List, Optional
+from datetime import date, datetime, timedelta, timezone
 
 import models, schemas, crud
 from database import get_db
 from utils.main_utils import get_current_user, require_role, audit_log, _enqueue_broadcast
+from utils.pagination import cursor_param
+
+STOCK_HISTORY_MAX_DAYS = 3660
 
 router = APIRouter(prefix="/inventory", tags=["inventory"])
 
@@ -78,21 +81,39 @@ def update_inventory_item(
     
     return result
 
-@router.get("/{item_id}/transactions")
+@router.get("/{item_id}/transactions", response_model=schemas.CursorPage[schemas.InventoryTransactionOut])
 def get_item_transactions(
     item_id: str,
+    limit: int = Query(50, ge=1, le=200),
+    cursor: Optional[str] = None,
     db: Session = Depends(get_db),
     current_user: models.User = Depends(get_current_user)
 ):
-    """Get all transactions for an inventory item"""
-    # Verify item exists
-    item = crud.get_inventory_item(db, item_id=item_id)
-    if not item:
+    """Newest-first transactions for an inventory item, keyset paged via `cursor`"""
+    if db.query(models.InventoryItem.item_id).filter(models.InventoryItem.item_id == item_id).first() is None:
         raise HTTPException(status_code=404, detail="Inventory item not found")
-    
-    # Get transactions
-    transactions = crud.get_transactions_by_item(db, item_id=item_id)
-    return transactions
+    items, next_cursor = crud.get_item_transactions_page(db, item_id, limit=limit, after=cursor_param(cursor, 2))
+    return {"items": items, "next_cursor": next_cursor}
+
+@router.get("/{item_id}/stock-history", response_model=schemas.StockHistoryOut)
+def get_item_stock_history(
+    item_id: str,
+    start: Optional[date] = None,
+    end: Optional[date] = None,
+    db: Session = Depends(get_db),
+    current_user: models.User = Depends(get_current_user)
+):
+    """Daily stock levels for an inventory item (default: the last 90 days)"""
+    end = end or date.today()
+    start = start or end - timedelta(days=90)
+    if start > end:
+        raise HTTPException(status_code=400, detail="start must not be after end")
+    if (end - start).days > STOCK_HISTORY_MAX_DAYS:
+        raise HTTPException(status_code=400, detail=f"Range is limited to {STOCK_HISTORY_MAX_DAYS} days")
+    history = crud.get_item_stock_history(db, item_id, start=start, end=end)
+    if history is None:
+        raise HTTPException(status_code=404, detail="Inventory item not found")
+    return history
 
 @router.post("/scan")
 def scan_inventory_item(
@@ -112,6 +133,19 @@ def scan_inventory_item(
     
     return item
 
+@router.post("/scan/batch", response_model=schemas.BarcodeBatchScanOut)
+def scan_inventory_batch(
+    data: schemas.BarcodeBatchScanRequest,
+    db: Session = Depends(get_db),
+    current_user: models.User = Depends(get_current_user),
+    background_tasks: BackgroundTasks = None
+):
+    """Resolve many scanned barcodes in one request; quantity_delta entries are applied together in one transaction"""
+    result = crud.scan_inventory_batch(db, data.scans, user_id=current_user.user_id, notes=data.notes)
+    if result["changes"] and background_tasks:
+        _enqueue_broadcast(background_tasks, '{"type":"inventory","action":"update"}')
+    return result
+
 @router.delete("/{item_id}")
 def delete_inventory_item(
     item_id: str, 
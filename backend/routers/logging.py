@@ -4,13 +4,17 @@ Logging and error tracking endpoints
 
 from fastapi import APIRouter, Depends, HTTPException, Request
 from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
 from database import get_db
+import crud
 import models
 import schemas
 from datetime import datetime, timezone
 import json
 import logging
-from typing import Dict, Any, Optional
+from typing import Dict, Any, List, Optional
+
+from utils.log_ingest import log_ingest_queue, KIND_ERROR, KIND_LOG
 
 router = APIRouter(prefix="/api", tags=["logging"])
 
@@ -18,155 +22,167 @@ router = APIRouter(prefix="/api", tags=["logging"])
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+MAX_BATCH_ITEMS = 500
+
+
+def _client_info(request: Request):
+    return (request.client.host if request.client else None), request.headers.get("user-agent", "")
+
+
+def _text(value: Any, default: Optional[str] = "") -> Optional[str]:
+    """Client values as column text: null -> `default`, objects/arrays -> JSON, scalars -> str."""
+    if value is None:
+        return default
+    if isinstance(value, str):
+        return value
+    if isinstance(value, (dict, list)):
+        return json.dumps(value, default=str)
+    return str(value)
+
+
+# Rows are coerced here, at enqueue, so one malformed entry cannot fail a whole bulk INSERT
+def _log_row(log_data: Dict[str, Any], client_ip: Optional[str], user_agent: str) -> Dict[str, Any]:
+    return {
+        "timestamp": datetime.now(timezone.utc),
+        "level": _text(log_data.get("level"), "INFO").upper(),
+        "context": _text(log_data.get("context"), "frontend"),
+        "message": _text(log_data.get("message")),
+        "data": json.dumps(log_data.get("data", {}), default=str),
+        "url": _text(log_data.get("url")),
+        "user_agent": user_agent,
+        "client_ip": client_ip,
+        "error_id": _text(log_data.get("errorId"), None),
+    }
+
+
+def _error_row(error_data: Dict[str, Any], client_ip: Optional[str], user_agent: str) -> Dict[str, Any]:
+    return {
+        "timestamp": datetime.now(timezone.utc),
+        "error_id": _text(error_data.get("errorId"), None),
+        "message": _text(error_data.get("message")),
+        "stack": _text(error_data.get("stack")),
+        "component_stack": _text(error_data.get("componentStack")),
+        "url": _text(error_data.get("url")),
+        "user_agent": user_agent,
+        "client_ip": client_ip,
+        "additional_data": json.dumps(error_data.get("additionalData", {}), default=str),
+    }
+
+
+def _queue_full():
+    raise HTTPException(
+        status_code=503,
+        detail="Log ingestion is overloaded; retry later",
+        headers={"Retry-After": "5"},
+    )
+
+
 @router.post("/logs")
 async def log_frontend_error(
     log_data: Dict[str, Any],
     request: Request,
-    db: Session = Depends(get_db)
 ):
     """
-    Receive and store frontend error logs
+    Receive frontend logs; rows are queued and bulk-inserted by the ingest flusher
     """
-    try:
-        # Extract client information
-        client_ip = request.client.host
-        user_agent = request.headers.get("user-agent", "")
-        
-        # Create log entry
-        log_entry = models.FrontendLog(
-            timestamp=datetime.now(timezone.utc),
-            level=log_data.get("level", "INFO"),
-            context=log_data.get("context", "frontend"),
-            message=log_data.get("message", ""),
-            data=json.dumps(log_data.get("data", {})),
-            url=log_data.get("url", ""),
-            user_agent=user_agent,
-            client_ip=client_ip,
-            error_id=log_data.get("errorId")
-        )
-        
-        db.add(log_entry)
-        db.commit()
-        
-        # Also log to application logger
-        log_level = getattr(logging, log_data.get("level", "INFO").upper(), logging.INFO)
-        logger.log(
-            log_level,
-            f"Frontend {log_data.get('level', 'INFO')}: {log_data.get('message', '')}",
-            extra={
-                "context": log_data.get("context", "frontend"),
-                "data": log_data.get("data", {}),
-                "url": log_data.get("url", ""),
-                "error_id": log_data.get("errorId")
-            }
-        )
-        
-        return {"status": "logged", "error_id": log_data.get("errorId")}
-        
-    except Exception as e:
-        logger.error(f"Failed to log frontend error: {str(e)}")
-        raise HTTPException(status_code=500, detail="Failed to log error")
+    client_ip, user_agent = _client_info(request)
+    row = _log_row(log_data, client_ip, user_agent)
+    if not log_ingest_queue.offer(KIND_LOG, [row]):
+        _queue_full()
+    
+    # Also log to application logger
+    log_level = logging.getLevelName(row["level"])
+    if not isinstance(log_level, int):
+        log_level = logging.INFO
+    logger.log(
+        log_level,
+        f"Frontend {row['level']}: {row['message']}",
+        extra={
+            "context": row["context"],
+            "data": log_data.get("data", {}),
+            "url": row["url"],
+            "error_id": row["error_id"]
+        }
+    )
+    
+    return {"status": "logged", "error_id": log_data.get("errorId")}
 
 @router.post("/errors")
 async def log_frontend_error_detailed(
     error_data: Dict[str, Any],
     request: Request,
-    db: Session = Depends(get_db)
 ):
     """
-    Receive and store detailed frontend error information
+    Receive detailed frontend error information; queued like /logs
     """
-    try:
-        # Extract client information
-        client_ip = request.client.host
-        user_agent = request.headers.get("user-agent", "")
-        
-        # Create error entry
-        error_entry = models.FrontendError(
-            timestamp=datetime.now(timezone.utc),
-            error_id=error_data.get("errorId"),
-            message=error_data.get("message", ""),
-            stack=error_data.get("stack", ""),
-            component_stack=error_data.get("componentStack", ""),
-            url=error_data.get("url", ""),
-            user_agent=user_agent,
-            client_ip=client_ip,
-            additional_data=json.dumps(error_data.get("additionalData", {}))
-        )
-        
-        db.add(error_entry)
-        db.commit()
-        
-        # Log to application logger
-        logger.error(
-            f"Frontend Error: {error_data.get('message', '')}",
-            extra={
-                "error_id": error_data.get("errorId"),
-                "stack": error_data.get("stack", ""),
-                "url": error_data.get("url", ""),
-                "client_ip": client_ip
-            }
-        )
-        
-        return {"status": "logged", "error_id": error_data.get("errorId")}
-        
-    except Exception as e:
-        logger.error(f"Failed to log frontend error: {str(e)}")
-        raise HTTPException(status_code=500, detail="Failed to log error")
+    client_ip, user_agent = _client_info(request)
+    row = _error_row(error_data, client_ip, user_agent)
+    if not log_ingest_queue.offer(KIND_ERROR, [row]):
+        _queue_full()
+    
+    # Log to application logger
+    logger.error(
+        f"Frontend Error: {row['message']}",
+        extra={
+            "error_id": row["error_id"],
+            "stack": row["stack"],
+            "url": row["url"],
+            "client_ip": client_ip
+        }
+    )
+    
+    return {"status": "logged", "error_id": error_data.get("errorId")}
+
+@router.post("/logs/batch", status_code=202)
+async def log_frontend_batch(
+    batch: Dict[str, List[Dict[str, Any]]],
+    request: Request,
+):
+    """
+    Receive arrays of frontend logs and errors in one request:
+    `{"logs": [...], "errors": [...]}` (at most MAX_BATCH_ITEMS entries in total).
+    Entries beyond the server queue's capacity are dropped and reported back.
+    """
+    logs = batch.get("logs") or []
+    errors = batch.get("errors") or []
+    if len(logs) + len(errors) > MAX_BATCH_ITEMS:
+        raise HTTPException(status_code=413, detail=f"At most {MAX_BATCH_ITEMS} entries per batch")
+    client_ip, user_agent = _client_info(request)
+    accepted = log_ingest_queue.offer(KIND_LOG, [_log_row(d, client_ip, user_agent) for d in logs])
+    accepted += log_ingest_queue.offer(KIND_ERROR, [_error_row(d, client_ip, user_agent) for d in errors])
+    dropped = len(logs) + len(errors) - accepted
+    if dropped and not accepted:
+        _queue_full()
+    if errors:
+        logger.error("Frontend error batch: %d errors from %s", len(errors), client_ip)
+    return {"status": "queued", "accepted": accepted, "dropped": dropped}
 
 @router.get("/logs/stats")
 async def get_log_stats(
     hours: int = 24,
+    start_time: Optional[datetime] = None,
+    end_time: Optional[datetime] = None,
     db: Session = Depends(get_db)
 ):
     """
-    Get logging statistics for the specified time period
+    Get logging statistics for the last `hours` (rounded down to whole hours, served
+    from hourly rollups) or for an explicit `start_time`/`end_time` window
     """
     try:
         from datetime import timedelta
         
         # Calculate time range
-        end_time = datetime.now(timezone.utc)
-        start_time = end_time - timedelta(hours=hours)
-        
-        # Query logs
-        logs = db.query(models.FrontendLog).filter(
-            models.FrontendLog.timestamp >= start_time,
-            models.FrontendLog.timestamp <= end_time
-        ).all()
-        
-        # Calculate statistics
-        stats = {
-            "total_logs": len(logs),
-            "by_level": {},
-            "by_context": {},
-            "by_hour": {},
-            "error_rate": 0
-        }
-        
-        error_count = 0
-        
-        for log in logs:
-            # Count by level
-            level = log.level
-            stats["by_level"][level] = stats["by_level"].get(level, 0) + 1
-            
-            # Count by context
-            context = log.context
-            stats["by_context"][context] = stats["by_context"].get(context, 0) + 1
-            
-            # Count by hour
-            hour = log.timestamp.hour
-            stats["by_hour"][hour] = stats["by_hour"].get(hour, 0) + 1
-            
-            # Count errors
-            if level in ["ERROR", "WARN"]:
-                error_count += 1
-        
-        # Calculate error rate
-        if len(logs) > 0:
-            stats["error_rate"] = (error_count / len(logs)) * 100
+        now = datetime.now(timezone.utc)
+        if start_time is None and end_time is None:
+            end_time = now
+            start_time = (now - timedelta(hours=hours)).replace(minute=0, second=0, microsecond=0)
+        else:
+            end_time = end_time or now
+            start_time = start_time or end_time - timedelta(hours=hours)
         
+        stats = await run_in_threadpool(crud.get_frontend_log_stats, db, start_time, end_time)
+        stats["window_start"] = start_time.isoformat()
+        stats["window_end"] = end_time.isoformat()
         return stats
         
     except Exception as e:
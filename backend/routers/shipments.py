@@ -122,14 +122,19 @@ def list_shipments(
     ticket_id: str | None = None,
     search: str | None = None,
     include_archived: bool = False,
+    with_total: bool = False,
     db: Session = Depends(get_db), 
     current_user: models.User = Depends(get_current_user)
 ):
-    """List all shipments with pagination and optional filters"""
-    items = crud.get_shipments(db, skip=skip, limit=limit, site_id=site_id, ticket_id=ticket_id, search=search)
-    if not include_archived:
-        items = [s for s in items if not getattr(s, 'archived', False)]
-    return items
+    """List all shipments with pagination and optional filters; with_total=true returns {items, total} from one query"""
+    if with_total:
+        items, total, estimated = crud.get_shipments_with_total(
+            db, skip=skip, limit=limit, site_id=site_id, ticket_id=ticket_id, search=search,
+            include_archived=include_archived
+        )
+        return {"items": items, "total": total, "total_is_estimate": estimated}
+    return crud.get_shipments(db, skip=skip, limit=limit, site_id=site_id, ticket_id=ticket_id, search=search,
+                              include_archived=include_archived)
 
 @router.get("/{shipment_id}")
 def get_shipment(
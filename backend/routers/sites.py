@@ -1,13 +1,21 @@
-from fastapi import APIRouter, Depends, HTTPException, status, BackgroundTasks, Response
+from fastapi import APIRouter, Depends, HTTPException, status, BackgroundTasks, Response, Query
 from sqlalchemy.orm import Session
-from typing import List
+from typing import List, Optional, Union
 from datetime import datetime, timezone
 
+import logging
+
 import models, schemas, crud
-from database import get_db
+from database import get_db, SessionLocal
+from settings import settings
 from utils.main_utils import get_current_user, require_role, audit_log, _enqueue_broadcast
+from utils.metrics import record_cache_lookup
+from utils.site_index import site_index
+from utils.pagination import cursor_param
+from utils.etag import etag_guard
 
 router = APIRouter(prefix="/sites", tags=["sites"])
+logger = logging.getLogger("ticketing")
 
 @router.get("/lookup")
 def lookup_sites(
@@ -18,10 +26,14 @@ def lookup_sites(
     current_user: models.User = Depends(get_current_user)
 ):
     """Fast lookup for Autocomplete: prefix match on site_id only"""
-    q = db.query(models.Site).filter(models.Site.site_id.ilike(f"{prefix}%"))
-    items = q.order_by(models.Site.site_id.asc()).limit(limit).all()
     response.headers["Cache-Control"] = "public, max-age=30"
-    return items
+    items = site_index.lookup(prefix, limit)
+    record_cache_lookup("site_index", items is not None)
+    if items is not None:
+        return items
+    # Index still loading on this worker
+    q = db.query(models.Site).filter(models.Site.site_id.ilike(f"{prefix}%"))
+    return q.order_by(models.Site.site_id.asc()).limit(limit).all()
 
 @router.post("/", response_model=schemas.SiteOut)
 def create_site(
@@ -61,7 +73,8 @@ def sites_count(
 def get_site(
     site_id: str, 
     db: Session = Depends(get_db), 
-    current_user: models.User = Depends(get_current_user)
+    current_user: models.User = Depends(get_current_user),
+    _etag: None = Depends(etag_guard("sites"))
 ):
     """Get a specific site by ID"""
     db_site = crud.get_site(db, site_id=site_id)
@@ -69,16 +82,21 @@ def get_site(
         raise HTTPException(status_code=404, detail="Site not found")
     return db_site
 
-@router.get("/", response_model=List[schemas.SiteOut])
+@router.get("/", response_model=Union[List[schemas.SiteOut], schemas.ListWithTotal[schemas.SiteOut]])
 def list_sites(
     skip: int = 0, 
     limit: int = 50, 
     region: str | None = None,
     search: str | None = None,
+    with_total: bool = False,
     db: Session = Depends(get_db), 
-    current_user: models.User = Depends(get_current_user)
+    current_user: models.User = Depends(get_current_user),
+    _etag: None = Depends(etag_guard("sites"))
 ):
-    """List sites with pagination and filters"""
+    """List sites with pagination and filters; with_total=true returns {items, total} from one query"""
+    if with_total:
+        items, total, estimated = crud.get_sites_with_total(db, skip=skip, limit=limit, region=region, search=search)
+        return {"items": items, "total": total, "total_is_estimate": estimated}
     return crud.get_sites(db, skip=skip, limit=limit, region=region, search=search)
 
 
@@ -107,14 +125,42 @@ def update_site(
     
     return result
 
+def _require_site(db: Session, site_id: str):
+    if db.query(models.Site.site_id).filter(models.Site.site_id == site_id).first() is None:
+        raise HTTPException(status_code=404, detail="Site not found")
+
+# Sites being deleted in the background by this worker (repeat requests are no-ops)
+_background_site_deletes = set()
+
+def _delete_site_in_background(site_id: str, chunk_size: int):
+    db = SessionLocal()
+    try:
+        crud.delete_site(db, site_id=site_id, chunk_size=chunk_size)
+    except Exception as e:
+        logger.error("Background delete of site %s failed: %s", site_id, e)
+    finally:
+        db.close()
+        _background_site_deletes.discard(site_id)
+
 @router.delete("/{site_id}")
 def delete_site(
     site_id: str, 
+    response: Response,
     db: Session = Depends(get_db), 
     current_user: models.User = Depends(require_role([models.UserRole.admin.value, models.UserRole.dispatcher.value])),
     background_tasks: BackgroundTasks = None
 ):
-    """Delete a site"""
+    """Delete a site; sites with many tickets are deleted in chunks in the background (202)"""
+    _require_site(db, site_id)
+
+    if background_tasks and crud.count_site_tickets(db, site_id) > settings.SITE_DELETE_SYNC_MAX_TICKETS:
+        if site_id not in _background_site_deletes:
+            _background_site_deletes.add(site_id)
+            background_tasks.add_task(_delete_site_in_background, site_id, settings.SITE_DELETE_CHUNK_SIZE)
+            _enqueue_broadcast(background_tasks, '{"type":"site","action":"delete"}')
+        response.status_code = status.HTTP_202_ACCEPTED
+        return {"success": True, "message": "Site deletion started", "status": "deleting"}
+
     result = crud.delete_site(db, site_id=site_id)
     if not result:
         raise HTTPException(status_code=404, detail="Site not found")
@@ -124,18 +170,41 @@ def delete_site(
     
     return {"success": True, "message": "Site deleted successfully"}
 
-@router.get("/{site_id}/shipments")
+@router.get("/{site_id}/summary", response_model=schemas.SiteSummaryOut)
+def get_site_summary(
+    site_id: str,
+    db: Session = Depends(get_db),
+    current_user: models.User = Depends(get_current_user),
+    _etag: None = Depends(etag_guard("sites", "tickets", "shipments", "equipment", "site_equipment"))
+):
+    """Site row plus ticket/shipment/equipment counts and last visit, without loading collections"""
+    summary = crud.get_site_summary(db, site_id=site_id)
+    if summary is None:
+        raise HTTPException(status_code=404, detail="Site not found")
+    return summary
+
+@router.get("/{site_id}/tickets", response_model=schemas.CursorPage[schemas.TicketOut])
+def get_site_tickets(
+    site_id: str,
+    limit: int = Query(50, ge=1, le=200),
+    cursor: Optional[str] = None,
+    db: Session = Depends(get_db),
+    current_user: models.User = Depends(get_current_user)
+):
+    """Newest-first tickets for a site, keyset paged via `cursor`"""
+    _require_site(db, site_id)
+    items, next_cursor = crud.get_site_tickets_page(db, site_id, limit=limit, after=cursor_param(cursor, 2))
+    return {"items": items, "next_cursor": next_cursor}
+
+@router.get("/{site_id}/shipments", response_model=schemas.CursorPage[schemas.ShipmentOut])
 def get_site_shipments(
     site_id: str,
+    limit: int = Query(50, ge=1, le=200),
+    cursor: Optional[str] = None,
     db: Session = Depends(get_db),
     current_user: models.User = Depends(get_current_user)
 ):
-    """Get all shipments for a specific site"""
-    # Verify site exists
-    db_site = crud.get_site(db, site_id=site_id)
-    if not db_site:
-        raise HTTPException(status_code=404, detail="Site not found")
-    
-    # Get shipments for this site
-    shipments = crud.get_shipments_by_site(db, site_id=site_id)
-    return shipments
+    """Newest-first shipments for a site, keyset paged via `cursor`"""
+    _require_site(db, site_id)
+    items, next_cursor = crud.get_site_shipments_page(db, site_id, limit=limit, after=cursor_param(cursor, 1))
+    return {"items": items, "next_cursor": next_cursor}
@@ -1,4 +1,4 @@
-from fastapi import APIRouter, Depends, HTTPException, status, BackgroundTasks
+from fastapi import APIRouter, Depends, HTTPException, status, BackgroundTasks, Request, Response
 from sqlalchemy.orm import Session
 from typing import List
 from datetime import datetime, timezone
@@ -6,6 +6,8 @@ from datetime import datetime, timezone
 import models, schemas, crud
 from database import get_db
 from utils.main_utils import get_current_user, require_role, audit_log, _enqueue_broadcast
+from utils.etag import etag_guard
+from utils.response_cache import response_cache
 
 router = APIRouter(prefix="/sla", tags=["sla"])
 
@@ -35,7 +37,8 @@ def create_sla_rule(
 def get_sla_rule(
     rule_id: str, 
     db: Session = Depends(get_db), 
-    current_user: models.User = Depends(get_current_user)
+    current_user: models.User = Depends(get_current_user),
+    _etag: None = Depends(etag_guard("sla_rules"))
 ):
     """Get a specific SLA rule by ID"""
     db_item = crud.get_sla_rule(db, rule_id=rule_id)
@@ -45,13 +48,17 @@ def get_sla_rule(
 
 @router.get("/")
 def list_sla_rules(
+    request: Request,
+    response: Response,
     skip: int = 0, 
     limit: int = 100, 
     db: Session = Depends(get_db), 
-    current_user: models.User = Depends(get_current_user)
+    current_user: models.User = Depends(get_current_user),
+    _etag: None = Depends(etag_guard("sla_rules"))
 ):
     """List all SLA rules with pagination"""
-    return crud.get_sla_rules(db, skip=skip, limit=limit)
+    return response_cache.respond("sla_rules", request, response, current_user,
+                                  lambda session: crud.get_sla_rules(session, skip=skip, limit=limit), db)
 
 @router.put("/{rule_id}")
 def update_sla_rule(
@@ -1,12 +1,18 @@
-from fastapi import APIRouter, Depends, HTTPException, status, BackgroundTasks, Body, Response, Query
-from sqlalchemy.orm import Session
-from typing import List, Optional, Dict
+from fastapi import APIRouter, Depends, HTTPException, status, BackgroundTasks, Body, Request, Response, Query
+from sqlalchemy.orm import Session, joinedload
+from typing import List, Optional, Dict, Union
 from datetime import datetime, timezone, timedelta
 
 import models, schemas, crud
 from database import get_db
 from utils.main_utils import get_current_user, require_role, audit_log, _as_ticket_status, _as_role
 from utils.main_utils import _enqueue_broadcast
+from utils.etag import etag_guard
+from utils.response_cache import response_cache
+from utils.single_flight import single_flight
+
+# Tables a TicketOut is built from (ETag validators)
+TICKET_TABLES = ("tickets", "sites", "users", "field_techs")
 
 router = APIRouter(prefix="/tickets", tags=["tickets"])
 
@@ -106,6 +112,7 @@ def tickets_count(
     site_id: Optional[str] = None,
     ticket_type: Optional[str] = None,
     search: Optional[str] = None,
+    exclude_archived: bool = False,
     db: Session = Depends(get_db),
     current_user: models.User = Depends(get_current_user)
 ):
@@ -118,6 +125,7 @@ def tickets_count(
         site_id=site_id,
         ticket_type=ticket_type,
         search=search,
+        exclude_archived=exclude_archived,
     )
     response.headers["Cache-Control"] = "public, max-age=15"
     return {"count": count}
@@ -153,7 +161,7 @@ def create_ticket(
     out = crud.get_ticket_for_response(db, result.ticket_id)
     return _normalize_ticket_dt(out)
 
-@router.get("/", response_model=List[schemas.TicketOut])
+@router.get("/", response_model=Union[List[schemas.TicketOut], schemas.ListWithTotal[schemas.TicketOut]])
 def list_tickets(
     skip: int = 0,
     limit: int = 50,
@@ -165,16 +173,16 @@ def list_tickets(
     ticket_type: Optional[str] = None,
     search: Optional[str] = None,
     include_related: bool = True,
+    exclude_archived: bool = False,
+    with_total: bool = False,
     db: Session = Depends(get_db),
-    current_user: models.User = Depends(get_current_user)
+    current_user: models.User = Depends(get_current_user),
+    _etag: None = Depends(etag_guard(*TICKET_TABLES))
 ):
-    """List tickets with pagination and filters"""
+    """List tickets with pagination and filters; with_total=true returns {items, total} from one query"""
     safe_skip = max(0, skip)
     safe_limit = max(1, min(limit, 200))
-    tickets = crud.get_tickets(
-        db,
-        skip=safe_skip,
-        limit=safe_limit,
+    filters = dict(
         status=status,
         workflow_state=workflow_state,
         priority=priority,
@@ -183,7 +191,12 @@ def list_tickets(
         ticket_type=ticket_type,
         search=search,
         include_related=include_related,
+        exclude_archived=exclude_archived,
     )
+    if with_total:
+        tickets, total, estimated = crud.get_tickets_with_total(db, skip=safe_skip, limit=safe_limit, **filters)
+        return {"items": [_normalize_ticket_dt(t) for t in tickets], "total": total, "total_is_estimate": estimated}
+    tickets = crud.get_tickets(db, skip=safe_skip, limit=safe_limit, **filters)
     return [_normalize_ticket_dt(t) for t in tickets]
 
 @router.post(
@@ -346,6 +359,8 @@ def mark_return_received(
     },
 )
 def dispatcher_queue(
+    request: Request,
+    response: Response,
     queue: str = "all",
     skip: int = 0,
     limit: int = 200,
@@ -388,9 +403,13 @@ def dispatcher_queue(
     else:
         raise HTTPException(status_code=400, detail="Invalid queue value")
 
-    query = db.query(models.Ticket).filter(models.Ticket.workflow_state.in_(selected_states)).order_by(models.Ticket.date_scheduled.asc().nullsfirst(), models.Ticket.created_at.desc())
-    items = query.offset(safe_skip).limit(safe_limit).all()
-    return [_normalize_ticket_dt(t) for t in items]
+    def load(session: Session):
+        query = session.query(models.Ticket).filter(models.Ticket.workflow_state.in_(selected_states)).order_by(models.Ticket.date_scheduled.asc().nullsfirst(), models.Ticket.created_at.desc())
+        items = query.offset(safe_skip).limit(safe_limit).all()
+        return [_normalize_ticket_dt(t) for t in items]
+
+    return response_cache.respond("dispatch_queue", request, response, current_user, load, db,
+                                  model=List[schemas.TicketOut])
 
 
 @router.get("/{ticket_id}/audits", response_model=List[schemas.TicketAuditOut], tags=["ticket-workflow"])
@@ -416,12 +435,21 @@ def ticket_audits(
     responses={403: {"description": "Dispatcher/Admin role required"}},
 )
 def workflow_summary_report(
+    request: Request,
+    response: Response,
     lookback_days: int = Query(30, ge=1, le=3650),
     onsite_alert_minutes: int = Query(180, ge=1, le=1440),
     db: Session = Depends(get_db),
     current_user: models.User = Depends(require_role([models.UserRole.admin.value, models.UserRole.dispatcher.value])),
 ):
     """Operational workflow report for queue aging, NRO phases, and time tracking."""
+    return response_cache.respond(
+        "workflow_summary", request, response, current_user,
+        lambda session: _workflow_summary(session, lookback_days, onsite_alert_minutes), db,
+    )
+
+
+def _workflow_summary(db: Session, lookback_days: int, onsite_alert_minutes: int) -> schemas.WorkflowSummaryReport:
     now = datetime.now(timezone.utc)
     lookback_start = now - timedelta(days=lookback_days)
     tickets = db.query(models.Ticket).all()
@@ -510,7 +538,12 @@ def workflow_summary_report(
             )
         )
 
-    time_entries = db.query(models.TimeEntry).filter(models.TimeEntry.start_time >= lookback_start).all()
+    time_entries = (
+        db.query(models.TimeEntry)
+        .options(joinedload(models.TimeEntry.user))
+        .filter(models.TimeEntry.start_time >= lookback_start)
+        .all()
+    )
     user_minutes: Dict[str, int] = {}
     user_names: Dict[str, str] = {}
     for e in time_entries:
@@ -550,7 +583,8 @@ def workflow_summary_report(
 def get_ticket(
     ticket_id: str, 
     db: Session = Depends(get_db),
-    current_user: models.User = Depends(get_current_user)
+    current_user: models.User = Depends(get_current_user),
+    _etag: None = Depends(etag_guard(*TICKET_TABLES))
 ):
     """Get a specific ticket by ID"""
     db_ticket = crud.get_ticket(db, ticket_id=ticket_id)
@@ -921,6 +955,8 @@ def bulk_update_ticket_status(
 
 @router.get("/daily/{date_str}")
 def get_daily_tickets(
+    request: Request,
+    response: Response,
     date_str: str,
     ticket_type: Optional[str] = None,
     priority: Optional[str] = None,
@@ -935,15 +971,18 @@ def get_daily_tickets(
     except ValueError:
         raise HTTPException(status_code=400, detail="Invalid date format. Use YYYY-MM-DD")
     
-    tickets = crud.get_daily_tickets(
-        db, 
-        date=date_obj, 
-        ticket_type=ticket_type, 
-        priority=priority, 
-        status=status, 
-        assigned_user_id=assigned_user_id
-    )
-    return tickets
+    def load(session: Session):
+        return crud.get_daily_tickets(
+            session, 
+            date=date_obj, 
+            ticket_type=ticket_type, 
+            priority=priority, 
+            status=status, 
+            assigned_user_id=assigned_user_id
+        )
+
+    # Dispatchers open the daily board together at shift start; overlapping loads share one query
+    return single_flight.respond(request, response, current_user, load, db)
 
 @router.put("/{ticket_id}/costs")
 def update_ticket_costs(
@@ -1,4 +1,4 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, status, Request, Response
 from sqlalchemy.orm import Session
 from typing import List
 from datetime import datetime, timezone
@@ -6,7 +6,10 @@ from datetime import datetime, timezone
 import models, schemas, crud
 from database import get_db
 from utils.auth import get_current_user, require_role
-from utils.main_utils import audit_log, generate_temp_password, get_password_hash
+from utils.main_utils import audit_log, generate_temp_password
+from utils.password_pool import password_pool
+from utils.etag import etag_guard
+from utils.response_cache import response_cache
 
 router = APIRouter(prefix="/users", tags=["users"])
 
@@ -24,11 +27,11 @@ def create_user(
     # Use provided password if present; otherwise generate a temporary one
     temp_password = None
     if user.password:
-        hashed_password = get_password_hash(user.password)
+        hashed_password = password_pool.hash(user.password)
         must_change_password = user.must_change_password if hasattr(user, 'must_change_password') and user.must_change_password is not None else False
     else:
         temp_password = generate_temp_password()
-        hashed_password = get_password_hash(temp_password)
+        hashed_password = password_pool.hash(temp_password)
         must_change_password = True
 
     # Create user data with proper password handling
@@ -50,6 +53,7 @@ def create_user(
         new_value=str(result.user_id)
     )
     crud.create_ticket_audit(db, audit)
+    response_cache.invalidate(["user"])
     
     # Return temp password in response only if generated
     out_dict = {
@@ -68,7 +72,8 @@ def create_user(
 def get_user(
     user_id: str, 
     db: Session = Depends(get_db), 
-    current_user: models.User = Depends(get_current_user)
+    current_user: models.User = Depends(get_current_user),
+    _etag: None = Depends(etag_guard("users"))
 ):
     """Get a specific user by ID"""
     db_user = crud.get_user(db, user_id=user_id)
@@ -78,19 +83,25 @@ def get_user(
 
 @router.get("/", response_model=List[schemas.UserOut])
 def list_users(
+    request: Request,
+    response: Response,
     skip: int = 0, 
     limit: int = 100,
     email: str = None,
     include_inactive: bool = True,
     db: Session = Depends(get_db), 
-    current_user: models.User = Depends(require_role([models.UserRole.admin.value]))
+    current_user: models.User = Depends(require_role([models.UserRole.admin.value])),
+    _etag: None = Depends(etag_guard("users"))
 ):
     """List all users with pagination and optional email filter (admin only); shows inactive by default"""
-    # If email filter is provided, return matching user
-    if email:
-        user = crud.get_user_by_email(db, email=email)
-        return [user] if user else []
-    return crud.get_users(db, skip=skip, limit=limit, include_inactive=include_inactive)
+    def load(session: Session):
+        # If email filter is provided, return matching user
+        if email:
+            user = crud.get_user_by_email(session, email=email)
+            return [user] if user else []
+        return crud.get_users(session, skip=skip, limit=limit, include_inactive=include_inactive)
+
+    return response_cache.respond("users", request, response, current_user, load, db, model=List[schemas.UserOut])
 
 @router.put("/{user_id}", response_model=schemas.UserOut)
 def update_user(
@@ -110,6 +121,7 @@ def update_user(
         new_value=str(result.user_id)
     )
     crud.create_ticket_audit(db, audit)
+    response_cache.invalidate(["user"])
     return result
 
 @router.delete("/{user_id}")
@@ -132,6 +144,7 @@ def delete_user(
         new_value=None
     )
     crud.create_ticket_audit(db, audit)
+    response_cache.invalidate(["user"])
     return {"success": True, "message": "User deleted successfully"}
 
 @router.post("/{user_id}/change_password")
@@ -148,10 +161,11 @@ def change_password(
     if not db_user:
         raise HTTPException(status_code=404, detail="User not found")
     
-    db_user.hashed_password = get_password_hash(password_data.new_password)
+    db_user.hashed_password = password_pool.hash(password_data.new_password)
     db_user.must_change_password = False
     db.commit()
     db.refresh(db_user)
+    response_cache.invalidate(["user"])
     return {"success": True}
 
 @router.post("/{user_id}/reset_password")
@@ -165,8 +179,9 @@ def reset_password(
     if not db_user:
         raise HTTPException(status_code=404, detail="User not found")
     temp_password = generate_temp_password()
-    db_user.hashed_password = get_password_hash(temp_password)
+    db_user.hashed_password = password_pool.hash(temp_password)
     db_user.must_change_password = True
     db.commit()
     db.refresh(db_user)
+    response_cache.invalidate(["user"])
     return {"success": True, "temp_password": temp_password}
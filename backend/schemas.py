@@ -1,7 +1,8 @@
 from pydantic import BaseModel, EmailStr, Field, ConfigDict, field_validator
 import re
-from typing import Optional, List, Dict
+from typing import Optional, List, Dict, Generic, TypeVar
 from datetime import date, datetime
+import datetime as dt
 import enum
 
 class UserRole(str, enum.Enum):
@@ -149,6 +150,31 @@ class SiteCreate(SiteBase):
 class SiteOut(SiteBase):
     model_config = ConfigDict(from_attributes=True)
 
+class SiteSummaryOut(SiteOut):
+    ticket_counts: Dict[str, int] = {}  # by ticket status
+    total_tickets: int = 0
+    open_tickets: int = 0
+    closed_tickets: int = 0  # completed, closed, approved or archived
+    shipment_counts: Dict[str, int] = {}  # by shipment status
+    total_shipments: int = 0
+    equipment_count: int = 0
+    site_equipment_count: int = 0
+    last_visit_at: Optional[datetime] = None  # latest ticket check-in
+    last_ticket_at: Optional[datetime] = None
+
+PageItem = TypeVar("PageItem")
+
+class CursorPage(BaseModel, Generic[PageItem]):
+    """One keyset page; pass next_cursor back as `cursor` for the next one (None = last page)"""
+    items: List[PageItem]
+    next_cursor: Optional[str] = None
+
+class ListWithTotal(BaseModel, Generic[PageItem]):
+    """One OFFSET page plus the total match count (list endpoints with `with_total=true`)"""
+    items: List[PageItem]
+    total: int
+    total_is_estimate: bool = False  # planner estimate for very large unfiltered lists
+
 class EquipmentBase(BaseModel):
     type: str
     make_model: Optional[str] = None
@@ -438,6 +464,7 @@ class TicketUpdate(BaseModel):
 class TicketOut(TicketBase):
     ticket_id: str
     created_at: Optional[datetime] = None  # Timestamp when ticket was created
+    sla_due_at: Optional[datetime] = None  # Next SLA threshold (UTC); None once closed or fully escalated
     site: Optional['SiteOut'] = None
     assigned_user: Optional['UserOut'] = None
     claimed_user: Optional['UserOut'] = None
@@ -565,6 +592,24 @@ class InventoryItemOut(InventoryItemBase):
 
     model_config = ConfigDict(from_attributes=True)
 
+class BarcodeScanEntry(BaseModel):
+    barcode: str = Field(..., min_length=1)
+    quantity_delta: Optional[int] = None  # signed stock adjustment; omit for a plain lookup
+
+class BarcodeBatchScanRequest(BaseModel):
+    scans: List[BarcodeScanEntry] = Field(..., min_length=1, max_length=500)
+    notes: Optional[str] = None
+
+class InventoryQuantityChange(BaseModel):
+    item_id: str
+    old_quantity: int
+    new_quantity: int
+
+class BarcodeBatchScanOut(BaseModel):
+    items: List[InventoryItemOut]  # one per distinct scanned barcode, in scan order
+    not_found: List[str] = []
+    changes: List[InventoryQuantityChange] = []
+
 class InventoryTransactionType(str, enum.Enum):
     in_ = 'in'
     out = 'out'
@@ -585,6 +630,25 @@ class InventoryTransactionCreate(InventoryTransactionBase):
 
 class InventoryTransactionOut(InventoryTransactionBase):
     transaction_id: str
+    user_id: Optional[str] = None
+    shipment_item_id: Optional[str] = None
+    # dt.date: inside the class body a bare `date` would resolve to this field's own default (None)
+    date: Optional[dt.date] = None
+
+    model_config = ConfigDict(from_attributes=True)
+
+class StockLevelPoint(BaseModel):
+    date: date
+    net_change: int
+    balance: int  # stock at the end of the day
+
+class StockHistoryOut(BaseModel):
+    item_id: str
+    start: date
+    end: date
+    opening_balance: int
+    closing_balance: int
+    points: List[StockLevelPoint] = []
 
 class TaskStatus(str, enum.Enum):
     open = 'open'
@@ -779,7 +843,7 @@ class TicketCheckOut(BaseModel):
     is_completed: Optional[bool] = True
 
 class DailyTicketFilter(BaseModel):
-    date: Optional[date] = None
+    date: Optional[dt.date] = None
     ticket_type: Optional[TicketType] = None
     priority: Optional[TicketPriority] = None
     status: Optional[TicketStatus] = None
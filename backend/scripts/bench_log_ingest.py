@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+"""Throughput benchmark for frontend log ingestion.
+
+Compares the old path (one INSERT + COMMIT per row) with the batched queue
+(bulk INSERT per batch). Uses DATABASE_URL from settings unless --sink null is
+given, in which case only the queue/flusher overhead is measured.
+
+    python scripts/bench_log_ingest.py --rows 20000 --producers 8
+    python scripts/bench_log_ingest.py --sink null
+"""
+
+from __future__ import annotations
+
+import argparse
+import sys
+import threading
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+
+BACKEND_DIR = Path(__file__).resolve().parents[1]
+if str(BACKEND_DIR) not in sys.path:
+    sys.path.insert(0, str(BACKEND_DIR))
+
+from utils.log_ingest import KIND_LOG, LogIngestQueue, write_rows_to_db  # noqa: E402
+
+
+def _row(i: int) -> dict:
+    return {
+        "timestamp": datetime.now(timezone.utc),
+        "level": "ERROR",
+        "context": "bench",
+        "message": f"benchmark row {i}",
+        "data": "{}",
+        "url": "http://localhost/bench",
+        "user_agent": "bench",
+        "client_ip": "127.0.0.1",
+        "error_id": None,
+    }
+
+
+def bench_per_row(rows: int) -> float:
+    from database import SessionLocal
+    import models
+
+    start = time.perf_counter()
+    db = SessionLocal()
+    try:
+        for i in range(rows):
+            db.add(models.FrontendLog(**_row(i)))
+            db.commit()
+    finally:
+        db.close()
+    return rows / (time.perf_counter() - start)
+
+
+def bench_queue(rows: int, producers: int, batch_size: int, sink) -> tuple[float, float, int]:
+    queue = LogIngestQueue(max_size=rows, batch_size=batch_size, flush_interval=0.05, sink=sink)
+    per_producer = rows // producers
+
+    def produce(offset: int):
+        for i in range(per_producer):
+            queue.offer(KIND_LOG, [_row(offset + i)])
+
+    start = time.perf_counter()
+    threads = [threading.Thread(target=produce, args=(p * per_producer,)) for p in range(producers)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    enqueue_rate = producers * per_producer / (time.perf_counter() - start)
+
+    flushed = 0
+    while len(queue):
+        flushed += queue.flush_once()
+    total_rate = flushed / (time.perf_counter() - start)
+    return enqueue_rate, total_rate, flushed
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=10000)
+    parser.add_argument("--producers", type=int, default=4)
+    parser.add_argument("--batch-size", type=int, default=500)
+    parser.add_argument("--sink", choices=("db", "null"), default="db")
+    parser.add_argument("--skip-per-row", action="store_true", help="skip the per-row commit baseline")
+    args = parser.parse_args()
+
+    sink = write_rows_to_db if args.sink == "db" else (lambda kind, rows: None)
+    if args.sink == "db" and not args.skip_per_row:
+        baseline_rows = min(args.rows, 2000)
+        print(f"per-row commit:  {bench_per_row(baseline_rows):10.0f} rows/s ({baseline_rows} rows)")
+    enqueue_rate, total_rate, flushed = bench_queue(args.rows, args.producers, args.batch_size, sink)
+    print(f"queue enqueue:   {enqueue_rate:10.0f} rows/s ({args.producers} producers)")
+    print(f"queue end-to-end:{total_rate:10.0f} rows/s ({flushed} rows, batch {args.batch_size}, sink {args.sink})")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
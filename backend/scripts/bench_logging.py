@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+"""Request overhead of logging: synchronous file handler vs the queued pipeline.
+
+Runs a minimal FastAPI app whose endpoint logs three INFO lines with extras (the
+shape of the old broadcast path) and measures mean request time plus the time
+spent inside the log calls on the request thread (what logging adds to latency):
+
+  sync    RotatingFileHandler + JSONFormatter on the request thread
+  queued  same handler behind install_queue_logging (listener thread)
+  sampled queued, with SamplingFilter keeping 10% of INFO records
+
+    python scripts/bench_logging.py --requests 3000
+"""
+
+from __future__ import annotations
+
+import argparse
+import logging
+import logging.handlers
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+BACKEND_DIR = Path(__file__).resolve().parents[1]
+if str(BACKEND_DIR) not in sys.path:
+    sys.path.insert(0, str(BACKEND_DIR))
+
+from fastapi import FastAPI  # noqa: E402
+from starlette.testclient import TestClient  # noqa: E402
+
+from utils.logging_config import (  # noqa: E402
+    JSONFormatter,
+    install_log_sampling,
+    install_queue_logging,
+    stop_queue_logging,
+)
+
+LOGGER_NAME = "bench.hot"
+_spent = [0.0]
+
+
+def _build_app() -> FastAPI:
+    app = FastAPI()
+    log = logging.getLogger(LOGGER_NAME)
+
+    @app.get("/work")
+    def work():
+        start = time.perf_counter()
+        for step in ("received", "published", "delivered"):
+            log.info("broadcast %s", step, extra={"ticket_id": "T-1", "action": "update"})
+        _spent[0] += time.perf_counter() - start
+        return {"ok": True}
+
+    return app
+
+
+def _configure(mode: str, directory: str):
+    log = logging.getLogger(LOGGER_NAME)
+    log.handlers.clear()
+    log.filters.clear()
+    log.propagate = False
+    log.setLevel(logging.INFO)
+    handler = logging.handlers.RotatingFileHandler(
+        f"{directory}/{mode}.log", maxBytes=50 * 1024 * 1024, backupCount=1
+    )
+    handler.setFormatter(JSONFormatter())
+    log.addHandler(handler)
+    if mode in ("queued", "sampled"):
+        install_queue_logging([LOGGER_NAME])
+    if mode == "sampled":
+        install_log_sampling({LOGGER_NAME: 0.1})
+
+
+def _run(client: TestClient, requests: int) -> tuple[float, float]:
+    """Mean request time and mean time spent inside the log calls, in microseconds."""
+    for _ in range(min(200, requests)):
+        client.get("/work")
+    _spent[0] = 0.0
+    start = time.perf_counter()
+    for _ in range(requests):
+        client.get("/work")
+    return (time.perf_counter() - start) / requests * 1e6, _spent[0] / requests * 1e6
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=2000)
+    args = parser.parse_args()
+
+    client = TestClient(_build_app())
+    with tempfile.TemporaryDirectory() as directory:
+        _configure("none", directory)
+        logging.getLogger(LOGGER_NAME).setLevel(logging.WARNING)
+        mean, in_log = _run(client, args.requests)
+        print(f"{'disabled':>10}: {mean:8.1f} us/request, {in_log:6.1f} us in log calls")
+        for mode in ("sync", "queued", "sampled"):
+            _configure(mode, directory)
+            mean, in_log = _run(client, args.requests)
+            stop_queue_logging()
+            print(f"{mode:>10}: {mean:8.1f} us/request, {in_log:6.1f} us in log calls")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
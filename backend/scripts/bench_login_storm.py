@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+"""Login storm benchmark: login throughput and the latency of other endpoints.
+
+Fires `--logins` concurrent bcrypt logins at an in-process ASGI app while a
+probe keeps calling a cheap sync endpoint, once with the previous inline
+`verify_password` (sync endpoint, bcrypt on the shared threadpool) and once with
+the password process pool (async endpoint awaiting the pool). The probe's
+latency shows whether other endpoints keep their latency during the storm.
+
+    python scripts/bench_login_storm.py --logins 200 --concurrency 60 --workers 4
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import time
+from pathlib import Path
+
+BACKEND_DIR = Path(__file__).resolve().parents[1]
+if str(BACKEND_DIR) not in sys.path:
+    sys.path.insert(0, str(BACKEND_DIR))
+os.environ.setdefault("SECRET_KEY", "bench_only_secret_key_with_at_least_32_chars")
+
+import httpx  # noqa: E402
+from fastapi import FastAPI, HTTPException  # noqa: E402
+
+from utils.password_pool import PasswordPool, get_password_hash, verify_password  # noqa: E402
+
+PASSWORD = "shift-start-password"
+
+
+def _app(mode: str, hashed: str, pool: PasswordPool) -> FastAPI:
+    app = FastAPI()
+
+    if mode == "inline":
+        @app.post("/login")
+        def login():
+            if not verify_password(PASSWORD, hashed):
+                raise HTTPException(status_code=401)
+            return {"ok": True}
+    else:
+        @app.post("/login")
+        async def login():
+            if not await pool.verify_async(PASSWORD, hashed):
+                raise HTTPException(status_code=401)
+            return {"ok": True}
+
+    @app.get("/ping")
+    def ping():
+        return {"ok": True}
+
+    return app
+
+
+async def _storm(app: FastAPI, logins: int, concurrency: int):
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        await client.get("/ping")
+        semaphore = asyncio.Semaphore(concurrency)
+        statuses = []
+        done = asyncio.Event()
+        probe_ms = []
+
+        async def login():
+            async with semaphore:
+                statuses.append((await client.post("/login")).status_code)
+
+        async def probe():
+            while not done.is_set():
+                start = time.perf_counter()
+                await client.get("/ping")
+                probe_ms.append((time.perf_counter() - start) * 1000)
+                await asyncio.sleep(0.01)
+
+        probe_task = asyncio.create_task(probe())
+        start = time.perf_counter()
+        await asyncio.gather(*(login() for _ in range(logins)))
+        elapsed = time.perf_counter() - start
+        done.set()
+        await probe_task
+    return elapsed, statuses, probe_ms
+
+
+def _report(mode: str, elapsed: float, statuses, probe_ms):
+    ok = statuses.count(200)
+    rejected = statuses.count(429)
+    probe_ms = sorted(probe_ms) or [0.0]
+    p99 = probe_ms[min(len(probe_ms) - 1, int(len(probe_ms) * 0.99))]
+    print(f"{mode:7s} logins {ok / elapsed:7.1f}/s ok={ok} 429={rejected}  "
+          f"/ping p50 {statistics.median(probe_ms):7.1f} ms  p99 {p99:7.1f} ms  max {probe_ms[-1]:7.1f} ms")
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--logins", type=int, default=120)
+    parser.add_argument("--concurrency", type=int, default=60)
+    parser.add_argument("--workers", type=int, default=max(1, (os.cpu_count() or 2) // 2))
+    parser.add_argument("--max-pending", type=int, default=1000)
+    args = parser.parse_args()
+
+    hashed = get_password_hash(PASSWORD)
+    pool = PasswordPool(workers=args.workers, max_pending=args.max_pending)
+    pool.verify(PASSWORD, hashed)  # start the worker processes outside the measurement
+    try:
+        for mode in ("inline", "pool"):
+            _report(mode, *asyncio.run(_storm(_app(mode, hashed, pool), args.logins, args.concurrency)))
+    finally:
+        pool.shutdown()
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
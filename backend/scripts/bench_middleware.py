@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+"""Per-request overhead of the HTTP middleware stack.
+
+Drives a trivial JSON endpoint directly through ASGI (no sockets) and compares
+the previous stack (`@app.middleware("http")` latency middleware, i.e.
+BaseHTTPMiddleware, plus Starlette GZipMiddleware at level 9) with the pure
+ASGI `LatencyMiddleware` + `CompressionMiddleware`. A bare app gives the
+baseline; the difference is the per-request overhead of each stack.
+
+    python scripts/bench_middleware.py --requests 5000 --body-bytes 20000
+    python scripts/bench_middleware.py --accept-encoding identity
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import os
+import sys
+import time
+from pathlib import Path
+
+BACKEND_DIR = Path(__file__).resolve().parents[1]
+if str(BACKEND_DIR) not in sys.path:
+    sys.path.insert(0, str(BACKEND_DIR))
+os.environ.setdefault("SECRET_KEY", "bench_only_secret_key_with_at_least_32_chars")
+
+from starlette.applications import Starlette  # noqa: E402
+from starlette.middleware.base import BaseHTTPMiddleware  # noqa: E402
+from starlette.middleware.gzip import GZipMiddleware  # noqa: E402
+from starlette.responses import Response  # noqa: E402
+from starlette.routing import Route  # noqa: E402
+
+from main import LatencyMiddleware  # noqa: E402
+from utils import query_stats  # noqa: E402
+from utils.compression import CompressionMiddleware  # noqa: E402
+from utils.main_utils import timer_ms  # noqa: E402
+
+
+async def _legacy_latency(request, call_next):
+    """What the per-request work looked like as an @app.middleware("http") function."""
+    start = timer_ms()
+    db_stats, db_token = query_stats.start_request()
+    try:
+        response = await call_next(request)
+    finally:
+        query_stats.end_request(db_token)
+    response.headers["X-DB-Queries"] = str(db_stats.count)
+    response.headers["X-DB-Time-Ms"] = f"{db_stats.total_ms:.2f}"
+    response.headers["X-Response-Time-Ms"] = f"{timer_ms() - start:.2f}"
+    return response
+
+
+def _app(stack: str, body: bytes) -> Starlette:
+    async def endpoint(request):
+        return Response(body, media_type="application/json")
+
+    app = Starlette(routes=[Route("/bench", endpoint)])
+    if stack == "legacy":
+        app.add_middleware(GZipMiddleware, minimum_size=500)
+        app.add_middleware(BaseHTTPMiddleware, dispatch=_legacy_latency)
+    elif stack == "asgi":
+        app.add_middleware(CompressionMiddleware)
+        app.add_middleware(LatencyMiddleware)
+    return app
+
+
+async def _run(app, requests: int, accept_encoding: str) -> float:
+    scope = {
+        "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1", "method": "GET",
+        "scheme": "http", "path": "/bench", "raw_path": b"/bench", "query_string": b"",
+        "root_path": "", "headers": [(b"accept-encoding", accept_encoding.encode())],
+        "client": ("127.0.0.1", 1), "server": ("testserver", 80),
+    }
+
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        pass
+
+    for _ in range(min(200, requests)):  # warm up
+        await app(dict(scope), receive, send)
+    start = time.perf_counter()
+    for _ in range(requests):
+        await app(dict(scope), receive, send)
+    return (time.perf_counter() - start) / requests * 1e6
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=3000)
+    parser.add_argument("--body-bytes", type=int, default=20000)
+    parser.add_argument("--accept-encoding", default="gzip, deflate, br, zstd")
+    args = parser.parse_args()
+
+    row = b'{"ticket_id":"T-000000","status":"open","site_id":"S-1","notes":"routine visit"},'
+    body = b"[" + (row * (args.body_bytes // len(row) + 1))[: args.body_bytes].rstrip(b",") + b"]"
+    results = {}
+    for stack in ("bare", "legacy", "asgi"):
+        results[stack] = asyncio.run(_run(_app(stack, body), args.requests, args.accept_encoding))
+    for stack in ("bare", "legacy", "asgi"):
+        overhead = results[stack] - results["bare"]
+        print(f"{stack:7s} {results[stack]:9.1f} us/request  (+{overhead:8.1f} us middleware)")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
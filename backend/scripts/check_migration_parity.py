@@ -22,10 +22,12 @@ REQUIRED_TICKET_COLUMNS = {
     "nro_phase2_scheduled_date",
     "nro_phase2_completed_at",
     "nro_phase2_state",
+    "sla_due_at",
 }
 REQUIRED_MIGRATION_FILE_SNIPPETS = (
     "ticket_workflow_state_and_version",
     "nro_phase_fields",
+    "ticket_sla_due_at",
 )
 
 
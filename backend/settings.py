@@ -1,6 +1,6 @@
 from pathlib import Path
 from pydantic_settings import BaseSettings, SettingsConfigDict
-from typing import List
+from typing import Dict, List
 
 _project_root = Path(__file__).resolve().parent.parent
 _env_file = _project_root / ".env"
@@ -26,6 +26,97 @@ class Settings(BaseSettings):
 
     # Redis
     REDIS_URL: str = "redis://localhost:6379/0"
+    REDIS_CONNECT_TIMEOUT_SECONDS: float = 0.5
+    REDIS_SOCKET_TIMEOUT_SECONDS: float = 1.0
+    # Circuit breaker: open after N failures each within WINDOW seconds of the last, retry with exponential backoff
+    REDIS_CIRCUIT_FAILURE_THRESHOLD: int = 3
+    REDIS_CIRCUIT_FAILURE_WINDOW_SECONDS: float = 30.0
+    REDIS_BACKOFF_BASE_SECONDS: float = 1.0
+    REDIS_BACKOFF_MAX_SECONDS: float = 60.0
+
+    # WebSocket broadcast transports, tried in order (redis, postgres); with none available
+    # a worker only reaches its own sockets. postgres uses LISTEN/NOTIFY on BROADCAST_PG_CHANNEL
+    BROADCAST_BACKENDS: str = "redis,postgres"
+    BROADCAST_PG_CHANNEL: str = "websocket_updates"
+    # Broadcasts are coalesced per topic for WINDOW_MS (0 = off) into batches of at most
+    # MAX_EVENTS entity events; each worker sends at most MAX_PER_SECOND messages (0 = unlimited)
+    BROADCAST_BATCH_WINDOW_MS: float = 100.0
+    BROADCAST_BATCH_MAX_EVENTS: int = 50
+    BROADCAST_MAX_PER_SECOND: float = 20.0
+
+    # Latency histograms (/ops/latency): max route keys per worker, Redis publish interval
+    LATENCY_MAX_ROUTE_KEYS: int = 512
+    LATENCY_PUBLISH_INTERVAL_SECONDS: float = 15.0
+    LATENCY_WINDOW_SECONDS: float = 300.0
+
+    # /metrics: max label series per metric; optional bearer token required to scrape
+    METRICS_MAX_SERIES_PER_METRIC: int = 500
+    METRICS_TOKEN: str = ""
+
+    # Per-request SQL stats: warn when one statement fingerprint runs more than N times
+    DB_REPEATED_QUERY_WARN_THRESHOLD: int = 10
+
+    # Request profiler: admins send "X-Profile: 1"; PROFILE_SAMPLE_RATE (0-1) of other
+    # requests are sampled and kept only when slower than PROFILE_SLOW_THRESHOLD_MS
+    PROFILE_DIR: str = "./logs/profiles"
+    PROFILE_MAX_FILES: int = 50
+    PROFILE_SAMPLE_RATE: float = 0.0
+    PROFILE_SLOW_THRESHOLD_MS: float = 1200.0
+    PROFILE_INTERVAL_MS: float = 5.0
+    PROFILE_MAX_CONCURRENT: int = 2
+
+    # Frontend log/error ingestion: bounded queue, bulk insert on size or interval
+    LOG_INGEST_QUEUE_MAX: int = 10000
+    LOG_INGEST_BATCH_SIZE: int = 500
+    LOG_INGEST_FLUSH_INTERVAL_SECONDS: float = 1.0
+    # Raw frontend log retention (0 disables); hourly rollups are kept longer
+    LOG_RETENTION_DAYS: int = 30
+    LOG_ROLLUP_RETENTION_DAYS: int = 400
+    LOG_PRUNE_BATCH_SIZE: int = 5000
+    LOG_PRUNE_INTERVAL_SECONDS: float = 3600.0
+
+    # Fraction of INFO records kept per hot logger (JSON object in env); WARNING+ always kept
+    LOG_SAMPLE_RATES: Dict[str, float] = {"ticketing.broadcast": 0.1}
+
+    # Compiled SLA rules are rebuilt at least this often even without a change message
+    SLA_RULES_MAX_AGE_SECONDS: float = 300.0
+    # Background SLA breach/escalation scanner
+    SLA_SCAN_INTERVAL_SECONDS: float = 60.0
+    SLA_SCAN_BATCH_SIZE: int = 5000
+
+    # Sites with more tickets than this are deleted in the background, in chunks
+    SITE_DELETE_SYNC_MAX_TICKETS: int = 2000
+    SITE_DELETE_CHUNK_SIZE: int = 500
+    # Full reload period of the in-memory /sites/lookup prefix index
+    SITE_INDEX_REFRESH_SECONDS: float = 600.0
+    # Per-worker barcode -> inventory item cache used by the scan endpoints
+    BARCODE_CACHE_TTL_SECONDS: float = 60.0
+    BARCODE_CACHE_MAX_ENTRIES: int = 20000
+    # Unfiltered `with_total` lists report the planner's row estimate above this size
+    LIST_TOTAL_ESTIMATE_MIN_ROWS: int = 1000000
+    # Shared response cache (Redis, plus a short per-worker copy) for read-heavy lists and reports
+    RESPONSE_CACHE_ENABLED: bool = True
+    RESPONSE_CACHE_L1_MAX_SECONDS: float = 5.0
+    RESPONSE_CACHE_L1_MAX_ENTRIES: int = 500
+    # Longest a coalesced GET waits on an identical in-flight request before querying itself
+    SINGLE_FLIGHT_WAIT_SECONDS: float = 30.0
+    # Response compression (zstd/br need the optional zstandard/brotli packages; gzip always works)
+    COMPRESSION_MINIMUM_SIZE: int = 500
+    COMPRESSION_CONTENT_TYPES: List[str] = [
+        "application/json", "text/*", "application/javascript", "application/xml", "image/svg+xml",
+    ]
+    COMPRESSION_GZIP_LEVEL: int = 6
+    COMPRESSION_BROTLI_QUALITY: int = 4
+    COMPRESSION_ZSTD_LEVEL: int = 3
+    # bcrypt runs on this many worker processes per app worker (0 = inline);
+    # calls beyond MAX_PENDING queued/running are rejected with 429
+    PASSWORD_POOL_WORKERS: int = 2
+    PASSWORD_POOL_MAX_PENDING: int = 64
+    # Revoked JWT IDs: per-worker Bloom filter sizing, exact LRU size, purge/rebuild period
+    TOKEN_REVOCATION_BLOOM_CAPACITY: int = 100000
+    TOKEN_REVOCATION_BLOOM_ERROR_RATE: float = 0.001
+    TOKEN_REVOCATION_LRU_SIZE: int = 10000
+    TOKEN_REVOCATION_PURGE_SECONDS: float = 3600.0
 
     # Rate limiting (login attempts per minute per IP)
     RATE_LIMIT_LOGIN_PER_MINUTE: int = 10
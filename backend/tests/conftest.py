@@ -2,6 +2,7 @@ from starlette.testclient import TestClient
 import os
 import sys
 import pytest
+from contextlib import contextmanager
 
 # Ensure backend package root is on sys.path
 CURRENT_DIR = os.path.dirname(__file__)
@@ -12,6 +13,7 @@ if BACKEND_ROOT not in sys.path:
 from main import app  # type: ignore
 from database import SessionLocal
 from utils.main_utils import get_password_hash
+from utils.query_stats import capture_queries
 import crud
 import schemas
 import models
@@ -63,6 +65,23 @@ def auth_headers(ensure_test_user):
     token = data.get("access_token")
     assert token
     return {"Authorization": f"Bearer {token}"}
+
+
+@pytest.fixture
+def query_budget():
+    """Assert an upper bound on SQL statements executed inside the block.
+
+    Usage: `with query_budget(5): client.get(...)`. On failure the message lists
+    the most repeated statement fingerprints, which is where N+1s show up.
+    """
+    @contextmanager
+    def _budget(max_queries: int):
+        with capture_queries() as stats:
+            yield stats
+        assert stats.count <= max_queries, f"query budget {max_queries} exceeded: {stats.describe()}"
+    return _budget
+
+
 @pytest.fixture(scope="session")
 def ensure_test_site():
     """Ensure at least one site exists for ticket/shipment tests."""
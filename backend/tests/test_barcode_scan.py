@@ -0,0 +1,108 @@
+"""Tests for the barcode cache and the batch scan path."""
+import os
+import sys
+
+CURRENT_DIR = os.path.dirname(__file__)
+BACKEND_ROOT = os.path.abspath(os.path.join(CURRENT_DIR, ".."))
+if BACKEND_ROOT not in sys.path:
+    sys.path.insert(0, BACKEND_ROOT)
+
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+
+import crud
+import models
+import schemas
+from utils import barcode_cache as barcode_cache_module
+from utils.barcode_cache import BarcodeCache
+
+
+class _Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def _session():
+    engine = create_engine("sqlite://")
+    models.Base.metadata.create_all(engine)
+    return sessionmaker(bind=engine)()
+
+
+def _count_selects(db):
+    statements = []
+    event.listen(db.get_bind(), "before_cursor_execute",
+                 lambda conn, cursor, statement, *args: statements.append(statement)
+                 if statement.lstrip().upper().startswith("SELECT") else None)
+    return statements
+
+
+def test_cache_expiry_lru_and_invalidation():
+    clock = _Clock()
+    cache = BarcodeCache(ttl_seconds=10, max_entries=2, clock=clock)
+    cache.put("b1", {"item_id": "I1"})
+    cache.put("b2", {"item_id": "I2"})
+    assert cache.get_many(["b1"])[0] == {"b1": {"item_id": "I1"}}
+    cache.put("b3", {"item_id": "I3"})  # evicts b2, the least recently used
+    assert cache.get_many(["b1", "b2", "b3"])[1] == ["b2"]
+
+    cache.invalidate(item_ids=["I1"])
+    assert cache.get_many(["b1", "b3"]) == ({"b3": {"item_id": "I3"}}, ["b1"])
+    clock.now = 11
+    assert cache.get_many(["b3"]) == ({}, ["b3"])
+
+
+def test_put_after_invalidation_is_skipped():
+    cache = BarcodeCache(ttl_seconds=10, max_entries=10)
+    generation = cache.generation
+    cache.invalidate(item_ids=["I1"])  # a write committed while the lookup was in flight
+    cache.put("b1", {"item_id": "I1"}, generation)
+    assert cache.get_many(["b1"]) == ({}, ["b1"])
+
+
+def test_batch_scan_uses_one_query_then_the_cache(monkeypatch):
+    monkeypatch.setattr(barcode_cache_module, "barcode_cache", BarcodeCache(ttl_seconds=60, max_entries=100))
+    monkeypatch.setattr(crud, "barcode_cache", barcode_cache_module.barcode_cache)
+    db = _session()
+    db.add_all([models.InventoryItem(item_id=f"INV{i}", name=f"part {i}", barcode=f"BC{i}", quantity_on_hand=5)
+                for i in range(5)])
+    db.commit()
+    selects = _count_selects(db)
+
+    scans = [schemas.BarcodeScanEntry(barcode=b) for b in ("BC3", "BC1", "NOPE", "BC3")]
+    result = crud.scan_inventory_batch(db, scans)
+    assert [i["item_id"] for i in result["items"]] == ["INV3", "INV1"]
+    assert result["not_found"] == ["NOPE"] and result["changes"] == []
+    assert len(selects) == 1
+
+    crud.scan_inventory_batch(db, scans[:2])
+    assert len(selects) == 1  # served from the cache
+
+
+def test_batch_scan_adjustments_apply_together_and_evict(monkeypatch):
+    monkeypatch.setattr(barcode_cache_module, "barcode_cache", BarcodeCache(ttl_seconds=60, max_entries=100))
+    monkeypatch.setattr(crud, "barcode_cache", barcode_cache_module.barcode_cache)
+    db = _session()
+    db.add_all([models.InventoryItem(item_id="INV1", name="a", barcode="BC1", quantity_on_hand=5),
+                models.InventoryItem(item_id="INV2", name="b", barcode="BC2", quantity_on_hand=1)])
+    db.commit()
+    crud.scan_inventory_batch(db, [schemas.BarcodeScanEntry(barcode="BC1")])
+
+    result = crud.scan_inventory_batch(db, [
+        schemas.BarcodeScanEntry(barcode="BC1", quantity_delta=3),
+        schemas.BarcodeScanEntry(barcode="BC2", quantity_delta=-4),
+        schemas.BarcodeScanEntry(barcode="BC1", quantity_delta=-1),
+    ], notes="cycle count")
+    assert result["changes"] == [
+        {"item_id": "INV1", "old_quantity": 5, "new_quantity": 7},
+        {"item_id": "INV2", "old_quantity": 1, "new_quantity": 0},
+    ]
+    assert [(i["item_id"], i["quantity_on_hand"]) for i in result["items"]] == [("INV1", 7), ("INV2", 0)]
+    txs = db.query(models.InventoryTransaction).all()
+    assert sorted(t.quantity for t in txs) == [-4, -1, 3]
+    assert all(t.type == models.InventoryTransactionType.adjust and t.notes == "cycle count" for t in txs)
+    # The adjusted items were evicted, so the next scan reads the new quantity
+    assert barcode_cache_module.barcode_cache.get_many(["BC1"]) == ({}, ["BC1"])
+    assert crud.scan_inventory_batch(db, [schemas.BarcodeScanEntry(barcode="BC1")])["items"][0]["quantity_on_hand"] == 7
@@ -0,0 +1,143 @@
+"""Tests for the pluggable cross-worker broadcast backends."""
+import asyncio
+import logging
+import os
+import sys
+
+CURRENT_DIR = os.path.dirname(__file__)
+BACKEND_ROOT = os.path.abspath(os.path.join(CURRENT_DIR, ".."))
+if BACKEND_ROOT not in sys.path:
+    sys.path.insert(0, BACKEND_ROOT)
+
+import pytest
+from sqlalchemy import create_engine
+
+from utils.broadcast import (
+    BroadcastBackend,
+    Broadcaster,
+    PostgresBroadcastBackend,
+    RedisBroadcastBackend,
+    build_backends,
+)
+
+
+class _Bus:
+    """Stands in for Redis or Postgres: every listener sees every published message."""
+
+    def __init__(self):
+        self.listeners = []
+
+
+class _FakeBackend(BroadcastBackend):
+    def __init__(self, name, bus, up=True):
+        self.name, self.bus, self.up = name, bus, up
+
+    async def publish(self, message):
+        if not self.up:
+            return False
+        for on_message in self.bus.listeners:
+            on_message(message)
+        return True
+
+    async def listen(self, on_message):
+        self.bus.listeners.append(on_message)
+        await asyncio.Event().wait()
+
+
+def test_publish_uses_first_backend_that_accepts():
+    redis_bus, pg_bus = _Bus(), _Bus()
+    redis = _FakeBackend("redis", redis_bus)
+    pg = _FakeBackend("postgres", pg_bus)
+    broadcaster = Broadcaster([redis, pg])
+
+    async def scenario():
+        assert await broadcaster.publish("a") == "redis"
+        redis.up = False
+        assert await broadcaster.publish("b") == "postgres"
+        pg.up = False
+        assert await broadcaster.publish("c") == "local"
+
+    asyncio.run(scenario())
+
+
+def test_every_worker_receives_messages_from_either_backend_in_order():
+    redis_bus, pg_bus = _Bus(), _Bus()
+
+    async def scenario():
+        workers = [Broadcaster([_FakeBackend("redis", redis_bus), _FakeBackend("postgres", pg_bus)])
+                   for _ in range(3)]
+        received = [[] for _ in workers]
+        tasks = []
+        for worker, inbox in zip(workers, received):
+            async def deliver(message, inbox=inbox):
+                inbox.append(message)
+            tasks.append(asyncio.create_task(worker.run(deliver)))
+        await asyncio.sleep(0)
+        await asyncio.sleep(0)
+
+        await workers[0].publish("one")
+        workers[1].backends[0].up = False  # worker 1 lost Redis: it publishes via Postgres
+        await workers[1].publish("two")
+        await asyncio.sleep(0.01)
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        return received
+
+    assert asyncio.run(scenario()) == [["one", "two"]] * 3
+
+
+def test_postgres_backend_is_idle_without_postgres():
+    backend = PostgresBroadcastBackend(create_engine("sqlite://"), "updates")
+    assert not backend.available
+
+    async def scenario():
+        assert await backend.publish("x") is False
+        await asyncio.wait_for(backend.listen(lambda m: None), timeout=1)
+
+    asyncio.run(scenario())
+
+
+def test_backend_missing_a_method_fails_at_construction():
+    class _PublishOnly(BroadcastBackend):
+        async def publish(self, message):
+            return True
+
+    with pytest.raises(TypeError):
+        _PublishOnly()
+
+
+def test_postgres_backend_without_psycopg2_is_disabled_once(monkeypatch, caplog):
+    engine = create_engine("postgresql://u:p@localhost:1/db")  # imports psycopg2 itself
+    monkeypatch.setitem(sys.modules, "psycopg2.extensions", None)
+    backend = PostgresBroadcastBackend(engine, "updates")
+
+    async def scenario():
+        assert await backend.publish("x") is False
+        await asyncio.wait_for(backend.listen(lambda m: None), timeout=1)
+        await asyncio.wait_for(backend.listen(lambda m: None), timeout=1)
+
+    with caplog.at_level(logging.WARNING, logger="ticketing"):
+        asyncio.run(scenario())
+    assert not backend.available
+    assert len([r for r in caplog.records if "broadcast backend disabled" in r.getMessage()]) == 1
+
+
+def test_postgres_backend_needs_the_psycopg2_driver(monkeypatch):
+    engine = create_engine("postgresql://u:p@localhost:1/db")
+    monkeypatch.setattr(engine.dialect, "driver", "psycopg")
+    assert not PostgresBroadcastBackend(engine, "updates").available
+
+
+def test_postgres_backend_refuses_payloads_over_the_notify_limit():
+    backend = PostgresBroadcastBackend(create_engine("postgresql://u:p@localhost:1/db"), "updates")
+    assert backend.available
+    assert asyncio.run(backend.publish("x" * 8000)) is False
+
+
+def test_build_backends():
+    backends = build_backends("redis, postgres")
+    assert [type(b) for b in backends] == [RedisBroadcastBackend, PostgresBroadcastBackend]
+    assert build_backends("") == []
+    with pytest.raises(ValueError):
+        build_backends("kafka")
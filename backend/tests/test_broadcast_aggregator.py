@@ -0,0 +1,109 @@
+"""Tests for per-topic broadcast coalescing and the outbound rate bound."""
+import asyncio
+import json
+import os
+import sys
+import time
+
+CURRENT_DIR = os.path.dirname(__file__)
+BACKEND_ROOT = os.path.abspath(os.path.join(CURRENT_DIR, ".."))
+if BACKEND_ROOT not in sys.path:
+    sys.path.insert(0, BACKEND_ROOT)
+
+from utils.broadcast_aggregator import BroadcastAggregator
+
+
+async def _collect(aggregator, submit, settle=0.1):
+    """Run the aggregator, call `submit()`, and return what it published (with timestamps)."""
+    published = []
+
+    async def publish(message):
+        published.append((time.monotonic(), json.loads(message)))
+
+    task = asyncio.create_task(aggregator.run(publish))
+    await asyncio.sleep(0)
+    await submit()
+    await asyncio.sleep(settle)
+    task.cancel()
+    await asyncio.gather(task, return_exceptions=True)
+    return published
+
+
+def test_identical_burst_becomes_one_plain_message():
+    aggregator = BroadcastAggregator(window_seconds=0.02, max_events=50, max_per_second=0)
+
+    async def submit():
+        for _ in range(500):
+            assert aggregator.submit('{"type":"ticket","action":"bulk_status"}')
+
+    published = asyncio.run(_collect(aggregator, submit))
+    assert [m for _, m in published] == [{"type": "ticket", "action": "bulk_status"}]
+
+
+def test_distinct_events_are_batched_per_topic_and_deduped_by_entity():
+    aggregator = BroadcastAggregator(window_seconds=0.02, max_events=50, max_per_second=0)
+
+    async def submit():
+        for shipment_id in ("S1", "S2", "S1"):
+            aggregator.submit(json.dumps({"type": "shipment", "action": "update", "shipment_id": shipment_id}))
+        aggregator.submit('{"type":"shipment","action":"delete","shipment_id":"S2"}')
+        aggregator.submit('{"type":"site","action":"create"}')
+
+    messages = [m for _, m in asyncio.run(_collect(aggregator, submit))]
+    assert messages == [
+        {"type": "shipment", "action": "batch", "count": 4, "events": [
+            {"action": "update", "shipment_id": "S1"},
+            {"action": "delete", "shipment_id": "S2"},
+        ]},
+        {"type": "site", "action": "create"},
+    ]
+
+
+def test_batch_events_are_capped_but_count_is_exact():
+    aggregator = BroadcastAggregator(window_seconds=0.02, max_events=3, max_per_second=0)
+
+    async def submit():
+        for i in range(10):
+            aggregator.submit(json.dumps({"type": "inventory", "action": "update", "item_id": i}))
+
+    [(_, message)] = asyncio.run(_collect(aggregator, submit))
+    assert message["count"] == 10
+    assert message["truncated"] is True
+    assert [e["item_id"] for e in message["events"]] == [0, 1, 2]
+
+
+def test_outbound_rate_is_bounded_and_waiting_batches_keep_absorbing():
+    aggregator = BroadcastAggregator(window_seconds=0.001, max_events=50, max_per_second=4)
+
+    async def submit():
+        for topic in ("a", "b", "c", "d", "e"):
+            aggregator.submit(json.dumps({"type": topic, "action": "update"}))
+        await asyncio.sleep(0.05)
+        for i in range(5):
+            aggregator.submit(json.dumps({"type": "e", "action": "update", "ticket_id": i}))
+
+    published = asyncio.run(_collect(aggregator, submit, settle=0.5))
+    assert [m["type"] for _, m in published] == ["a", "b", "c", "d", "e"]
+    start = published[0][0]
+    assert published[3][0] - start < 0.1  # one second of burst
+    assert published[4][0] - start >= 0.2  # then 4/s
+    assert published[4][1]["count"] == 6
+
+
+def test_submit_declines_when_not_running_or_not_a_typed_object():
+    aggregator = BroadcastAggregator(window_seconds=0.02, max_events=50, max_per_second=0)
+    assert not aggregator.submit('{"type":"ticket","action":"update"}')
+
+    async def submit():
+        assert not aggregator.submit("not json")
+        assert not aggregator.submit('["ticket"]')
+        assert not aggregator.submit('{"action":"update"}')
+
+    assert asyncio.run(_collect(aggregator, submit)) == []
+
+    disabled = BroadcastAggregator(window_seconds=0, max_events=50, max_per_second=0)
+
+    async def submit_disabled():
+        assert not disabled.submit('{"type":"ticket","action":"update"}')
+
+    asyncio.run(_collect(disabled, submit_disabled))
@@ -0,0 +1,94 @@
+"""Tests for the pure ASGI compression middleware."""
+import gzip
+import os
+import sys
+import zlib
+
+CURRENT_DIR = os.path.dirname(__file__)
+BACKEND_ROOT = os.path.abspath(os.path.join(CURRENT_DIR, ".."))
+if BACKEND_ROOT not in sys.path:
+    sys.path.insert(0, BACKEND_ROOT)
+
+from starlette.applications import Starlette
+from starlette.responses import PlainTextResponse, Response, StreamingResponse
+from starlette.routing import Route
+from starlette.testclient import TestClient
+
+from utils.compression import CompressionMiddleware, negotiate
+
+BIG = '{"items": [' + ",".join('{"id": %d, "name": "ticket"}' % i for i in range(200)) + "]}"
+
+
+def _client(**kwargs):
+    async def json_body(request):
+        return Response(BIG, media_type="application/json")
+
+    async def small(request):
+        return Response('{"ok": true}', media_type="application/json")
+
+    async def png(request):
+        return Response(b"\x89PNG" + b"\0" * 2000, media_type="image/png")
+
+    async def no_transform(request):
+        return PlainTextResponse("x" * 2000, headers={"Cache-Control": "no-transform"})
+
+    async def stream(request):
+        async def chunks():
+            for i in range(3):
+                yield ("line %d " % i) * 100
+        return StreamingResponse(chunks(), media_type="text/plain")
+
+    app = Starlette(routes=[
+        Route("/json", json_body), Route("/small", small), Route("/png", png),
+        Route("/no-transform", no_transform), Route("/stream", stream),
+    ])
+    kwargs.setdefault("encodings", ["gzip"])
+    app.add_middleware(CompressionMiddleware, **kwargs)
+    return TestClient(app)
+
+
+def _raw(client, path, accept="gzip"):
+    with client.stream("GET", path, headers={"Accept-Encoding": accept}) as resp:
+        return resp, b"".join(resp.iter_raw())
+
+
+def test_negotiation_uses_q_values_then_server_preference():
+    available = ["zstd", "br", "gzip"]
+    assert negotiate("gzip, deflate, br, zstd", available) == "zstd"
+    assert negotiate("gzip;q=1.0, br;q=0.5", available) == "gzip"
+    assert negotiate("br;q=0, gzip;q=0.2", available) == "gzip"
+    assert negotiate("*", ["gzip"]) == "gzip"
+    assert negotiate("identity", available) is None
+    assert negotiate("", available) is None
+
+
+def test_json_is_compressed_with_length_and_vary():
+    resp, raw = _raw(_client(), "/json")
+    assert resp.headers["content-encoding"] == "gzip"
+    assert resp.headers["vary"] == "Accept-Encoding"
+    assert int(resp.headers["content-length"]) == len(raw)
+    assert gzip.decompress(raw).decode() == BIG
+
+
+def test_small_disallowed_and_no_transform_bodies_pass_through():
+    client = _client()
+    for path in ("/small", "/png", "/no-transform"):
+        resp, raw = _raw(client, path)
+        assert "content-encoding" not in resp.headers, path
+    resp, _ = _raw(client, "/json", accept="identity")
+    assert "content-encoding" not in resp.headers
+
+
+def test_streaming_chunks_are_flushed_individually():
+    resp, raw = _raw(_client(), "/stream")
+    assert resp.headers["content-encoding"] == "gzip"
+    assert "content-length" not in resp.headers
+    text = zlib.decompressobj(31).decompress(raw).decode()
+    assert text == "".join(("line %d " % i) * 100 for i in range(3))
+
+
+def test_level_is_tunable():
+    stored = _raw(_client(gzip_level=0), "/json")[1]
+    assert len(stored) > len(BIG)
+    assert gzip.decompress(stored).decode() == BIG
+    assert len(_raw(_client(gzip_level=6), "/json")[1]) < len(BIG) // 4
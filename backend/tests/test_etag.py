@@ -0,0 +1,168 @@
+"""Tests for table change counters and conditional GET (ETag / 304)."""
+import os
+import sys
+
+CURRENT_DIR = os.path.dirname(__file__)
+BACKEND_ROOT = os.path.abspath(os.path.join(CURRENT_DIR, ".."))
+if BACKEND_ROOT not in sys.path:
+    sys.path.insert(0, BACKEND_ROOT)
+
+from fastapi import Depends, FastAPI, Request, Response
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, update
+from sqlalchemy.orm import sessionmaker
+
+import models
+from utils import etag as etag_module
+from utils.auth import get_current_user
+from utils.redis_manager import redis_manager
+from utils.response_cache import ResponseCache
+
+
+class _FakeRedis:
+    """Just enough of redis-py's pipeline API for utils.etag."""
+
+    def __init__(self):
+        self.strings, self.hashes = {}, {}
+
+    def pipeline(self, transaction=False):
+        return _FakePipeline(self)
+
+
+class _FakePipeline:
+    def __init__(self, redis):
+        self.redis, self.calls = redis, []
+
+    def __getattr__(self, name):
+        return lambda *args, **kwargs: self.calls.append((name, args, kwargs))
+
+    def execute(self):
+        out = []
+        for name, args, kwargs in self.calls:
+            if name == "set":
+                if kwargs.get("nx") and args[0] in self.redis.strings:
+                    out.append(None)
+                else:
+                    self.redis.strings[args[0]] = args[1]
+                    out.append(True)
+            elif name == "get":
+                out.append(self.redis.strings.get(args[0]))
+            elif name == "hincrby":
+                h = self.redis.hashes.setdefault(args[0], {})
+                h[args[1]] = int(h.get(args[1], 0)) + args[2]
+                out.append(h[args[1]])
+            elif name == "hset":
+                mapping = kwargs.get("mapping") or {args[1]: args[2]}
+                self.redis.hashes.setdefault(args[0], {}).update(mapping)
+                out.append(len(mapping))
+            elif name == "hget":
+                out.append(self.redis.hashes.get(args[0], {}).get(args[1]))
+            elif name == "hmget":
+                h = self.redis.hashes.get(args[0], {})
+                out.append([h.get(f) for f in args[1]])
+            else:
+                out.append(True)
+        return out
+
+
+def _fake_redis(monkeypatch):
+    fake = _FakeRedis()
+    monkeypatch.setattr(redis_manager, "get_sync", lambda: fake)
+    return fake
+
+
+def test_commits_bump_written_tables_and_rollbacks_do_not(monkeypatch):
+    fake = _fake_redis(monkeypatch)
+    engine = create_engine("sqlite://")
+    models.Base.metadata.create_all(engine)
+    Session = sessionmaker(bind=engine)
+    etag_module.track_table_changes(Session)
+    db = Session()
+
+    db.add(models.Site(site_id="S1"))
+    db.commit()
+    db.execute(update(models.Site).where(models.Site.site_id == "S1").values(location="x"))
+    db.commit()
+    db.add(models.SLARule(rule_id="R1", name="r"))
+    db.flush()
+    db.rollback()
+
+    assert fake.hashes["etag:tables"] == {"sites": 2}
+    _, versions, _ = etag_module.read_table_versions(["sites", "sla_rules"])
+    assert versions == {"sites": 2, "sla_rules": 0}
+
+
+def _app(calls):
+    app = FastAPI()
+
+    @app.get("/things")
+    def things(_etag: None = Depends(etag_module.etag_guard("sites"))):
+        calls.append(1)
+        return {"ok": True}
+
+    app.dependency_overrides[get_current_user] = lambda: models.User(user_id="u1")
+    return TestClient(app)
+
+
+def test_conditional_get_returns_304_without_running_the_endpoint(monkeypatch):
+    _fake_redis(monkeypatch)
+    calls = []
+    client = _app(calls)
+
+    first = client.get("/things?a=1")
+    etag = first.headers["etag"]
+    assert first.status_code == 200 and etag.startswith('W/"')
+
+    again = client.get("/things?a=1", headers={"If-None-Match": etag})
+    assert again.status_code == 304 and again.content == b"" and again.headers["etag"] == etag
+    assert len(calls) == 1
+
+    # Different query string -> different validator
+    assert client.get("/things?a=2", headers={"If-None-Match": etag}).status_code == 200
+
+    etag_module.bump_table_versions(["sites"])
+    changed = client.get("/things?a=1", headers={"If-None-Match": etag})
+    assert changed.status_code == 200 and changed.headers["etag"] != etag
+
+
+def test_if_modified_since(monkeypatch):
+    fake = _fake_redis(monkeypatch)
+    client = _app([])
+    etag_module.bump_table_versions(["sites"])
+    fake.hashes["etag:modified"]["sites"] = 1700000000  # settled change, well in the past
+
+    first = client.get("/things")
+    assert first.headers["last-modified"] == "Tue, 14 Nov 2023 22:13:20 GMT"
+    assert client.get("/things", headers={"If-Modified-Since": first.headers["last-modified"]}).status_code == 304
+    assert client.get("/things", headers={"If-Modified-Since": "Tue, 14 Nov 2023 22:13:19 GMT"}).status_code == 200
+
+
+def test_no_validators_without_redis(monkeypatch):
+    monkeypatch.setattr(redis_manager, "get_sync", lambda: None)
+    response = _app([]).get("/things", headers={"If-None-Match": "*"})
+    assert response.status_code == 200 and "etag" not in response.headers
+
+
+def test_cached_body_is_never_older_than_its_validator(monkeypatch):
+    _fake_redis(monkeypatch)
+    cache = ResponseCache()
+    cache.register("things", {"site"}, ttl_seconds=300)
+    rows = ["old"]
+    app = FastAPI()
+
+    @app.get("/things")
+    def things(request: Request, response: Response, _etag: None = Depends(etag_module.etag_guard("sites"))):
+        return cache.respond("things", request, response, None, lambda db: {"name": rows[0]}, None)
+
+    app.dependency_overrides[get_current_user] = lambda: models.User(user_id="u1")
+    client = TestClient(app)
+    first = client.get("/things")
+    assert first.json() == {"name": "old"}
+
+    # A write committed (counters bumped) but its broadcast has not invalidated the cache yet
+    rows[0] = "new"
+    etag_module.bump_table_versions(["sites"])
+    second = client.get("/things")
+    assert second.headers["etag"] != first.headers["etag"]
+    assert second.json() == {"name": "new"}
+    assert client.get("/things", headers={"If-None-Match": second.headers["etag"]}).status_code == 304
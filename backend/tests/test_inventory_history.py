@@ -0,0 +1,112 @@
+"""Tests for keyset-paged inventory transactions and the stock history series."""
+import os
+import sys
+from datetime import date
+
+CURRENT_DIR = os.path.dirname(__file__)
+BACKEND_ROOT = os.path.abspath(os.path.join(CURRENT_DIR, ".."))
+if BACKEND_ROOT not in sys.path:
+    sys.path.insert(0, BACKEND_ROOT)
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+import crud
+import models
+from database import get_db
+from routers import inventory
+from utils.auth import get_current_user
+from utils.pagination import decode_cursor
+
+OUT, IN, ADJUST = (models.InventoryTransactionType.out, models.InventoryTransactionType.in_,
+                   models.InventoryTransactionType.adjust)
+
+
+def _session():
+    engine = create_engine("sqlite://")
+    models.Base.metadata.create_all(engine)
+    return sessionmaker(bind=engine)()
+
+
+def _seed(db):
+    # Ledger for INV1: +20 on the 1st, -5 and -3 on the 2nd, adjust -2 on the 4th -> 10 on hand
+    db.add(models.InventoryItem(item_id="INV1", name="part", quantity_on_hand=10))
+    db.add(models.InventoryItem(item_id="INV2", name="other", quantity_on_hand=7))
+    ledger = [("T1", date(2026, 3, 1), 20, IN), ("T2", date(2026, 3, 2), 5, OUT),
+              ("T3", date(2026, 3, 2), 3, OUT), ("T4", date(2026, 3, 4), -2, ADJUST)]
+    for tx_id, day, qty, type_ in ledger:
+        db.add(models.InventoryTransaction(transaction_id=tx_id, item_id="INV1", date=day, quantity=qty, type=type_))
+    db.add(models.InventoryTransaction(transaction_id="X1", item_id="INV2", date=date(2026, 3, 2), quantity=1, type=OUT))
+    db.commit()
+
+
+def test_transactions_keyset_pages_newest_first():
+    db = _session()
+    _seed(db)
+    seen, after = [], None
+    while True:
+        items, cursor = crud.get_item_transactions_page(db, "INV1", limit=3, after=after)
+        seen.extend(t.transaction_id for t in items)
+        if cursor is None:
+            break
+        after = decode_cursor(cursor, 2)
+    assert seen == ["T4", "T3", "T2", "T1"]
+
+
+def test_transactions_pages_include_undated_rows_last():
+    db = _session()
+    _seed(db)
+    for tx_id in ("U1", "U2", "U3"):
+        db.add(models.InventoryTransaction(transaction_id=tx_id, item_id="INV1", date=None, quantity=1, type=IN))
+    db.commit()
+    for limit in (1, 2, 4, 7, 8):
+        seen, after = [], None
+        while True:
+            items, cursor = crud.get_item_transactions_page(db, "INV1", limit=limit, after=after)
+            assert len(items) <= limit
+            seen.extend(t.transaction_id for t in items)
+            if cursor is None:
+                break
+            after = decode_cursor(cursor, 2)
+        assert seen == ["T4", "T3", "T2", "T1", "U3", "U2", "U1"], limit
+
+
+def test_stock_history_running_balances():
+    db = _session()
+    _seed(db)
+    history = crud.get_item_stock_history(db, "INV1", start=date(2026, 1, 1), end=date(2026, 12, 31))
+    assert [(p["date"], p["net_change"], p["balance"]) for p in history["points"]] == [
+        (date(2026, 3, 1), 20, 20), (date(2026, 3, 2), -8, 12), (date(2026, 3, 4), -2, 10)]
+    assert (history["opening_balance"], history["closing_balance"]) == (0, 10)
+
+
+def test_stock_history_window_is_anchored_on_later_activity():
+    db = _session()
+    _seed(db)
+    history = crud.get_item_stock_history(db, "INV1", start=date(2026, 3, 2), end=date(2026, 3, 3))
+    assert [(p["date"], p["balance"]) for p in history["points"]] == [(date(2026, 3, 2), 12)]
+    assert (history["opening_balance"], history["closing_balance"]) == (20, 12)
+
+    quiet = crud.get_item_stock_history(db, "INV1", start=date(2026, 3, 3), end=date(2026, 3, 3))
+    assert quiet["points"] == [] and quiet["opening_balance"] == quiet["closing_balance"] == 12
+    assert crud.get_item_stock_history(db, "missing", start=date(2026, 1, 1), end=date(2026, 1, 2)) is None
+
+
+def test_transactions_endpoint_serializes_dated_rows():
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    models.Base.metadata.create_all(engine)
+    db = sessionmaker(bind=engine)()
+    _seed(db)
+    app = FastAPI()
+    app.include_router(inventory.router)
+    app.dependency_overrides[get_db] = lambda: db
+    app.dependency_overrides[get_current_user] = lambda: models.User(user_id="u1")
+
+    response = TestClient(app).get("/inventory/INV1/transactions?limit=2")
+    assert response.status_code == 200
+    body = response.json()
+    assert [(t["transaction_id"], t["date"]) for t in body["items"]] == [("T4", "2026-03-04"), ("T3", "2026-03-02")]
+    assert body["next_cursor"]
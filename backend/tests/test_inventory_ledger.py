@@ -0,0 +1,171 @@
+"""Tests for the set-based shipment inventory decrements."""
+import os
+import sys
+import threading
+import uuid
+
+CURRENT_DIR = os.path.dirname(__file__)
+BACKEND_ROOT = os.path.abspath(os.path.join(CURRENT_DIR, ".."))
+if BACKEND_ROOT not in sys.path:
+    sys.path.insert(0, BACKEND_ROOT)
+
+import pytest
+from sqlalchemy import create_engine, delete, text
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.orm import sessionmaker
+
+import crud
+import models
+from utils.inventory_ledger import Decrement, _postgres_update, _totals, apply_decrements
+
+
+def _session():
+    engine = create_engine("sqlite://")
+    models.Base.metadata.create_all(engine)
+    return sessionmaker(bind=engine)()
+
+
+def _seed_items(db, **quantities):
+    for item_id, qty in quantities.items():
+        db.add(models.InventoryItem(item_id=item_id, name=item_id, quantity_on_hand=qty))
+    db.commit()
+
+
+def test_decrements_floor_at_zero_and_aggregate_duplicates():
+    db = _session()
+    _seed_items(db, A=10, B=3)
+    changes, missing = apply_decrements(
+        db, [Decrement("B", 5, "si-1"), Decrement("A", 2, "si-2"), Decrement("A", 3, "si-3"), Decrement("X", 1, "si-4")],
+        ticket_id=None, notes="Shipped",
+    )
+    db.commit()
+
+    assert [tuple(c) for c in changes] == [("A", 10, 5), ("B", 3, 0)]
+    assert missing == ["X"]
+    txs = db.query(models.InventoryTransaction).order_by(models.InventoryTransaction.shipment_item_id).all()
+    assert [(t.item_id, t.shipment_item_id, t.quantity) for t in txs] == [("B", "si-1", 5), ("A", "si-2", 2), ("A", "si-3", 3)]
+    assert all(t.type == models.InventoryTransactionType.out and t.notes == "Shipped" for t in txs)
+
+
+def test_bulk_update_inventory_for_shipment_summary():
+    db = _session()
+    _seed_items(db, A=4)
+    db.add(models.Site(site_id="S1"))
+    db.add(models.Shipment(shipment_id="SHIP-1", site_id="S1", what_is_being_shipped="parts"))
+    db.add_all([
+        models.ShipmentItem(shipment_item_id="si-1", shipment_id="SHIP-1", item_id="A", quantity=3, what_is_being_shipped="a"),
+        models.ShipmentItem(shipment_item_id="si-2", shipment_id="SHIP-1", item_id="A", quantity=None, what_is_being_shipped="a"),
+        models.ShipmentItem(shipment_item_id="si-3", shipment_id="SHIP-1", item_id="A", quantity=9,
+                            what_is_being_shipped="a", remove_from_inventory=False),
+    ])
+    db.commit()
+
+    result = crud.bulk_update_inventory_for_shipment(db, "SHIP-1", user_id=None)
+    assert result["updated_items"] == 1 and result["transactions_created"] == 2 and result["errors"] == []
+    assert result["changes"] == [{"item_id": "A", "old_quantity": 4, "new_quantity": 0}]
+    assert crud.bulk_update_inventory_for_shipment(db, "SHIP-NONE", user_id=None)["updated_items"] == 0
+
+
+def test_parallel_shippers_do_not_lose_updates(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'ledger.db'}", connect_args={"timeout": 30, "check_same_thread": False})
+    models.Base.metadata.create_all(engine)
+    Session = sessionmaker(bind=engine)
+    setup = Session()
+    _seed_items(setup, A=1000, B=1000)
+    setup.close()
+
+    def ship(worker):
+        db = Session()
+        try:
+            for _ in range(20):
+                apply_decrements(db, [Decrement("A", 2), Decrement("B", 1)], notes=f"worker {worker}")
+                db.commit()
+        finally:
+            db.close()
+
+    threads = [threading.Thread(target=ship, args=(w,)) for w in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    db = Session()
+    assert {i.item_id: i.quantity_on_hand for i in db.query(models.InventoryItem)} == {"A": 1000 - 8 * 20 * 2, "B": 1000 - 8 * 20}
+    assert db.query(models.InventoryTransaction).count() == 8 * 20 * 2
+
+
+def test_postgres_statement_aggregates_locks_in_order_and_floors():
+    stmt = _postgres_update(_totals([("B", -5), ("A", -2), ("A", -3), ("C", 4)]))
+    sql = " ".join(str(stmt.compile(dialect=postgresql.dialect(), compile_kwargs={"literal_binds": True})).split())
+    # One VALUES row per item, duplicates summed, in item_id (lock) order
+    assert ("VALUES (CAST('A' AS VARCHAR), CAST(-5 AS INTEGER)), (CAST('B' AS VARCHAR), CAST(-5 AS INTEGER)), "
+            "(CAST('C' AS VARCHAR), CAST(4 AS INTEGER))") in sql
+    assert "ORDER BY i.item_id FOR UPDATE OF i" in sql
+    assert "SET quantity_on_hand = GREATEST(0, COALESCE(i.quantity_on_hand, 0) + v.delta)" in sql
+    assert sql.endswith("RETURNING i.item_id, l.old_qty, i.quantity_on_hand")
+
+
+def _postgres_sessionmaker():
+    """Sessions on the configured DATABASE_URL; skips unless it is a reachable Postgres."""
+    from database import engine
+    if engine.dialect.name != "postgresql":
+        pytest.skip("DATABASE_URL is not Postgres")
+    try:
+        with engine.connect() as conn:
+            conn.execute(text("SELECT 1"))
+    except Exception as e:
+        pytest.skip(f"Postgres not reachable: {e}")
+    return sessionmaker(bind=engine)
+
+
+def test_postgres_decrements_floor_at_zero_and_aggregate_duplicates():
+    Session = _postgres_sessionmaker()
+    db = Session()
+    prefix = f"LEDGER-{uuid.uuid4().hex[:8]}-"
+    try:
+        _seed_items(db, **{prefix + "A": 10, prefix + "B": 3})
+        changes, missing = apply_decrements(db, [
+            Decrement(prefix + "B", 5, None), Decrement(prefix + "A", 2, None),
+            Decrement(prefix + "A", 3, None), Decrement(prefix + "X", 1, None),
+        ])
+        assert [tuple(c) for c in changes] == [(prefix + "A", 10, 5), (prefix + "B", 3, 0)]
+        assert missing == [prefix + "X"]
+        db.rollback()
+    finally:
+        db.execute(delete(models.InventoryItem).where(models.InventoryItem.item_id.startswith(prefix)))
+        db.commit()
+        db.close()
+
+
+def test_postgres_parallel_shippers_do_not_lose_updates():
+    Session = _postgres_sessionmaker()
+    prefix = f"LEDGER-{uuid.uuid4().hex[:8]}-"
+    setup = Session()
+    _seed_items(setup, **{prefix + "A": 1000, prefix + "B": 1000})
+
+    def ship(worker):
+        db = Session()
+        try:
+            for _ in range(20):
+                # Opposite item order per worker: the ordered row locks must prevent deadlocks
+                items = [Decrement(prefix + "A", 2), Decrement(prefix + "B", 1)]
+                apply_decrements(db, items if worker % 2 else items[::-1], notes=f"worker {worker}")
+                db.commit()
+        finally:
+            db.close()
+
+    try:
+        threads = [threading.Thread(target=ship, args=(w,)) for w in range(8)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        quantities = dict(setup.query(models.InventoryItem.item_id, models.InventoryItem.quantity_on_hand)
+                          .filter(models.InventoryItem.item_id.startswith(prefix)))
+        assert quantities == {prefix + "A": 1000 - 8 * 20 * 2, prefix + "B": 1000 - 8 * 20}
+    finally:
+        setup.rollback()
+        setup.execute(delete(models.InventoryTransaction).where(models.InventoryTransaction.item_id.startswith(prefix)))
+        setup.execute(delete(models.InventoryItem).where(models.InventoryItem.item_id.startswith(prefix)))
+        setup.commit()
+        setup.close()
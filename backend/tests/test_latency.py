@@ -0,0 +1,109 @@
+"""Tests for the per-route latency histograms behind /ops/latency."""
+import math
+import os
+import sys
+
+CURRENT_DIR = os.path.dirname(__file__)
+BACKEND_ROOT = os.path.abspath(os.path.join(CURRENT_DIR, ".."))
+if BACKEND_ROOT not in sys.path:
+    sys.path.insert(0, BACKEND_ROOT)
+
+from starlette.testclient import TestClient
+from main import app
+from utils.latency import LatencyHistogram, RouteLatencyRegistry, _bucket_index, _bucket_value, _GAMMA, _MIN_MS
+
+
+def test_histogram_percentiles_within_relative_error():
+    hist = LatencyHistogram()
+    for ms in range(1, 1001):
+        hist.record(float(ms))
+    summary = hist.summary()
+    assert summary["count"] == 1000
+    assert summary["max_ms"] == 1000.0
+    for name, expected in (("p50_ms", 500), ("p90_ms", 900), ("p99_ms", 990), ("p999_ms", 999)):
+        assert abs(summary[name] - expected) / expected < 0.02
+
+
+def test_histogram_merge_and_roundtrip():
+    a, b = LatencyHistogram(), LatencyHistogram()
+    for ms in (1.0, 2.0, 3.0):
+        a.record(ms)
+    for ms in (100.0, 200.0):
+        b.record(ms)
+    a.merge(LatencyHistogram.from_dict(b.to_dict()))
+    assert a.count == 5
+    assert a.max_ms == 200.0
+    assert a.summary()["p50_ms"] < 4.0
+
+
+def test_bucket_value_is_the_geometric_midpoint():
+    index = _bucket_index(100.0)
+    upper = _MIN_MS * _GAMMA ** index
+    lower = upper / _GAMMA
+    assert lower < 100.0 <= upper
+    assert math.isclose(_bucket_value(index), math.sqrt(lower * upper))
+
+
+def test_registry_window_ages_out_old_samples():
+    now = [0.0]
+    registry = RouteLatencyRegistry(worker_id="test", window_seconds=60, clock=lambda: now[0])
+    registry.record("GET", "/tickets/", 200, 900.0)
+    now[0] = 61
+    registry.record("GET", "/tickets/", 200, 5.0)
+    summary = registry.summary()["GET /tickets/ 2xx"]
+    assert summary["count"] == 2 and summary["max_ms"] == 900.0  # previous window still counted
+
+    now[0] = 122
+    registry.record("GET", "/tickets/", 200, 5.0)
+    summary = registry.summary()["GET /tickets/ 2xx"]
+    assert summary["count"] == 2 and summary["max_ms"] == 5.0
+
+    now[0] = 300  # idle for more than two windows
+    assert registry.summary() == {}
+
+
+def test_registry_keys_by_route_and_caps_cardinality():
+    registry = RouteLatencyRegistry(max_keys=2, worker_id="test")
+    registry.record("GET", "/tickets/{ticket_id}", 200, 5.0)
+    registry.record("GET", "/tickets/{ticket_id}", 404, 1.0)
+    registry.record("GET", "/sites/", 200, 2.0)
+    summary = registry.summary()
+    assert set(summary) == {"GET /tickets/{ticket_id} 2xx", "GET /tickets/{ticket_id} 4xx", "other"}
+
+
+def test_middleware_records_route_template():
+    client = TestClient(app)
+    resp = client.get("/ops/latency")
+    assert resp.status_code == 401
+    assert "X-Response-Time-Ms" in resp.headers
+    from main import latency_registry
+    assert "GET /ops/latency 4xx" in latency_registry.summary()
+
+
+def test_unhandled_exception_is_recorded_as_500_and_frees_the_profiler(monkeypatch, tmp_path):
+    import threading
+
+    from fastapi import FastAPI
+
+    import main
+    from utils.profiling import ProfileStore, RequestProfiler
+
+    profiler = RequestProfiler(ProfileStore(str(tmp_path)), sample_rate=1.0, interval_ms=1, max_concurrent=1)
+    monkeypatch.setattr(main, "request_profiler", profiler)
+    registry = RouteLatencyRegistry()
+    monkeypatch.setattr(main, "latency_registry", registry)
+
+    boom_app = FastAPI()
+    boom_app.add_middleware(main.LatencyMiddleware)
+
+    @boom_app.get("/boom/{n}")
+    def boom(n: int):
+        raise RuntimeError("boom")
+
+    client = TestClient(boom_app, raise_server_exceptions=False)
+    for n in range(3):
+        assert client.get(f"/boom/{n}").status_code == 500
+
+    assert registry.summary()["GET /boom/{n} 5xx"]["count"] == 3
+    assert not [t for t in threading.enumerate() if t.name == "request-profiler" and t.is_alive()]
+    assert profiler.start() is not None  # the only slot was released every time
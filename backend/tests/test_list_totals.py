@@ -0,0 +1,70 @@
+"""Tests for list endpoints returning items plus a window-function total."""
+import os
+import sys
+from datetime import date, datetime, timedelta
+
+CURRENT_DIR = os.path.dirname(__file__)
+BACKEND_ROOT = os.path.abspath(os.path.join(CURRENT_DIR, ".."))
+if BACKEND_ROOT not in sys.path:
+    sys.path.insert(0, BACKEND_ROOT)
+
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+
+import crud
+import models
+
+
+def _session():
+    engine = create_engine("sqlite://")
+    models.Base.metadata.create_all(engine)
+    return sessionmaker(bind=engine)()
+
+
+def _seed(db):
+    db.add_all([models.Site(site_id=f"S{i:02d}", region="east" if i % 2 else "west") for i in range(7)])
+    base = datetime(2026, 1, 1)
+    for i in range(9):
+        status = models.TicketStatus.archived if i < 3 else models.TicketStatus.open
+        db.add(models.Ticket(ticket_id=f"2026-{i:06d}", site_id="S01", date_created=date(2026, 1, 1),
+                             status=status, created_at=base + timedelta(hours=i)))
+    for i in range(5):
+        db.add(models.Shipment(shipment_id=f"SHIP-{i:06d}", site_id="S01", what_is_being_shipped="x",
+                               archived=i == 0, date_created=base + timedelta(hours=i)))
+    db.commit()
+
+
+def test_page_and_total_come_from_one_query():
+    db = _session()
+    _seed(db)
+    statements = []
+    event.listen(db.get_bind(), "before_cursor_execute", lambda c, cur, stmt, *a: statements.append(stmt))
+
+    sites, total, estimated = crud.get_sites_with_total(db, skip=2, limit=2, region="east")
+    assert [s.site_id for s in sites] == ["S05"] and total == 3 and not estimated
+    assert len(statements) == 1 and "OVER ()" in statements[0]
+
+
+def test_ticket_totals_match_count_and_exclude_archived():
+    db = _session()
+    _seed(db)
+    tickets, total, _ = crud.get_tickets_with_total(db, skip=0, limit=4, exclude_archived=True)
+    assert len(tickets) == 4 and total == 6 == crud.count_tickets(db, exclude_archived=True)
+    assert all(t.status != models.TicketStatus.archived for t in tickets)
+    _, total, _ = crud.get_tickets_with_total(db, limit=2, status="archived")
+    assert total == 3
+
+
+def test_shipment_totals_filter_archived_in_sql():
+    db = _session()
+    _seed(db)
+    shipments, total, _ = crud.get_shipments_with_total(db, limit=10, include_archived=False)
+    assert total == 4 and [s.shipment_id for s in shipments][-1] == "SHIP-000001"
+    assert len(crud.get_shipments(db, limit=4, include_archived=False)) == 4
+
+
+def test_total_past_the_last_page_falls_back_to_count():
+    db = _session()
+    _seed(db)
+    sites, total, _ = crud.get_sites_with_total(db, skip=50, limit=10)
+    assert sites == [] and total == 7
@@ -0,0 +1,93 @@
+"""Tests for buffered frontend log ingestion."""
+import os
+import sys
+
+CURRENT_DIR = os.path.dirname(__file__)
+BACKEND_ROOT = os.path.abspath(os.path.join(CURRENT_DIR, ".."))
+if BACKEND_ROOT not in sys.path:
+    sys.path.insert(0, BACKEND_ROOT)
+
+from sqlalchemy.exc import OperationalError
+from starlette.testclient import TestClient
+from main import app
+from routers.logging import _error_row, _log_row
+from utils.log_ingest import KIND_ERROR, KIND_LOG, LogIngestQueue, log_ingest_queue
+
+
+class RecordingSink:
+    def __init__(self, fail=False):
+        self.batches = []
+        self.fail = fail
+        self.calls = 0
+
+    def __call__(self, kind, rows):
+        self.calls += 1
+        if self.fail:
+            raise self.fail if isinstance(self.fail, Exception) else RuntimeError("db down")
+        if any(row.get("bad") for row in rows):
+            raise RuntimeError("null value in column \"message\"")
+        self.batches.append((kind, len(rows)))
+
+
+def test_queue_sheds_when_full_and_flushes_in_batches():
+    sink = RecordingSink()
+    queue = LogIngestQueue(max_size=5, batch_size=2, sink=sink)
+    assert queue.offer(KIND_LOG, [{"i": i} for i in range(4)]) == 4
+    assert queue.offer(KIND_ERROR, [{"i": 4}, {"i": 5}]) == 1
+    while len(queue):
+        queue.flush_once()
+    assert sink.batches == [(KIND_LOG, 2), (KIND_LOG, 2), (KIND_ERROR, 1)]
+
+
+def test_failed_batch_is_dropped_not_retried():
+    queue = LogIngestQueue(max_size=10, batch_size=10, sink=RecordingSink(fail=True))
+    queue.offer(KIND_LOG, [{"i": 1}])
+    assert queue.flush_once() == 1
+    assert len(queue) == 0
+
+
+def test_rejected_batch_drops_only_the_bad_rows():
+    sink = RecordingSink()
+    queue = LogIngestQueue(max_size=10, batch_size=10, sink=sink)
+    queue.offer(KIND_LOG, [{"i": i} for i in range(5)] + [{"bad": True}])
+    assert queue.flush_once() == 6
+    assert sum(n for _, n in sink.batches) == 5
+
+
+def test_unreachable_database_drops_the_batch_without_bisecting():
+    sink = RecordingSink(fail=OperationalError("INSERT", {}, Exception("connection refused")))
+    queue = LogIngestQueue(max_size=10, batch_size=10, sink=sink)
+    queue.offer(KIND_LOG, [{"i": i} for i in range(6)])
+    assert queue.flush_once() == 6
+    assert sink.calls == 1
+
+
+def test_rows_are_coerced_to_column_types():
+    row = _log_row({"level": None, "context": None, "message": None, "url": {"path": "/"}, "errorId": 7}, None, "ua")
+    assert (row["level"], row["context"], row["message"]) == ("INFO", "frontend", "")
+    assert row["url"] == '{"path": "/"}'
+    assert row["error_id"] == "7"
+    assert _log_row({}, None, "ua")["error_id"] is None
+
+    row = _error_row({"message": ["a", 1], "stack": 3, "componentStack": None}, None, "ua")
+    assert (row["message"], row["stack"], row["component_stack"]) == ('["a", 1]', "3", "")
+
+
+def test_batch_endpoint_queues_rows(monkeypatch):
+    sink = RecordingSink()
+    monkeypatch.setattr(log_ingest_queue, "sink", sink)
+    with TestClient(app) as client:
+        resp = client.post(
+            "/api/logs/batch",
+            json={"logs": [{"level": "warn", "message": "a"}, {"message": "b"}], "errors": [{"errorId": "e1", "message": "boom"}]},
+        )
+        assert resp.status_code == 202, resp.text
+        assert resp.json() == {"status": "queued", "accepted": 3, "dropped": 0}
+    # Lifespan shutdown drains the queue
+    assert sorted(sink.batches) == [(KIND_ERROR, 1), (KIND_LOG, 2)]
+
+
+def test_batch_endpoint_rejects_oversized_batches():
+    client = TestClient(app)
+    resp = client.post("/api/logs/batch", json={"logs": [{"message": "x"}] * 501})
+    assert resp.status_code == 413
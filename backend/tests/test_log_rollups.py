@@ -0,0 +1,60 @@
+"""Tests for hourly frontend log rollups behind /api/logs/stats."""
+import os
+import sys
+from datetime import datetime, timedelta, timezone
+
+CURRENT_DIR = os.path.dirname(__file__)
+BACKEND_ROOT = os.path.abspath(os.path.join(CURRENT_DIR, ".."))
+if BACKEND_ROOT not in sys.path:
+    sys.path.insert(0, BACKEND_ROOT)
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+import crud
+import models
+from utils.log_ingest import hourly_rollup_counts
+
+
+def _session():
+    engine = create_engine("sqlite://")
+    models.Base.metadata.create_all(
+        engine, tables=[models.FrontendLog.__table__, models.FrontendLogHourlyRollup.__table__]
+    )
+    return sessionmaker(bind=engine)()
+
+
+def test_rollup_counts_bucket_by_utc_hour():
+    ts = datetime(2026, 3, 1, 10, 59, tzinfo=timezone(timedelta(hours=2)))
+    rows = [
+        {"timestamp": ts, "level": "ERROR", "context": "frontend"},
+        {"timestamp": ts + timedelta(minutes=2), "level": "ERROR", "context": "frontend"},
+        {"timestamp": ts, "level": "INFO", "context": "api"},
+    ]
+    counts = hourly_rollup_counts(rows)
+    assert counts[(datetime(2026, 3, 1, 8), "ERROR", "frontend")] == 1
+    assert counts[(datetime(2026, 3, 1, 9), "ERROR", "frontend")] == 1
+    assert counts[(datetime(2026, 3, 1, 8), "INFO", "api")] == 1
+
+
+def test_stats_combine_rollups_with_raw_edges():
+    db = _session()
+    base = datetime(2026, 3, 1, 0)
+    # Whole hours 1:00-3:00 come from rollups only
+    db.add_all([
+        models.FrontendLogHourlyRollup(hour=base + timedelta(hours=1), level="ERROR", context="frontend", count=100),
+        models.FrontendLogHourlyRollup(hour=base + timedelta(hours=2), level="INFO", context="api", count=50),
+        # Partial edge hours are counted from raw rows, so their rollups must be ignored
+        models.FrontendLogHourlyRollup(hour=base, level="INFO", context="frontend", count=999),
+        models.FrontendLogHourlyRollup(hour=base + timedelta(hours=3), level="INFO", context="frontend", count=999),
+    ])
+    for ts, level in ((base + timedelta(minutes=10), "INFO"), (base + timedelta(minutes=40), "WARN"),
+                      (base + timedelta(hours=3, minutes=5), "INFO"), (base + timedelta(hours=3, minutes=50), "INFO")):
+        db.add(models.FrontendLog(timestamp=ts, level=level, context="frontend", message="m"))
+    db.commit()
+
+    stats = crud.get_frontend_log_stats(db, base + timedelta(minutes=30), base + timedelta(hours=3, minutes=30))
+    assert stats["total_logs"] == 100 + 50 + 1 + 1
+    assert stats["by_level"] == {"ERROR": 100, "INFO": 51, "WARN": 1}
+    assert stats["by_hour"] == {0: 1, 1: 100, 2: 50, 3: 1}
+    assert round(stats["error_rate"], 2) == round(101 / 152 * 100, 2)
@@ -0,0 +1,69 @@
+"""Tests for the queued logging pipeline, JSON formatter and sampling filter."""
+import json
+import logging
+import os
+import sys
+import threading
+
+CURRENT_DIR = os.path.dirname(__file__)
+BACKEND_ROOT = os.path.abspath(os.path.join(CURRENT_DIR, ".."))
+if BACKEND_ROOT not in sys.path:
+    sys.path.insert(0, BACKEND_ROOT)
+
+from utils import logging_config
+from utils.logging_config import JSONFormatter, SamplingFilter, install_queue_logging, stop_queue_logging
+
+
+class ListHandler(logging.Handler):
+    def __init__(self):
+        super().__init__()
+        self.records = []
+
+    def emit(self, record):
+        self.records.append((threading.current_thread(), self.format(record)))
+
+
+def test_json_formatter_includes_only_extra_fields():
+    record = logging.LogRecord("ticketing", logging.INFO, __file__, 10, "hello %s", ("world",), None)
+    record.ticket_id = "T-1"
+    payload = json.loads(JSONFormatter().format(record))
+    assert payload["message"] == "hello world"
+    assert payload["ticket_id"] == "T-1"
+    assert "args" not in payload and "msg" not in payload and "taskName" not in payload
+
+
+def test_queue_logging_formats_on_listener_thread():
+    handler = ListHandler()
+    handler.setFormatter(JSONFormatter())
+    log = logging.getLogger("test.queued")
+    log.propagate = False
+    log.setLevel(logging.INFO)
+    log.addHandler(handler)
+    app_listeners = list(logging_config._listeners)
+    listeners = install_queue_logging(["test.queued"])
+    try:
+        assert handler not in log.handlers
+        try:
+            raise ValueError("boom")
+        except ValueError:
+            log.exception("failed %d", 3, extra={"route": "/x"})
+    finally:
+        stop_queue_logging(listeners)
+        log.handlers.clear()
+    # The application's own listeners (installed when main is imported) keep running
+    assert logging_config._listeners == app_listeners
+    emit_thread, text = handler.records[0]
+    assert emit_thread is not threading.current_thread()
+    payload = json.loads(text)
+    assert payload["message"] == "failed 3"
+    assert payload["route"] == "/x"
+    assert "ValueError: boom" in payload["exception"]
+
+
+def test_sampling_filter_keeps_warnings():
+    drop_all = SamplingFilter(0.0)
+    info = logging.LogRecord("x", logging.INFO, "", 0, "m", (), None)
+    warning = logging.LogRecord("x", logging.WARNING, "", 0, "m", (), None)
+    assert drop_all.filter(info) is False
+    assert drop_all.filter(warning) is True
+    assert SamplingFilter(1.0).filter(info) is True
@@ -0,0 +1,56 @@
+"""Tests for the bounded metrics registry and the /metrics endpoint."""
+import os
+import sys
+
+CURRENT_DIR = os.path.dirname(__file__)
+BACKEND_ROOT = os.path.abspath(os.path.join(CURRENT_DIR, ".."))
+if BACKEND_ROOT not in sys.path:
+    sys.path.insert(0, BACKEND_ROOT)
+
+from starlette.testclient import TestClient
+from main import app
+from utils.metrics import MetricsRegistry, render
+
+
+def test_series_are_capped_per_metric():
+    registry = MetricsRegistry(max_series=2, worker_id="test")
+    counter = registry.counter("demo_requests", "Demo.", ("route",))
+    for route in ("/a", "/b", "/c", "/d"):
+        counter.inc(labels=(route,))
+    series = dict((tuple(k), v) for k, v in registry.snapshot()["demo_requests"]["series"])
+    assert series == {("/a",): 1.0, ("/b",): 1.0, ("other",): 2.0}
+
+
+def test_render_merges_worker_snapshots():
+    a = MetricsRegistry(worker_id="a")
+    b = MetricsRegistry(worker_id="b")
+    for registry, value in ((a, 0.003), (b, 0.2)):
+        registry.counter("demo_requests", "Demo.", ("route",)).inc(labels=("/x",))
+        registry.histogram("demo_seconds", "Demo.", buckets=(0.01, 0.1, 1.0)).observe(value)
+        registry.gauge("demo_connections", "Demo.").set(3)
+    text = render([a.snapshot(), b.snapshot()])
+    assert 'demo_requests_total{route="/x"} 2' in text
+    assert 'demo_seconds_bucket{le="0.01"} 1' in text
+    assert 'demo_seconds_bucket{le="1.0"} 2' in text
+    assert 'demo_seconds_bucket{le="+Inf"} 2' in text
+    assert "demo_seconds_count 2" in text
+    assert "demo_connections 6" in text
+    assert text.endswith("# EOF\n")
+
+
+def test_cache_hit_ratio_is_derived():
+    registry = MetricsRegistry(worker_id="test")
+    lookups = registry.counter("ticketing_cache_requests", "Demo.", ("cache", "result"))
+    lookups.inc(3, labels=("sites", "hit"))
+    lookups.inc(1, labels=("sites", "miss"))
+    assert 'ticketing_cache_hit_ratio{cache="sites"} 0.75' in render([registry.snapshot()])
+
+
+def test_metrics_endpoint_exposes_request_metrics():
+    client = TestClient(app)
+    client.get("/health")
+    resp = client.get("/metrics")
+    assert resp.status_code == 200
+    assert resp.headers["content-type"].startswith("application/openmetrics-text")
+    assert 'ticketing_http_requests_total{method="GET",route="/health",status="2xx"}' in resp.text
+    assert "ticketing_websocket_connections" in resp.text
@@ -0,0 +1,84 @@
+"""Tests for the bounded password hashing/verification pool."""
+import asyncio
+import hashlib
+import os
+import sys
+import threading
+import time
+from concurrent.futures.process import BrokenProcessPool
+
+CURRENT_DIR = os.path.dirname(__file__)
+BACKEND_ROOT = os.path.abspath(os.path.join(CURRENT_DIR, ".."))
+if BACKEND_ROOT not in sys.path:
+    sys.path.insert(0, BACKEND_ROOT)
+
+import pytest
+from fastapi import HTTPException
+
+from utils import password_pool as password_pool_module
+from utils.password_pool import PasswordPool, get_password_hash
+
+
+def test_inline_pool_hashes_and_verifies_bcrypt_and_legacy_sha256():
+    pool = PasswordPool(workers=0, max_pending=4)
+    hashed = pool.hash("secret")
+    assert hashed.startswith("$2")
+    assert pool.verify("secret", hashed)
+    assert not pool.verify("wrong", hashed)
+    assert pool.verify("old", hashlib.sha256(b"old").hexdigest())
+    assert not pool.verify("x", "")
+    assert pool.pending == 0
+
+
+def test_process_pool_verifies_and_rejects_when_full():
+    hashed = get_password_hash("secret")
+    pool = PasswordPool(workers=1, max_pending=1)
+    try:
+        assert asyncio.run(pool.verify_async("secret", hashed)) is True
+
+        running = pool._submit(get_password_hash, "another")
+        with pytest.raises(HTTPException) as exc:
+            pool.verify("secret", hashed)
+        assert exc.value.status_code == 429
+        assert exc.value.headers["Retry-After"] == "1"
+
+        assert running.result().startswith("$2")
+        deadline = time.monotonic() + 5
+        while pool.pending and time.monotonic() < deadline:  # done callbacks run just after result()
+            time.sleep(0.01)
+        assert pool.pending == 0
+        assert pool.verify("secret", hashed)
+    finally:
+        pool.shutdown()
+
+
+def test_inline_async_verify_runs_in_the_threadpool(monkeypatch):
+    threads = []
+
+    def verify(plain, hashed):
+        threads.append(threading.current_thread())
+        return True
+
+    monkeypatch.setattr(password_pool_module, "verify_password", verify)
+    pool = PasswordPool(workers=0, max_pending=4)
+
+    async def check():
+        assert await pool.verify_async("secret", "hash")
+        return threading.current_thread()
+
+    loop_thread = asyncio.run(check())
+    assert threads and threads[0] is not loop_thread
+    assert pool.pending == 0
+
+
+def test_pool_is_replaced_after_a_worker_dies():
+    hashed = get_password_hash("secret")
+    pool = PasswordPool(workers=1, max_pending=4)
+    try:
+        with pytest.raises(BrokenProcessPool):
+            pool._submit(os._exit, 1).result(timeout=30)
+        assert pool.verify("secret", hashed)
+        assert asyncio.run(pool.verify_async("secret", hashed)) is True
+        assert pool.hash("again").startswith("$2")
+    finally:
+        pool.shutdown()
@@ -0,0 +1,87 @@
+"""Tests for the opt-in request profiler."""
+import json
+import os
+import sys
+import threading
+import time
+
+CURRENT_DIR = os.path.dirname(__file__)
+BACKEND_ROOT = os.path.abspath(os.path.join(CURRENT_DIR, ".."))
+if BACKEND_ROOT not in sys.path:
+    sys.path.insert(0, BACKEND_ROOT)
+
+from starlette.testclient import TestClient
+from main import app
+from utils.profiling import ProfileStore, RequestProfiler, StackSampler
+
+
+def _busy_loop(stop):
+    while not stop.is_set():
+        sum(i * i for i in range(1000))
+
+
+def test_sampler_captures_busy_thread_as_speedscope():
+    stop = threading.Event()
+    worker = threading.Thread(target=_busy_loop, args=(stop,), name="busy")
+    worker.start()
+    sampler = StackSampler(interval_ms=2)
+    sampler.start()
+    time.sleep(0.1)
+    sampler.stop()
+    stop.set()
+    worker.join()
+
+    doc = sampler.to_speedscope("test")
+    busy = [p for p in doc["profiles"] if p["name"] == "busy"]
+    assert busy and busy[0]["samples"]
+    names = {doc["shared"]["frames"][i]["name"] for stack in busy[0]["samples"] for i in stack}
+    assert "_busy_loop" in names
+    assert len(busy[0]["samples"]) == len(busy[0]["weights"])
+
+
+def test_sampler_survives_broken_frames(monkeypatch):
+    class _Broken:
+        f_code = {}  # what a frame torn down mid-walk has looked like
+
+    real_current_frames = sys._current_frames
+    monkeypatch.setattr(sys, "_current_frames", lambda: {-1: _Broken(), **real_current_frames()})
+    stop = threading.Event()
+    worker = threading.Thread(target=_busy_loop, args=(stop,), name="busy")
+    worker.start()
+    sampler = StackSampler(interval_ms=2)
+    sampler.start()
+    try:
+        time.sleep(0.05)
+        assert sampler._thread.is_alive()
+    finally:
+        sampler.stop()
+        stop.set()
+        worker.join()
+    assert any(name == "busy" for name, _, _ in sampler.samples)
+
+
+def test_store_keeps_newest_and_rejects_unsafe_names(tmp_path):
+    store = ProfileStore(str(tmp_path), max_files=2)
+    saved = [store.save("GET", "/tickets/{ticket_id}", 1500 + i, {"i": i}) for i in range(3)]
+    listed = [p["name"] for p in store.list()]
+    assert listed == [saved[2], saved[1]]
+    assert json.load(open(store.path_for(saved[2]))) == {"i": 2}
+    assert store.path_for("../settings.py") is None
+    assert store.path_for(saved[0]) is None
+
+
+def test_sampled_profile_kept_only_when_slow(tmp_path):
+    profiler = RequestProfiler(ProfileStore(str(tmp_path)), slow_threshold_ms=1000, interval_ms=1, max_concurrent=1)
+    sampler = profiler.start()
+    assert profiler.start() is None  # concurrency slot taken
+    time.sleep(0.02)
+    assert profiler.finish(sampler, "GET", "/sites/", 10, keep=False) is None
+    assert profiler.finish(sampler, "GET", "/sites/", 10, keep=False) is None  # second finish is a no-op
+    assert profiler.start() is not None
+    assert profiler.start() is None  # ...and did not free a second slot
+
+
+def test_profile_endpoints_require_auth():
+    client = TestClient(app)
+    assert client.get("/ops/profiles").status_code == 401
+    assert client.get("/ops/profiles/x.speedscope.json").status_code == 401
@@ -0,0 +1,48 @@
+"""Tests for per-request SQL statistics."""
+import os
+import sys
+
+CURRENT_DIR = os.path.dirname(__file__)
+BACKEND_ROOT = os.path.abspath(os.path.join(CURRENT_DIR, ".."))
+if BACKEND_ROOT not in sys.path:
+    sys.path.insert(0, BACKEND_ROOT)
+
+from sqlalchemy import create_engine, text
+from starlette.testclient import TestClient
+from main import app
+from utils.query_stats import QueryStats, capture_queries, fingerprint, instrument_engine
+
+
+def test_fingerprint_collapses_literals_and_params():
+    a = fingerprint("SELECT * FROM users WHERE users.user_id = %(pk_1)s AND age > 30")
+    b = fingerprint("SELECT  *  FROM users\nWHERE users.user_id = %(pk_1)s AND age > 41")
+    assert a == b
+    assert fingerprint("SELECT 1 WHERE x IN (%(x_1)s, %(x_2)s)") == fingerprint("SELECT 1 WHERE x IN (%(x_1)s)")
+    assert fingerprint("SELECT name FROM t WHERE name = 'o''brien'") == "SELECT name FROM t WHERE name = ?"
+
+
+def test_repeated_fingerprints_over_threshold():
+    stats = QueryStats()
+    for i in range(12):
+        stats.record(f"SELECT * FROM users WHERE user_id = {i}", 0.5)
+    stats.record("SELECT * FROM tickets", 1.0)
+    assert stats.count == 13
+    assert stats.repeated(10) == [("SELECT * FROM users WHERE user_id = ?", 12)]
+
+
+def test_capture_queries_counts_engine_statements():
+    engine = create_engine("sqlite://")
+    instrument_engine(engine)
+    with capture_queries() as stats:
+        with engine.connect() as conn:
+            for _ in range(3):
+                conn.execute(text("SELECT 1"))
+    assert stats.count == 3
+    assert stats.fingerprints["SELECT ?"] == 3
+
+
+def test_response_carries_db_headers():
+    client = TestClient(app)
+    resp = client.get("/")
+    assert resp.headers["X-DB-Queries"] == "0"
+    assert "X-DB-Time-Ms" in resp.headers
@@ -0,0 +1,109 @@
+"""Tests for the shared Redis manager circuit breaker."""
+import os
+import sys
+
+CURRENT_DIR = os.path.dirname(__file__)
+BACKEND_ROOT = os.path.abspath(os.path.join(CURRENT_DIR, ".."))
+if BACKEND_ROOT not in sys.path:
+    sys.path.insert(0, BACKEND_ROOT)
+
+from starlette.testclient import TestClient
+from main import app
+from utils.redis_manager import CircuitBreaker, RedisManager, STATE_CLOSED, STATE_HALF_OPEN, STATE_OPEN
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_breaker_opens_after_threshold_and_backs_off():
+    clock = FakeClock()
+    breaker = CircuitBreaker(failure_threshold=2, base_backoff=10, max_backoff=100, clock=clock)
+    breaker.record_failure(RuntimeError("down"))
+    assert breaker.state == STATE_CLOSED
+    breaker.record_failure(RuntimeError("down"))
+    assert breaker.state == STATE_OPEN
+    assert breaker.allow() is False
+
+    # Backoff elapses -> one probe allowed, concurrent callers still short-circuit
+    clock.now += 13
+    assert breaker.allow() is True
+    assert breaker.state == STATE_HALF_OPEN
+    assert breaker.allow() is False
+
+    # Failed probe doubles the delay
+    breaker.record_failure(RuntimeError("still down"))
+    assert breaker.state == STATE_OPEN
+    clock.now += 13
+    assert breaker.allow() is False
+    clock.now += 13
+    assert breaker.allow() is True
+
+    breaker.record_success()
+    assert breaker.state == STATE_CLOSED
+    assert breaker.consecutive_failures == 0
+
+
+def test_sporadic_failures_outside_the_window_do_not_open_the_circuit():
+    clock = FakeClock()
+    breaker = CircuitBreaker(failure_threshold=2, base_backoff=10, failure_window=30, clock=clock)
+    for _ in range(5):
+        breaker.record_failure(RuntimeError("blip"))
+        assert breaker.state == STATE_CLOSED
+        clock.now += 31
+    breaker.record_failure(RuntimeError("blip"))
+    clock.now += 29
+    breaker.record_failure(RuntimeError("blip"))
+    assert breaker.state == STATE_OPEN
+
+
+def test_manager_short_circuits_when_redis_unreachable():
+    clock = FakeClock()
+    manager = RedisManager(
+        "redis://127.0.0.1:1/0",
+        connect_timeout=0.2,
+        breaker=CircuitBreaker(failure_threshold=1, base_backoff=30, clock=clock),
+    )
+    assert manager.get_sync() is None
+    assert manager.healthy is False
+    # Circuit is open: no connect attempt until the backoff elapses
+    manager._sync_client = None
+    assert manager.get_sync() is None
+    assert manager._sync_client is None
+    assert manager.status()["circuit"]["state"] == STATE_OPEN
+
+
+def test_cancelled_async_probe_does_not_leave_the_circuit_half_open():
+    import asyncio
+
+    class _HangingClient:
+        async def ping(self):
+            await asyncio.sleep(10)
+
+    clock = FakeClock()
+    manager = RedisManager("redis://127.0.0.1:1/0",
+                           breaker=CircuitBreaker(failure_threshold=1, base_backoff=10, clock=clock))
+    manager.record_failure(RuntimeError("down"))
+    manager._async_client = _HangingClient()
+    clock.now += 13
+
+    async def scenario():
+        probe = asyncio.create_task(manager.get_async())
+        await asyncio.sleep(0)
+        assert manager.breaker.state == STATE_HALF_OPEN
+        probe.cancel()
+        await asyncio.gather(probe, return_exceptions=True)
+
+    asyncio.run(scenario())
+    assert manager.breaker.state == STATE_OPEN
+    assert manager.breaker.allow() is True  # the next caller gets to probe
+
+
+def test_ops_redis_requires_auth():
+    client = TestClient(app)
+    resp = client.get("/ops/redis")
+    assert resp.status_code == 401
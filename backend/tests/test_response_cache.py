@@ -0,0 +1,195 @@
+"""Tests for the shared (Redis L2 + per-worker L1) response cache."""
+import json
+import os
+import sys
+from typing import List
+
+CURRENT_DIR = os.path.dirname(__file__)
+BACKEND_ROOT = os.path.abspath(os.path.join(CURRENT_DIR, ".."))
+if BACKEND_ROOT not in sys.path:
+    sys.path.insert(0, BACKEND_ROOT)
+
+from pydantic import BaseModel
+
+from utils import response_cache as response_cache_module
+from utils.redis_manager import redis_manager
+from utils.response_cache import GENERATIONS_KEY, RESPONSE_CACHE_CHANNEL, ResponseCache
+
+
+class _FakeRedis:
+    """Just enough of redis-py's pipeline API for utils.response_cache."""
+
+    def __init__(self):
+        self.hashes, self.published = {}, []
+
+    def pipeline(self, transaction=False):
+        return _FakePipeline(self)
+
+
+class _FakePipeline:
+    def __init__(self, redis):
+        self.redis, self.calls = redis, []
+
+    def __getattr__(self, name):
+        return lambda *args, **kwargs: self.calls.append((name, args, kwargs))
+
+    def execute(self):
+        out = []
+        for name, args, kwargs in self.calls:
+            if name == "hget":
+                out.append(self.redis.hashes.get(args[0], {}).get(args[1]))
+            elif name == "hset":
+                self.redis.hashes.setdefault(args[0], {})[args[1]] = args[2]
+                out.append(1)
+            elif name == "hincrby":
+                h = self.redis.hashes.setdefault(args[0], {})
+                h[args[1]] = int(h.get(args[1], 0)) + args[2]
+                out.append(h[args[1]])
+            elif name == "delete":
+                out.append(int(self.redis.hashes.pop(args[0], None) is not None))
+            elif name == "publish":
+                self.redis.published.append(args)
+                out.append(1)
+            else:
+                out.append(True)
+        return out
+
+
+class _Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+class _Rule(BaseModel):
+    name: str
+
+
+def _cache(monkeypatch, redis=True):
+    fake = _FakeRedis()
+    monkeypatch.setattr(redis_manager, "get_sync", lambda: fake if redis else None)
+    clock = _Clock()
+    cache = ResponseCache(clock=clock)
+    cache.register("rules", {"sla:update"}, ttl_seconds=60)
+    cache.register("report", {"ticket"}, ttl_seconds=10, stale_seconds=100)
+    return cache, fake, clock
+
+
+def _counter(values):
+    calls = []
+
+    def compute(db):
+        calls.append(db)
+        return values[len(calls) - 1]
+    return compute, calls
+
+
+def test_l1_then_l2_then_recompute_after_invalidation(monkeypatch):
+    cache, fake, clock = _cache(monkeypatch)
+    compute, calls = _counter([[{"name": "a"}], [{"name": "b"}]])
+
+    assert json.loads(cache.get_body("rules", "k", compute, "db", model=List[_Rule])) == [{"name": "a"}]
+    assert cache.get_body("rules", "k", compute, "db", model=List[_Rule]) == b'[{"name":"a"}]'
+    # Another worker (fresh L1) is served from Redis
+    other = ResponseCache(clock=clock)
+    other.register("rules", {"sla:update"}, ttl_seconds=60)
+    assert other.get_body("rules", "k", compute, "db", model=List[_Rule]) == b'[{"name":"a"}]'
+    assert len(calls) == 1
+
+    cache.invalidate_for_message('{"type":"sla","action":"update"}')
+    assert fake.hashes[GENERATIONS_KEY]["rules"] == 1
+    assert json.loads(fake.published[-1][1]) == ["rules"]
+    assert fake.published[-1][0] == RESPONSE_CACHE_CHANNEL
+    assert cache.get_body("rules", "k", compute, "db", model=List[_Rule]) == b'[{"name":"b"}]'
+    assert len(calls) == 2
+
+
+def test_unrelated_events_do_not_invalidate(monkeypatch):
+    cache, fake, _ = _cache(monkeypatch)
+    compute, calls = _counter([{"v": 1}, {"v": 2}])
+    cache.get_body("rules", "k", compute, None)
+    cache.invalidate_for_message('{"type":"sla","action":"escalated"}')
+    cache.invalidate_for_message('{"type":"inventory","action":"update"}')
+    cache.invalidate_for_message("not json")
+    assert cache.get_body("rules", "k", compute, None) == b'{"v":1}'
+    assert fake.published == []
+
+
+def test_value_computed_before_invalidation_is_not_served_after(monkeypatch):
+    cache, fake, _ = _cache(monkeypatch)
+
+    def compute(db):
+        # A write lands while this result is being built
+        cache.invalidate(["sla:update"])
+        return {"v": "old"}
+
+    cache.get_body("rules", "k", compute, None)
+    fresh, calls = _counter([{"v": "new"}])
+    assert cache.get_body("rules", "k", fresh, None) == b'{"v":"new"}'
+    assert len(calls) == 1
+
+
+def test_remote_invalidation_drops_l1(monkeypatch):
+    cache, fake, _ = _cache(monkeypatch, redis=False)
+    monkeypatch.setattr(response_cache_module, "response_cache", cache)
+    compute, calls = _counter([{"v": 1}, {"v": 2}])
+    cache.get_body("rules", "k", compute, None)
+    response_cache_module._apply_message(json.dumps(["rules"]))
+    assert cache.get_body("rules", "k", compute, None) == b'{"v":2}'
+
+
+def test_stale_entry_is_served_while_refreshing(monkeypatch):
+    cache, fake, clock = _cache(monkeypatch)
+    compute, calls = _counter([{"v": 1}])
+    cache.get_body("report", "k", compute, None)
+
+    refreshes = []
+    monkeypatch.setattr(cache, "_refresh_in_background", lambda *args: refreshes.append(args[1]))
+    clock.now += 50
+    assert cache.get_body("report", "k", compute, None) == b'{"v":1}'
+    assert refreshes == ["k"]
+    assert len(calls) == 1
+
+    clock.now += 100
+    late, late_calls = _counter([{"v": 2}])
+    assert cache.get_body("report", "k", late, None) == b'{"v":2}'
+
+
+def test_disabled_cache_always_computes(monkeypatch):
+    from settings import settings
+    cache, fake, _ = _cache(monkeypatch)
+    monkeypatch.setattr(settings, "RESPONSE_CACHE_ENABLED", False)
+    compute, calls = _counter([{"v": 1}, {"v": 2}])
+    cache.get_body("rules", "k", compute, None)
+    assert cache.get_body("rules", "k", compute, None) == b'{"v":2}'
+    assert "rc:rules" not in fake.hashes
+
+
+def test_respond_keeps_dependency_headers_and_keys_on_query_and_role(monkeypatch):
+    from types import SimpleNamespace
+    from fastapi import Depends, FastAPI, Request, Response
+    from fastapi.testclient import TestClient
+
+    cache, fake, _ = _cache(monkeypatch)
+    roles = iter(["admin", "admin", "dispatcher"])
+
+    def guard(response: Response):
+        response.headers["ETag"] = 'W/"abc"'
+
+    app = FastAPI()
+
+    @app.get("/rules")
+    def rules(request: Request, response: Response, limit: int = 10, _g: None = Depends(guard)):
+        user = SimpleNamespace(role=next(roles))
+        return cache.respond("rules", request, response, user, lambda db: [{"limit": limit}], None)
+
+    client = TestClient(app)
+    first = client.get("/rules?limit=5")
+    assert first.json() == [{"limit": 5}]
+    assert first.headers["etag"] == 'W/"abc"'
+    assert first.headers["content-type"] == "application/json"
+    client.get("/rules?limit=5")
+    client.get("/rules?limit=5")
+    assert sorted(fake.hashes["rc:rules"]) == ["/rules?limit=5|admin", "/rules?limit=5|dispatcher"]
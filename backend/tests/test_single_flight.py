@@ -0,0 +1,128 @@
+"""Tests for request coalescing (single-flight) of identical concurrent GETs."""
+import os
+import sys
+import threading
+import time
+from datetime import date
+
+CURRENT_DIR = os.path.dirname(__file__)
+BACKEND_ROOT = os.path.abspath(os.path.join(CURRENT_DIR, ".."))
+if BACKEND_ROOT not in sys.path:
+    sys.path.insert(0, BACKEND_ROOT)
+
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+
+import crud
+import models
+from utils.single_flight import SingleFlight, encode_body
+
+
+def _run_together(n, target):
+    barrier = threading.Barrier(n)
+    results = [None] * n
+
+    def run(i):
+        barrier.wait()
+        results[i] = target(i)
+
+    threads = [threading.Thread(target=run, args=(i,)) for i in range(n)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    return results
+
+
+def test_overlapping_calls_share_one_result():
+    flight = SingleFlight(wait_seconds=5)
+    calls = []
+
+    def slow():
+        calls.append(1)
+        time.sleep(0.2)
+        return object()
+
+    results = _run_together(10, lambda i: flight.do("k", slow))
+    assert len(calls) == 1
+    assert len({id(r) for r, _ in results}) == 1
+    assert sorted(shared for _, shared in results) == [False] + [True] * 9
+    assert flight.in_flight() == 0
+
+    # Nothing is kept once the call finished
+    flight.do("k", slow)
+    assert len(calls) == 2
+
+
+def test_leader_error_reaches_waiters_and_different_keys_do_not_coalesce():
+    flight = SingleFlight(wait_seconds=5)
+
+    def boom():
+        time.sleep(0.2)
+        raise ValueError("db down")
+
+    def call(i):
+        try:
+            flight.do("k", boom)
+        except ValueError as e:
+            return str(e)
+
+    assert _run_together(4, call) == ["db down"] * 4
+
+    calls = []
+    _run_together(4, lambda i: flight.do(i, lambda: calls.append(i)))
+    assert len(calls) == 4
+
+
+def test_waiter_stops_waiting_on_a_slow_leader():
+    flight = SingleFlight(wait_seconds=0.05)
+    release = threading.Event()
+    leader = threading.Thread(target=flight.do, args=("k", release.wait))
+    leader.start()
+    while not flight.in_flight():
+        time.sleep(0.01)
+    assert flight.do("k", lambda: "own") == ("own", False)
+    release.set()
+    leader.join()
+
+
+def test_load_daily_board_queries_once_per_overlapping_group(tmp_path):
+    """20 dispatchers opening the same daily board at once run the queries of one load."""
+    engine = create_engine(f"sqlite:///{tmp_path / 'daily.db'}", connect_args={"check_same_thread": False})
+    models.Base.metadata.create_all(engine)
+    Session = sessionmaker(bind=engine)
+    setup = Session()
+    setup.add(models.Site(site_id="S1"))
+    for i in range(30):
+        setup.add(models.Ticket(ticket_id=f"T{i}", site_id="S1", date_created=date(2026, 10, 19),
+                                date_scheduled=date(2026, 10, 19)))
+    setup.commit()
+    setup.close()
+
+    statements = []
+    event.listen(engine, "before_cursor_execute", lambda *args: statements.append(args[2]))
+
+    def load_daily(flight, i):
+        db = Session()
+        try:
+            def compute():
+                body = encode_body(crud.get_daily_tickets(db, date=date(2026, 10, 19)))
+                time.sleep(0.3)  # hold the flight open so every request overlaps it
+                return body
+            return flight.do("daily", compute)[0] if flight else compute()
+        finally:
+            db.close()
+
+    solo = load_daily(None, 0)
+    per_load = len(statements)
+    assert per_load > 0
+
+    statements.clear()
+    uncoalesced = _run_together(20, lambda i: load_daily(None, i))
+    assert len(statements) == 20 * per_load
+
+    statements.clear()
+    flight = SingleFlight(wait_seconds=5)
+    coalesced = _run_together(20, lambda i: load_daily(flight, i))
+    assert len(statements) == per_load
+    assert set(coalesced) == set(uncoalesced) == {solo}
@@ -0,0 +1,85 @@
+"""Tests for the set-based cascading site delete."""
+import os
+import sys
+from datetime import date, datetime
+
+CURRENT_DIR = os.path.dirname(__file__)
+BACKEND_ROOT = os.path.abspath(os.path.join(CURRENT_DIR, ".."))
+if BACKEND_ROOT not in sys.path:
+    sys.path.insert(0, BACKEND_ROOT)
+
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+
+import crud
+import models
+from utils import query_stats
+
+
+def _session():
+    engine = create_engine("sqlite://")
+
+    @event.listens_for(engine, "connect")
+    def _enable_fks(dbapi_connection, connection_record):
+        dbapi_connection.execute("PRAGMA foreign_keys=ON")
+
+    models.Base.metadata.create_all(engine)
+    query_stats.instrument_engine(engine)
+    return sessionmaker(bind=engine)()
+
+
+def _seed(db, tickets: int):
+    db.add_all([models.Site(site_id="S1"), models.Site(site_id="S2"), models.InventoryItem(item_id="I1", name="Router")])
+    db.flush()
+    for i in range(tickets):
+        tid = f"T-{i}"
+        db.add(models.Ticket(ticket_id=tid, site_id="S1", date_created=date(2026, 1, 1)))
+        db.flush()
+        db.add_all([
+            models.TicketComment(comment_id=f"C-{i}", ticket_id=tid, comment="hi"),
+            models.Task(task_id=f"K-{i}", ticket_id=tid, description="do it"),
+            models.TimeEntry(entry_id=f"E-{i}", ticket_id=tid, start_time=datetime(2026, 1, 1)),
+            models.TicketAudit(audit_id=f"A-{i}", ticket_id=tid),
+        ])
+    db.add_all([
+        models.Equipment(equipment_id="EQ1", site_id="S1"),
+        models.Shipment(shipment_id="SH1", site_id="S1", what_is_being_shipped="router"),
+        # Another site's shipment referencing one of S1's tickets keeps existing
+        models.Shipment(shipment_id="SH2", site_id="S2", ticket_id="T-0", what_is_being_shipped="cable"),
+    ])
+    db.flush()
+    db.add(models.ShipmentItem(shipment_item_id="SI1", shipment_id="SH1", item_id="I1", what_is_being_shipped="router"))
+    db.flush()
+    db.add(models.InventoryTransaction(transaction_id="IT1", item_id="I1", shipment_item_id="SI1"))
+    db.commit()
+
+
+def _assert_site_gone(db):
+    assert db.query(models.Site).filter_by(site_id="S1").first() is None
+    for model in (models.Ticket, models.TicketComment, models.Task, models.TimeEntry, models.TicketAudit,
+                  models.Equipment, models.ShipmentItem, models.InventoryTransaction):
+        assert db.query(model).count() == 0, model.__name__
+    assert [s.shipment_id for s in db.query(models.Shipment).all()] == ["SH2"]
+    assert db.query(models.Shipment).filter_by(shipment_id="SH2").one().ticket_id is None
+
+
+def test_delete_site_statement_count_does_not_grow_with_tickets():
+    counts = []
+    for tickets in (3, 30):
+        db = _session()
+        _seed(db, tickets)
+        with query_stats.capture_queries() as stats:
+            result = crud.delete_site(db, "S1")
+        assert result.site_id == "S1"
+        _assert_site_gone(db)
+        counts.append(stats.count)
+    assert counts[0] == counts[1]
+
+
+def test_delete_site_in_chunks():
+    db = _session()
+    _seed(db, 7)
+    assert crud.count_site_tickets(db, "S1") == 7
+    assert crud.delete_site(db, "S1", chunk_size=3).site_id == "S1"
+    _assert_site_gone(db)
+    assert crud.delete_site(db, "S1") is None
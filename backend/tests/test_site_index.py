@@ -0,0 +1,67 @@
+"""Tests for the in-memory site-ID prefix index behind /sites/lookup."""
+import json
+import os
+import sys
+
+CURRENT_DIR = os.path.dirname(__file__)
+BACKEND_ROOT = os.path.abspath(os.path.join(CURRENT_DIR, ".."))
+if BACKEND_ROOT not in sys.path:
+    sys.path.insert(0, BACKEND_ROOT)
+
+import models
+from utils import site_index as site_index_module
+from utils.site_index import SitePrefixIndex, site_row
+
+
+def _rows(*site_ids):
+    return [{"site_id": sid, "location": f"loc {sid}"} for sid in site_ids]
+
+
+def test_lookup_is_none_until_loaded():
+    index = SitePrefixIndex()
+    assert index.lookup("1", 10) is None
+    index.upsert({"site_id": "1001"})
+    assert not index.ready
+    index.load([])
+    assert index.lookup("1", 10) == []
+
+
+def test_prefix_lookup_is_sorted_case_insensitive_and_limited():
+    index = SitePrefixIndex()
+    index.load(_rows("2001", "1002", "ab-7", "1001", "AB-3", "10", "1100"))
+
+    assert [r["site_id"] for r in index.lookup("10", 10)] == ["10", "1001", "1002"]
+    assert [r["site_id"] for r in index.lookup("10", 2)] == ["10", "1001"]
+    assert [r["site_id"] for r in index.lookup("ab", 10)] == ["AB-3", "ab-7"]
+    assert [r["site_id"] for r in index.lookup("Ab-7", 10)] == ["ab-7"]
+    assert index.lookup("3", 10) == []
+    assert len(index.lookup("", 100)) == 7
+
+
+def test_upsert_and_remove_keep_order():
+    index = SitePrefixIndex()
+    index.load(_rows("1001", "1003"))
+    before = index.lookup("1", 10)
+
+    index.upsert({"site_id": "1002", "location": "new"})
+    index.upsert({"site_id": "1001", "location": "moved"})
+    assert [(r["site_id"], r["location"]) for r in index.lookup("100", 10)] == [
+        ("1001", "moved"), ("1002", "new"), ("1003", "loc 1003")]
+    # Earlier snapshots are never mutated (copy-on-write)
+    assert [r["site_id"] for r in before] == ["1001", "1003"]
+
+    index.remove("1002")
+    index.remove("9999")
+    assert [r["site_id"] for r in index.lookup("1", 10)] == ["1001", "1003"]
+
+
+def test_published_changes_apply_on_other_workers(monkeypatch):
+    index = SitePrefixIndex()
+    index.load(_rows("1001"))
+    monkeypatch.setattr(site_index_module, "site_index", index)
+
+    row = site_row(models.Site(site_id="1005", location="Depot", city="Austin"))
+    assert row["location"] == "Depot" and row["notes"] is None
+    site_index_module._apply_message(json.dumps({"op": "upsert", "row": row}))
+    site_index_module._apply_message(json.dumps({"op": "delete", "site_id": "1001"}))
+    assert [r["site_id"] for r in index.lookup("100", 10)] == ["1005"]
@@ -0,0 +1,90 @@
+"""Tests for the site summary aggregates and keyset-paged site collections."""
+import os
+import sys
+from datetime import date, datetime, timedelta
+
+import pytest
+
+CURRENT_DIR = os.path.dirname(__file__)
+BACKEND_ROOT = os.path.abspath(os.path.join(CURRENT_DIR, ".."))
+if BACKEND_ROOT not in sys.path:
+    sys.path.insert(0, BACKEND_ROOT)
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+import crud
+import models
+from utils.pagination import decode_cursor, encode_cursor
+
+
+def _session():
+    engine = create_engine("sqlite://")
+    models.Base.metadata.create_all(engine)
+    return sessionmaker(bind=engine)()
+
+
+def _seed(db):
+    db.add_all([models.Site(site_id="S1", location="Main St"), models.Site(site_id="S2")])
+    base = datetime(2026, 1, 1, 9)
+    statuses = ["open", "open", "in_progress", "closed", "approved"]
+    for i, status in enumerate(statuses):
+        db.add(models.Ticket(
+            ticket_id=f"2026-{i:06d}", site_id="S1", date_created=date(2026, 1, 1),
+            status=models.TicketStatus(status),
+            # Two tickets share created_at so the ticket_id tiebreaker is exercised
+            created_at=base + timedelta(hours=min(i, 3)),
+            check_in_time=base + timedelta(days=i) if status != "open" else None,
+        ))
+    db.add(models.Ticket(ticket_id="2026-900000", site_id="S2", date_created=date(2026, 1, 1), created_at=base))
+    for i, status in enumerate(["pending", "shipped", "shipped"]):
+        db.add(models.Shipment(shipment_id=f"SHIP-{i:06d}", site_id="S1", what_is_being_shipped="router", status=status))
+    db.add(models.Equipment(equipment_id="EQ1", site_id="S1"))
+    db.commit()
+
+
+def test_site_summary_aggregates():
+    db = _session()
+    _seed(db)
+    summary = crud.get_site_summary(db, "S1")
+
+    assert summary["location"] == "Main St"
+    assert summary["ticket_counts"] == {"open": 2, "in_progress": 1, "closed": 1, "approved": 1}
+    assert (summary["total_tickets"], summary["open_tickets"], summary["closed_tickets"]) == (5, 3, 2)
+    assert summary["shipment_counts"] == {"pending": 1, "shipped": 2}
+    assert summary["total_shipments"] == 3
+    assert (summary["equipment_count"], summary["site_equipment_count"]) == (1, 0)
+    assert summary["last_visit_at"] == datetime(2026, 1, 5, 9)
+    assert summary["last_ticket_at"] == datetime(2026, 1, 1, 12)
+    assert crud.get_site_summary(db, "missing") is None
+
+
+def test_site_tickets_keyset_pages_cover_everything_once():
+    db = _session()
+    _seed(db)
+    seen, after = [], None
+    while True:
+        items, cursor = crud.get_site_tickets_page(db, "S1", limit=2, after=after)
+        seen.extend(t.ticket_id for t in items)
+        if cursor is None:
+            break
+        after = decode_cursor(cursor, 2)
+    # Newest first; equal created_at ordered by ticket_id descending
+    assert seen == ["2026-000004", "2026-000003", "2026-000002", "2026-000001", "2026-000000"]
+
+
+def test_site_shipments_keyset_pages():
+    db = _session()
+    _seed(db)
+    first, cursor = crud.get_site_shipments_page(db, "S1", limit=2)
+    assert [s.shipment_id for s in first] == ["SHIP-000002", "SHIP-000001"]
+    rest, cursor2 = crud.get_site_shipments_page(db, "S1", limit=2, after=decode_cursor(cursor, 1))
+    assert [s.shipment_id for s in rest] == ["SHIP-000000"] and cursor2 is None
+
+
+def test_cursor_round_trip_and_validation():
+    values = (datetime(2026, 1, 1, 9, 30), "2026-000001")
+    assert decode_cursor(encode_cursor(values), 2) == values
+    for bad in ("not-base64!!", encode_cursor(["only-one"]), encode_cursor([{"$x": 1}, 1])):
+        with pytest.raises(ValueError):
+            decode_cursor(bad, 2)
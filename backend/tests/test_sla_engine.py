@@ -0,0 +1,87 @@
+"""Tests for the compiled in-memory SLA rule matcher."""
+import os
+import sys
+from datetime import datetime
+from types import SimpleNamespace
+
+CURRENT_DIR = os.path.dirname(__file__)
+BACKEND_ROOT = os.path.abspath(os.path.join(CURRENT_DIR, ".."))
+if BACKEND_ROOT not in sys.path:
+    sys.path.insert(0, BACKEND_ROOT)
+
+import models
+from utils.sla_engine import SLARuleEngine, compile_rules
+
+
+def _rule(rule_id, ticket_type, impact=None, priority=None, target=24, breach=48, active=True, created_at=None):
+    return SimpleNamespace(
+        rule_id=rule_id,
+        name=rule_id,
+        ticket_type=ticket_type,
+        customer_impact=impact,
+        business_priority=priority,
+        sla_target_hours=target,
+        sla_breach_hours=breach,
+        escalation_levels=3,
+        is_active=active,
+        created_at=created_at,
+    )
+
+
+RULES = [
+    _rule("type", models.TicketType.onsite, target=24, breach=48),
+    _rule("impact", models.TicketType.onsite, models.ImpactLevel.high, target=8, breach=16),
+    _rule("exact", models.TicketType.onsite, models.ImpactLevel.high, models.BusinessPriority.urgent, target=2, breach=4),
+    _rule("inactive", models.TicketType.nro, target=1, breach=2, active=False),
+    _rule("untyped", None, models.ImpactLevel.critical, target=1, breach=2),
+]
+
+
+class _Loader:
+    def __init__(self, rules):
+        self.rules = rules
+        self.calls = 0
+
+    def __call__(self, db):
+        self.calls += 1
+        return list(self.rules)
+
+
+def test_most_specific_rule_wins():
+    engine = SLARuleEngine(loader=_Loader(RULES))
+    T, I, P = models.TicketType, models.ImpactLevel, models.BusinessPriority
+
+    assert engine.match(None, T.onsite, I.high, P.urgent).rule_id == "exact"
+    assert engine.match(None, T.onsite, I.high, P.low).rule_id == "impact"
+    assert engine.match(None, T.onsite, I.low, P.urgent).rule_id == "type"
+    # Plain strings resolve the same as enum members
+    assert engine.match(None, "onsite", "high", "urgent").rule_id == "exact"
+    # Inactive and typeless rules never match
+    assert engine.match(None, T.nro, I.high, P.urgent) is None
+    assert engine.match(None, T.inhouse, I.critical, None) is None
+
+
+def test_newest_duplicate_rule_wins():
+    older = _rule("old", models.TicketType.onsite, target=10, created_at=datetime(2024, 1, 1))
+    newer = _rule("new", models.TicketType.onsite, target=12, created_at=datetime(2025, 1, 1))
+    table = compile_rules([newer, older])
+    assert table[("onsite", None, None)].rule_id == "new"
+
+
+def test_table_is_cached_until_invalidated_or_stale():
+    now = [0.0]
+    loader = _Loader(RULES)
+    engine = SLARuleEngine(max_age_seconds=60, loader=loader, clock=lambda: now[0])
+
+    for _ in range(5):
+        engine.match(None, "onsite", "high", "urgent")
+    assert loader.calls == 1
+
+    loader.rules = [_rule("replacement", models.TicketType.onsite, target=5, breach=6)]
+    engine.invalidate()
+    assert engine.match(None, "onsite", "high", "urgent").rule_id == "replacement"
+    assert loader.calls == 2
+
+    now[0] = 61.0
+    engine.match(None, "onsite", None, None)
+    assert loader.calls == 3
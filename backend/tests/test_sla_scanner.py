@@ -0,0 +1,116 @@
+"""Tests for tickets.sla_due_at maintenance and the SLA scanner broadcast."""
+import json
+import os
+import sys
+from datetime import date, datetime, timedelta, timezone
+
+CURRENT_DIR = os.path.dirname(__file__)
+BACKEND_ROOT = os.path.abspath(os.path.join(CURRENT_DIR, ".."))
+if BACKEND_ROOT not in sys.path:
+    sys.path.insert(0, BACKEND_ROOT)
+
+from sqlalchemy import create_engine, update
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.orm import sessionmaker
+
+import models
+from utils.sla_scanner import BROADCAST_MAX_IDS, escalation_message
+
+
+def _session():
+    engine = create_engine("sqlite://")
+    models.Base.metadata.create_all(engine, tables=[models.Ticket.__table__])
+    return sessionmaker(bind=engine)()
+
+
+def test_compute_sla_due_at_thresholds():
+    created = datetime(2026, 1, 1, 12, tzinfo=timezone(timedelta(hours=-5)))
+    utc = datetime(2026, 1, 1, 17)
+    assert models.compute_sla_due_at(created, 4, 8, 0, "open") == utc + timedelta(hours=4)
+    assert models.compute_sla_due_at(created, 4, 8, 1, models.TicketStatus.in_progress) == utc + timedelta(hours=8)
+    assert models.compute_sla_due_at(created, 4, 8, 2, "open") is None
+    # Breach not after target: nothing left once the target is crossed
+    assert models.compute_sla_due_at(created, 8, 8, 1, "open") is None
+    assert models.compute_sla_due_at(created, 4, 8, 0, models.TicketStatus.closed) is None
+    assert models.compute_sla_due_at(None, 4, 8, 0, "open") is None
+
+
+def test_ticket_writes_keep_sla_due_at_current():
+    db = _session()
+    ticket = models.Ticket(
+        ticket_id="T-1", site_id="S-1", type=models.TicketType.onsite, date_created=date(2026, 1, 1),
+        created_at=datetime(2026, 1, 1, 12), sla_target_hours=4, sla_breach_hours=8,
+    )
+    db.add(ticket)
+    db.commit()
+    assert ticket.sla_due_at == datetime(2026, 1, 1, 16)
+
+    ticket.sla_target_hours = 2
+    db.commit()
+    assert ticket.sla_due_at == datetime(2026, 1, 1, 14)
+
+    # Unrelated edits leave it alone (a scanner escalation may have moved it)
+    db.query(models.Ticket).filter_by(ticket_id="T-1").update({"sla_due_at": datetime(2030, 1, 1)})
+    db.commit()
+    db.refresh(ticket)
+    ticket.notes = "called customer"
+    db.commit()
+    assert ticket.sla_due_at == datetime(2030, 1, 1)
+
+    ticket.status = models.TicketStatus.closed
+    db.commit()
+    assert ticket.sla_due_at is None
+
+
+def test_bulk_updates_keep_sla_due_at_current():
+    db = _session()
+    for i in range(4):
+        db.add(models.Ticket(
+            ticket_id=f"T-{i}", site_id="S-1", type=models.TicketType.onsite, date_created=date(2026, 1, 1),
+            created_at=datetime(2026, 1, 1, 12), sla_target_hours=4, sla_breach_hours=8,
+        ))
+    db.commit()
+
+    db.query(models.Ticket).filter_by(ticket_id="T-0").update({"status": models.TicketStatus.closed})
+    db.query(models.Ticket).filter_by(ticket_id="T-1").update(
+        {models.Ticket.escalation_level: models.Ticket.escalation_level + 1}, synchronize_session="evaluate")
+    db.execute(update(models.Ticket).where(models.Ticket.ticket_id == "T-2").values(sla_target_hours=10))
+    db.query(models.Ticket).filter_by(ticket_id="T-3").update({"notes": "unrelated"})
+    db.commit()
+    db.expire_all()
+
+    due = dict(db.query(models.Ticket.ticket_id, models.Ticket.sla_due_at))
+    assert due == {
+        "T-0": None,
+        "T-1": datetime(2026, 1, 1, 20),
+        "T-2": datetime(2026, 1, 1, 22),
+        "T-3": datetime(2026, 1, 1, 16),
+    }
+
+
+def test_sla_due_at_expression_on_postgres():
+    columns = models.Ticket.__table__.c
+    expression = models.sla_due_at_expression(
+        "postgresql", columns.created_at, columns.sla_target_hours, columns.sla_breach_hours,
+        columns.escalation_level, columns.status)
+    sql = str(expression.compile(dialect=postgresql.dialect(), compile_kwargs={"literal_binds": True}))
+    # Same thresholds as compute_sla_due_at and the scanner's UPDATE
+    assert sql == (
+        "CASE WHEN (tickets.created_at IS NULL OR tickets.status IN ('approved', 'archived', 'closed', 'completed')) "
+        "THEN NULL "
+        "WHEN (coalesce(tickets.escalation_level, 0) = 0) "
+        "THEN tickets.created_at + make_interval(0, 0, 0, 0, coalesce(tickets.sla_target_hours, 24)) "
+        "WHEN (coalesce(tickets.escalation_level, 0) = 1 "
+        "AND coalesce(tickets.sla_breach_hours, 48) > coalesce(tickets.sla_target_hours, 24)) "
+        "THEN tickets.created_at + make_interval(0, 0, 0, 0, coalesce(tickets.sla_breach_hours, 48)) END"
+    )
+    assert models.sla_due_at_expression("mysql", *[None] * 5) is None
+
+
+def test_escalation_message_is_coalesced():
+    escalated = {f"T-{i}": 1 + (i % 2) for i in range(BROADCAST_MAX_IDS + 50)}
+    message = json.loads(escalation_message(escalated))
+    assert message["type"] == "sla" and message["action"] == "escalated"
+    assert message["count"] == BROADCAST_MAX_IDS + 50
+    assert message["levels"] == {"1": 125, "2": 125}
+    assert len(message["ticket_ids"]) == BROADCAST_MAX_IDS
@@ -243,10 +243,13 @@ def test_nro_phase_transition_fields(auth_headers, ensure_test_site, test_site_i
     assert d3.get("nro_phase2_state") == "scheduled"
 
 
-def test_workflow_summary_report(auth_headers):
+def test_workflow_summary_report(auth_headers, query_budget):
     """Workflow summary report should return operational metrics for admin/dispatcher."""
-    resp = client.get("/tickets/reports/workflow-summary?lookback_days=30&onsite_alert_minutes=120", headers=auth_headers)
+    # Constant query count regardless of tickets/time entries (no per-row user loads)
+    with query_budget(5):
+        resp = client.get("/tickets/reports/workflow-summary?lookback_days=30&onsite_alert_minutes=120", headers=auth_headers)
     assert resp.status_code == 200, resp.text
+    assert int(resp.headers["X-DB-Queries"]) <= 5
     data = resp.json()
     assert "status_counts" in data
     assert "workflow_state_counts" in data
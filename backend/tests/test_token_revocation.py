@@ -0,0 +1,152 @@
+"""Tests for JWT revocation (Bloom filter + LRU in front of revoked_tokens)."""
+import os
+import sys
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+
+CURRENT_DIR = os.path.dirname(__file__)
+BACKEND_ROOT = os.path.abspath(os.path.join(CURRENT_DIR, ".."))
+if BACKEND_ROOT not in sys.path:
+    sys.path.insert(0, BACKEND_ROOT)
+
+from jose import jwt
+from sqlalchemy import create_engine, select
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+import models
+from utils import token_revocation
+from utils.auth import ALGORITHM, SECRET_KEY
+from utils.main_utils import create_access_token
+from utils.token_revocation import BloomFilter, RevocationList, RevokedJTI, revoked_from_payload
+
+
+def _session():
+    engine = create_engine("sqlite://")
+    models.Base.metadata.create_all(engine, tables=[models.User.__table__, models.RevokedToken.__table__])
+    return sessionmaker(bind=engine)()
+
+
+class _NoDB:
+    """Fails the test if the revocation check touches the database."""
+
+    def get(self, *args, **kwargs):
+        raise AssertionError("unexpected database lookup")
+
+
+def _revoked(db, jti, expires_in=timedelta(hours=1)):
+    db.add(models.RevokedToken(jti=jti, user_id="u1", token_type="access",
+                               expires_at=datetime.now(timezone.utc) + expires_in))
+    db.commit()
+
+
+def test_bloom_filter_has_no_false_negatives():
+    bloom = BloomFilter(1000, 0.001)
+    keys = [f"jti-{i}" for i in range(1000)]
+    for key in keys:
+        bloom.add(key)
+    assert all(key in bloom for key in keys)
+    false_positives = sum(f"other-{i}" in bloom for i in range(10000))
+    assert false_positives < 50
+
+
+def test_checks_go_to_the_database_until_loaded():
+    db = _session()
+    _revoked(db, "old")
+    revocations = RevocationList(capacity=100, error_rate=0.01, lru_size=10)
+    assert not revocations.loaded
+    assert revocations.is_revoked("old", db)
+    assert not revocations.is_revoked("fresh", db)
+
+
+def test_loaded_list_answers_without_the_database():
+    db = _session()
+    _revoked(db, "old")
+    revocations = RevocationList(capacity=100, error_rate=0.01, lru_size=10)
+    revocations.reload(db)
+
+    assert not revocations.is_revoked("fresh", _NoDB())
+    assert revocations.is_revoked("old", db)  # filter hit, not in the LRU yet: one lookup
+    assert revocations.is_revoked("old", _NoDB())  # then served from the LRU
+    assert not revocations.is_revoked(None, _NoDB())
+
+    revocations.add("new", datetime.now(timezone.utc).timestamp() + 60)
+    assert revocations.is_revoked("new", _NoDB())
+
+
+def test_reload_with_purge_deletes_expired_rows():
+    db = _session()
+    _revoked(db, "expired", expires_in=timedelta(hours=-1))
+    _revoked(db, "live")
+    revocations = RevocationList(capacity=100, error_rate=0.01, lru_size=10)
+    revocations.reload(db, purge=True)
+    assert db.execute(select(models.RevokedToken.jti)).scalars().all() == ["live"]
+    assert revocations.is_revoked("live", db)
+
+
+def test_revoke_persists_and_applies_locally(monkeypatch):
+    db = _session()
+    revocations = RevocationList(capacity=100, error_rate=0.01, lru_size=10)
+    revocations.reload(db)
+    monkeypatch.setattr(token_revocation, "revocation_list", revocations)
+
+    token = create_access_token({"sub": "u1", "role": "admin"})
+    payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+    assert payload["jti"]
+    revoked = revoked_from_payload(payload)
+    assert revoked == RevokedJTI(payload["jti"], "u1", "access", revoked.expires_at)
+
+    token_revocation.revoke(db, [revoked])
+    assert db.get(models.RevokedToken, payload["jti"]).reason == "logout"
+    assert revocations.is_revoked(payload["jti"], _NoDB())
+    assert revoked_from_payload({"sub": "u1", "exp": 0}) is None
+
+
+def test_before_load_false_skips_the_database():
+    revocations = RevocationList(capacity=100, error_rate=0.01, lru_size=10)
+    assert not revocations.is_revoked("anything", _NoDB(), before_load=False)
+
+
+def test_overlapping_reloads_keep_revocations_made_meanwhile():
+    engine = create_engine("sqlite://", poolclass=StaticPool, connect_args={"check_same_thread": False})
+    models.Base.metadata.create_all(engine, tables=[models.User.__table__, models.RevokedToken.__table__])
+    Session = sessionmaker(bind=engine)
+    revocations = RevocationList(capacity=100, error_rate=0.01, lru_size=10)
+    selected, release = threading.Event(), threading.Event()
+    errors = []
+
+    class _SlowSession:
+        """Reads the table now, returns the rows only once released (a slow rebuild)."""
+
+        def __init__(self):
+            self._db = Session()
+
+        def execute(self, *args, **kwargs):
+            frozen = self._db.execute(*args, **kwargs).freeze()
+            selected.set()
+            release.wait(5)
+            return frozen()
+
+    def reload(db):
+        try:
+            revocations.reload(db)
+        except Exception as e:
+            errors.append(e)
+
+    slow = threading.Thread(target=reload, args=(_SlowSession(),))
+    slow.start()
+    assert selected.wait(5)
+    second = threading.Thread(target=reload, args=(Session(),))
+    second.start()
+    time.sleep(0.05)
+
+    # Revoked elsewhere after the slow rebuild read the table, while both rebuilds are in flight
+    _revoked(Session(), "meanwhile")
+    revocations.add("meanwhile", datetime.now(timezone.utc).timestamp() + 60)
+    release.set()
+    slow.join(5)
+    second.join(5)
+
+    assert errors == []
+    assert "meanwhile" in revocations._bloom
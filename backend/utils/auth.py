@@ -15,6 +15,7 @@ from sqlalchemy.orm import Session
 import models
 import crud
 from database import get_db
+from utils.token_revocation import revocation_list
 
 # Security configuration - must come from .env; no default
 SECRET_KEY = os.getenv("SECRET_KEY")
@@ -56,6 +57,10 @@ def get_current_user(token: str = Depends(oauth2_scheme), db: Session = Depends(
         logger.exception("get_current_user: error %s", e)
         raise HTTPException(status_code=401, detail=f"Authentication error: {str(e)}")
     
+    if revocation_list.is_revoked(payload.get("jti"), db):
+        logger.info("get_current_user: token revoked")
+        raise HTTPException(status_code=401, detail="Token revoked")
+
     user = crud.get_user(db, user_id=user_id)
     if user is None:
         logger.warning("get_current_user: user not found for user_id=%s", user_id)
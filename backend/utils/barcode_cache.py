@@ -0,0 +1,147 @@
+"""
+Per-worker barcode -> inventory item cache for the scan endpoints.
+
+Entries are plain dicts of the item's column values, kept in an LRU bounded by
+`BARCODE_CACHE_MAX_ENTRIES` and expiring after `BARCODE_CACHE_TTL_SECONDS`. Only
+barcodes that resolved to an item are cached, so a newly created item is found on
+its first scan.
+
+Every inventory write (item create/update/delete, shipment decrements, scan
+adjustments) calls `notify_inventory_changed()` after commit. That evicts the
+items on this worker and publishes on `BARCODE_CACHE_CHANNEL` so other workers
+evict them too; the TTL bounds staleness if a message is missed.
+"""
+import json
+import logging
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+logger = logging.getLogger("ticketing")
+
+BARCODE_CACHE_CHANNEL = "inventory_barcodes_changed"
+
+
+class BarcodeCache:
+    def __init__(self, ttl_seconds: Optional[float] = None, max_entries: Optional[int] = None,
+                 clock: Callable[[], float] = time.monotonic):
+        self._ttl_seconds = ttl_seconds
+        self._max_entries = max_entries
+        self._clock = clock
+        self._entries: "OrderedDict[str, Tuple[float, Dict[str, Any]]]" = OrderedDict()
+        self._barcode_by_item: Dict[str, str] = {}
+        self._generation = 0
+        self._lock = threading.Lock()
+
+    @property
+    def ttl_seconds(self) -> float:
+        if self._ttl_seconds is not None:
+            return self._ttl_seconds
+        from settings import settings
+        return settings.BARCODE_CACHE_TTL_SECONDS
+
+    @property
+    def max_entries(self) -> int:
+        if self._max_entries is not None:
+            return self._max_entries
+        from settings import settings
+        return settings.BARCODE_CACHE_MAX_ENTRIES
+
+    def __len__(self):
+        return len(self._entries)
+
+    @property
+    def generation(self) -> int:
+        """Bumped by every invalidation; read it before a DB lookup and pass it to `put`."""
+        return self._generation
+
+    def get_many(self, barcodes: Iterable[str]) -> Tuple[Dict[str, Dict[str, Any]], List[str]]:
+        """Split `barcodes` into (cached rows by barcode, barcodes to look up)."""
+        now = self._clock()
+        found, missing = {}, []
+        with self._lock:
+            for barcode in barcodes:
+                entry = self._entries.get(barcode)
+                if entry is not None and entry[0] > now:
+                    self._entries.move_to_end(barcode)
+                    found[barcode] = entry[1]
+                    continue
+                if entry is not None:
+                    self._drop(barcode)
+                missing.append(barcode)
+        return found, missing
+
+    def put(self, barcode: str, row: Dict[str, Any], generation: Optional[int] = None):
+        """Cache `row`, unless an invalidation ran since `generation` was read (it may be stale)."""
+        with self._lock:
+            if generation is not None and generation != self._generation:
+                return
+            self._drop(barcode)
+            self._entries[barcode] = (self._clock() + self.ttl_seconds, row)
+            self._barcode_by_item[row["item_id"]] = barcode
+            while len(self._entries) > self.max_entries:
+                self._drop(next(iter(self._entries)))
+
+    def invalidate(self, item_ids: Iterable[str] = (), barcodes: Iterable[str] = ()):
+        with self._lock:
+            self._generation += 1
+            for item_id in item_ids:
+                barcode = self._barcode_by_item.get(item_id)
+                if barcode is not None:
+                    self._drop(barcode)
+            for barcode in barcodes:
+                self._drop(barcode)
+
+    def clear(self):
+        with self._lock:
+            self._generation += 1
+            self._entries.clear()
+            self._barcode_by_item.clear()
+
+    def _drop(self, barcode: str):
+        entry = self._entries.pop(barcode, None)
+        if entry is not None and self._barcode_by_item.get(entry[1]["item_id"]) == barcode:
+            del self._barcode_by_item[entry[1]["item_id"]]
+
+
+def item_row(item) -> Dict[str, Any]:
+    """Column values of an InventoryItem (what /inventory/scan returns)."""
+    return {column.key: getattr(item, column.key) for column in item.__table__.columns}
+
+
+def _apply_message(data: str):
+    message = json.loads(data)
+    barcode_cache.invalidate(message.get("item_ids") or (), message.get("barcodes") or ())
+
+
+def notify_inventory_changed(item_ids: Iterable[str] = (), barcodes: Iterable[str] = ()):
+    """Evict items from every worker's barcode cache; call after the write commits."""
+    item_ids = [i for i in item_ids if i]
+    barcodes = [b for b in barcodes if b]
+    if not item_ids and not barcodes:
+        return
+    barcode_cache.invalidate(item_ids, barcodes)
+    from utils.redis_manager import redis_manager
+    client = redis_manager.get_sync()
+    if not client:
+        return
+    try:
+        client.publish(BARCODE_CACHE_CHANNEL, json.dumps({"item_ids": item_ids, "barcodes": barcodes}))
+    except Exception as e:
+        logger.warning("Barcode cache invalidation publish failed: %s", e)
+        redis_manager.record_failure(e)
+
+
+async def barcode_cache_listener():
+    """Apply barcode cache evictions published by other workers.
+
+    The cache is cleared on every (re)subscribe, since evictions published while
+    disconnected were missed.
+    """
+    from utils.redis_manager import listen_channel, redis_manager
+    await listen_channel(redis_manager, BARCODE_CACHE_CHANNEL, on_message=_apply_message,
+                         on_subscribe=barcode_cache.clear)
+
+
+barcode_cache = BarcodeCache()
@@ -0,0 +1,227 @@
+"""
+Cross-worker WebSocket broadcasts over pluggable backends.
+
+Each worker runs one listener per backend and hands every message it receives to
+its own sockets (`Broadcaster.run(deliver)`). `Broadcaster.publish` offers a
+message to the backends in `BROADCAST_BACKENDS` order; the first one that
+accepts it carries it to every worker, including the publisher. Only when no
+backend accepts it does the publisher deliver it to its own sockets
+(transport "local").
+
+* `RedisBroadcastBackend`: the `websocket_updates` pubsub channel.
+* `PostgresBroadcastBackend`: `pg_notify` on `BROADCAST_PG_CHANNEL`, with one
+  dedicated LISTEN connection per worker (outside the pool). It takes over
+  while Redis is down or absent, so workers stay in sync with only the database.
+  LISTEN needs the psycopg2 driver; with any other driver the backend logs once
+  and stays off.
+"""
+import abc
+import asyncio
+import logging
+from typing import Awaitable, Callable, List, Optional
+
+from sqlalchemy import text
+
+from utils.redis_manager import listen_channel, redis_manager
+
+logger = logging.getLogger("ticketing")
+
+REDIS_CHANNEL = "websocket_updates"
+# Postgres rejects NOTIFY payloads of 8000 bytes or more
+PG_MAX_PAYLOAD_BYTES = 7999
+
+
+class BroadcastBackend(abc.ABC):
+    """A transport that carries a message to every worker's `listen` loop."""
+
+    name = "local"
+
+    @abc.abstractmethod
+    async def publish(self, message: str) -> bool:
+        """Send `message` to all workers; False if this backend can't take it right now."""
+
+    @abc.abstractmethod
+    async def listen(self, on_message: Callable[[str], None]):
+        """Call `on_message(message)` for every published message until cancelled."""
+
+
+class RedisBroadcastBackend(BroadcastBackend):
+    name = "redis"
+
+    def __init__(self, manager=redis_manager, channel: str = REDIS_CHANNEL):
+        self._manager = manager
+        self._channel = channel
+
+    async def publish(self, message: str) -> bool:
+        client = await self._manager.get_async()
+        if not client:
+            return False
+        try:
+            await client.publish(self._channel, message)
+            return True
+        except Exception as e:
+            logger.warning("Redis publish failed: %s", e)
+            self._manager.record_failure(e)
+            return False
+
+    async def listen(self, on_message: Callable[[str], None]):
+        await listen_channel(self._manager, self._channel, on_message=on_message)
+
+
+class PostgresBroadcastBackend(BroadcastBackend):
+    name = "postgres"
+
+    def __init__(self, engine=None, channel: Optional[str] = None, retry_seconds: float = 5.0):
+        if engine is None:
+            from database import engine
+        if channel is None:
+            from settings import settings
+            channel = settings.BROADCAST_PG_CHANNEL
+        self._engine = engine
+        self._channel = channel
+        self._retry_seconds = retry_seconds
+        self._usable: Optional[bool] = None
+
+    @property
+    def available(self) -> bool:
+        """LISTEN/NOTIFY needs Postgres; with SQLite (local dev) this backend stays idle."""
+        if self._usable is None:
+            self._usable = self._check_driver()
+        return self._usable
+
+    def _check_driver(self) -> bool:
+        """Checked once: without a LISTEN connection this worker would miss its own broadcasts."""
+        if self._engine.dialect.name != "postgresql":
+            return False
+        if self._engine.dialect.driver != "psycopg2":
+            logger.warning("Postgres broadcast backend disabled: LISTEN needs psycopg2, DATABASE_URL uses %s",
+                           self._engine.dialect.driver)
+            return False
+        try:
+            import psycopg2.extensions  # noqa: F401
+        except ImportError as e:
+            logger.warning("Postgres broadcast backend disabled: %s", e)
+            return False
+        return True
+
+    def _notify(self, message: str):
+        with self._engine.begin() as conn:
+            conn.execute(text("SELECT pg_notify(:channel, :payload)"),
+                         {"channel": self._channel, "payload": message})
+
+    async def publish(self, message: str) -> bool:
+        if not self.available:
+            return False
+        if len(message.encode()) > PG_MAX_PAYLOAD_BYTES:
+            logger.warning("Broadcast of %d bytes is too large for NOTIFY", len(message.encode()))
+            return False
+        try:
+            await asyncio.get_running_loop().run_in_executor(None, self._notify, message)
+            return True
+        except Exception as e:
+            logger.warning("Postgres NOTIFY failed: %s", e)
+            return False
+
+    def _connect(self):
+        """A LISTEN connection of its own: holding a pooled one forever would shrink the pool."""
+        import psycopg2
+        import psycopg2.extensions
+
+        cargs, cparams = self._engine.dialect.create_connect_args(self._engine.url)
+        # TCP keepalives notice a dead server; an idle LISTEN connection never reads otherwise
+        conn = psycopg2.connect(*cargs, **cparams, keepalives=1, keepalives_idle=30,
+                                keepalives_interval=10, keepalives_count=3)
+        conn.set_isolation_level(psycopg2.extensions.ISOLATION_LEVEL_AUTOCOMMIT)
+        with conn.cursor() as cur:
+            cur.execute(f'LISTEN "{self._channel}"')
+        return conn
+
+    async def listen(self, on_message: Callable[[str], None]):
+        if not self.available:
+            return
+        loop = asyncio.get_running_loop()
+        while True:
+            conn = None
+            try:
+                conn = await loop.run_in_executor(None, self._connect)
+                lost = loop.create_future()
+
+                def _readable():
+                    try:
+                        conn.poll()
+                    except Exception as e:
+                        if not lost.done():
+                            lost.set_exception(e)
+                        return
+                    while conn.notifies:
+                        notify = conn.notifies.pop(0)
+                        try:
+                            on_message(notify.payload)
+                        except Exception as e:
+                            logger.warning("Handler for Postgres channel %s failed: %s", self._channel, e)
+
+                fd = conn.fileno()
+                loop.add_reader(fd, _readable)
+                try:
+                    await lost
+                finally:
+                    loop.remove_reader(fd)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning("Postgres channel %s listener lost connection: %s", self._channel, e)
+            finally:
+                if conn is not None:
+                    try:
+                        conn.close()
+                    except Exception:
+                        pass
+            await asyncio.sleep(self._retry_seconds)
+
+
+class Broadcaster:
+    def __init__(self, backends: List[BroadcastBackend]):
+        self.backends = backends
+
+    async def publish(self, message: str) -> str:
+        """Publish on the first backend that accepts `message`; returns its name, or "local" if none did."""
+        for backend in self.backends:
+            if await backend.publish(message):
+                return backend.name
+        return "local"
+
+    async def run(self, deliver: Callable[[str], Awaitable[None]]):
+        """Listen on every backend and pass messages to `deliver`, in arrival order, until cancelled."""
+        queue: "asyncio.Queue[str]" = asyncio.Queue()
+        listeners = [asyncio.create_task(b.listen(queue.put_nowait)) for b in self.backends]
+        try:
+            while True:
+                message = await queue.get()
+                try:
+                    await deliver(message)
+                except Exception as e:
+                    logger.warning("Broadcast delivery failed: %s", e)
+        finally:
+            for task in listeners:
+                task.cancel()
+
+
+def build_backends(names: str) -> List[BroadcastBackend]:
+    """Backends for a comma-separated `BROADCAST_BACKENDS` value, in order."""
+    factories = {"redis": RedisBroadcastBackend, "postgres": PostgresBroadcastBackend}
+    backends = []
+    for name in (n.strip().lower() for n in names.split(",")):
+        if not name:
+            continue
+        if name not in factories:
+            raise ValueError(f"Unknown broadcast backend: {name}")
+        backends.append(factories[name]())
+    return backends
+
+
+def _build_broadcaster() -> Broadcaster:
+    from settings import settings
+    return Broadcaster(build_backends(settings.BROADCAST_BACKENDS))
+
+
+broadcaster = _build_broadcaster()
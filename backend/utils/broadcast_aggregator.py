@@ -0,0 +1,162 @@
+"""
+Coalescing of WebSocket broadcasts per topic, with a per-worker rate bound.
+
+Bulk endpoints and CSV imports emit bursts of near-identical
+`{"type": "ticket", "action": ...}` messages. Each one used to go out on
+its own, and each one made every client refetch. Now `submit` parks a message under
+its topic (`type`) for `BROADCAST_BATCH_WINDOW_MS`. Within the window:
+
+* messages about the same entity (same `*_id` fields) replace each other, and
+  identical id-less messages collapse into one;
+* if a single distinct message remains it is published unchanged, otherwise
+  one batch is sent:
+  `{"type": "ticket", "action": "batch", "count": 37, "events": [{"action": ...}, ...]}`.
+  `events` keeps at most `BROADCAST_BATCH_MAX_EVENTS` entries and sets
+  `"truncated": true` beyond that; `count` is always exact.
+
+At most `BROADCAST_MAX_PER_SECOND` messages leave the worker per second (token
+bucket, one second of burst). Under pressure, due batches wait and keep absorbing
+new events, so a sustained flood turns into fewer, larger batches rather than
+a backlog.
+
+Clients that only look at `type` (NotificationProvider refreshes by type) need
+no change: a batch triggers one refresh instead of `count` of them.
+"""
+import asyncio
+import json
+import logging
+import time
+from typing import Awaitable, Callable, Dict, Optional
+
+from utils import metrics
+
+logger = logging.getLogger("ticketing")
+
+BROADCAST_EVENTS_COALESCED = metrics.registry.counter(
+    "ticketing_broadcast_events_coalesced",
+    "Broadcast events folded into another message (deduplicated or batched) instead of sent on their own.")
+BROADCAST_RATE_LIMITED = metrics.registry.counter(
+    "ticketing_broadcast_rate_limited", "Times a due broadcast waited for the per-worker outbound rate limit.")
+
+
+def entity_key(event: dict) -> str:
+    """Events with the same key describe the same entity; the later one replaces the earlier."""
+    ids = sorted((k, str(v)) for k, v in event.items() if k.endswith("_id") and v is not None)
+    if ids:
+        return json.dumps(ids)
+    return json.dumps(event, sort_keys=True, default=str)
+
+
+class _Batch:
+    def __init__(self, topic: str, due: float, max_events: int):
+        self.topic = topic
+        self.due = due
+        self.max_events = max_events
+        self.count = 0
+        self.truncated = False
+        self.events: Dict[str, dict] = {}
+
+    def add(self, event: dict):
+        self.count += 1
+        key = entity_key(event)
+        if key in self.events or len(self.events) < self.max_events:
+            self.events[key] = event
+        else:
+            self.truncated = True
+
+    def message(self) -> str:
+        if len(self.events) == 1 and not self.truncated:
+            return json.dumps(next(iter(self.events.values())), default=str)
+        batch = {
+            "type": self.topic,
+            "action": "batch",
+            "count": self.count,
+            "events": [{k: v for k, v in e.items() if k != "type"} for e in self.events.values()],
+        }
+        if self.truncated:
+            batch["truncated"] = True
+        return json.dumps(batch, default=str)
+
+
+class BroadcastAggregator:
+    def __init__(self, window_seconds: Optional[float] = None, max_events: Optional[int] = None,
+                 max_per_second: Optional[float] = None, clock: Callable[[], float] = time.monotonic):
+        from settings import settings
+        self.window_seconds = (settings.BROADCAST_BATCH_WINDOW_MS / 1000.0
+                               if window_seconds is None else window_seconds)
+        self.max_events = settings.BROADCAST_BATCH_MAX_EVENTS if max_events is None else max_events
+        self.max_per_second = settings.BROADCAST_MAX_PER_SECOND if max_per_second is None else max_per_second
+        self._clock = clock
+        # Insertion order is due order: every batch waits the same window
+        self._pending: Dict[str, _Batch] = {}
+        self._wakeup: Optional[asyncio.Event] = None
+        self._tokens = float(self.max_per_second)
+        self._refilled = clock()
+
+    @property
+    def running(self) -> bool:
+        return self._wakeup is not None
+
+    def submit(self, message: str) -> bool:
+        """Queue `message` for its topic's next batch.
+
+        False when it was not queued (aggregation off, `run` not started, or not
+        a JSON object with a `type`); the caller then publishes it directly.
+        """
+        if not self.running or self.window_seconds <= 0:
+            return False
+        try:
+            event = json.loads(message)
+            topic = event["type"]
+        except (ValueError, TypeError, KeyError):
+            return False
+        batch = self._pending.get(topic)
+        if batch is None:
+            batch = self._pending[topic] = _Batch(topic, self._clock() + self.window_seconds, self.max_events)
+            self._wakeup.set()
+        batch.add(event)
+        return True
+
+    def _wait_for_token(self) -> float:
+        """Seconds until one outbound message is allowed; takes the token when that is 0."""
+        if self.max_per_second <= 0:
+            return 0.0
+        now = self._clock()
+        self._tokens = min(float(self.max_per_second), self._tokens + (now - self._refilled) * self.max_per_second)
+        self._refilled = now
+        if self._tokens >= 1:
+            self._tokens -= 1
+            return 0.0
+        return (1 - self._tokens) / self.max_per_second
+
+    async def run(self, publish: Callable[[str], Awaitable[None]]):
+        """Publish each batch via `publish` once its window has passed, within the rate limit."""
+        self._wakeup = asyncio.Event()
+        try:
+            while True:
+                if not self._pending:
+                    self._wakeup.clear()
+                    await self._wakeup.wait()
+                    continue
+                batch = next(iter(self._pending.values()))
+                delay = batch.due - self._clock()
+                if delay <= 0:
+                    delay = self._wait_for_token()
+                    if delay > 0:
+                        BROADCAST_RATE_LIMITED.inc()
+                if delay > 0:
+                    await asyncio.sleep(delay)
+                    continue
+                del self._pending[batch.topic]
+                if batch.count > 1:
+                    BROADCAST_EVENTS_COALESCED.inc(batch.count - 1)
+                try:
+                    await publish(batch.message())
+                except Exception as e:
+                    logger.warning("Broadcast of %s batch failed: %s", batch.topic, e)
+        finally:
+            self._wakeup = None
+            self._pending.clear()
+
+
+broadcast_aggregator = BroadcastAggregator()
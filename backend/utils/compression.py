@@ -0,0 +1,200 @@
+"""
+Pure ASGI response compression with gzip, Brotli and zstd negotiation.
+
+Replaces Starlette's GZipMiddleware, which compresses every body over 500 bytes
+with gzip level 9 regardless of content type. Here:
+
+* Only content types in `COMPRESSION_CONTENT_TYPES` are compressed (`text/*`
+  style prefixes allowed); images, archives, event streams and responses that
+  already carry a Content-Encoding or `Cache-Control: no-transform` pass through.
+* The encoding is chosen from Accept-Encoding by q-value, ties going to the
+  server preference zstd > br > gzip. Brotli and zstd are used only when the
+  optional `brotli` / `zstandard` packages are installed; gzip always works.
+* Levels are tunable (`COMPRESSION_GZIP_LEVEL`, `COMPRESSION_BROTLI_QUALITY`,
+  `COMPRESSION_ZSTD_LEVEL`). The defaults favour CPU over ratio: JSON compresses
+  well at low levels and the top levels cost several times more per byte.
+* Streaming responses are compressed chunk by chunk with a sync flush, so each
+  chunk reaches the client when the app sends it.
+"""
+import zlib
+from typing import Callable, Dict, List, Optional, Sequence
+
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+try:
+    import brotli
+except ImportError:  # optional dependency
+    brotli = None
+
+try:
+    import zstandard
+except ImportError:  # optional dependency
+    zstandard = None
+
+
+class _Gzip:
+    def __init__(self, level: int):
+        self._z = zlib.compressobj(level, zlib.DEFLATED, 31)
+
+    def chunk(self, data: bytes) -> bytes:
+        return self._z.compress(data) + self._z.flush(zlib.Z_SYNC_FLUSH)
+
+    def finish(self, data: bytes = b"") -> bytes:
+        return self._z.compress(data) + self._z.flush()
+
+
+class _Brotli:
+    def __init__(self, quality: int):
+        self._c = brotli.Compressor(quality=quality)
+
+    def chunk(self, data: bytes) -> bytes:
+        return self._c.process(data) + self._c.flush()
+
+    def finish(self, data: bytes = b"") -> bytes:
+        return self._c.process(data) + self._c.finish()
+
+
+class _Zstd:
+    def __init__(self, level: int):
+        self._c = zstandard.ZstdCompressor(level=level).compressobj()
+
+    def chunk(self, data: bytes) -> bytes:
+        return self._c.compress(data) + self._c.flush(zstandard.COMPRESSOBJ_FLUSH_BLOCK)
+
+    def finish(self, data: bytes = b"") -> bytes:
+        return self._c.compress(data) + self._c.flush()
+
+
+def available_encodings() -> List[str]:
+    """Supported encodings in server preference order."""
+    return [name for name, module in (("zstd", zstandard), ("br", brotli), ("gzip", zlib)) if module is not None]
+
+
+def negotiate(accept_encoding: str, available: Sequence[str]) -> Optional[str]:
+    """Best of `available` for an Accept-Encoding header (None: send identity)."""
+    weights: Dict[str, float] = {}
+    for part in accept_encoding.split(","):
+        name, _, params = part.strip().partition(";")
+        name = name.strip().lower()
+        if not name:
+            continue
+        q = 1.0
+        for param in params.split(";"):
+            key, _, value = param.strip().partition("=")
+            if key.strip().lower() == "q":
+                try:
+                    q = float(value)
+                except ValueError:
+                    q = 0.0
+        weights[name] = q
+    best, best_q = None, 0.0
+    for name in available:
+        q = weights.get(name, weights.get("*", 0.0))
+        if q > best_q:
+            best, best_q = name, q
+    return best
+
+
+def _content_type_allowed(content_type: str, allowlist: Sequence[str]) -> bool:
+    media_type = content_type.split(";", 1)[0].strip().lower()
+    if not media_type:
+        return False
+    for allowed in allowlist:
+        if allowed.endswith("/*") and media_type.startswith(allowed[:-1]):
+            return True
+        if media_type == allowed:
+            return True
+    return False
+
+
+class CompressionMiddleware:
+    def __init__(
+        self,
+        app: ASGIApp,
+        minimum_size: int = 500,
+        content_types: Sequence[str] = ("application/json", "text/*"),
+        gzip_level: int = 6,
+        brotli_quality: int = 4,
+        zstd_level: int = 3,
+        encodings: Optional[Sequence[str]] = None,
+    ):
+        self.app = app
+        self.minimum_size = minimum_size
+        self.content_types = [c.lower() for c in content_types]
+        self.encodings = list(encodings) if encodings is not None else available_encodings()
+        self._factories: Dict[str, Callable[[], object]] = {
+            "gzip": lambda: _Gzip(gzip_level),
+            "br": lambda: _Brotli(brotli_quality),
+            "zstd": lambda: _Zstd(zstd_level),
+        }
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        encoding = negotiate(Headers(scope=scope).get("accept-encoding", ""), self.encodings)
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+        await _Responder(self, encoding, send).run(scope, receive)
+
+
+class _Responder:
+    def __init__(self, middleware: CompressionMiddleware, encoding: str, send: Send):
+        self.middleware = middleware
+        self.encoding = encoding
+        self.send = send
+        self.start: Optional[Message] = None
+        self.compressor = None
+        self.passthrough = False
+
+    async def run(self, scope: Scope, receive: Receive):
+        await self.middleware.app(scope, receive, self.wrapped_send)
+
+    def _eligible(self, headers: Headers) -> bool:
+        if "content-encoding" in headers:
+            return False
+        if "no-transform" in headers.get("cache-control", "").lower():
+            return False
+        return _content_type_allowed(headers.get("content-type", ""), self.middleware.content_types)
+
+    async def wrapped_send(self, message: Message) -> None:
+        if message["type"] == "http.response.start":
+            # Held back until the first body chunk decides whether to compress
+            self.start = message
+            self.passthrough = not self._eligible(Headers(raw=message["headers"]))
+            return
+        if message["type"] != "http.response.body":
+            await self.send(message)
+            return
+        if self.start is not None:
+            await self._send_first(message)
+        elif self.compressor is not None:
+            more_body = message.get("more_body", False)
+            body = message.get("body", b"")
+            out = self.compressor.chunk(body) if more_body else self.compressor.finish(body)
+            await self.send({"type": "http.response.body", "body": out, "more_body": more_body})
+        else:
+            await self.send(message)
+
+    async def _send_first(self, message: Message) -> None:
+        start, self.start = self.start, None
+        body = message.get("body", b"")
+        more_body = message.get("more_body", False)
+        if self.passthrough or (not more_body and len(body) < self.middleware.minimum_size):
+            await self.send(start)
+            await self.send(message)
+            return
+
+        self.compressor = self.middleware._factories[self.encoding]()
+        out = self.compressor.chunk(body) if more_body else self.compressor.finish(body)
+        headers = MutableHeaders(raw=start["headers"])
+        headers.add_vary_header("Accept-Encoding")
+        headers["Content-Encoding"] = self.encoding
+        if more_body:
+            del headers["Content-Length"]
+        else:
+            headers["Content-Length"] = str(len(out))
+        await self.send(start)
+        await self.send({"type": "http.response.body", "body": out, "more_body": more_body})
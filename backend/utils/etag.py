@@ -0,0 +1,193 @@
+"""
+Conditional GET (ETag / If-None-Match, Last-Modified / If-Modified-Since).
+
+Validators come from per-table change counters, not from the response body:
+
+* `track_table_changes(session_factory)` hooks SQLAlchemy so every commit that
+  wrote a table (ORM flushes and bulk/Core UPDATE/DELETE/INSERT run through the
+  session) bumps that table's counter in Redis (`HINCRBY etag:tables <table>`)
+  and stamps its change time. Raw-SQL writers call `mark_tables_changed` /
+  `bump_table_versions` themselves.
+* `etag_guard(*tables)` is a route dependency. It reads the counters of the tables
+  the response is built from (one pipelined Redis round trip), hashes them with the
+  path, query string and user into a weak ETag, and answers 304 before the
+  endpoint queries anything when the client's validator still matches. It also
+  leaves a digest of the counters it read in `request.state.etag_versions`; the
+  response cache keys on it, so a body cached before a write is never sent with
+  the validator issued after it.
+
+An epoch token stored next to the counters is part of every ETag, so a Redis
+flush (counters restarting at 1) cannot revalidate stale client copies. Without
+Redis no validators are issued and every request gets a full response.
+"""
+import hashlib
+import logging
+import time
+import uuid
+from email.utils import formatdate, parsedate_to_datetime
+from typing import Dict, Iterable, Optional, Sequence, Tuple
+
+from fastapi import Depends, HTTPException, Request, Response
+from sqlalchemy import event
+
+logger = logging.getLogger("ticketing")
+
+VERSIONS_KEY = "etag:tables"
+MODIFIED_KEY = "etag:modified"
+EPOCH_KEY = "etag:epoch"
+
+_PENDING = "etag_changed_tables"
+
+
+def mark_tables_changed(session, *tables: str):
+    """Record tables written by raw SQL in `session`; they are bumped when it commits."""
+    session.info.setdefault(_PENDING, set()).update(tables)
+
+
+def bump_table_versions(tables: Iterable[str]):
+    """Bump change counters right away (for writes outside a tracked session)."""
+    tables = sorted(set(tables))
+    if not tables:
+        return
+    from utils.redis_manager import redis_manager
+    client = redis_manager.get_sync()
+    if not client:
+        return
+    now = int(time.time())
+    try:
+        pipe = client.pipeline(transaction=False)
+        pipe.set(EPOCH_KEY, uuid.uuid4().hex, nx=True)
+        for table in tables:
+            pipe.hincrby(VERSIONS_KEY, table, 1)
+        pipe.hset(MODIFIED_KEY, mapping={table: now for table in tables})
+        pipe.execute()
+    except Exception as e:
+        logger.warning("Table version bump failed: %s", e)
+        redis_manager.record_failure(e)
+
+
+def _after_flush(session, flush_context):
+    tables = {obj.__table__.name for obj in (*session.new, *session.dirty, *session.deleted)
+              if hasattr(obj, "__table__")}
+    if tables:
+        mark_tables_changed(session, *tables)
+
+
+def _do_orm_execute(state):
+    if state.is_update or state.is_delete or state.is_insert:
+        table = getattr(state.statement, "table", None)
+        name = getattr(table, "name", None)
+        if name:
+            mark_tables_changed(state.session, name)
+
+
+def _after_commit(session):
+    tables = session.info.pop(_PENDING, None)
+    if tables:
+        bump_table_versions(tables)
+
+
+def _after_rollback(session):
+    session.info.pop(_PENDING, None)
+
+
+def track_table_changes(session_factory):
+    """Install the change-counter hooks on a sessionmaker (or Session class)."""
+    event.listen(session_factory, "after_flush", _after_flush)
+    event.listen(session_factory, "do_orm_execute", _do_orm_execute)
+    event.listen(session_factory, "after_commit", _after_commit)
+    event.listen(session_factory, "after_rollback", _after_rollback)
+
+
+def read_table_versions(tables: Sequence[str]) -> Optional[Tuple[str, Dict[str, int], Optional[int]]]:
+    """(epoch, version per table, newest change time) or None when Redis is unavailable."""
+    from utils.redis_manager import redis_manager
+    client = redis_manager.get_sync()
+    if not client:
+        return None
+    try:
+        pipe = client.pipeline(transaction=False)
+        pipe.set(EPOCH_KEY, uuid.uuid4().hex, nx=True)
+        pipe.get(EPOCH_KEY)
+        pipe.hmget(VERSIONS_KEY, list(tables))
+        pipe.hmget(MODIFIED_KEY, list(tables))
+        _, epoch, versions, modified = pipe.execute()
+    except Exception as e:
+        logger.warning("Table version read failed: %s", e)
+        redis_manager.record_failure(e)
+        return None
+    stamps = [int(m) for m in modified if m is not None]
+    return (
+        epoch.decode() if isinstance(epoch, bytes) else str(epoch),
+        {table: int(v or 0) for table, v in zip(tables, versions)},
+        max(stamps) if len(stamps) == len(tables) else None,
+    )
+
+
+def _versions_token(epoch: str, versions: Dict[str, int]) -> str:
+    return epoch + "|" + ",".join(f"{t}:{v}" for t, v in sorted(versions.items()))
+
+
+def versions_digest(epoch: str, versions: Dict[str, int]) -> str:
+    """Short digest of table versions, for cache keys that must change with the ETag."""
+    return hashlib.sha1(_versions_token(epoch, versions).encode()).hexdigest()[:16]
+
+
+def compute_etag(epoch: str, versions: Dict[str, int], request: Request, user_id: Optional[str]) -> str:
+    query = "&".join(sorted(f"{k}={v}" for k, v in request.query_params.multi_items()))
+    raw = "|".join([_versions_token(epoch, versions), request.url.path, query, user_id or ""])
+    return 'W/"%s"' % hashlib.sha1(raw.encode()).hexdigest()[:20]
+
+
+def _etag_matches(header: str, etag: str) -> bool:
+    if header.strip() == "*":
+        return True
+    opaque = etag[2:] if etag.startswith("W/") else etag
+    for candidate in header.split(","):
+        candidate = candidate.strip()
+        if (candidate[2:] if candidate.startswith("W/") else candidate) == opaque:
+            return True
+    return False
+
+
+def _not_modified_since(header: str, last_modified: int) -> bool:
+    try:
+        return last_modified <= int(parsedate_to_datetime(header).timestamp())
+    except (TypeError, ValueError):
+        return False
+
+
+def etag_guard(*tables: str):
+    """Route dependency: validators for responses built from `tables`, 304 when unchanged.
+
+    Declare it after the route's auth dependency so role checks run first.
+    """
+    from utils.auth import get_current_user
+
+    def guard(request: Request, response: Response, current_user=Depends(get_current_user)):
+        state = read_table_versions(tables)
+        if state is None:
+            return
+        epoch, versions, last_modified = state
+        if last_modified is not None and last_modified >= int(time.time()):
+            # Changed within the current second: a second-resolution date could not
+            # tell this version from a later one in the same second
+            last_modified = None
+        etag = compute_etag(epoch, versions, request, getattr(current_user, "user_id", None))
+        request.state.etag_versions = versions_digest(epoch, versions)
+        headers = {"ETag": etag, "Cache-Control": "private, no-cache", "Vary": "Authorization"}
+        if last_modified is not None:
+            headers["Last-Modified"] = formatdate(last_modified, usegmt=True)
+
+        if_none_match = request.headers.get("if-none-match")
+        if if_none_match is not None:
+            not_modified = _etag_matches(if_none_match, etag)
+        else:
+            if_modified_since = request.headers.get("if-modified-since")
+            not_modified = bool(if_modified_since and last_modified is not None
+                                and _not_modified_since(if_modified_since, last_modified))
+        if not_modified:
+            raise HTTPException(status_code=304, headers=headers)
+        response.headers.update(headers)
+
+    return guard
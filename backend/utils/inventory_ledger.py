@@ -0,0 +1,172 @@
+"""
+Set-based inventory stock changes (shipment decrements, scan adjustments).
+
+All stock changes for one shipment (or one scan batch) are applied with a single
+`UPDATE inventory_items ... FROM (VALUES ...) RETURNING` on Postgres. The new
+quantity is computed from the row's current value inside the database, so two
+shipments of the same part racing each other cannot lose an update. The rows are
+locked first in item_id order, so parallel shippers touching overlapping items
+cannot deadlock. The matching `inventory_transactions` rows are written with one
+multi-row INSERT in the same transaction. Nothing here commits; the caller owns
+the transaction.
+"""
+import uuid
+from collections import OrderedDict
+from datetime import date
+from typing import Dict, List, NamedTuple, Optional, Sequence, Tuple
+
+from sqlalchemy import case, func, insert, select, text, update
+from sqlalchemy.orm import Session
+
+import models
+from utils.etag import mark_tables_changed
+
+
+class Decrement(NamedTuple):
+    item_id: str
+    quantity: int
+    shipment_item_id: Optional[str] = None
+
+
+class Adjustment(NamedTuple):
+    item_id: str
+    delta: int
+
+
+class LedgerChange(NamedTuple):
+    item_id: str
+    old_quantity: int
+    new_quantity: int
+
+
+def _totals(deltas: Sequence[Tuple[str, int]]) -> "OrderedDict[str, int]":
+    """Signed stock change per item, sorted by item_id (the lock order)."""
+    totals: Dict[str, int] = {}
+    for item_id, delta in deltas:
+        totals[item_id] = totals.get(item_id, 0) + delta
+    return OrderedDict(sorted(totals.items()))
+
+
+def _postgres_update(totals: "OrderedDict[str, int]"):
+    """The single locking UPDATE ... FROM (VALUES ...) RETURNING (item_id, old, new) for `totals`."""
+    values, params = [], {}
+    for i, (item_id, delta) in enumerate(totals.items()):
+        values.append(f"(CAST(:item_{i} AS VARCHAR), CAST(:delta_{i} AS INTEGER))")
+        params[f"item_{i}"] = item_id
+        params[f"delta_{i}"] = delta
+    sql = f"""
+        WITH v(item_id, delta) AS (VALUES {', '.join(values)}),
+        locked AS (
+            SELECT i.item_id, COALESCE(i.quantity_on_hand, 0) AS old_qty
+            FROM inventory_items AS i JOIN v ON v.item_id = i.item_id
+            ORDER BY i.item_id
+            FOR UPDATE OF i
+        )
+        UPDATE inventory_items AS i
+        SET quantity_on_hand = GREATEST(0, COALESCE(i.quantity_on_hand, 0) + v.delta)
+        FROM v JOIN locked AS l ON l.item_id = v.item_id
+        WHERE i.item_id = v.item_id
+        RETURNING i.item_id, l.old_qty, i.quantity_on_hand
+    """
+    return text(sql).bindparams(**params)
+
+
+def _apply_postgres(db: Session, totals: "OrderedDict[str, int]") -> List[LedgerChange]:
+    mark_tables_changed(db, "inventory_items")
+    return [LedgerChange(*row) for row in db.execute(_postgres_update(totals)).all()]
+
+
+def _apply_generic(db: Session, totals: "OrderedDict[str, int]") -> List[LedgerChange]:
+    """Per-item atomic UPDATE for backends without UPDATE ... FROM VALUES (SQLite in tests).
+
+    The new quantity is still computed in the database; old_quantity is read
+    just before and is only informational.
+    """
+    item = models.InventoryItem
+    changes = []
+    for item_id, delta in totals.items():
+        old = db.execute(select(item.quantity_on_hand).where(item.item_id == item_id)).first()
+        if old is None:
+            continue
+        current = func.coalesce(item.quantity_on_hand, 0)
+        new = db.execute(
+            update(item)
+            .where(item.item_id == item_id)
+            .values(quantity_on_hand=case((current + delta < 0, 0), else_=current + delta))
+            .returning(item.quantity_on_hand)
+        ).scalar_one()
+        changes.append(LedgerChange(item_id, old[0] or 0, new))
+    return changes
+
+
+def _apply(db: Session, deltas: Sequence[Tuple[str, int]], transactions: List[Dict]) -> Tuple[List[LedgerChange], List[str]]:
+    totals = _totals(deltas)
+    if db.get_bind().dialect.name == "postgresql":
+        changes = _apply_postgres(db, totals)
+    else:
+        changes = _apply_generic(db, totals)
+
+    found = {c.item_id for c in changes}
+    rows = [row for row in transactions if row["item_id"] in found]
+    if rows:
+        db.execute(insert(models.InventoryTransaction), rows)
+    changes.sort(key=lambda c: c.item_id)
+    return changes, [item_id for item_id in totals if item_id not in found]
+
+
+def _transaction(item_id: str, quantity: int, type_, user_id, ticket_id, notes, shipment_item_id=None) -> Dict:
+    return {
+        "transaction_id": str(uuid.uuid4()),
+        "item_id": item_id,
+        "user_id": user_id,
+        "shipment_item_id": shipment_item_id,
+        "ticket_id": ticket_id,
+        "date": date.today(),
+        "quantity": quantity,
+        "type": type_,
+        "notes": notes,
+    }
+
+
+def apply_decrements(
+    db: Session,
+    decrements: Sequence[Decrement],
+    user_id: Optional[str] = None,
+    ticket_id: Optional[str] = None,
+    notes: Optional[str] = None,
+) -> Tuple[List[LedgerChange], List[str]]:
+    """Decrement stock (floored at 0) and record one `out` transaction per decrement.
+
+    Returns (changes per inventory item, item_ids that do not exist). Decrements
+    for missing items are skipped and get no transaction row.
+    """
+    decrements = [d for d in decrements if d.quantity > 0]
+    if not decrements:
+        return [], []
+    return _apply(
+        db,
+        [(d.item_id, -d.quantity) for d in decrements],
+        [_transaction(d.item_id, d.quantity, models.InventoryTransactionType.out, user_id, ticket_id, notes,
+                      shipment_item_id=d.shipment_item_id) for d in decrements],
+    )
+
+
+def apply_adjustments(
+    db: Session,
+    adjustments: Sequence[Adjustment],
+    user_id: Optional[str] = None,
+    notes: Optional[str] = None,
+) -> Tuple[List[LedgerChange], List[str]]:
+    """Apply signed stock adjustments (result floored at 0), one `adjust` transaction each.
+
+    Same return value and missing-item handling as `apply_decrements`.
+    """
+    adjustments = [a for a in adjustments if a.delta]
+    if not adjustments:
+        return [], []
+    return _apply(
+        db,
+        adjustments,
+        [_transaction(a.item_id, a.delta, models.InventoryTransactionType.adjust, user_id, None, notes)
+         for a in adjustments],
+    )
@@ -0,0 +1,251 @@
+"""
+Fixed-memory latency histograms keyed by route template, method and status class.
+
+Each histogram uses log-spaced buckets (HDR-style, ~1% relative error) over a fixed
+range, so memory is bounded per key and percentiles come from a cumulative walk over
+bucket counts instead of sorting raw samples. Histograms are mergeable by adding
+counts, which is how per-worker snapshots are aggregated through Redis.
+
+Each worker keeps two generations per key and rotates them every window, so a
+summary covers between one and two windows of traffic and old baselines age out.
+"""
+import json
+import logging
+import math
+import os
+import socket
+import threading
+import time
+from typing import Callable, Dict, Iterable, Optional, Tuple
+
+logger = logging.getLogger("ticketing")
+
+# 1% relative error between 0.01 ms and 10 minutes -> ~1000 buckets per histogram
+_GAMMA = 1.02
+_LOG_GAMMA = math.log(_GAMMA)
+_MIN_MS = 0.01
+_MAX_MS = 600_000.0
+_BUCKETS = int(math.ceil(math.log(_MAX_MS / _MIN_MS) / _LOG_GAMMA)) + 1
+
+PERCENTILES = (("p50_ms", 0.50), ("p90_ms", 0.90), ("p99_ms", 0.99), ("p999_ms", 0.999))
+
+REDIS_KEY_PREFIX = "latency:hist:"
+
+
+def _bucket_index(ms: float) -> int:
+    if ms <= _MIN_MS:
+        return 0
+    if ms >= _MAX_MS:
+        return _BUCKETS - 1
+    return min(_BUCKETS - 1, int(math.ceil(math.log(ms / _MIN_MS) / _LOG_GAMMA)))
+
+
+def _bucket_value(index: int) -> float:
+    """Representative value of a bucket (geometric midpoint of its bounds)."""
+    if index == 0:
+        return _MIN_MS
+    upper = _MIN_MS * (_GAMMA ** index)
+    return upper / math.sqrt(_GAMMA)
+
+
+class LatencyHistogram:
+    """Mergeable log-bucketed histogram of millisecond latencies."""
+
+    __slots__ = ("counts", "count", "total_ms", "max_ms")
+
+    def __init__(self):
+        self.counts = [0] * _BUCKETS
+        self.count = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+
+    def record(self, ms: float):
+        if ms < 0:
+            return
+        self.counts[_bucket_index(ms)] += 1
+        self.count += 1
+        self.total_ms += ms
+        if ms > self.max_ms:
+            self.max_ms = ms
+
+    def merge(self, other: "LatencyHistogram"):
+        counts = self.counts
+        for i, c in enumerate(other.counts):
+            if c:
+                counts[i] += c
+        self.count += other.count
+        self.total_ms += other.total_ms
+        self.max_ms = max(self.max_ms, other.max_ms)
+
+    def percentiles(self, quantiles: Iterable[float]) -> Tuple[float, ...]:
+        """Single cumulative pass over buckets for all requested quantiles (ascending)."""
+        targets = [max(1, int(math.ceil(q * self.count))) for q in quantiles]
+        out = []
+        seen = 0
+        t = 0
+        for i, c in enumerate(self.counts):
+            if not c:
+                continue
+            seen += c
+            while t < len(targets) and seen >= targets[t]:
+                out.append(min(_bucket_value(i), self.max_ms))
+                t += 1
+            if t == len(targets):
+                break
+        while len(out) < len(targets):
+            out.append(self.max_ms)
+        return tuple(out)
+
+    def summary(self) -> Dict[str, float]:
+        if not self.count:
+            return {"count": 0}
+        values = self.percentiles(q for _, q in PERCENTILES)
+        out = {
+            "count": self.count,
+            "avg_ms": round(self.total_ms / self.count, 2),
+            "max_ms": round(self.max_ms, 2),
+        }
+        for (name, _), v in zip(PERCENTILES, values):
+            out[name] = round(v, 2)
+        return out
+
+    def to_dict(self) -> Dict:
+        return {
+            "b": {str(i): c for i, c in enumerate(self.counts) if c},
+            "n": self.count,
+            "s": self.total_ms,
+            "m": self.max_ms,
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> "LatencyHistogram":
+        h = cls()
+        for i, c in (data.get("b") or {}).items():
+            idx = int(i)
+            if 0 <= idx < _BUCKETS:
+                h.counts[idx] += int(c)
+        h.count = int(data.get("n", 0))
+        h.total_ms = float(data.get("s", 0.0))
+        h.max_ms = float(data.get("m", 0.0))
+        return h
+
+
+def status_class(status_code: int) -> str:
+    return f"{status_code // 100}xx"
+
+
+class RouteLatencyRegistry:
+    """Per-worker histograms keyed by "METHOD /route/{template} Nxx".
+
+    Key cardinality is capped; routes beyond `max_keys` are folded into an
+    "other" key so unmatched or hostile paths cannot grow memory.
+
+    Samples go into the current generation; every `window_seconds` it becomes the
+    previous one and the older generation is dropped. Snapshots merge both, so they
+    cover the last one to two windows. `window_seconds=0` keeps everything since
+    worker start.
+    """
+
+    OVERFLOW_KEY = "other"
+
+    def __init__(self, max_keys: int = 512, worker_id: Optional[str] = None,
+                 window_seconds: float = 0.0, clock: Callable[[], float] = time.monotonic):
+        self.max_keys = max_keys
+        self.worker_id = worker_id or f"{socket.gethostname()}:{os.getpid()}"
+        self.window_seconds = window_seconds
+        self._clock = clock
+        self._hists: Dict[str, LatencyHistogram] = {}
+        self._previous: Dict[str, LatencyHistogram] = {}
+        self._rotated_at = clock()
+        self._lock = threading.Lock()
+
+    def _maybe_rotate(self):
+        if not self.window_seconds:
+            return
+        now = self._clock()
+        if now - self._rotated_at < self.window_seconds:
+            return
+        with self._lock:
+            elapsed = now - self._rotated_at
+            if elapsed < self.window_seconds:
+                return
+            # After a full idle window the current generation is already stale too
+            self._previous = self._hists if elapsed < 2 * self.window_seconds else {}
+            self._hists = {}
+            self._rotated_at = now
+
+    @staticmethod
+    def make_key(method: str, route_template: str, status_code: int) -> str:
+        return f"{method} {route_template} {status_class(status_code)}"
+
+    def record(self, method: str, route_template: str, status_code: int, ms: float):
+        self._maybe_rotate()
+        key = self.make_key(method, route_template, status_code)
+        hist = self._hists.get(key)
+        if hist is None:
+            with self._lock:
+                hist = self._hists.get(key)
+                if hist is None:
+                    if len(self._hists) >= self.max_keys:
+                        key = self.OVERFLOW_KEY
+                        hist = self._hists.get(key)
+                    if hist is None:
+                        hist = LatencyHistogram()
+                        self._hists[key] = hist
+        hist.record(ms)
+
+    def snapshot(self) -> Dict[str, LatencyHistogram]:
+        self._maybe_rotate()
+        with self._lock:
+            items = list(self._previous.items()) + list(self._hists.items())
+        out = {}
+        for key, hist in items:
+            copy = out.get(key)
+            if copy is None:
+                copy = out[key] = LatencyHistogram()
+            copy.merge(hist)
+        return out
+
+    @staticmethod
+    def summarize(hists: Dict[str, LatencyHistogram]) -> Dict[str, Dict[str, float]]:
+        return {key: hists[key].summary() for key in sorted(hists) if hists[key].count}
+
+    def summary(self) -> Dict[str, Dict[str, float]]:
+        return self.summarize(self.snapshot())
+
+    # ------------------------------------------------------------------
+    # Cross-worker aggregation via Redis: each worker overwrites its own
+    # windowed snapshot; readers merge every live worker's hash.
+    # ------------------------------------------------------------------
+
+    async def publish(self, redis_client, ttl_seconds: int):
+        snap = self.snapshot()
+        if not snap:
+            return
+        key = f"{REDIS_KEY_PREFIX}{self.worker_id}"
+        mapping = {k: json.dumps(h.to_dict(), separators=(",", ":")) for k, h in snap.items()}
+        pipe = redis_client.pipeline()
+        pipe.delete(key)
+        pipe.hset(key, mapping=mapping)
+        pipe.expire(key, ttl_seconds)
+        await pipe.execute()
+
+    @staticmethod
+    async def collect(redis_client) -> Tuple[Dict[str, LatencyHistogram], int]:
+        merged: Dict[str, LatencyHistogram] = {}
+        workers = 0
+        async for key in redis_client.scan_iter(match=f"{REDIS_KEY_PREFIX}*"):
+            data = await redis_client.hgetall(key)
+            if not data:
+                continue
+            workers += 1
+            for route_key, raw in data.items():
+                try:
+                    hist = LatencyHistogram.from_dict(json.loads(raw))
+                except (ValueError, TypeError):
+                    continue
+                if route_key in merged:
+                    merged[route_key].merge(hist)
+                else:
+                    merged[route_key] = hist
+        return merged, workers
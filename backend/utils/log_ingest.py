@@ -0,0 +1,301 @@
+"""
+Buffered ingestion for frontend logs and errors.
+
+Request handlers only append rows to a bounded in-memory queue; a background
+flusher drains it and bulk-inserts into `frontend_logs` / `frontend_errors` once
+`batch_size` rows are waiting or `flush_interval` seconds have passed. When the
+queue is full new rows are shed (counted, not stored) so an error storm from many
+browsers cannot turn into thousands of commits per second on the primary.
+
+Each log batch also upserts per-hour (level, context) counts into
+`frontend_log_hourly_rollups` in the same transaction, which is what
+/api/logs/stats reads. Raw rows are pruned in small batches by the retention loop.
+
+A batch the database rejects is split in halves and retried, so only the rows
+that fail on their own are dropped. When the database is unreachable the whole
+batch is dropped at once instead.
+"""
+import asyncio
+import logging
+import threading
+import time
+from collections import Counter, deque
+from datetime import datetime, timedelta, timezone
+from typing import Callable, Deque, Dict, List, Optional, Tuple
+
+from starlette.concurrency import run_in_threadpool
+
+from utils import metrics
+
+logger = logging.getLogger("ticketing")
+
+KIND_LOG = "log"
+KIND_ERROR = "error"
+
+INGEST_ROWS = metrics.registry.counter(
+    "ticketing_log_ingest_rows", "Frontend log/error rows by outcome (accepted, dropped, written, failed).", ("kind", "outcome"))
+INGEST_QUEUE_DEPTH = metrics.registry.gauge("ticketing_log_ingest_queue_depth", "Frontend log/error rows waiting to be written.")
+INGEST_FLUSH_SECONDS = metrics.registry.histogram(
+    "ticketing_log_ingest_flush_seconds", "Time to bulk-insert one batch of frontend log/error rows.")
+
+Sink = Callable[[str, List[Dict]], None]
+
+# Arbitrary constant identifying the retention job for pg_try_advisory_lock
+_PRUNE_LOCK_KEY = 72031
+
+
+def utc_hour(ts: datetime) -> datetime:
+    """Naive UTC start of the hour containing `ts` (frontend_logs.timestamp is naive UTC)."""
+    if ts.tzinfo is not None:
+        ts = ts.astimezone(timezone.utc).replace(tzinfo=None)
+    return ts.replace(minute=0, second=0, microsecond=0)
+
+
+def hourly_rollup_counts(rows: List[Dict]) -> Dict[Tuple[datetime, str, str], int]:
+    counts: Counter = Counter()
+    for row in rows:
+        counts[(utc_hour(row["timestamp"]), row["level"], row["context"])] += 1
+    return counts
+
+
+def _upsert_hourly_rollups(db, rows: List[Dict]):
+    from sqlalchemy.dialects.postgresql import insert as pg_insert
+    import models
+
+    counts = hourly_rollup_counts(rows)
+    # Sorted so concurrent workers lock rollup rows in the same order (no deadlocks)
+    values = [
+        {"hour": hour, "level": level, "context": context, "count": n}
+        for (hour, level, context), n in sorted(counts.items())
+    ]
+    stmt = pg_insert(models.FrontendLogHourlyRollup).values(values)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=["hour", "level", "context"],
+        set_={"count": models.FrontendLogHourlyRollup.count + stmt.excluded["count"]},
+    )
+    db.execute(stmt)
+
+
+def _database_unavailable(exc: Exception) -> bool:
+    """Connection-level failures: retrying smaller batches would fail the same way."""
+    from sqlalchemy.exc import DBAPIError, InterfaceError, OperationalError
+
+    if isinstance(exc, (OperationalError, InterfaceError)):
+        return True
+    return isinstance(exc, DBAPIError) and exc.connection_invalidated
+
+
+def write_rows_to_db(kind: str, rows: List[Dict]):
+    """Default sink: one multi-row INSERT (plus hourly rollup upsert) and one commit per batch."""
+    from sqlalchemy import insert
+    from sqlalchemy.dialects.postgresql import insert as pg_insert
+    from database import SessionLocal
+    import models
+
+    db = SessionLocal()
+    try:
+        is_postgres = db.get_bind().dialect.name == "postgresql"
+        if kind == KIND_ERROR:
+            stmt = insert(models.FrontendError)
+            if is_postgres:
+                # error_id is unique; browsers retry, so duplicates are expected
+                stmt = pg_insert(models.FrontendError).on_conflict_do_nothing(index_elements=["error_id"])
+            db.execute(stmt, rows)
+        else:
+            db.execute(insert(models.FrontendLog), rows)
+            if is_postgres:
+                _upsert_hourly_rollups(db, rows)
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        db.close()
+
+
+class LogIngestQueue:
+    def __init__(self, max_size: int = 10000, batch_size: int = 500, flush_interval: float = 1.0, sink: Sink = write_rows_to_db):
+        self.max_size = max_size
+        self.batch_size = max(1, batch_size)
+        self.flush_interval = flush_interval
+        self.sink = sink
+        self._queue: Deque[Tuple[str, Dict]] = deque()
+        self._lock = threading.Lock()
+        self._wakeup: Optional[asyncio.Event] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._task: Optional[asyncio.Task] = None
+        INGEST_QUEUE_DEPTH.set_function(lambda: len(self._queue))
+
+    def __len__(self):
+        return len(self._queue)
+
+    def offer(self, kind: str, rows: List[Dict]) -> int:
+        """Enqueue rows; returns how many were accepted (the rest are shed)."""
+        with self._lock:
+            room = max(0, self.max_size - len(self._queue))
+            accepted = rows[:room]
+            self._queue.extend((kind, row) for row in accepted)
+            depth = len(self._queue)
+        dropped = len(rows) - len(accepted)
+        if accepted:
+            INGEST_ROWS.inc(len(accepted), labels=(kind, "accepted"))
+        if dropped:
+            INGEST_ROWS.inc(dropped, labels=(kind, "dropped"))
+        if depth >= self.batch_size:
+            self._notify()
+        return len(accepted)
+
+    def _notify(self):
+        if self._wakeup is None or self._loop is None:
+            return
+        try:
+            running = asyncio.get_running_loop()
+        except RuntimeError:
+            running = None
+        if running is self._loop:
+            self._wakeup.set()
+        else:
+            self._loop.call_soon_threadsafe(self._wakeup.set)
+
+    def _drain(self) -> Dict[str, List[Dict]]:
+        batches: Dict[str, List[Dict]] = {}
+        with self._lock:
+            for _ in range(min(self.batch_size, len(self._queue))):
+                kind, row = self._queue.popleft()
+                batches.setdefault(kind, []).append(row)
+        return batches
+
+    def flush_once(self) -> int:
+        """Write one batch synchronously; returns the number of rows taken off the queue."""
+        batches = self._drain()
+        taken = 0
+        for kind, rows in batches.items():
+            taken += len(rows)
+            start = time.perf_counter()
+            try:
+                written = self._write(kind, rows)
+                if written:
+                    INGEST_ROWS.inc(written, labels=(kind, "written"))
+            finally:
+                INGEST_FLUSH_SECONDS.observe(time.perf_counter() - start)
+        return taken
+
+    def _write(self, kind: str, rows: List[Dict]) -> int:
+        """Write `rows`, bisecting around rows the sink rejects; returns how many were stored."""
+        try:
+            self.sink(kind, rows)
+            return len(rows)
+        except Exception as e:
+            if len(rows) == 1 or _database_unavailable(e):
+                INGEST_ROWS.inc(len(rows), labels=(kind, "failed"))
+                logger.warning("Frontend %s batch of %d rows failed to write: %s", kind, len(rows), e)
+                return 0
+        mid = len(rows) // 2
+        return self._write(kind, rows[:mid]) + self._write(kind, rows[mid:])
+
+    async def _run(self):
+        while True:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+            while self._queue:
+                await run_in_threadpool(self.flush_once)
+                if len(self._queue) < self.batch_size:
+                    break
+
+    def start(self):
+        self._loop = asyncio.get_running_loop()
+        self._wakeup = asyncio.Event()
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        """Cancel the flusher and write whatever is still queued."""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        while self._queue:
+            await run_in_threadpool(self.flush_once)
+
+
+def prune_frontend_logs(retention_days: int, rollup_retention_days: int, batch_size: int = 5000,
+                        pause_seconds: float = 0.05) -> Dict[str, int]:
+    """Delete raw logs/errors older than `retention_days` in short batches.
+
+    Each batch is its own transaction so locks and WAL bursts stay small. A
+    Postgres advisory lock keeps several workers from pruning at the same time.
+    Rollups are kept much longer (they are tiny) and pruned in one statement.
+    """
+    from sqlalchemy import text
+    from database import engine
+
+    deleted = {"frontend_logs": 0, "frontend_errors": 0, "frontend_log_hourly_rollups": 0}
+    now = datetime.now(timezone.utc).replace(tzinfo=None)
+    with engine.connect() as conn:
+        if not conn.execute(text("SELECT pg_try_advisory_lock(:k)"), {"k": _PRUNE_LOCK_KEY}).scalar():
+            conn.rollback()
+            return deleted
+        conn.commit()
+        try:
+            if retention_days > 0:
+                cutoff = now - timedelta(days=retention_days)
+                for table in ("frontend_logs", "frontend_errors"):
+                    while True:
+                        result = conn.execute(
+                            text(
+                                f"DELETE FROM {table} WHERE id IN "
+                                f"(SELECT id FROM {table} WHERE timestamp < :cutoff LIMIT :n)"
+                            ),
+                            {"cutoff": cutoff, "n": batch_size},
+                        )
+                        conn.commit()
+                        deleted[table] += result.rowcount
+                        if result.rowcount < batch_size:
+                            break
+                        time.sleep(pause_seconds)
+            if rollup_retention_days > 0:
+                result = conn.execute(
+                    text("DELETE FROM frontend_log_hourly_rollups WHERE hour < :cutoff"),
+                    {"cutoff": now - timedelta(days=rollup_retention_days)},
+                )
+                conn.commit()
+                deleted["frontend_log_hourly_rollups"] = result.rowcount
+        finally:
+            conn.execute(text("SELECT pg_advisory_unlock(:k)"), {"k": _PRUNE_LOCK_KEY})
+            conn.commit()
+    if any(deleted.values()):
+        logger.info("Frontend log retention pruned %s", deleted)
+    return deleted
+
+
+async def log_retention_loop():
+    """Periodically prune raw frontend logs per LOG_RETENTION_DAYS."""
+    from settings import settings
+    while True:
+        await asyncio.sleep(settings.LOG_PRUNE_INTERVAL_SECONDS)
+        try:
+            await run_in_threadpool(
+                prune_frontend_logs,
+                settings.LOG_RETENTION_DAYS,
+                settings.LOG_ROLLUP_RETENTION_DAYS,
+                settings.LOG_PRUNE_BATCH_SIZE,
+            )
+        except Exception as e:
+            logger.warning("Frontend log retention run failed: %s", e)
+
+
+def _build_queue() -> LogIngestQueue:
+    from settings import settings
+    return LogIngestQueue(
+        max_size=settings.LOG_INGEST_QUEUE_MAX,
+        batch_size=settings.LOG_INGEST_BATCH_SIZE,
+        flush_interval=settings.LOG_INGEST_FLUSH_INTERVAL_SECONDS,
+    )
+
+
+log_ingest_queue = _build_queue()
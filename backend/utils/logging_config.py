@@ -4,12 +4,23 @@ Comprehensive logging configuration for the backend
 
 import logging
 import logging.config
+import logging.handlers
+import atexit
+import copy
+import queue
+import random
 import sys
 from datetime import datetime, timezone
-from typing import Dict, Any
+from typing import Dict, Any, List, Optional
 import json
 import os
 
+# LogRecord attributes that are never "extra" fields; built once from a real record
+# so it tracks the running Python version (e.g. taskName on 3.12).
+_RESERVED_RECORD_KEYS = frozenset(
+    logging.LogRecord("", logging.INFO, "", 0, "", (), None).__dict__.keys()
+) | {"message", "asctime", "getMessage"}
+
 class JSONFormatter(logging.Formatter):
     """Custom JSON formatter for structured logging"""
     
@@ -30,18 +41,112 @@ class JSONFormatter(logging.Formatter):
         if record.exc_info:
             log_entry["exception"] = self.formatException(record.exc_info)
         
-        # Add extra fields
-        for key, value in record.__dict__.items():
-            if key not in {
-                "name", "msg", "args", "levelname", "levelno", "pathname",
-                "filename", "module", "lineno", "funcName", "created",
-                "msecs", "relativeCreated", "thread", "threadName",
-                "processName", "process", "getMessage", "exc_info",
-                "exc_text", "stack_info"
-            }:
-                log_entry[key] = value
+        # Add extra fields (set difference instead of a per-key membership loop)
+        extra_keys = record.__dict__.keys() - _RESERVED_RECORD_KEYS
+        if extra_keys:
+            record_dict = record.__dict__
+            for key in extra_keys:
+                log_entry[key] = record_dict[key]
         
-        return json.dumps(log_entry, default=str)
+        return json.dumps(log_entry, default=str, separators=(",", ":"))
+
+class SamplingFilter(logging.Filter):
+    """Keep a fraction of a hot logger's records at or below `max_level`.
+
+    Attach to the logger itself (not a handler) so dropped records never reach the
+    queue or a formatter. WARNING and above always pass by default.
+    """
+    
+    def __init__(self, rate: float, max_level: int = logging.INFO):
+        super().__init__()
+        self.rate = max(0.0, min(1.0, rate))
+        self.max_level = max_level
+    
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno > self.max_level or self.rate >= 1.0:
+            return True
+        return random.random() < self.rate
+
+class _QueueHandler(logging.handlers.QueueHandler):
+    """QueueHandler that leaves formatting to the listener thread.
+
+    The stock prepare() formats the record on the caller's thread; here only the
+    message is merged (args may be mutated after the call) and exc_info is kept
+    for the real handlers' formatters. A full queue drops the record.
+    """
+    
+    dropped = 0
+    
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        record = copy.copy(record)
+        record.msg = record.getMessage()
+        record.args = None
+        return record
+    
+    def enqueue(self, record: logging.LogRecord):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            _QueueHandler.dropped += 1
+
+_listeners: List[logging.handlers.QueueListener] = []
+
+def install_queue_logging(logger_names: Optional[List[str]] = None,
+                          max_queue_size: int = 10000) -> List[logging.handlers.QueueListener]:
+    """Move the handlers of the given loggers (default: root plus every configured
+    logger) behind QueueHandlers so formatting and file I/O run on listener threads.
+
+    Loggers that share the same handler set share one queue and listener thread.
+    Safe to call more than once; already-queued loggers are left alone. Returns
+    the listeners started by this call.
+    """
+    if logger_names is None:
+        logger_names = [""] + [
+            name for name, obj in logging.root.manager.loggerDict.items()
+            if isinstance(obj, logging.Logger) and obj.handlers
+        ]
+    groups: Dict[tuple, List[logging.Logger]] = {}
+    for name in logger_names:
+        lg = logging.getLogger(name)
+        handlers = tuple(lg.handlers)
+        if not handlers or any(isinstance(h, logging.handlers.QueueHandler) for h in handlers):
+            continue
+        groups.setdefault(handlers, []).append(lg)
+    started = []
+    for handlers, loggers in groups.items():
+        q: "queue.Queue[logging.LogRecord]" = queue.Queue(maxsize=max_queue_size)
+        listener = logging.handlers.QueueListener(q, *handlers, respect_handler_level=True)
+        listener.start()
+        _listeners.append(listener)
+        started.append(listener)
+        queue_handler = _QueueHandler(q)
+        for lg in loggers:
+            for h in handlers:
+                lg.removeHandler(h)
+            lg.addHandler(queue_handler)
+    if _listeners and not getattr(install_queue_logging, "_atexit", False):
+        atexit.register(stop_queue_logging)
+        install_queue_logging._atexit = True
+    return started
+
+def stop_queue_logging(listeners: Optional[List[logging.handlers.QueueListener]] = None):
+    """Flush queued records and stop listener threads (every one, or just `listeners`)."""
+    if listeners is None:
+        listeners = list(reversed(_listeners))
+    for listener in listeners:
+        if listener in _listeners:
+            _listeners.remove(listener)
+            listener.stop()
+
+def install_log_sampling(rates: Dict[str, float]):
+    """Attach a SamplingFilter per logger name, e.g. {"ticketing.broadcast": 0.1}."""
+    for name, rate in rates.items():
+        lg = logging.getLogger(name)
+        for f in list(lg.filters):
+            if isinstance(f, SamplingFilter):
+                lg.removeFilter(f)
+        if rate < 1.0:
+            lg.addFilter(SamplingFilter(rate))
 
 class RequestLoggingFilter(logging.Filter):
     """Filter to add request context to log records"""
@@ -220,6 +325,7 @@ def setup_logging(environment: str = None):
     # Get and apply logging configuration
     config = get_logging_config(environment)
     logging.config.dictConfig(config)
+    install_queue_logging()
     
     # Log the setup
     logger = logging.getLogger(__name__)
@@ -0,0 +1,304 @@
+"""
+Bounded in-process metrics registry rendered as OpenMetrics text at /metrics.
+
+Counters, gauges and histograms live in fixed-size structures: each metric caps
+its label series (extra series fold into an all-"other" series) and histograms
+use fixed buckets, so memory does not grow with traffic. Gauges can be backed by
+a callback that is read at scrape time (pool usage, WebSocket connections).
+
+With several uvicorn workers each process publishes a JSON snapshot to Redis and
+/metrics merges every live worker's snapshot (counters, histograms and gauges are
+summed), the same way /ops/latency aggregates latency histograms.
+"""
+import json
+import logging
+import math
+import os
+import socket
+import threading
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+logger = logging.getLogger("ticketing")
+
+CONTENT_TYPE = "application/openmetrics-text; version=1.0.0; charset=utf-8"
+REDIS_KEY_PREFIX = "metrics:snap:"
+OVERFLOW_LABEL = "other"
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_value(value: float) -> str:
+    if value == math.inf:
+        return "+Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+def _label_str(names: Sequence[str], values: Sequence[str], extra: Optional[Tuple[str, str]] = None) -> str:
+    pairs = [f'{n}="{_escape(v)}"' for n, v in zip(names, values)]
+    if extra:
+        pairs.append(f'{extra[0]}="{extra[1]}"')
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+class _Metric:
+    type_name = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (), max_series: int = 500):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.max_series = max_series
+        self._series: Dict[Tuple[str, ...], object] = {}
+        self._lock = threading.Lock()
+
+    def _key(self, labels: Sequence[str]) -> Tuple[str, ...]:
+        key = tuple(str(v) for v in labels)
+        if len(key) != len(self.labelnames):
+            raise ValueError(f"{self.name} expects labels {self.labelnames}, got {key}")
+        if key not in self._series and len(self._series) >= self.max_series:
+            return (OVERFLOW_LABEL,) * len(self.labelnames)
+        return key
+
+    def _snapshot_series(self) -> Dict[Tuple[str, ...], object]:
+        with self._lock:
+            return {k: (list(v) if isinstance(v, list) else v) for k, v in self._series.items()}
+
+    def snapshot(self) -> Dict:
+        return {
+            "type": self.type_name,
+            "help": self.documentation,
+            "labels": list(self.labelnames),
+            "series": [[list(k), v] for k, v in self._snapshot_series().items()],
+        }
+
+
+class Counter(_Metric):
+    type_name = "counter"
+
+    def inc(self, amount: float = 1.0, labels: Sequence[str] = ()):
+        with self._lock:
+            key = self._key(labels)
+            self._series[key] = self._series.get(key, 0.0) + amount
+
+
+class Gauge(_Metric):
+    type_name = "gauge"
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._callback: Optional[Callable[[], float]] = None
+
+    def set(self, value: float, labels: Sequence[str] = ()):
+        with self._lock:
+            self._series[self._key(labels)] = float(value)
+
+    def inc(self, amount: float = 1.0, labels: Sequence[str] = ()):
+        with self._lock:
+            key = self._key(labels)
+            self._series[key] = self._series.get(key, 0.0) + amount
+
+    def dec(self, amount: float = 1.0, labels: Sequence[str] = ()):
+        self.inc(-amount, labels)
+
+    def set_function(self, fn: Callable[[], float]):
+        """Read the (unlabelled) value from `fn` at scrape time instead of storing it."""
+        self._callback = fn
+
+    def _snapshot_series(self):
+        if self._callback is None:
+            return super()._snapshot_series()
+        try:
+            return {(): float(self._callback())}
+        except Exception as e:
+            logger.debug("Gauge callback %s failed: %s", self.name, e)
+            return {}
+
+
+class Histogram(_Metric):
+    """Fixed-bucket histogram; each series is [bucket counts..., +Inf count, sum]."""
+
+    type_name = "histogram"
+
+    def __init__(self, name, documentation, labelnames=(), buckets: Sequence[float] = DEFAULT_BUCKETS, max_series: int = 500):
+        super().__init__(name, documentation, labelnames, max_series)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value: float, labels: Sequence[str] = ()):
+        idx = len(self.buckets)
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                idx = i
+                break
+        with self._lock:
+            key = self._key(labels)
+            series = self._series.get(key)
+            if series is None:
+                series = [0] * (len(self.buckets) + 1) + [0.0]
+                self._series[key] = series
+            series[idx] += 1
+            series[-1] += value
+
+    def snapshot(self) -> Dict:
+        out = super().snapshot()
+        out["buckets"] = list(self.buckets)
+        return out
+
+
+class MetricsRegistry:
+    def __init__(self, max_series: int = 500, worker_id: Optional[str] = None):
+        self.max_series = max_series
+        self.worker_id = worker_id or f"{socket.gethostname()}:{os.getpid()}"
+        self._metrics: Dict[str, _Metric] = {}
+        self._lock = threading.Lock()
+
+    def _register(self, metric: _Metric) -> _Metric:
+        with self._lock:
+            existing = self._metrics.get(metric.name)
+            if existing is not None:
+                return existing
+            self._metrics[metric.name] = metric
+            return metric
+
+    def counter(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Counter:
+        return self._register(Counter(name, documentation, labelnames, self.max_series))
+
+    def gauge(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Gauge:
+        return self._register(Gauge(name, documentation, labelnames, self.max_series))
+
+    def histogram(self, name: str, documentation: str, labelnames: Sequence[str] = (), buckets: Sequence[float] = DEFAULT_BUCKETS) -> Histogram:
+        return self._register(Histogram(name, documentation, labelnames, buckets, self.max_series))
+
+    def snapshot(self) -> Dict[str, Dict]:
+        with self._lock:
+            metrics = list(self._metrics.values())
+        return {m.name: m.snapshot() for m in metrics}
+
+    # ------------------------------------------------------------------
+    # Cross-worker aggregation via Redis
+    # ------------------------------------------------------------------
+
+    async def publish(self, redis_client, ttl_seconds: int):
+        key = f"{REDIS_KEY_PREFIX}{self.worker_id}"
+        await redis_client.set(key, json.dumps(self.snapshot(), separators=(",", ":")), ex=ttl_seconds)
+
+    async def collect(self, redis_client) -> Tuple[List[Dict], int]:
+        """Live snapshot for this worker plus the last published snapshot of every other worker."""
+        snapshots = [self.snapshot()]
+        own_key = f"{REDIS_KEY_PREFIX}{self.worker_id}"
+        async for key in redis_client.scan_iter(match=f"{REDIS_KEY_PREFIX}*"):
+            if key == own_key:
+                continue
+            raw = await redis_client.get(key)
+            if not raw:
+                continue
+            try:
+                snapshots.append(json.loads(raw))
+            except ValueError:
+                continue
+        return snapshots, len(snapshots)
+
+
+def merge_snapshots(snapshots: List[Dict]) -> Dict[str, Dict]:
+    merged: Dict[str, Dict] = {}
+    for snap in snapshots:
+        for name, metric in snap.items():
+            target = merged.get(name)
+            if target is None:
+                target = {k: v for k, v in metric.items() if k != "series"}
+                target["series"] = {}
+                merged[name] = target
+            if target["type"] != metric["type"] or target.get("buckets") != metric.get("buckets"):
+                continue
+            series = target["series"]
+            for labels, value in metric["series"]:
+                key = tuple(labels)
+                if isinstance(value, list):
+                    prev = series.get(key)
+                    series[key] = [a + b for a, b in zip(prev, value)] if prev else list(value)
+                else:
+                    series[key] = series.get(key, 0.0) + value
+    return merged
+
+
+def _derive_cache_hit_ratio(merged: Dict[str, Dict]):
+    requests = merged.get("ticketing_cache_requests")
+    if not requests:
+        return
+    totals: Dict[str, List[float]] = {}
+    for (cache, result), value in requests["series"].items():
+        hits_total = totals.setdefault(cache, [0.0, 0.0])
+        hits_total[1] += value
+        if result == "hit":
+            hits_total[0] += value
+    merged["ticketing_cache_hit_ratio"] = {
+        "type": "gauge",
+        "help": "Cache hit ratio since worker start (hits / lookups).",
+        "labels": ["cache"],
+        "series": {(cache,): (h / t if t else 0.0) for cache, (h, t) in totals.items()},
+    }
+
+
+def render(snapshots: List[Dict]) -> str:
+    """Render merged snapshots in OpenMetrics text exposition format."""
+    merged = merge_snapshots(snapshots)
+    _derive_cache_hit_ratio(merged)
+    lines: List[str] = []
+    for name in sorted(merged):
+        metric = merged[name]
+        mtype = metric["type"]
+        labelnames = metric["labels"]
+        lines.append(f"# TYPE {name} {mtype}")
+        lines.append(f"# HELP {name} {_escape(metric['help'])}")
+        for labels in sorted(metric["series"]):
+            value = metric["series"][labels]
+            if mtype == "counter":
+                lines.append(f"{name}_total{_label_str(labelnames, labels)} {_format_value(value)}")
+            elif mtype == "gauge":
+                lines.append(f"{name}{_label_str(labelnames, labels)} {_format_value(value)}")
+            else:
+                cumulative = 0
+                bounds = list(metric["buckets"]) + [math.inf]
+                for bound, count in zip(bounds, value[:-1]):
+                    cumulative += count
+                    le = _format_value(bound) if bound == math.inf else repr(float(bound))
+                    lines.append(f"{name}_bucket{_label_str(labelnames, labels, ('le', le))} {cumulative}")
+                lines.append(f"{name}_count{_label_str(labelnames, labels)} {cumulative}")
+                lines.append(f"{name}_sum{_label_str(labelnames, labels)} {_format_value(value[-1])}")
+    lines.append("# EOF")
+    return "\n".join(lines) + "\n"
+
+
+def _build_registry() -> MetricsRegistry:
+    from settings import settings
+    return MetricsRegistry(max_series=settings.METRICS_MAX_SERIES_PER_METRIC)
+
+
+registry = _build_registry()
+
+HTTP_REQUESTS = registry.counter(
+    "ticketing_http_requests", "HTTP requests by method, route template and status class.", ("method", "route", "status"))
+HTTP_REQUEST_DURATION = registry.histogram(
+    "ticketing_http_request_duration_seconds", "HTTP request latency by method and route template.", ("method", "route"))
+DB_POOL_CHECKOUT_WAIT = registry.histogram(
+    "ticketing_db_pool_checkout_wait_seconds", "Time spent waiting for a pooled DB connection (includes connect).",
+    buckets=(0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0, 30.0))
+DB_POOL_CHECKOUT_TIMEOUTS = registry.counter(
+    "ticketing_db_pool_checkout_timeouts", "DB pool checkouts that timed out waiting for a connection.")
+DB_POOL_CHECKED_OUT = registry.gauge("ticketing_db_pool_checked_out", "DB connections currently checked out.")
+DB_POOL_SIZE = registry.gauge("ticketing_db_pool_size", "Configured DB pool size.")
+DB_POOL_OVERFLOW = registry.gauge("ticketing_db_pool_overflow", "DB overflow connections currently open.")
+WEBSOCKET_CONNECTIONS = registry.gauge("ticketing_websocket_connections", "Open WebSocket connections.")
+BROADCAST_QUEUE_DEPTH = registry.gauge("ticketing_broadcast_queue_depth", "Broadcasts enqueued but not yet delivered.")
+BROADCASTS = registry.counter("ticketing_broadcasts", "Broadcast messages sent by transport.", ("transport",))
+CACHE_REQUESTS = registry.counter("ticketing_cache_requests", "Cache lookups by cache name and result.", ("cache", "result"))
+
+
+def record_cache_lookup(cache: str, hit: bool, count: int = 1):
+    if count:
+        CACHE_REQUESTS.inc(count, labels=(cache, "hit" if hit else "miss"))
@@ -0,0 +1,121 @@
+"""
+Pagination helpers: keyset (seek) pages and OFFSET pages with a total.
+
+A page is read with `WHERE (sort columns) < (last row's values) ORDER BY ... LIMIT n+1`
+instead of OFFSET, so page N costs the same as page 1 and rows inserted while a
+client pages through do not shift later pages. The cursor handed to clients is
+the last row's sort-key values, JSON-encoded in URL-safe base64; clients treat
+it as opaque.
+"""
+import base64
+import json
+from datetime import date, datetime
+from typing import Any, List, Optional, Sequence, Tuple
+
+from fastapi import HTTPException
+from sqlalchemy import and_, func, or_, text
+
+
+def _encode_value(value: Any) -> Any:
+    if isinstance(value, datetime):
+        return {"$dt": value.isoformat()}
+    if isinstance(value, date):
+        return {"$d": value.isoformat()}
+    return value
+
+
+def _decode_value(value: Any) -> Any:
+    if isinstance(value, dict):
+        if "$dt" in value:
+            return datetime.fromisoformat(value["$dt"])
+        if "$d" in value:
+            return date.fromisoformat(value["$d"])
+        raise ValueError("unknown cursor value")
+    return value
+
+
+def encode_cursor(values: Sequence[Any]) -> str:
+    raw = json.dumps([_encode_value(v) for v in values], separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, size: int) -> Tuple[Any, ...]:
+    """Inverse of `encode_cursor`; raises ValueError for anything malformed."""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        values = json.loads(raw)
+    except Exception as e:
+        raise ValueError("invalid cursor") from e
+    if not isinstance(values, list) or len(values) != size:
+        raise ValueError("invalid cursor")
+    return tuple(_decode_value(v) for v in values)
+
+
+def cursor_param(cursor: Optional[str], size: int) -> Optional[Tuple[Any, ...]]:
+    """Decode a `cursor` query parameter for a route; a malformed cursor is a 400."""
+    if not cursor:
+        return None
+    try:
+        return decode_cursor(cursor, size)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
+def seek_after(columns: Sequence[Any], values: Sequence[Any], descending: bool = True):
+    """Filter for rows strictly after `values` in (columns...) order.
+
+    Expanded to `a < x OR (a = x AND b < y) ...` rather than a row-value
+    comparison so it works on every backend; the columns must be NOT NULL.
+    """
+    clauses = []
+    for i, column in enumerate(columns):
+        bound = column < values[i] if descending else column > values[i]
+        clauses.append(and_(*[columns[j] == values[j] for j in range(i)], bound))
+    return or_(*clauses)
+
+
+def keyset_page(query, columns: Sequence[Any], limit: int, after: Optional[Sequence[Any]] = None,
+                descending: bool = True) -> Tuple[List[Any], Optional[str]]:
+    """Run `query` for one page; returns (rows, next_cursor or None on the last page)."""
+    if after is not None:
+        query = query.filter(seek_after(columns, after, descending))
+    order = [c.desc() if descending else c.asc() for c in columns]
+    rows = query.order_by(*order).limit(limit + 1).all()
+    if len(rows) <= limit:
+        return rows, None
+    rows = rows[:limit]
+    last = rows[-1]
+    return rows, encode_cursor([getattr(last, c.key) for c in columns])
+
+
+def estimated_row_count(db, table_name: str) -> Optional[int]:
+    """Planner row estimate for a whole table (Postgres only; None if unknown)."""
+    if db.get_bind().dialect.name != "postgresql":
+        return None
+    value = db.execute(
+        text("SELECT reltuples::bigint FROM pg_class WHERE oid = to_regclass(:table_name)"),
+        {"table_name": table_name},
+    ).scalar()
+    # -1 means the table was never analyzed
+    return value if value is not None and value >= 0 else None
+
+
+def offset_page_with_total(query, skip: int, limit: int,
+                           estimate_table: Optional[str] = None) -> Tuple[List[Any], int, bool]:
+    """Run an OFFSET page and the total match count in one query; returns (rows, total, estimated).
+
+    The total comes from `COUNT(*) OVER ()` on the page query itself. Pass
+    `estimate_table` only for unfiltered listings: if the planner estimates at
+    least LIST_TOTAL_ESTIMATE_MIN_ROWS rows, that estimate is returned instead
+    and the window (which has to visit every row) is skipped.
+    """
+    if estimate_table:
+        from settings import settings
+        estimate = estimated_row_count(query.session, estimate_table)
+        if estimate is not None and estimate >= settings.LIST_TOTAL_ESTIMATE_MIN_ROWS:
+            return query.offset(skip).limit(limit).all(), estimate, True
+    rows = query.add_columns(func.count().over().label("total")).offset(skip).limit(limit).all()
+    if rows:
+        return [row[0] for row in rows], rows[0][-1], False
+    # Past the last page the window has no row to ride on
+    return [], query.order_by(None).count() if skip else 0, False
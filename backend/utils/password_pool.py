@@ -0,0 +1,182 @@
+"""
+Password hashing and verification on a dedicated, bounded process pool.
+
+bcrypt costs a few hundred milliseconds of CPU per call. Run inline, a login
+storm at shift start fills the shared AnyIO threadpool that every sync endpoint
+uses and holds the GIL for part of that time. Here the work runs in
+`PASSWORD_POOL_WORKERS` separate processes:
+
+* The login endpoints are async and await the result, so they hold no
+  threadpool thread while bcrypt runs.
+* Sync callers (user create / password change / reset) block only their own
+  thread.
+* At most `PASSWORD_POOL_MAX_PENDING` calls may be queued or running. Beyond
+  that, callers fail fast with 429 and `Retry-After` instead of queueing
+  without bound.
+* A worker that dies (OOM kill, segfault) breaks the whole executor; it is
+  discarded and the next call starts a fresh one. The call that hit the
+  broken pool is retried once.
+
+`PASSWORD_POOL_WORKERS=0` runs bcrypt in the calling thread, and async callers
+hand it to the AnyIO threadpool (the previous behaviour).
+"""
+import asyncio
+import hashlib
+import logging
+import multiprocessing
+import threading
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Callable, Optional
+
+import bcrypt
+from fastapi import HTTPException
+from starlette.concurrency import run_in_threadpool
+
+from utils import metrics
+
+logger = logging.getLogger("ticketing")
+
+PASSWORD_POOL_PENDING = metrics.registry.gauge(
+    "ticketing_password_pool_pending", "Password hash/verify calls queued or running on the password pool.")
+PASSWORD_POOL_REJECTED = metrics.registry.counter(
+    "ticketing_password_pool_rejected", "Password hash/verify calls rejected with 429 because the pool queue was full.")
+
+
+def get_password_hash(password: str) -> str:
+    """Hash a password using bcrypt"""
+    return bcrypt.hashpw(password.encode('utf-8'), bcrypt.gensalt()).decode('utf-8')
+
+
+def verify_password(plain_password: str, hashed_password: str) -> bool:
+    """Verify a password - supports both bcrypt and SHA256 (legacy)"""
+    if not hashed_password:
+        return False
+    # Check if it's a bcrypt hash (starts with $2b$ or $2a$ or $2y$)
+    if hashed_password.startswith('$2'):
+        try:
+            return bcrypt.checkpw(plain_password.encode('utf-8'), hashed_password.encode('utf-8'))
+        except Exception:
+            return False
+    # Fall back to SHA256 for legacy hashes
+    else:
+        sha256_hash = hashlib.sha256(plain_password.encode()).hexdigest()
+        return sha256_hash == hashed_password
+
+
+class PasswordPool:
+    def __init__(self, workers: Optional[int] = None, max_pending: Optional[int] = None):
+        self._workers = workers
+        self._max_pending = max_pending
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._pending = 0
+        self._lock = threading.Lock()
+
+    @property
+    def workers(self) -> int:
+        if self._workers is not None:
+            return self._workers
+        from settings import settings
+        return settings.PASSWORD_POOL_WORKERS
+
+    @property
+    def max_pending(self) -> int:
+        if self._max_pending is not None:
+            return self._max_pending
+        from settings import settings
+        return settings.PASSWORD_POOL_MAX_PENDING
+
+    @property
+    def pending(self) -> int:
+        return self._pending
+
+    def _acquire(self):
+        with self._lock:
+            if self._pending >= self.max_pending:
+                PASSWORD_POOL_REJECTED.inc()
+                raise HTTPException(
+                    status_code=429,
+                    detail="Too many password checks in progress. Try again shortly.",
+                    headers={"Retry-After": "1"},
+                )
+            self._pending += 1
+        PASSWORD_POOL_PENDING.inc()
+
+    def _release(self, *_):
+        with self._lock:
+            self._pending -= 1
+        PASSWORD_POOL_PENDING.dec()
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                # spawn: forking a server process with live threads and sockets is unsafe
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.workers, mp_context=multiprocessing.get_context("spawn"))
+            return self._executor
+
+    def _discard_executor(self, executor: ProcessPoolExecutor):
+        with self._lock:
+            if self._executor is not executor:
+                return  # already replaced
+            self._executor = None
+        logger.warning("Password pool worker died; replacing the pool")
+        executor.shutdown(wait=False, cancel_futures=True)
+
+    def _discard_if_broken(self, executor: ProcessPoolExecutor, future: Future):
+        if not future.cancelled() and isinstance(future.exception(), BrokenProcessPool):
+            self._discard_executor(executor)
+
+    def _submit(self, fn: Callable, *args) -> Future:
+        self._acquire()
+        try:
+            if self.workers <= 0:
+                future: Future = Future()
+                try:
+                    future.set_result(fn(*args))
+                except BaseException as e:
+                    future.set_exception(e)
+            else:
+                executor = self._get_executor()
+                try:
+                    future = executor.submit(fn, *args)
+                except BrokenProcessPool:
+                    self._discard_executor(executor)
+                    raise
+                future.add_done_callback(lambda f: self._discard_if_broken(executor, f))
+        except BaseException:
+            self._release()
+            raise
+        future.add_done_callback(self._release)
+        return future
+
+    def _call(self, fn: Callable, *args):
+        try:
+            return self._submit(fn, *args).result()
+        except BrokenProcessPool:
+            return self._submit(fn, *args).result()
+
+    def hash(self, password: str) -> str:
+        """bcrypt hash of `password` (blocks the calling thread, not the pool's CPU budget)."""
+        return self._call(get_password_hash, password)
+
+    def verify(self, plain_password: str, hashed_password: str) -> bool:
+        return self._call(verify_password, plain_password, hashed_password)
+
+    async def verify_async(self, plain_password: str, hashed_password: str) -> bool:
+        """`verify` for async endpoints; holds no threadpool thread while bcrypt runs."""
+        if self.workers <= 0:
+            return await run_in_threadpool(self.verify, plain_password, hashed_password)
+        try:
+            return await asyncio.wrap_future(self._submit(verify_password, plain_password, hashed_password))
+        except BrokenProcessPool:
+            return await asyncio.wrap_future(self._submit(verify_password, plain_password, hashed_password))
+
+    def shutdown(self):
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+
+password_pool = PasswordPool()
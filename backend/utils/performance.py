@@ -6,34 +6,51 @@ import time
 import functools
 import psutil
 import logging
+from collections import deque
 from typing import Dict, Any, Optional, Callable
 from datetime import datetime, timezone
 from contextlib import contextmanager
 from sqlalchemy.orm import Session
 from sqlalchemy import text
 
+from utils import metrics as metrics_registry
+
 logger = logging.getLogger(__name__)
 
+OPERATION_DURATION = metrics_registry.registry.histogram(
+    "ticketing_operation_duration_seconds", "Timed functions, queries and operations.", ("operation",))
+
 class PerformanceMonitor:
-    """Performance monitoring class for tracking various metrics"""
+    """Performance monitoring class for tracking various metrics.
+
+    Keeps the most recent `max_samples` values for at most `max_metrics` names;
+    durations are also exported through the /metrics registry.
+    """
     
-    def __init__(self):
+    def __init__(self, max_metrics: int = 200, max_samples: int = 500):
         self.metrics = {}
+        self.max_metrics = max_metrics
+        self.max_samples = max_samples
         self.start_time = time.time()
     
     def record_metric(self, name: str, value: float, unit: str = "seconds", **metadata):
         """Record a performance metric"""
-        if name not in self.metrics:
-            self.metrics[name] = []
+        if unit == "seconds":
+            OPERATION_DURATION.observe(value, labels=(name,))
+        samples = self.metrics.get(name)
+        if samples is None:
+            if len(self.metrics) >= self.max_metrics:
+                return
+            samples = self.metrics[name] = deque(maxlen=self.max_samples)
         
-        self.metrics[name].append({
+        samples.append({
             "value": value,
             "unit": unit,
             "timestamp": datetime.now(timezone.utc),
             "metadata": metadata
         })
         
-        logger.info(
+        logger.debug(
             f"Performance metric recorded: {name} = {value} {unit}",
             extra={
                 "metric_name": name,
@@ -45,12 +62,13 @@ class PerformanceMonitor:
     
     def get_metrics(self) -> Dict[str, Any]:
         """Get all recorded metrics"""
-        return self.metrics.copy()
+        return {name: list(samples) for name, samples in self.metrics.items()}
     
     def get_system_metrics(self) -> Dict[str, Any]:
         """Get current system performance metrics"""
         return {
-            "cpu_percent": psutil.cpu_percent(interval=1),
+            # interval=None: usage since the previous call, without blocking the caller
+            "cpu_percent": psutil.cpu_percent(interval=None),
             "memory_percent": psutil.virtual_memory().percent,
             "disk_usage": psutil.disk_usage('/').percent,
             "uptime": time.time() - self.start_time,
@@ -0,0 +1,240 @@
+"""
+Opt-in sampling profiler for individual requests.
+
+A profiling session runs a daemon thread that snapshots `sys._current_frames()`
+every `interval_ms` while the request is in flight. Sync endpoints execute in the
+threadpool, so every thread except the sampler is captured and idle stacks
+(threads parked in wait/select) are dropped; concurrent requests can therefore
+show up in the same profile. Output is speedscope JSON (https://www.speedscope.app)
+stored in a bounded on-disk ring of files, newest kept.
+"""
+import json
+import logging
+import os
+import random
+import re
+import sys
+import threading
+import time
+from datetime import datetime, timezone
+from typing import Dict, List, Optional, Tuple
+
+logger = logging.getLogger("ticketing")
+
+SPEEDSCOPE_SCHEMA = "https://www.speedscope.app/file-format-schema.json"
+_FILE_SUFFIX = ".speedscope.json"
+_NAME_RE = re.compile(r"^[A-Za-z0-9_.-]+\.speedscope\.json$")
+_UNSAFE_CHARS = re.compile(r"[^A-Za-z0-9_-]+")
+
+# Innermost functions of a thread that is waiting rather than working
+_IDLE_FUNCTIONS = {"wait", "select", "poll", "accept"}
+
+Frame = Tuple[str, str, int]
+
+
+class StackSampler:
+    """Samples every thread's Python stack until stopped."""
+
+    def __init__(self, interval_ms: float = 5.0, max_samples: int = 20000):
+        self.interval = interval_ms / 1000.0
+        self.max_samples = max_samples
+        self.samples: List[Tuple[str, Tuple[Frame, ...], float]] = []
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self.started_at = 0.0
+        self.duration_ms = 0.0
+        self.finished = False
+
+    def start(self):
+        self.started_at = time.perf_counter()
+        self._thread = threading.Thread(target=self._run, name="request-profiler", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=1.0)
+        self.duration_ms = (time.perf_counter() - self.started_at) * 1000.0
+
+    def _run(self):
+        own_id = threading.get_ident()
+        last = time.perf_counter()
+        warned = False
+        while not self._stop.wait(self.interval):
+            now = time.perf_counter()
+            weight_ms = (now - last) * 1000.0
+            last = now
+            try:
+                self._sample(own_id, weight_ms)
+            except Exception as e:
+                # Other threads' frames change under us; drop this tick rather than end the profile
+                if not warned:
+                    logger.warning("Profiler sample failed (continuing): %r", e)
+                    warned = True
+            if len(self.samples) >= self.max_samples:
+                break
+
+    def _sample(self, own_id: int, weight_ms: float):
+        names = {t.ident: t.name for t in threading.enumerate()}
+        for thread_id, frame in sys._current_frames().items():
+            if thread_id == own_id:
+                continue
+            try:
+                if frame.f_code.co_name in _IDLE_FUNCTIONS:
+                    continue
+                stack = []
+                while frame is not None:
+                    code = frame.f_code
+                    stack.append((code.co_name, code.co_filename, frame.f_lineno))
+                    frame = frame.f_back
+            except AttributeError:
+                continue  # a frame torn down mid-walk: skip this thread for this tick
+            stack.reverse()
+            self.samples.append((names.get(thread_id, str(thread_id)), tuple(stack), weight_ms))
+
+    def to_speedscope(self, name: str) -> Dict:
+        frames: List[Dict] = []
+        frame_index: Dict[Frame, int] = {}
+        by_thread: Dict[str, Tuple[List[List[int]], List[float]]] = {}
+        for thread_name, stack, weight in self.samples:
+            indices = []
+            for frame in stack:
+                idx = frame_index.get(frame)
+                if idx is None:
+                    idx = frame_index[frame] = len(frames)
+                    frames.append({"name": frame[0], "file": frame[1], "line": frame[2]})
+                indices.append(idx)
+            samples, weights = by_thread.setdefault(thread_name, ([], []))
+            samples.append(indices)
+            weights.append(round(weight, 3))
+        profiles = [
+            {
+                "type": "sampled",
+                "name": thread_name,
+                "unit": "milliseconds",
+                "startValue": 0,
+                "endValue": round(sum(weights), 3),
+                "samples": samples,
+                "weights": weights,
+            }
+            for thread_name, (samples, weights) in by_thread.items()
+        ]
+        return {
+            "$schema": SPEEDSCOPE_SCHEMA,
+            "name": name,
+            "exporter": "ticketing-backend",
+            "activeProfileIndex": 0,
+            "shared": {"frames": frames},
+            "profiles": profiles,
+        }
+
+
+class ProfileStore:
+    """Bounded ring of speedscope files in one directory (oldest deleted first)."""
+
+    def __init__(self, directory: str, max_files: int = 50):
+        self.directory = directory
+        self.max_files = max(1, max_files)
+        self._lock = threading.Lock()
+
+    def save(self, method: str, route: str, elapsed_ms: float, data: Dict) -> str:
+        stamp = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%S%f")
+        slug = _UNSAFE_CHARS.sub("_", route).strip("_")[:80] or "root"
+        name = f"{stamp}_{method}_{slug}_{int(elapsed_ms)}ms{_FILE_SUFFIX}"
+        with self._lock:
+            os.makedirs(self.directory, exist_ok=True)
+            path = os.path.join(self.directory, name)
+            tmp = path + ".tmp"
+            with open(tmp, "w", encoding="utf-8") as fh:
+                json.dump(data, fh, separators=(",", ":"))
+            os.replace(tmp, path)
+            self._prune()
+        return name
+
+    def _prune(self):
+        names = sorted(n for n in os.listdir(self.directory) if n.endswith(_FILE_SUFFIX))
+        for old in names[: max(0, len(names) - self.max_files)]:
+            try:
+                os.remove(os.path.join(self.directory, old))
+            except OSError:
+                pass
+
+    def list(self) -> List[Dict]:
+        if not os.path.isdir(self.directory):
+            return []
+        out = []
+        for name in sorted(os.listdir(self.directory), reverse=True):
+            if not name.endswith(_FILE_SUFFIX):
+                continue
+            stat = os.stat(os.path.join(self.directory, name))
+            out.append({
+                "name": name,
+                "size_bytes": stat.st_size,
+                "created_at": datetime.fromtimestamp(stat.st_mtime, timezone.utc).isoformat(),
+            })
+        return out
+
+    def path_for(self, name: str) -> Optional[str]:
+        """Absolute path of a stored profile, or None for unknown/unsafe names."""
+        if not _NAME_RE.match(name):
+            return None
+        path = os.path.join(self.directory, name)
+        return path if os.path.isfile(path) else None
+
+
+class RequestProfiler:
+    """Decides which requests to profile and bounds concurrent sessions."""
+
+    def __init__(self, store: ProfileStore, sample_rate: float = 0.0, slow_threshold_ms: float = 1200.0,
+                 interval_ms: float = 5.0, max_concurrent: int = 2):
+        self.store = store
+        self.sample_rate = sample_rate
+        self.slow_threshold_ms = slow_threshold_ms
+        self.interval_ms = interval_ms
+        self._slots = threading.BoundedSemaphore(max(1, max_concurrent))
+
+    def should_sample(self) -> bool:
+        return self.sample_rate > 0 and random.random() < self.sample_rate
+
+    def start(self) -> Optional[StackSampler]:
+        """Start a sampler if a concurrency slot is free; caller must `finish` it."""
+        if not self._slots.acquire(blocking=False):
+            return None
+        try:
+            sampler = StackSampler(self.interval_ms)
+            sampler.start()
+        except BaseException:
+            self._slots.release()
+            raise
+        return sampler
+
+    def finish(self, sampler: StackSampler, method: str, route: str, elapsed_ms: float, keep: bool) -> Optional[str]:
+        """Stop `sampler`, free its slot and store the profile if `keep`; safe to call again (no-op)."""
+        if sampler.finished:
+            return None
+        sampler.finished = True
+        try:
+            sampler.stop()
+        finally:
+            self._slots.release()
+        if not keep or not sampler.samples:
+            return None
+        try:
+            return self.store.save(method, route, elapsed_ms, sampler.to_speedscope(f"{method} {route} {elapsed_ms:.0f}ms"))
+        except Exception as e:
+            logger.warning("Failed to store profile for %s %s: %s", method, route, e)
+            return None
+
+
+def _build_profiler() -> RequestProfiler:
+    from settings import settings
+    return RequestProfiler(
+        ProfileStore(settings.PROFILE_DIR, settings.PROFILE_MAX_FILES),
+        sample_rate=settings.PROFILE_SAMPLE_RATE,
+        slow_threshold_ms=settings.PROFILE_SLOW_THRESHOLD_MS,
+        interval_ms=settings.PROFILE_INTERVAL_MS,
+        max_concurrent=settings.PROFILE_MAX_CONCURRENT,
+    )
+
+
+request_profiler = _build_profiler()
@@ -0,0 +1,125 @@
+"""
+Per-request SQL statistics from SQLAlchemy cursor events.
+
+`before/after_cursor_execute` listeners time every statement and attribute it to
+the QueryStats bound to the current request context (a contextvar, so it follows
+the request into the threadpool that runs sync endpoints). Statements are
+fingerprinted with literals and IN-lists collapsed, which makes N+1 patterns show
+up as one fingerprint repeated many times.
+
+`capture_queries()` records every statement on the engine regardless of context;
+tests use it (via the `query_budget` fixture) because TestClient runs the app in
+another thread.
+"""
+import logging
+import re
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import List, Optional, Tuple
+
+from sqlalchemy import event
+
+logger = logging.getLogger("ticketing")
+
+_current: ContextVar[Optional["QueryStats"]] = ContextVar("query_stats", default=None)
+_captures: List["QueryStats"] = []
+_captures_lock = threading.Lock()
+
+_STRING_LITERAL = re.compile(r"'(?:[^']|'')*'")
+_NUMBER_LITERAL = re.compile(r"\b\d+(?:\.\d+)?\b")
+_PARAM = re.compile(r"%\(\w+\)s|\$\d+|\?|:\w+")
+_IN_LIST = re.compile(r"\bIN\s*\((?:\s*\?\s*,)*\s*\?\s*\)", re.IGNORECASE)
+_POSTCOMPILE = re.compile(r"\(__\[POSTCOMPILE_\w+\]\)")
+_WHITESPACE = re.compile(r"\s+")
+
+
+def fingerprint(statement: str) -> str:
+    """Normalize a SQL statement so executions differing only in values compare equal."""
+    fp = _STRING_LITERAL.sub("?", statement)
+    fp = _PARAM.sub("?", fp)
+    fp = _NUMBER_LITERAL.sub("?", fp)
+    fp = _POSTCOMPILE.sub("(?)", fp)
+    fp = _IN_LIST.sub("IN (?)", fp)
+    return _WHITESPACE.sub(" ", fp).strip()
+
+
+class QueryStats:
+    __slots__ = ("count", "total_ms", "fingerprints", "_lock")
+
+    def __init__(self):
+        self.count = 0
+        self.total_ms = 0.0
+        self.fingerprints: Counter = Counter()
+        self._lock = threading.Lock()
+
+    def record(self, statement: str, elapsed_ms: float):
+        fp = fingerprint(statement)
+        with self._lock:
+            self.count += 1
+            self.total_ms += elapsed_ms
+            self.fingerprints[fp] += 1
+
+    def repeated(self, threshold: int) -> List[Tuple[str, int]]:
+        """Fingerprints executed more than `threshold` times, most frequent first."""
+        return [(fp, n) for fp, n in self.fingerprints.most_common() if n > threshold]
+
+    def describe(self, limit: int = 5) -> str:
+        top = "\n".join(f"  {n}x {fp[:200]}" for fp, n in self.fingerprints.most_common(limit))
+        return f"{self.count} queries, {self.total_ms:.1f} ms\n{top}"
+
+
+def start_request():
+    """Bind a fresh QueryStats to the current context; returns (stats, reset token)."""
+    stats = QueryStats()
+    return stats, _current.set(stats)
+
+
+def end_request(token):
+    _current.reset(token)
+
+
+@contextmanager
+def capture_queries():
+    """Collect every statement executed on instrumented engines while the block runs."""
+    stats = QueryStats()
+    with _captures_lock:
+        _captures.append(stats)
+    try:
+        yield stats
+    finally:
+        with _captures_lock:
+            _captures.remove(stats)
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("query_start", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    starts = conn.info.get("query_start")
+    if not starts:
+        return
+    elapsed_ms = (time.perf_counter() - starts.pop()) * 1000.0
+    stats = _current.get()
+    if stats is not None:
+        stats.record(statement, elapsed_ms)
+    if _captures:
+        with _captures_lock:
+            captures = list(_captures)
+        for capture in captures:
+            capture.record(statement, elapsed_ms)
+
+
+def _handle_error(exception_context):
+    conn = exception_context.connection
+    if conn is not None and conn.info.get("query_start"):
+        conn.info["query_start"].pop()
+
+
+def instrument_engine(engine):
+    event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+    event.listen(engine, "handle_error", _handle_error)
@@ -9,25 +9,13 @@ from fastapi import HTTPException, Request
 
 logger = logging.getLogger("ticketing")
 
-_redis_client = None
 _memory_fallback = {}
 
 
 def _get_redis():
-    global _redis_client
-    if _redis_client is not None:
-        return _redis_client
-    try:
-        from settings import settings
-        import redis
-        _redis_client = redis.from_url(settings.REDIS_URL, decode_responses=True)
-        _redis_client.ping()
-        logger.info("Redis connected for rate limiting")
-        return _redis_client
-    except Exception as e:
-        logger.warning("Redis unavailable for rate limiting: %s", e)
-        _redis_client = None
-        return None
+    """Shared sync client; None while the Redis circuit is open."""
+    from utils.redis_manager import redis_manager
+    return redis_manager.get_sync()
 
 
 def _check_limit(key: str, limit: int, window_seconds: int) -> bool:
@@ -45,7 +33,9 @@ def _check_limit(key: str, limit: int, window_seconds: int) -> bool:
         return count <= limit
     except Exception as e:
         logger.warning("Redis rate limit error: %s", e)
-        return True
+        from utils.redis_manager import redis_manager
+        redis_manager.record_failure(e)
+        return _memory_check(key, limit, window_seconds)
 
 
 def _memory_check(key: str, limit: int, window_seconds: int) -> bool:
@@ -0,0 +1,281 @@
+"""
+Shared Redis client manager.
+
+One manager per process owns both the sync client (rate limiting) and the async
+client (WebSocket broadcasting). A circuit breaker tracks Redis health so that an
+outage costs one connect timeout per backoff window instead of one per request.
+"""
+import asyncio
+import logging
+import random
+import threading
+import time
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, Optional
+
+logger = logging.getLogger("ticketing")
+
+STATE_CLOSED = "closed"
+STATE_OPEN = "open"
+STATE_HALF_OPEN = "half_open"
+
+
+class CircuitBreaker:
+    """Failure-burst circuit breaker with exponential reconnect backoff.
+
+    closed    -> calls allowed; `failure_threshold` failures, each within
+                 `failure_window` seconds of the previous one, open it. Commands on
+                 a connected client don't report success, so a quiet spell is what
+                 resets the count; sporadic errors hours apart never add up.
+    open      -> calls short-circuit until the backoff delay elapses.
+    half_open -> exactly one probe is allowed; success closes, failure re-opens
+                 with a doubled delay (capped at `max_backoff`).
+    """
+
+    def __init__(self, failure_threshold: int = 3, base_backoff: float = 1.0, max_backoff: float = 60.0,
+                 failure_window: float = 30.0, clock=time.monotonic):
+        self.failure_threshold = max(1, failure_threshold)
+        self.failure_window = failure_window
+        self.base_backoff = base_backoff
+        self.max_backoff = max_backoff
+        self._clock = clock
+        self._lock = threading.Lock()
+        self.state = STATE_CLOSED
+        self.consecutive_failures = 0
+        self.open_count = 0
+        self.next_attempt_at = 0.0
+        self._last_failure_clock: Optional[float] = None
+        self.last_error: Optional[str] = None
+        self.last_failure_at: Optional[datetime] = None
+        self.last_success_at: Optional[datetime] = None
+
+    def allow(self) -> bool:
+        with self._lock:
+            if self.state == STATE_CLOSED:
+                return True
+            if self.state == STATE_OPEN and self._clock() >= self.next_attempt_at:
+                self.state = STATE_HALF_OPEN
+                return True
+            return False
+
+    def record_success(self):
+        with self._lock:
+            if self.state != STATE_CLOSED:
+                logger.info("Redis circuit closed after %d failed attempt(s)", self.open_count)
+            self.state = STATE_CLOSED
+            self.consecutive_failures = 0
+            self.open_count = 0
+            self.last_success_at = datetime.now(timezone.utc)
+
+    def abandon_probe(self):
+        """A half-open probe ended without an outcome (cancelled): let the next caller probe."""
+        with self._lock:
+            if self.state == STATE_HALF_OPEN:
+                self.state = STATE_OPEN
+
+    def record_failure(self, error: Optional[BaseException] = None):
+        with self._lock:
+            now = self._clock()
+            if self._last_failure_clock is not None and now - self._last_failure_clock > self.failure_window:
+                self.consecutive_failures = 0
+            self._last_failure_clock = now
+            self.consecutive_failures += 1
+            self.last_error = str(error) if error else None
+            self.last_failure_at = datetime.now(timezone.utc)
+            if self.state == STATE_HALF_OPEN or self.consecutive_failures >= self.failure_threshold:
+                self._open()
+
+    def _open(self):
+        self.open_count += 1
+        delay = min(self.max_backoff, self.base_backoff * (2 ** (self.open_count - 1)))
+        # Jitter so several workers do not reconnect in lockstep
+        delay = delay * random.uniform(0.8, 1.2)
+        self.next_attempt_at = self._clock() + delay
+        if self.state != STATE_OPEN:
+            logger.warning("Redis circuit opened; next reconnect attempt in %.1fs (%s)", delay, self.last_error)
+        self.state = STATE_OPEN
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            retry_in = max(0.0, self.next_attempt_at - self._clock()) if self.state == STATE_OPEN else 0.0
+            return {
+                "state": self.state,
+                "consecutive_failures": self.consecutive_failures,
+                "open_count": self.open_count,
+                "retry_in_seconds": round(retry_in, 2),
+                "last_error": self.last_error,
+                "last_failure_at": self.last_failure_at.isoformat() if self.last_failure_at else None,
+                "last_success_at": self.last_success_at.isoformat() if self.last_success_at else None,
+            }
+
+
+class RedisManager:
+    """Lazily connects sync/async Redis clients behind a shared circuit breaker.
+
+    Callers get `None` while Redis is unhealthy and must use their local fallback.
+    After a command error, callers report it with `record_failure` so the breaker
+    sees failures that happen on an already-connected client.
+    """
+
+    def __init__(self, url: str, connect_timeout: float = 0.5, socket_timeout: float = 1.0, breaker: Optional[CircuitBreaker] = None):
+        self.url = url
+        self.connect_timeout = connect_timeout
+        self.socket_timeout = socket_timeout
+        self.breaker = breaker or CircuitBreaker()
+        self._sync_client = None
+        self._async_client = None
+        self._sync_lock = threading.Lock()
+
+    @property
+    def healthy(self) -> bool:
+        return self.breaker.state == STATE_CLOSED
+
+    def _needs_probe(self, client) -> bool:
+        return client is None or self.breaker.state == STATE_HALF_OPEN
+
+    def get_sync(self):
+        """Return a connected sync client, or None while the circuit is open."""
+        if not self.breaker.allow():
+            return None
+        client = self._sync_client
+        if not self._needs_probe(client):
+            return client
+        with self._sync_lock:
+            try:
+                if self._sync_client is None:
+                    import redis
+                    self._sync_client = redis.from_url(
+                        self.url,
+                        decode_responses=True,
+                        socket_connect_timeout=self.connect_timeout,
+                        socket_timeout=self.socket_timeout,
+                    )
+                self._sync_client.ping()
+            except Exception as e:
+                self.record_failure(e)
+                return None
+            except BaseException:
+                self.breaker.abandon_probe()
+                raise
+            self.breaker.record_success()
+            return self._sync_client
+
+    async def get_async(self):
+        """Return a connected async client, or None while the circuit is open."""
+        if not self.breaker.allow():
+            return None
+        client = self._async_client
+        if not self._needs_probe(client):
+            return client
+        try:
+            if self._async_client is None:
+                from redis.asyncio import Redis
+                # No socket_timeout here: WebSocket pubsub listeners block on reads indefinitely
+                self._async_client = Redis.from_url(
+                    self.url,
+                    decode_responses=True,
+                    socket_connect_timeout=self.connect_timeout,
+                )
+            await self._async_client.ping()
+        except Exception as e:
+            self.record_failure(e)
+            return None
+        except BaseException:
+            # Cancelled mid-probe (client gone, task cancelled): without this the breaker
+            # would stay half_open, where allow() refuses every caller
+            self.breaker.abandon_probe()
+            raise
+        self.breaker.record_success()
+        return self._async_client
+
+    def peek_async(self):
+        """Return the async client if already connected and healthy; never dials.
+
+        Used on hot paths (WebSocket accept) where a reconnect attempt per caller
+        would turn an outage into a connect storm; broadcasts drive reconnection.
+        """
+        if self._async_client is None or not self.healthy:
+            return None
+        return self._async_client
+
+    def record_failure(self, error: Optional[BaseException] = None):
+        self.breaker.record_failure(error)
+
+    def record_success(self):
+        self.breaker.record_success()
+
+    def status(self) -> Dict[str, Any]:
+        return {
+            "healthy": self.healthy,
+            "sync_connected": self._sync_client is not None,
+            "async_connected": self._async_client is not None,
+            "circuit": self.breaker.snapshot(),
+        }
+
+    async def aclose(self):
+        if self._async_client is not None:
+            try:
+                await self._async_client.aclose()
+            except Exception:
+                pass
+            self._async_client = None
+        if self._sync_client is not None:
+            try:
+                self._sync_client.close()
+            except Exception:
+                pass
+            self._sync_client = None
+
+
+async def listen_channel(manager: RedisManager, channel: str, on_message: Callable[[str], None],
+                         on_subscribe: Optional[Callable[[], None]] = None, retry_seconds: float = 5.0):
+    """Call `on_message(data)` for every message on `channel`, resubscribing after Redis errors.
+
+    `on_subscribe` runs after each (re)subscribe: anything published while we were
+    not subscribed was missed, so callers typically resync there.
+    """
+    while True:
+        client = await manager.get_async()
+        if not client:
+            await asyncio.sleep(retry_seconds)
+            continue
+        pubsub = client.pubsub()
+        try:
+            await pubsub.subscribe(channel)
+            if on_subscribe is not None:
+                on_subscribe()
+            async for message in pubsub.listen():
+                if message and message.get("type") == "message":
+                    try:
+                        on_message(message.get("data"))
+                    except Exception as e:
+                        logger.warning("Handler for Redis channel %s failed: %s", channel, e)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.warning("Redis channel %s listener lost connection: %s", channel, e)
+            manager.record_failure(e)
+        finally:
+            try:
+                await pubsub.aclose()
+            except Exception:
+                pass
+        await asyncio.sleep(retry_seconds)
+
+
+def _build_manager() -> RedisManager:
+    from settings import settings
+    return RedisManager(
+        settings.REDIS_URL,
+        connect_timeout=settings.REDIS_CONNECT_TIMEOUT_SECONDS,
+        socket_timeout=settings.REDIS_SOCKET_TIMEOUT_SECONDS,
+        breaker=CircuitBreaker(
+            failure_threshold=settings.REDIS_CIRCUIT_FAILURE_THRESHOLD,
+            base_backoff=settings.REDIS_BACKOFF_BASE_SECONDS,
+            max_backoff=settings.REDIS_BACKOFF_MAX_SECONDS,
+            failure_window=settings.REDIS_CIRCUIT_FAILURE_WINDOW_SECONDS,
+        ),
+    )
+
+
+redis_manager = _build_manager()
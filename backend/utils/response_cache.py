@@ -0,0 +1,305 @@
+"""
+Shared response cache for read-heavy endpoints.
+
+Serialized JSON bodies are cached per namespace under a key built from the route,
+its query parameters and the caller's role. There are two tiers:
+
+* L1, per worker: a small LRU dict. Entries are kept for at most
+  `RESPONSE_CACHE_L1_MAX_SECONDS`.
+* L2, Redis: one hash per namespace (`rc:<namespace>`), shared by all workers.
+
+Each namespace lists the broadcast events that change its data (e.g.
+`sla_rules` <- `sla:update`). `broadcast_message` calls `invalidate_for_message` for
+every broadcast, which bumps the namespace generation (`HINCRBY rc:gen`), drops
+its L2 hash and publishes on `RESPONSE_CACHE_CHANNEL` so every worker clears its
+L1. Entries carry the generation they were computed under, so a value computed
+before an invalidation but stored after it is never served.
+
+Misses are computed through `utils.single_flight`, so identical requests that
+miss together run one query. Namespaces registered with `stale_seconds` serve an expired entry for up to that
+long while one background refresh recomputes it (stale-while-revalidate).
+
+Routes behind `etag_guard` also key on the table versions the guard read. Table
+counters are bumped at commit, but the invalidation runs later, from the
+broadcast; without that, a GET in between would pair the new ETag with the old
+body and then keep answering 304 to it.
+"""
+import json
+import logging
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Iterable, NamedTuple, Optional, Set, Tuple
+
+from fastapi import Request, Response
+
+from utils import metrics
+from utils.single_flight import encode_body, json_response, request_key, single_flight
+
+logger = logging.getLogger("ticketing")
+
+RESPONSE_CACHE_CHANNEL = "response_cache_invalidate"
+GENERATIONS_KEY = "rc:gen"
+
+RESPONSE_CACHE_REQUESTS = metrics.registry.counter(
+    "ticketing_response_cache_requests",
+    "Response cache lookups by namespace and result (l1_hit, l2_hit, stale, miss).",
+    ("namespace", "result"))
+
+
+class Namespace(NamedTuple):
+    name: str
+    events: frozenset
+    ttl_seconds: float
+    stale_seconds: float = 0.0
+
+
+class _Entry(NamedTuple):
+    generation: Optional[int]  # L2 generation (None when Redis was unavailable)
+    local_generation: int
+    stored_at: float
+    body: bytes
+
+
+class ResponseCache:
+    def __init__(self, clock: Callable[[], float] = time.time):
+        self._clock = clock
+        self._namespaces: Dict[str, Namespace] = {}
+        self._l1: "OrderedDict[Tuple[str, str], _Entry]" = OrderedDict()
+        self._local_generations: Dict[str, int] = {}
+        self._refreshing: Set[Tuple[str, str]] = set()
+        self._lock = threading.Lock()
+        self._executor: Optional[ThreadPoolExecutor] = None
+
+    def register(self, name: str, events: Iterable[str], ttl_seconds: float, stale_seconds: float = 0.0):
+        self._namespaces[name] = Namespace(name, frozenset(events), ttl_seconds, stale_seconds)
+
+    # -- invalidation -----------------------------------------------------
+
+    def namespaces_for(self, event_types: Iterable[str]) -> Set[str]:
+        event_types = set(event_types)
+        return {ns.name for ns in self._namespaces.values() if ns.events & event_types}
+
+    def drop_local(self, names: Iterable[str]):
+        names = set(names)
+        with self._lock:
+            for name in names:
+                self._local_generations[name] = self._local_generations.get(name, 0) + 1
+            for key in [k for k in self._l1 if k[0] in names]:
+                del self._l1[key]
+
+    def clear_local(self):
+        with self._lock:
+            for name in list(self._local_generations):
+                self._local_generations[name] += 1
+            self._l1.clear()
+
+    def invalidate(self, event_types: Iterable[str]):
+        """Drop every namespace affected by `event_types`, here, in Redis and on other workers."""
+        names = sorted(self.namespaces_for(event_types))
+        if not names:
+            return
+        self.drop_local(names)
+        from utils.redis_manager import redis_manager
+        client = redis_manager.get_sync()
+        if not client:
+            return
+        try:
+            pipe = client.pipeline(transaction=False)
+            for name in names:
+                pipe.hincrby(GENERATIONS_KEY, name, 1)
+                pipe.delete(f"rc:{name}")
+            pipe.publish(RESPONSE_CACHE_CHANNEL, json.dumps(names))
+            pipe.execute()
+        except Exception as e:
+            logger.warning("Response cache invalidation failed: %s", e)
+            redis_manager.record_failure(e)
+
+    def invalidate_for_message(self, message: str):
+        """Invalidate for one broadcast message (`{"type": ..., "action": ...}`).
+
+        Namespaces match either the bare type (`sla`) or `type:action` (`sla:update`).
+        """
+        try:
+            payload = json.loads(message)
+            event_type, action = payload.get("type"), payload.get("action")
+        except (TypeError, ValueError, AttributeError):
+            return
+        if event_type:
+            self.invalidate([event_type, f"{event_type}:{action}"])
+
+    # -- lookup -----------------------------------------------------------
+
+    def _l1_get(self, name: str, key: str) -> Optional[_Entry]:
+        with self._lock:
+            entry = self._l1.get((name, key))
+            if entry is None:
+                return None
+            if entry.local_generation != self._local_generations.get(name, 0):
+                del self._l1[(name, key)]
+                return None
+            self._l1.move_to_end((name, key))
+            return entry
+
+    def _l1_put(self, name: str, key: str, entry: _Entry):
+        from settings import settings
+        with self._lock:
+            if entry.local_generation != self._local_generations.get(name, 0):
+                return
+            self._l1[(name, key)] = entry
+            self._l1.move_to_end((name, key))
+            while len(self._l1) > settings.RESPONSE_CACHE_L1_MAX_ENTRIES:
+                self._l1.popitem(last=False)
+
+    def _l2_get(self, name: str, key: str) -> Tuple[Optional[int], Optional[_Entry]]:
+        """(current generation, stored entry if it belongs to that generation)."""
+        from utils.redis_manager import redis_manager
+        client = redis_manager.get_sync()
+        if not client:
+            return None, None
+        try:
+            pipe = client.pipeline(transaction=False)
+            pipe.hget(GENERATIONS_KEY, name)
+            pipe.hget(f"rc:{name}", key)
+            generation, raw = pipe.execute()
+        except Exception as e:
+            logger.warning("Response cache read failed: %s", e)
+            redis_manager.record_failure(e)
+            return None, None
+        generation = int(generation or 0)
+        if raw is None:
+            return generation, None
+        stored = json.loads(raw)
+        if stored.get("g") != generation:
+            return generation, None
+        return generation, _Entry(generation, 0, stored["t"], stored["b"].encode())
+
+    def _l2_put(self, namespace: Namespace, key: str, entry: _Entry):
+        if entry.generation is None:
+            return
+        from utils.redis_manager import redis_manager
+        client = redis_manager.get_sync()
+        if not client:
+            return
+        value = json.dumps({"g": entry.generation, "t": entry.stored_at, "b": entry.body.decode()})
+        try:
+            pipe = client.pipeline(transaction=False)
+            pipe.hset(f"rc:{namespace.name}", key, value)
+            pipe.expire(f"rc:{namespace.name}", int(namespace.ttl_seconds + namespace.stale_seconds) + 60)
+            pipe.execute()
+        except Exception as e:
+            logger.warning("Response cache write failed: %s", e)
+            redis_manager.record_failure(e)
+
+    def _compute(self, namespace: Namespace, key: str, compute: Callable[[Any], Any], db,
+                 generation: Optional[int], model: Any, store: bool = True) -> _Entry:
+        with self._lock:
+            local_generation = self._local_generations.get(namespace.name, 0)
+        entry = _Entry(generation, local_generation, self._clock(), encode_body(compute(db), model))
+        if not store:
+            return entry
+        self._l1_put(namespace.name, key, entry)
+        self._l2_put(namespace, key, entry)
+        return entry
+
+    def _refresh_in_background(self, namespace: Namespace, key: str, compute, generation, model):
+        with self._lock:
+            if (namespace.name, key) in self._refreshing:
+                return
+            self._refreshing.add((namespace.name, key))
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix="response-cache")
+
+        def run():
+            from database import SessionLocal
+            db = SessionLocal()
+            try:
+                self._compute(namespace, key, compute, db, generation, model)
+            except Exception as e:
+                logger.warning("Response cache refresh of %s failed: %s", namespace.name, e)
+            finally:
+                db.close()
+                with self._lock:
+                    self._refreshing.discard((namespace.name, key))
+
+        self._executor.submit(run)
+
+    def get_body(self, name: str, key: str, compute: Callable[[Any], Any], db, model: Any = None) -> bytes:
+        """JSON body for `key`, from L1, L2 or `compute(db)` (whose result is cached)."""
+        from settings import settings
+        namespace = self._namespaces[name]
+        if not settings.RESPONSE_CACHE_ENABLED:
+            return self._coalesced(namespace, key, compute, db, None, model, store=False).body
+
+        now = self._clock()
+        l1_ttl = min(namespace.ttl_seconds, settings.RESPONSE_CACHE_L1_MAX_SECONDS)
+        entry = self._l1_get(name, key)
+        if entry is not None and now - entry.stored_at < l1_ttl:
+            RESPONSE_CACHE_REQUESTS.inc(labels=(name, "l1_hit"))
+            return entry.body
+
+        generation, stored = self._l2_get(name, key)
+        if stored is not None:
+            age = now - stored.stored_at
+            if age < namespace.ttl_seconds:
+                RESPONSE_CACHE_REQUESTS.inc(labels=(name, "l2_hit"))
+                with self._lock:
+                    local_generation = self._local_generations.get(name, 0)
+                self._l1_put(name, key, stored._replace(local_generation=local_generation))
+                return stored.body
+            if age < namespace.ttl_seconds + namespace.stale_seconds:
+                RESPONSE_CACHE_REQUESTS.inc(labels=(name, "stale"))
+                self._refresh_in_background(namespace, key, compute, generation, model)
+                return stored.body
+        elif entry is not None and generation is None and namespace.stale_seconds \
+                and now - entry.stored_at < namespace.ttl_seconds + namespace.stale_seconds:
+            # Redis unavailable: L1 alone still gives stale-while-revalidate
+            RESPONSE_CACHE_REQUESTS.inc(labels=(name, "stale"))
+            self._refresh_in_background(namespace, key, compute, None, model)
+            return entry.body
+
+        RESPONSE_CACHE_REQUESTS.inc(labels=(name, "miss"))
+        return self._coalesced(namespace, key, compute, db, generation, model).body
+
+    def _coalesced(self, namespace: Namespace, key: str, compute, db, generation, model, store: bool = True) -> _Entry:
+        """`_compute`, shared with identical misses already computing on this worker."""
+        entry, _ = single_flight.do(
+            ("response_cache", namespace.name, key),
+            lambda: self._compute(namespace, key, compute, db, generation, model, store=store),
+            route=namespace.name,
+        )
+        return entry
+
+    def respond(self, name: str, request: Request, response: Response, user, compute: Callable[[Any], Any],
+                db, model: Any = None) -> Response:
+        """Cached JSON response for a route; keeps headers already set on the injected `response`."""
+        key = request_key(request, user)
+        versions = getattr(request.state, "etag_versions", None)
+        if versions:
+            key = f"{key}|v={versions}"
+        return json_response(self.get_body(name, key, compute, db, model=model), response)
+
+
+def _apply_message(data: str):
+    try:
+        names = json.loads(data)
+    except (TypeError, ValueError):
+        return
+    response_cache.drop_local(names)
+
+
+async def response_cache_listener():
+    """Drop L1 entries invalidated on other workers; clear L1 after (re)subscribing."""
+    from utils.redis_manager import listen_channel, redis_manager
+    await listen_channel(redis_manager, RESPONSE_CACHE_CHANNEL, on_message=_apply_message,
+                         on_subscribe=response_cache.clear_local)
+
+
+response_cache = ResponseCache()
+
+response_cache.register("companies", {"field_tech_company", "field_tech"}, ttl_seconds=300)
+response_cache.register("sla_rules", {"sla:create", "sla:update", "sla:delete"}, ttl_seconds=300)
+response_cache.register("users", {"user"}, ttl_seconds=120)
+response_cache.register("dispatch_queue", {"ticket", "site", "field_tech", "user", "sla"}, ttl_seconds=15)
+response_cache.register("workflow_summary", {"ticket", "time_entry", "user", "sla"}, ttl_seconds=60, stale_seconds=300)
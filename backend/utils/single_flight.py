@@ -0,0 +1,127 @@
+"""
+Request coalescing (single-flight) for idempotent GET handlers.
+
+Concurrent identical requests on one worker - same path, query string and
+authorization scope (the caller's role) - share one computation: the first
+caller (the leader) runs it, the others wait for its result instead of
+issuing the same queries. Nothing is kept once the leader finishes; this only
+collapses requests that overlap in time. Pair it with `utils.response_cache`
+for reuse across time.
+
+Waiters share the serialized JSON body, never ORM objects, since those belong
+to the leader's session. If the leader raises, every waiter gets the same
+exception. A waiter that has waited `SINGLE_FLIGHT_WAIT_SECONDS` stops waiting
+and computes the result itself.
+"""
+import json
+import threading
+from functools import lru_cache
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple
+
+from fastapi import Request, Response
+from fastapi.encoders import jsonable_encoder
+from pydantic import TypeAdapter
+
+from utils import metrics
+
+SINGLE_FLIGHT_REQUESTS = metrics.registry.counter(
+    "ticketing_single_flight_requests",
+    "Coalescable GETs by route (or response cache namespace) and result (leader, coalesced, timeout).",
+    ("route", "result"))
+
+
+@lru_cache(maxsize=None)
+def _adapter(model: Any) -> TypeAdapter:
+    return TypeAdapter(model)
+
+
+def encode_body(data: Any, model: Any = None) -> bytes:
+    """JSON body for `data`, as FastAPI would render it (validated through `model` when given)."""
+    if model is not None:
+        adapter = _adapter(model)
+        return adapter.dump_json(adapter.validate_python(data, from_attributes=True), by_alias=True)
+    return json.dumps(jsonable_encoder(data), ensure_ascii=False, separators=(",", ":")).encode()
+
+
+def _role(user) -> str:
+    role = getattr(user, "role", None)
+    return str(getattr(role, "value", role) or "")
+
+
+def request_key(request: Request, user) -> str:
+    """Path, sorted query string and role: requests with equal keys get equal responses."""
+    query = "&".join(sorted(f"{k}={v}" for k, v in request.query_params.multi_items()))
+    return f"{request.url.path}?{query}|{_role(user)}"
+
+
+def json_response(body: bytes, response: Response) -> Response:
+    """JSON response for `body`; keeps headers dependencies set on the injected `response`."""
+    out = Response(content=body, media_type="application/json")
+    for header, value in response.headers.items():
+        if header.lower() not in ("content-length", "content-type"):
+            out.headers[header] = value
+    return out
+
+
+class _Call:
+    def __init__(self):
+        self.done = threading.Event()
+        self.result: Any = None
+        self.error: Optional[BaseException] = None
+
+
+class SingleFlight:
+    def __init__(self, wait_seconds: Optional[float] = None):
+        self._wait_seconds = wait_seconds
+        self._calls: Dict[Hashable, _Call] = {}
+        self._lock = threading.Lock()
+
+    @property
+    def wait_seconds(self) -> float:
+        if self._wait_seconds is not None:
+            return self._wait_seconds
+        from settings import settings
+        return settings.SINGLE_FLIGHT_WAIT_SECONDS
+
+    def in_flight(self) -> int:
+        return len(self._calls)
+
+    def do(self, key: Hashable, fn: Callable[[], Any], route: str = "") -> Tuple[Any, bool]:
+        """(fn() or the result of an identical call already running, whether it was shared)."""
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+
+        if not leader:
+            if call.done.wait(self.wait_seconds):
+                SINGLE_FLIGHT_REQUESTS.inc(labels=(route, "coalesced"))
+                if call.error is not None:
+                    raise call.error
+                return call.result, True
+            # The leader is taking too long; do not queue behind it indefinitely
+            SINGLE_FLIGHT_REQUESTS.inc(labels=(route, "timeout"))
+            return fn(), False
+
+        SINGLE_FLIGHT_REQUESTS.inc(labels=(route, "leader"))
+        try:
+            call.result = fn()
+            return call.result, False
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+
+    def respond(self, request: Request, response: Response, user, compute: Callable[[Any], Any], db,
+                model: Any = None) -> Response:
+        """Coalesced JSON response for a GET route; `compute(db)` runs once per overlapping group."""
+        route = getattr(request.scope.get("route"), "path", request.url.path)
+        body, _ = self.do(("route", request_key(request, user)), lambda: encode_body(compute(db), model), route=route)
+        return json_response(body, response)
+
+
+single_flight = SingleFlight()
@@ -0,0 +1,168 @@
+"""
+Per-worker in-memory prefix index over site IDs for /sites/lookup.
+
+Site rows are kept as plain dicts in an array sorted by lower-cased site_id, so a
+case-insensitive prefix lookup is a `bisect` plus a short scan, with no DB round
+trip. The array is replaced copy-on-write on every change; lookups read a single
+snapshot reference without locking.
+
+The index is loaded at startup and fully reloaded every `SITE_INDEX_REFRESH_SECONDS`.
+Site create/update/delete apply the change locally and publish it on
+`SITE_INDEX_CHANNEL` so other workers apply it too. `lookup` returns None until
+the first load completes and callers fall back to the database.
+"""
+import asyncio
+import bisect
+import json
+import logging
+import threading
+from typing import Any, Dict, List, Optional, Tuple
+
+from starlette.concurrency import run_in_threadpool
+
+logger = logging.getLogger("ticketing")
+
+SITE_INDEX_CHANNEL = "site_index_changed"
+
+_Snapshot = Tuple[List[str], List[Dict[str, Any]]]
+
+
+def site_row(site) -> Dict[str, Any]:
+    """Column values of a Site (what /sites/lookup has always returned)."""
+    return {column.key: getattr(site, column.key) for column in site.__table__.columns}
+
+
+def _sort_key(site_id: str) -> Tuple[str, str]:
+    return site_id.lower(), site_id
+
+
+class SitePrefixIndex:
+    def __init__(self):
+        self._snapshot: Optional[_Snapshot] = None
+        self._lock = threading.Lock()
+
+    @property
+    def ready(self) -> bool:
+        return self._snapshot is not None
+
+    def __len__(self):
+        snapshot = self._snapshot
+        return len(snapshot[1]) if snapshot else 0
+
+    def load(self, rows: List[Dict[str, Any]]):
+        rows = sorted(rows, key=lambda r: _sort_key(r["site_id"]))
+        with self._lock:
+            self._snapshot = ([r["site_id"].lower() for r in rows], rows)
+
+    def upsert(self, row: Dict[str, Any]):
+        with self._lock:
+            if self._snapshot is None:
+                return
+            keys, rows = list(self._snapshot[0]), list(self._snapshot[1])
+            self._remove_from(keys, rows, row["site_id"])
+            key = row["site_id"].lower()
+            pos = bisect.bisect_left(keys, key)
+            while pos < len(keys) and keys[pos] == key and rows[pos]["site_id"] < row["site_id"]:
+                pos += 1
+            keys.insert(pos, key)
+            rows.insert(pos, row)
+            self._snapshot = (keys, rows)
+
+    def remove(self, site_id: str):
+        with self._lock:
+            if self._snapshot is None:
+                return
+            keys, rows = list(self._snapshot[0]), list(self._snapshot[1])
+            if self._remove_from(keys, rows, site_id):
+                self._snapshot = (keys, rows)
+
+    @staticmethod
+    def _remove_from(keys: List[str], rows: List[Dict[str, Any]], site_id: str) -> bool:
+        key = site_id.lower()
+        i = bisect.bisect_left(keys, key)
+        while i < len(keys) and keys[i] == key:
+            if rows[i]["site_id"] == site_id:
+                del keys[i]
+                del rows[i]
+                return True
+            i += 1
+        return False
+
+    def lookup(self, prefix: str, limit: int) -> Optional[List[Dict[str, Any]]]:
+        """Sites whose ID starts with `prefix` (case-insensitive), or None while not loaded."""
+        snapshot = self._snapshot
+        if snapshot is None:
+            return None
+        keys, rows = snapshot
+        prefix = prefix.lower()
+        start = bisect.bisect_left(keys, prefix)
+        out = []
+        for i in range(start, len(keys)):
+            if len(out) >= limit or not keys[i].startswith(prefix):
+                break
+            out.append(rows[i])
+        return out
+
+
+def _load_all_sites() -> List[Dict[str, Any]]:
+    from database import SessionLocal
+    import models
+
+    db = SessionLocal()
+    try:
+        return [dict(row._mapping) for row in db.query(*models.Site.__table__.columns).all()]
+    finally:
+        db.close()
+
+
+def _publish(message: Dict[str, Any]):
+    from utils.redis_manager import redis_manager
+    client = redis_manager.get_sync()
+    if not client:
+        return
+    try:
+        client.publish(SITE_INDEX_CHANNEL, json.dumps(message, default=str))
+    except Exception as e:
+        logger.warning("Site index change publish failed: %s", e)
+        redis_manager.record_failure(e)
+
+
+def notify_site_saved(site):
+    row = site_row(site)
+    site_index.upsert(row)
+    _publish({"op": "upsert", "row": row})
+
+
+def notify_site_deleted(site_id: str):
+    site_index.remove(site_id)
+    _publish({"op": "delete", "site_id": site_id})
+
+
+def _apply_message(data: str):
+    message = json.loads(data)
+    if message.get("op") == "upsert":
+        site_index.upsert(message["row"])
+    elif message.get("op") == "delete":
+        site_index.remove(message["site_id"])
+
+
+async def site_index_loop():
+    """Load the index now and reload it every SITE_INDEX_REFRESH_SECONDS."""
+    from settings import settings
+    while True:
+        try:
+            rows = await run_in_threadpool(_load_all_sites)
+            site_index.load(rows)
+            logger.info("Site prefix index loaded with %d sites", len(rows))
+        except Exception as e:
+            logger.warning("Site prefix index load failed: %s", e)
+        await asyncio.sleep(settings.SITE_INDEX_REFRESH_SECONDS)
+
+
+async def site_index_listener():
+    """Apply site changes published by other workers."""
+    from utils.redis_manager import listen_channel, redis_manager
+    await listen_channel(redis_manager, SITE_INDEX_CHANNEL, on_message=_apply_message)
+
+
+site_index = SitePrefixIndex()
@@ -0,0 +1,153 @@
+"""
+In-memory SLA rule matcher.
+
+Active `sla_rules` rows are compiled into a dict keyed by
+(ticket_type, customer_impact, business_priority) so resolving a ticket's SLA is
+at most three dict lookups instead of a query. Most specific rule wins:
+
+    (type, impact, priority) -> (type, impact, None) -> (type, None, None)
+
+Rules change rarely. The CRUD functions call `notify_rules_changed()`, which
+drops this worker's compiled table and publishes on `SLA_RULES_CHANNEL`; every
+worker runs `sla_rules_listener()` and drops its table on that message. The
+table is also rebuilt after `max_age_seconds` in case a message was missed
+(e.g. Redis was down when a rule changed).
+"""
+import logging
+import threading
+import time
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+from utils import metrics
+
+logger = logging.getLogger("ticketing")
+
+SLA_RULES_CHANNEL = "sla_rules_changed"
+DEFAULT_TARGET_HOURS = 24
+DEFAULT_BREACH_HOURS = 48
+
+SLA_RULE_RELOADS = metrics.registry.counter(
+    "ticketing_sla_rule_reloads", "Times this worker recompiled the SLA rule table.")
+
+RuleKey = Tuple[Optional[str], Optional[str], Optional[str]]
+
+
+class CompiledRule(NamedTuple):
+    """Detached copy of an SLARule row (same attribute names as the model)."""
+    rule_id: str
+    name: str
+    ticket_type: Optional[str]
+    customer_impact: Optional[str]
+    business_priority: Optional[str]
+    sla_target_hours: int
+    sla_breach_hours: int
+    escalation_levels: int
+
+
+def _key_part(value: Any) -> Optional[str]:
+    """Enum members, raw strings and None all normalise to the enum value string."""
+    if value is None:
+        return None
+    return getattr(value, "value", value)
+
+
+def compile_rules(rules: Iterable[Any]) -> Dict[RuleKey, CompiledRule]:
+    """Build the lookup table from active rule rows.
+
+    Rules without a ticket type can never match (same as the old query). When two
+    active rules share a key, the most recently created one wins.
+    """
+    table: Dict[RuleKey, CompiledRule] = {}
+    ordered = sorted(rules, key=lambda r: getattr(r, "created_at", None) or datetime.min)
+    for rule in ordered:
+        if not rule.is_active or rule.ticket_type is None:
+            continue
+        compiled = CompiledRule(
+            rule_id=rule.rule_id,
+            name=rule.name,
+            ticket_type=_key_part(rule.ticket_type),
+            customer_impact=_key_part(rule.customer_impact),
+            business_priority=_key_part(rule.business_priority),
+            sla_target_hours=rule.sla_target_hours if rule.sla_target_hours is not None else DEFAULT_TARGET_HOURS,
+            sla_breach_hours=rule.sla_breach_hours if rule.sla_breach_hours is not None else DEFAULT_BREACH_HOURS,
+            escalation_levels=rule.escalation_levels if rule.escalation_levels is not None else 3,
+        )
+        table[(compiled.ticket_type, compiled.customer_impact, compiled.business_priority)] = compiled
+    return table
+
+
+def _load_active_rules(db) -> List[Any]:
+    import models
+    return db.query(models.SLARule).filter(models.SLARule.is_active == True).all()
+
+
+class SLARuleEngine:
+    def __init__(self, max_age_seconds: float = 300.0, loader=_load_active_rules, clock=time.monotonic):
+        self.max_age_seconds = max_age_seconds
+        self.loader = loader
+        self.clock = clock
+        self._table: Optional[Dict[RuleKey, CompiledRule]] = None
+        self._loaded_at = 0.0
+        self._generation = 0
+        self._lock = threading.Lock()
+
+    def invalidate(self):
+        with self._lock:
+            self._table = None
+            self._generation += 1
+
+    def _get_table(self, db) -> Dict[RuleKey, CompiledRule]:
+        table = self._table
+        if table is not None and self.clock() - self._loaded_at < self.max_age_seconds:
+            return table
+        generation = self._generation
+        table = compile_rules(self.loader(db))
+        with self._lock:
+            # An invalidation that raced the load wins; the next call reloads again
+            if generation == self._generation:
+                self._table = table
+                self._loaded_at = self.clock()
+        SLA_RULE_RELOADS.inc()
+        return table
+
+    def match(self, db, ticket_type, customer_impact, business_priority) -> Optional[CompiledRule]:
+        return self._lookup(self._get_table(db), ticket_type, customer_impact, business_priority)
+
+    @staticmethod
+    def _lookup(table: Dict[RuleKey, CompiledRule], ticket_type, customer_impact, business_priority) -> Optional[CompiledRule]:
+        t, i, p = _key_part(ticket_type), _key_part(customer_impact), _key_part(business_priority)
+        return table.get((t, i, p)) or table.get((t, i, None)) or table.get((t, None, None))
+
+
+def notify_rules_changed():
+    """Drop this worker's compiled rules and tell the other workers to do the same."""
+    sla_engine.invalidate()
+    from utils.redis_manager import redis_manager
+    client = redis_manager.get_sync()
+    if not client:
+        return
+    try:
+        client.publish(SLA_RULES_CHANNEL, "reload")
+    except Exception as e:
+        logger.warning("SLA rule change publish failed: %s", e)
+        redis_manager.record_failure(e)
+
+
+async def sla_rules_listener():
+    """Invalidate the local rule table whenever another worker changes SLA rules."""
+    from utils.redis_manager import listen_channel, redis_manager
+    await listen_channel(
+        redis_manager,
+        SLA_RULES_CHANNEL,
+        on_message=lambda data: sla_engine.invalidate(),
+        on_subscribe=sla_engine.invalidate,
+    )
+
+
+def _build_engine() -> SLARuleEngine:
+    from settings import settings
+    return SLARuleEngine(max_age_seconds=settings.SLA_RULES_MAX_AGE_SECONDS)
+
+
+sla_engine = _build_engine()
@@ -0,0 +1,123 @@
+"""
+Periodic SLA breach / escalation scanner.
+
+`tickets.sla_due_at` holds each open ticket's next SLA threshold (maintained by
+the Ticket insert/update listeners in models.py) and is covered by a partial
+index on non-NULL values. A scan is therefore an index range read of only the
+tickets that are actually due, however many tickets are open. Due tickets are
+escalated in batches with a single UPDATE ... RETURNING each, which also moves
+`sla_due_at` to the next threshold (or NULL), and one coalesced broadcast is
+sent per scan.
+"""
+import asyncio
+import json
+import logging
+import time
+from datetime import datetime, timezone
+from typing import Awaitable, Callable, Dict, Optional
+
+from starlette.concurrency import run_in_threadpool
+
+from utils import metrics
+from utils.etag import bump_table_versions
+
+logger = logging.getLogger("ticketing")
+
+SLA_ESCALATIONS = metrics.registry.counter(
+    "ticketing_sla_escalations", "Tickets escalated by the SLA scanner, by new escalation level.", ("level",))
+SLA_SCAN_SECONDS = metrics.registry.histogram(
+    "ticketing_sla_scan_seconds", "Duration of one SLA scanner pass.")
+
+# Arbitrary constant identifying the SLA scanner for pg_try_advisory_lock
+_SCAN_LOCK_KEY = 72035
+# Ticket ids included in the coalesced broadcast; the count is always exact
+BROADCAST_MAX_IDS = 200
+
+_ESCALATE_SQL = """
+WITH due AS (
+    SELECT ticket_id FROM tickets
+    WHERE sla_due_at IS NOT NULL AND sla_due_at <= :now
+      AND status NOT IN ('completed', 'closed', 'approved', 'archived')
+    ORDER BY sla_due_at
+    LIMIT :batch_size
+    FOR UPDATE SKIP LOCKED
+)
+UPDATE tickets AS t
+SET escalation_level = COALESCE(t.escalation_level, 0) + 1,
+    escalation_notified = false,
+    sla_due_at = CASE
+        WHEN COALESCE(t.escalation_level, 0) = 0
+             AND COALESCE(t.sla_breach_hours, 48) > COALESCE(t.sla_target_hours, 24)
+        THEN t.created_at + make_interval(hours => COALESCE(t.sla_breach_hours, 48))
+        ELSE NULL
+    END
+FROM due
+WHERE t.ticket_id = due.ticket_id
+RETURNING t.ticket_id, t.escalation_level
+"""
+
+
+def scan_sla_breaches(batch_size: int = 5000, now: Optional[datetime] = None) -> Dict[str, int]:
+    """Escalate every ticket whose SLA threshold has passed; returns {ticket_id: new_level}.
+
+    Each batch commits on its own so row locks stay short. A ticket that is
+    already past its breach time too is picked up again by a later batch or the
+    next scan. An advisory lock keeps workers from scanning at the same time.
+    """
+    from sqlalchemy import text
+    from database import engine
+
+    now = now or datetime.now(timezone.utc).replace(tzinfo=None)
+    escalated: Dict[str, int] = {}
+    with engine.connect() as conn:
+        if not conn.execute(text("SELECT pg_try_advisory_lock(:k)"), {"k": _SCAN_LOCK_KEY}).scalar():
+            conn.rollback()
+            return escalated
+        conn.commit()
+        try:
+            while True:
+                rows = conn.execute(text(_ESCALATE_SQL), {"now": now, "batch_size": batch_size}).all()
+                conn.commit()
+                for ticket_id, level in rows:
+                    escalated[ticket_id] = level
+                    SLA_ESCALATIONS.inc(labels=(str(level),))
+                if len(rows) < batch_size:
+                    break
+        finally:
+            conn.execute(text("SELECT pg_advisory_unlock(:k)"), {"k": _SCAN_LOCK_KEY})
+            conn.commit()
+    if escalated:
+        bump_table_versions(["tickets"])
+    return escalated
+
+
+def escalation_message(escalated: Dict[str, int]) -> str:
+    """One broadcast for a whole scan instead of one per ticket."""
+    levels: Dict[str, int] = {}
+    for level in escalated.values():
+        levels[str(level)] = levels.get(str(level), 0) + 1
+    return json.dumps({
+        "type": "sla",
+        "action": "escalated",
+        "count": len(escalated),
+        "levels": levels,
+        "ticket_ids": list(escalated)[:BROADCAST_MAX_IDS],
+    })
+
+
+async def sla_scan_loop(broadcast: Callable[[str], Awaitable[None]]):
+    """Run the scanner every SLA_SCAN_INTERVAL_SECONDS and broadcast what it escalated."""
+    from settings import settings
+    while True:
+        await asyncio.sleep(settings.SLA_SCAN_INTERVAL_SECONDS)
+        start = time.perf_counter()
+        try:
+            escalated = await run_in_threadpool(scan_sla_breaches, settings.SLA_SCAN_BATCH_SIZE)
+        except Exception as e:
+            logger.warning("SLA scan failed: %s", e)
+            continue
+        finally:
+            SLA_SCAN_SECONDS.observe(time.perf_counter() - start)
+        if escalated:
+            logger.info("SLA scan escalated %d tickets", len(escalated))
+            await broadcast(escalation_message(escalated))
@@ -0,0 +1,255 @@
+"""
+JWT revocation (logout) without a DB round trip on the common path.
+
+Every token carries a `jti`. `/logout` writes the access token's and refresh
+token's JTIs to `revoked_tokens` (`revoke`). Each worker keeps two structures:
+
+* a Bloom filter over every unexpired revoked JTI. "Not in the filter" means
+  not revoked, which is the answer for nearly every request.
+* an exact LRU of recently revoked JTIs (with their expiry). A filter hit is
+  first checked against it; only a hit that is not in the LRU (an old
+  revocation or a false positive) reads `revoked_tokens`.
+
+New revocations reach other workers over Redis pubsub
+(`TOKEN_REVOCATION_CHANNEL`). After every (re)subscribe, and every
+`TOKEN_REVOCATION_PURGE_SECONDS`, a worker deletes expired rows and rebuilds its
+filter from the table, so a missed message is repaired by the next rebuild.
+Until the first rebuild has finished, checks go to the database.
+"""
+import asyncio
+import hashlib
+import json
+import logging
+import math
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime, timezone
+from typing import Iterable, NamedTuple, Optional
+
+from sqlalchemy import delete, select
+from sqlalchemy.orm import Session
+
+import models
+from utils import metrics
+
+logger = logging.getLogger("ticketing")
+
+TOKEN_REVOCATION_CHANNEL = "token_revocations"
+
+REVOCATION_CHECKS = metrics.registry.counter(
+    "ticketing_token_revocation_checks",
+    "Token revocation checks by how they were answered (filter, lru, db_revoked, db_clear).",
+    ("result",))
+
+
+class RevokedJTI(NamedTuple):
+    jti: str
+    user_id: str
+    token_type: str
+    expires_at: datetime
+
+
+class BloomFilter:
+    """Fixed-size Bloom filter (double hashing over one blake2b digest)."""
+
+    def __init__(self, capacity: int, error_rate: float):
+        capacity = max(1, capacity)
+        self.bits = max(64, int(-capacity * math.log(error_rate) / (math.log(2) ** 2)))
+        self.hashes = max(1, round(self.bits / capacity * math.log(2)))
+        self._array = bytearray((self.bits + 7) // 8)
+
+    def _positions(self, key: str):
+        digest = hashlib.blake2b(key.encode(), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], "little")
+        h2 = int.from_bytes(digest[8:], "little") | 1
+        return ((h1 + i * h2) % self.bits for i in range(self.hashes))
+
+    def add(self, key: str):
+        for pos in self._positions(key):
+            self._array[pos >> 3] |= 1 << (pos & 7)
+
+    def __contains__(self, key: str) -> bool:
+        return all(self._array[pos >> 3] & (1 << (pos & 7)) for pos in self._positions(key))
+
+
+def _utc(value: datetime) -> datetime:
+    return value if value.tzinfo else value.replace(tzinfo=timezone.utc)
+
+
+class RevocationList:
+    def __init__(self, capacity: Optional[int] = None, error_rate: Optional[float] = None,
+                 lru_size: Optional[int] = None, clock=time.time):
+        from settings import settings
+        self._capacity = capacity or settings.TOKEN_REVOCATION_BLOOM_CAPACITY
+        self._error_rate = error_rate or settings.TOKEN_REVOCATION_BLOOM_ERROR_RATE
+        self._lru_size = lru_size or settings.TOKEN_REVOCATION_LRU_SIZE
+        self._clock = clock
+        self._bloom = BloomFilter(self._capacity, self._error_rate)
+        self._recent: "OrderedDict[str, float]" = OrderedDict()
+        # Filter false positives the database said are not revoked
+        self._clear: "OrderedDict[str, None]" = OrderedDict()
+        self._additions = 0
+        self._loaded = False
+        self._rebuilding: Optional[list] = None
+        self._lock = threading.Lock()
+        # One rebuild at a time: they share `_rebuilding`, so an overlap could drop an add
+        self._reload_lock = threading.Lock()
+
+    @property
+    def loaded(self) -> bool:
+        return self._loaded
+
+    def add(self, jti: str, expires_at: float):
+        """Record a revocation in this worker's filter and LRU."""
+        with self._lock:
+            self._bloom.add(jti)
+            if self._rebuilding is not None:
+                self._rebuilding.append(jti)
+            self._additions += 1
+            self._clear.pop(jti, None)
+            self._remember(self._recent, jti, expires_at)
+
+    def _remember(self, lru: OrderedDict, jti: str, value):
+        lru[jti] = value
+        lru.move_to_end(jti)
+        while len(lru) > self._lru_size:
+            lru.popitem(last=False)
+
+    def is_revoked(self, jti: Optional[str], db: Optional[Session] = None, before_load: bool = True) -> bool:
+        """`before_load=False` answers "not revoked" instead of querying until the filter is loaded."""
+        if not jti:
+            return False
+        with self._lock:
+            additions = self._additions
+            if not self._loaded and not before_load:
+                return False
+            if self._loaded:
+                if jti not in self._bloom:
+                    REVOCATION_CHECKS.inc(labels=("filter",))
+                    return False
+                if jti in self._recent:
+                    REVOCATION_CHECKS.inc(labels=("lru",))
+                    return True
+                if jti in self._clear:
+                    REVOCATION_CHECKS.inc(labels=("lru",))
+                    return False
+        revoked = self._lookup(jti, db)
+        REVOCATION_CHECKS.inc(labels=("db_revoked" if revoked else "db_clear",))
+        with self._lock:
+            if revoked:
+                # Expiry unknown here; the JWT's own exp rejects the token after that anyway
+                self._remember(self._recent, jti, math.inf)
+            elif self._loaded and additions == self._additions:
+                self._remember(self._clear, jti, None)
+        return revoked
+
+    def _lookup(self, jti: str, db: Optional[Session]) -> bool:
+        if db is not None:
+            return db.get(models.RevokedToken, jti) is not None
+        from database import SessionLocal
+        session = SessionLocal()
+        try:
+            return session.get(models.RevokedToken, jti) is not None
+        finally:
+            session.close()
+
+    def reload(self, db: Optional[Session] = None, purge: bool = False):
+        """Rebuild the filter from `revoked_tokens` (deleting expired rows first if `purge`)."""
+        with self._reload_lock:
+            self._reload(db, purge)
+
+    def _reload(self, db: Optional[Session], purge: bool):
+        own_session = db is None
+        if own_session:
+            from database import SessionLocal
+            db = SessionLocal()
+        with self._lock:
+            self._rebuilding = []
+        try:
+            now = datetime.now(timezone.utc)
+            if purge:
+                removed = db.execute(delete(models.RevokedToken).where(models.RevokedToken.expires_at < now)).rowcount
+                db.commit()
+                if removed:
+                    logger.info("Purged %d expired revoked tokens", removed)
+            jtis = db.execute(select(models.RevokedToken.jti).where(models.RevokedToken.expires_at >= now)).scalars().all()
+            bloom = BloomFilter(max(self._capacity, 2 * len(jtis)), self._error_rate)
+            for jti in jtis:
+                bloom.add(jti)
+            with self._lock:
+                for jti in self._rebuilding:
+                    bloom.add(jti)
+                self._bloom = bloom
+                self._clear.clear()
+                cutoff = self._clock()
+                for jti in [j for j, exp in self._recent.items() if exp < cutoff]:
+                    del self._recent[jti]
+                self._loaded = True
+        finally:
+            with self._lock:
+                self._rebuilding = None
+            if own_session:
+                db.close()
+
+
+def revoke(db: Session, tokens: Iterable[RevokedJTI], reason: str = "logout"):
+    """Persist revocations, then apply them on this worker and publish them to the others."""
+    tokens = [t for t in tokens if t.jti]
+    if not tokens:
+        return
+    for t in tokens:
+        db.merge(models.RevokedToken(jti=t.jti, user_id=t.user_id, token_type=t.token_type,
+                                     expires_at=t.expires_at, reason=reason))
+    db.commit()
+    messages = [{"jti": t.jti, "exp": _utc(t.expires_at).timestamp()} for t in tokens]
+    for m in messages:
+        revocation_list.add(m["jti"], m["exp"])
+    from utils.redis_manager import redis_manager
+    client = redis_manager.get_sync()
+    if not client:
+        return
+    try:
+        client.publish(TOKEN_REVOCATION_CHANNEL, json.dumps(messages))
+    except Exception as e:
+        logger.warning("Token revocation publish failed: %s", e)
+        redis_manager.record_failure(e)
+
+
+def revoked_from_payload(payload: dict, default_type: str = "access") -> Optional[RevokedJTI]:
+    """RevokedJTI for a decoded token, or None when it has no jti (issued before JTIs existed)."""
+    jti, sub, exp = payload.get("jti"), payload.get("sub"), payload.get("exp")
+    if not jti or not sub or exp is None:
+        return None
+    return RevokedJTI(jti, str(sub), payload.get("type") or default_type,
+                      datetime.fromtimestamp(exp, tz=timezone.utc))
+
+
+def _apply_message(data: str):
+    for m in json.loads(data):
+        revocation_list.add(m["jti"], m["exp"])
+
+
+def _reload_in_background():
+    asyncio.get_running_loop().run_in_executor(None, revocation_list.reload)
+
+
+async def token_revocation_listener():
+    """Apply revocations published by other workers; rebuild the filter after (re)subscribing."""
+    from utils.redis_manager import listen_channel, redis_manager
+    await listen_channel(redis_manager, TOKEN_REVOCATION_CHANNEL, on_message=_apply_message,
+                         on_subscribe=_reload_in_background)
+
+
+async def token_revocation_purge_loop():
+    """Load the filter at startup, then purge expired rows and rebuild it periodically."""
+    from settings import settings
+    while True:
+        try:
+            await asyncio.get_running_loop().run_in_executor(None, revocation_list.reload, None, True)
+        except Exception as e:
+            logger.warning("Revoked token purge failed: %s", e)
+        await asyncio.sleep(settings.TOKEN_REVOCATION_PURGE_SECONDS)
+
+
+revocation_list = RevocationList()
@@ -264,6 +264,10 @@ export const AuthProvider = ({ children }) => {
   };
 
   const logout = () => {
+    // Best effort: revoke the tokens server-side, but never keep the user logged in on failure
+    if (accessToken) {
+      api.post('/logout', { refresh_token: refreshToken }).catch(() => {});
+    }
     clearAuth();
   };
 
@@ -11,6 +11,8 @@ import useApi from './hooks/useApi';
 import StatusChip from './components/StatusChip';
 import TypeChip from './components/TypeChip';
 
+const PAGE_SIZE = 100;
+
 function CompactSiteDetail() {
   const { site_id: siteId } = useParams();
   const navigate = useNavigate();
@@ -27,16 +29,19 @@ function CompactSiteDetail() {
   const [savingNotes, setSavingNotes] = useState(false);
   const loadingRef = useRef(false);
 
+  const [ticketsCursor, setTicketsCursor] = useState(null);
+  const [shipmentsCursor, setShipmentsCursor] = useState(null);
+
   const load = async () => {
     if (loadingRef.current) return; // Prevent concurrent calls
     loadingRef.current = true;
     
     try {
+      // Summary carries the site row plus counts; collections are keyset paged
       const results = await Promise.allSettled([
-        api.get(`/sites/${siteId}`),
-        // Fetch all tickets for this site (no status filter) - users can filter in UI
-        api.get(`/tickets/?site_id=${siteId}&limit=500&skip=0`),
-        api.get(`/sites/${siteId}/shipments`)
+        api.get(`/sites/${siteId}/summary`),
+        api.get(`/sites/${siteId}/tickets?limit=${PAGE_SIZE}`),
+        api.get(`/sites/${siteId}/shipments?limit=${PAGE_SIZE}`)
       ]);
       const [siteRes, ticketsRes, shipmentsRes] = results;
 
@@ -48,15 +53,19 @@ function CompactSiteDetail() {
       }
 
       if (ticketsRes.status === 'fulfilled') {
-        setTickets(Array.isArray(ticketsRes.value) ? ticketsRes.value : (ticketsRes.value || []));
+        setTickets(ticketsRes.value?.items || []);
+        setTicketsCursor(ticketsRes.value?.next_cursor || null);
       } else {
         setTickets([]);
+        setTicketsCursor(null);
       }
 
       if (shipmentsRes.status === 'fulfilled') {
-        setShipments(Array.isArray(shipmentsRes.value) ? shipmentsRes.value : (shipmentsRes.value || []));
+        setShipments(shipmentsRes.value?.items || []);
+        setShipmentsCursor(shipmentsRes.value?.next_cursor || null);
       } else {
         setShipments([]);
+        setShipmentsCursor(null);
       }
     } catch {
       // Should rarely hit due to allSettled, but keep a guard
@@ -66,6 +75,23 @@ function CompactSiteDetail() {
     }
   };
 
+  const loadMore = async (kind) => {
+    const cursor = kind === 'tickets' ? ticketsCursor : shipmentsCursor;
+    if (!cursor) return;
+    try {
+      const page = await api.get(`/sites/${siteId}/${kind}?limit=${PAGE_SIZE}&cursor=${encodeURIComponent(cursor)}`);
+      if (kind === 'tickets') {
+        setTickets(prev => prev.concat(page?.items || []));
+        setTicketsCursor(page?.next_cursor || null);
+      } else {
+        setShipments(prev => prev.concat(page?.items || []));
+        setShipmentsCursor(page?.next_cursor || null);
+      }
+    } catch {
+      showError(`Failed to load more ${kind}`);
+    }
+  };
+
   useEffect(() => {
     load();
   // eslint-disable-next-line react-hooks/exhaustive-deps
@@ -86,8 +112,8 @@ function CompactSiteDetail() {
 
         <Tabs value={activeTab} onChange={(e, v) => setActiveTab(v)} sx={{ mb: 2 }}>
           <Tab label="Info" />
-          <Tab label={`Tickets (${tickets.length})`} />
-          <Tab label={`Shipments (${shipments.length})`} />
+          <Tab label={`Tickets (${site.total_tickets ?? tickets.length})`} />
+          <Tab label={`Shipments (${site.total_shipments ?? shipments.length})`} />
         </Tabs>
 
         {activeTab === 0 && (
@@ -248,6 +274,7 @@ function CompactSiteDetail() {
                 {tickets.length === 0 && <TableRow><TableCell colSpan={6} align="center">No tickets</TableCell></TableRow>}
               </TableBody>
             </Table>
+            {ticketsCursor && <Button size="small" sx={{ mt: 1 }} onClick={() => loadMore('tickets')}>Load more</Button>}
           </Box>
         )}
 
@@ -275,6 +302,7 @@ function CompactSiteDetail() {
                 {shipments.length === 0 && <TableRow><TableCell colSpan={4} align="center">No shipments</TableCell></TableRow>}
               </TableBody>
             </Table>
+            {shipmentsCursor && <Button size="small" sx={{ mt: 1 }} onClick={() => loadMore('shipments')}>Load more</Button>}
           </Box>
         )}
       </Paper>
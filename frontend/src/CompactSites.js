@@ -53,13 +53,11 @@ function CompactSites() {
       params.set('limit', String(rowsPerPage));
       params.set('skip', String(page * rowsPerPage));
       if (search) params.set('search', search);
-      // total count
-      const countParams = new URLSearchParams();
-      if (search) countParams.set('search', search);
-      const countRes = await apiRef.current.get(`/sites/count?${countParams.toString()}`);
-      setTotal(countRes?.count ?? 0);
+      // Items and total count in one request
+      params.set('with_total', 'true');
       const response = await apiRef.current.get(`/sites/?${params.toString()}`);
-      setSites(response || []);
+      setTotal(response?.total ?? 0);
+      setSites(response?.items || []);
     } catch {
       showError('Failed to load sites');
     }
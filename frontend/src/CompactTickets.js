@@ -83,43 +83,31 @@ function CompactTickets() {
       params.set('limit', String(rowsPerPage));
       params.set('skip', String(page * rowsPerPage));
       if (filters.type !== 'all') params.set('ticket_type', filters.type);
-      if (filters.status !== 'all') params.set('status', filters.status === 'active' ? '' : filters.status);
+      if (filters.status !== 'all' && filters.status !== 'active') params.set('status', filters.status);
+      // Archived tickets only show under their own filter
+      if (filters.status !== 'archived') params.set('exclude_archived', 'true');
       if (filters.workflow_state && filters.workflow_state !== 'all') params.set('workflow_state', filters.workflow_state);
       if (filters.priority !== 'all') params.set('priority', filters.priority);
       if (filters.search) params.set('search', filters.search);
-      // Fetch archived count first
-      const archivedParams = new URLSearchParams();
-      if (filters.type !== 'all') archivedParams.set('ticket_type', filters.type);
-      if (filters.workflow_state && filters.workflow_state !== 'all') archivedParams.set('workflow_state', filters.workflow_state);
-      if (filters.priority !== 'all') archivedParams.set('priority', filters.priority);
-      if (filters.search) archivedParams.set('search', filters.search);
-      archivedParams.set('status', 'archived');
-      
-      const archivedRes = await apiRef.current.get(`/tickets/count?${archivedParams.toString()}`);
-      const archivedCount = archivedRes?.count ?? 0;
-      setArchivedCount(archivedCount);
-      
-      // Fetch total count (all tickets)
-      const countParams = new URLSearchParams();
-      if (filters.type !== 'all') countParams.set('ticket_type', filters.type);
-      if (filters.status !== 'all' && filters.status !== 'active') countParams.set('status', filters.status);
-      if (filters.workflow_state && filters.workflow_state !== 'all') countParams.set('workflow_state', filters.workflow_state);
-      if (filters.priority !== 'all') countParams.set('priority', filters.priority);
-      if (filters.search) countParams.set('search', filters.search);
-      const countRes = await apiRef.current.get(`/tickets/count?${countParams.toString()}`);
-      const totalCount = countRes?.count ?? 0;
-      
-      // For active tickets, subtract archived count from total
-      const activeCount = filters.status === 'active' ? totalCount - archivedCount : totalCount;
-      setTotal(activeCount);
-      
+      // Items and total count in one request
+      params.set('with_total', 'true');
       const response = await apiRef.current.get(`/tickets/?${params.toString()}`);
-      // When filtering by archived, keep them; otherwise exclude from list
-      setTickets(
-        filters.status === 'archived'
-          ? (response || [])
-          : (response || []).filter(t => t.status !== 'archived')
-      );
+      const totalCount = response?.total ?? 0;
+      setTotal(totalCount);
+      setTickets(response?.items || []);
+
+      if (filters.status === 'archived') {
+        setArchivedCount(totalCount);
+      } else {
+        const archivedParams = new URLSearchParams();
+        if (filters.type !== 'all') archivedParams.set('ticket_type', filters.type);
+        if (filters.workflow_state && filters.workflow_state !== 'all') archivedParams.set('workflow_state', filters.workflow_state);
+        if (filters.priority !== 'all') archivedParams.set('priority', filters.priority);
+        if (filters.search) archivedParams.set('search', filters.search);
+        archivedParams.set('status', 'archived');
+        const archivedRes = await apiRef.current.get(`/tickets/count?${archivedParams.toString()}`);
+        setArchivedCount(archivedRes?.count ?? 0);
+      }
     } catch (err) {
       showError('Failed to load tickets');
     } finally {
@@ -69,6 +69,11 @@ export function NotificationProvider({ children }) {
       triggerRefresh(t, message);
     }
 
+    // Burst coalesced by the server (bulk edits, imports): notify once, as for its latest event
+    if (message.action === 'batch' && message.events && message.events.length) {
+      message = { type: message.type, ...message.events[message.events.length - 1] };
+    }
+
     // Create notification based on message type
     let notificationMessage = '';
     let notificationType = 'info';
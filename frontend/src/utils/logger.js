@@ -13,6 +13,11 @@ class Logger {
       debug: 3
     };
     this.context = 'frontend';
+    // Entries are buffered and sent to /api/logs/batch so error bursts cost one request per flush
+    this.pending = [];
+    this.flushTimer = null;
+    this.maxBatchSize = 50;
+    this.flushDelayMs = 2000;
   }
 
   setLogLevel(level) {
@@ -66,19 +71,37 @@ class Logger {
     }
   }
 
-  async sendToBackend(logEntry) {
+  sendToBackend(logEntry) {
+    this.pending.push(logEntry);
+    if (this.pending.length >= this.maxBatchSize) {
+      this.flush();
+    } else if (!this.flushTimer) {
+      this.flushTimer = setTimeout(() => this.flush(), this.flushDelayMs);
+    }
+  }
+
+  async flush() {
+    if (this.flushTimer) {
+      clearTimeout(this.flushTimer);
+      this.flushTimer = null;
+    }
+    if (this.pending.length === 0) return;
+    const logs = this.pending.splice(0, this.maxBatchSize);
     try {
       const headers = { 'Content-Type': 'application/json' };
       const token = typeof sessionStorage !== 'undefined' && sessionStorage.getItem('access_token');
       if (token) headers['Authorization'] = `Bearer ${token}`;
-      await fetch('/api/logs', {
+      await fetch('/api/logs/batch', {
         method: 'POST',
         headers,
-        body: JSON.stringify(logEntry)
+        body: JSON.stringify({ logs })
       });
     } catch (error) {
       console.error('Failed to send log to backend:', error);
     }
+    if (this.pending.length > 0 && !this.flushTimer) {
+      this.flushTimer = setTimeout(() => this.flush(), this.flushDelayMs);
+    }
   }
 
   error(message, data = null) {